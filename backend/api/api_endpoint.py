@@ -5,20 +5,28 @@ import os
 # Import route blueprints
 from routes.database_routes import database_routes
 from routes.uyap_routes import uyap_routes
+from services.database_connection import DB_PATH
+from services.storage import get_storage
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for cross-origin requests
+CORS(app, expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"])  # Enable CORS for cross-origin requests
 
 # Register blueprints
 app.register_blueprint(database_routes)
 app.register_blueprint(uyap_routes)
 
 if __name__ == '__main__':
+    storage = get_storage()
+
     # Check if database exists
-    DB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'files.db')
-    if not os.path.exists(DB_PATH):
+    if storage.name == 'sqlite' and not os.path.exists(DB_PATH):
         print(f"Warning: Database file {DB_PATH} not found!")
     
+    # Apply pending schema migrations once, before serving
+    storage.ensure_schema()
+    
     print("Starting Database API Server...")
-    print(f"Database path: {DB_PATH}")
+    print(f"Storage backend: {storage.name}")
+    if storage.name == 'sqlite':
+        print(f"Database path: {DB_PATH}")
     app.run(debug=True, port=5001, host='0.0.0.0') 
\ No newline at end of file
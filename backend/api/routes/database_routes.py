@@ -1,85 +1,431 @@
-from flask import Blueprint, jsonify, request
-import sqlite3
+from flask import Blueprint, Response, jsonify, make_response, request
 import os
+import re
 import json
-from datetime import datetime
+import base64
+from datetime import datetime, timezone
+from functools import wraps
 
 # Add current directory to path to import backend functions
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.database_reader import (
-    get_all_files, get_file_by_id, get_file_details_by_id,
-    get_borclular_by_file_id, get_borclu_sorgular_by_borclu_id,
-    get_borclu_sorgu_by_tipi, get_file_dict
-)
+from services.database_reader import list_page_key, LIST_FILTER_COLUMNS, LIST_SORT_KEYS, JSON_PATH_PATTERN
+from services.search_index import build_match_query
+from services.storage import get_storage
+from services.replica import replica_status
+from services.sorgu_cache import sorgu_cache
+from services.write_queue import write_queue
 
 database_routes = Blueprint('database_routes', __name__)
 
+# Conditional GET: endpoints send an ETag (and Last-Modified where a row timestamp
+# exists). A request whose If-None-Match / If-Modified-Since still matches gets a
+# 304 before any payload is read or serialized.
+
+def _set_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Clients may keep the body but must revalidate before reusing it
+    response.cache_control.no_cache = True
+    return response
+
+def _not_modified_response(etag, last_modified=None):
+    """Return a 304 response if the request validators match, otherwise None"""
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        matched = last_modified <= request.if_modified_since
+    else:
+        matched = False
+    if not matched:
+        return None
+    return _set_validators(Response(status=304), etag, last_modified)
+
+def _conditional(view, etag, last_modified, *args, **kwargs):
+    not_modified = _not_modified_response(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    response = make_response(view(*args, **kwargs))
+    if response.status_code == 200:
+        _set_validators(response, etag, last_modified)
+    return response
+
+def data_version_etag(view):
+    """Conditional GET validated by the global data_version write counter"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = get_storage().data_version()
+        if version is None:
+            return view(*args, **kwargs)
+        return _conditional(view, f"v{version}", None, *args, **kwargs)
+    return wrapper
+
+def _timestamp_to_http_date(timestamp):
+    """Convert a stored (local time, ISO format) timestamp to an aware UTC datetime for Last-Modified"""
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    return parsed.astimezone(timezone.utc).replace(microsecond=0)
+
+def sorgu_etag(sorgu_tipi):
+    """Conditional GET for a sorgulama endpoint, validated by the row's borclu_sorgular.timestamp"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(file_id, borclu_id):
+            timestamp = get_storage().get_borclu_sorgu_timestamp(borclu_id, sorgu_tipi)
+            if timestamp is None:
+                return view(file_id, borclu_id)
+            etag = "t" + re.sub(r'[^0-9A-Za-z]', '', timestamp)
+            return _conditional(view, etag, _timestamp_to_http_date(timestamp), file_id, borclu_id)
+        return wrapper
+    return decorator
+
+# Sorgulama endpoints splice the stored sorgu_verisi JSON text into the response
+# envelope as is; payloads are never decoded and re-encoded on the read path.
+
+# Top-level sections of an SGK result returned by the sgk-sorgulama endpoint
+SGK_SECTIONS = [
+    "sskCalisani", "bagkurCalisani", "sskIsYeriBilgisi", "kamuCalisani",
+    "kamuEmeklisi", "sskEmeklisi", "bagkurEmeklisi"
+]
+
+def raw_json_response(fields, raw_fields):
+    """Stream a JSON object made of fields (encoded here) and raw_fields (already JSON text, copied verbatim)"""
+    def generate():
+        # fields is never empty, so the encoded object only needs its closing brace moved
+        yield json.dumps(fields, ensure_ascii=False)[:-1].encode('utf-8')
+        for name, text in raw_fields.items():
+            yield f", {json.dumps(name)}: ".encode('utf-8')
+            yield text.encode('utf-8')
+        yield b"}"
+    return Response(generate(), mimetype='application/json')
+
 @database_routes.route('/api/icra-dosyalarim', methods=['GET'])
+@data_version_etag
 def api_icra_dosyalarim():
-    """Main endpoint for getting all icra dosyalari list"""
-    try:
-        print("API: Fetching icra dosyalari list from database")
-        
-        files = get_all_files()
-        print(f"Found {len(files)} files in database")
-        
-        # Transform database data to match the expected API response format
-        listData = []
-        for file_row in files:
-            file_dict = get_file_dict(file_row)
-            if file_dict:
-                # Get all borclular for this file to show complete list
-                borclular = get_borclular_by_file_id(file_dict['file_id'])
-                
-                # Create borclu names list
-                if borclular and len(borclular) > 1:
-                    # Multiple borclular - show all names in correct order
-                    borclu_names = [borclu.get('ad', '') for borclu in sorted(borclular, key=lambda x: x.get('borclu_id', '')) if borclu.get('ad')]
-                    borcluAdi = ', '.join(borclu_names)
-                else:
-                    # Single borclu or no borclular - use the original field
-                    borcluAdi = file_dict['borcluAdi']
-                
-                transformed_item = {
-                    "file_id": file_dict['file_id'],
-                    "klasor": file_dict['klasor'],
-                    "dosyaNo": file_dict['dosyaNo'],
-                    "eYil": file_dict['eYil'],
-                    "eNo": file_dict['eNo'],
-                    "borcluAdi": borcluAdi,
-                    "alacakliAdi": file_dict['alacakliAdi'],
-                    "foyTuru": file_dict['foyTuru'],
-                    "durum": file_dict['durum'],
-                    "takipTarihi": file_dict['takipTarihi'],
-                    "icraMudurlugu": file_dict['icraMudurlugu'],
-                }
-                listData.append(transformed_item)
-        
-        print(f"Transformed {len(listData)} files for API response")
-        if listData:
-            print("First item structure:", listData[0])
-        
-        return jsonify(listData)
+    """
+    Main endpoint for getting the icra dosyalari list.
+
+    Optional query parameters:
+        durum, icraMudurlugu, foyTuru, eYil, alacakliAdi: exact-match filters
+        takipTarihiFrom, takipTarihiTo: inclusive date range (DD.MM.YYYY or YYYY-MM-DD)
+        sort: one of LIST_SORT_KEYS (default file_id), order: asc or desc
+        limit: page size (1..MAX_PAGE_SIZE); without it the whole list is returned
+        cursor: X-Next-Cursor value of the previous page
+        arsiv: 1 to list the closed files moved to archive.db instead
+
+    The body is always a JSON array. X-Total-Count carries the number of
+    matching files and X-Next-Cursor is set when another page follows.
+    """
+    try:
+        try:
+            filters = _parse_list_filters(request.args)
+            sort = request.args.get('sort') or 'file_id'
+            if sort not in LIST_SORT_KEYS:
+                raise ValueError(f"sort must be one of: {', '.join(LIST_SORT_KEYS)}")
+            order = (request.args.get('order') or 'asc').lower()
+            if order not in ('asc', 'desc'):
+                raise ValueError("order must be asc or desc")
+            limit = _parse_limit(request.args.get('limit'))
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor, sort, order) if cursor else None
+            archived = _parse_arsiv(request.args)
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+
+        storage = get_storage()
+        headers = {}
+        total_count = storage.count_files(filters, archived=archived)
+        if total_count is not None:
+            headers['X-Total-Count'] = str(total_count)
+
+        # Read one extra row to know whether another page follows
+        items = storage.iter_files(
+            limit=limit + 1 if limit is not None else None,
+            after=after,
+            filters=filters,
+            sort=sort,
+            descending=order == 'desc',
+            archived=archived
+        )
+        # Pull the first row here so database errors still produce a 500 response
+        first_item = next(items, None)
+
+        if limit is not None:
+            page = [first_item] if first_item is not None else []
+            page.extend(items)
+            if len(page) > limit:
+                page = page[:limit]
+                headers['X-Next-Cursor'] = encode_cursor(list_page_key(page[-1], sort), sort, order)
+            first_item = page[0] if page else None
+            items = iter(page[1:])
+
+        return Response(_stream_json_array(first_item, items), mimetype='application/json', headers=headers)
         
     except Exception as error:
         print(f"Error in api_icra_dosyalarim: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
+MAX_PAGE_SIZE = 1000
+
+def _parse_arsiv(args):
+    """Validate the arsiv query parameter: True to read archived files from archive.db"""
+    value = (args.get('arsiv') or '0').lower()
+    if value not in ('0', '1', 'true', 'false'):
+        raise ValueError("arsiv must be 0 or 1")
+    return value in ('1', 'true')
+
+def _parse_limit(value):
+    """Validate the limit query parameter (None means no limit)"""
+    if value is None or value == '':
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+def _parse_date(value, name):
+    """Convert a DD.MM.YYYY or YYYY-MM-DD query parameter to an ISO date string"""
+    for date_format in ('%d.%m.%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f"{name} must be a date in DD.MM.YYYY or YYYY-MM-DD format")
+
+def _parse_list_filters(args):
+    """Collect the supported list filters from the query string"""
+    filters = {}
+    for name in LIST_FILTER_COLUMNS:
+        value = args.get(name)
+        if value is None or value == '':
+            continue
+        if name == 'eYil':
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError("eYil must be an integer")
+        filters[name] = value
+    for name in ('takipTarihiFrom', 'takipTarihiTo'):
+        if args.get(name):
+            filters[name] = _parse_date(args[name], name)
+    return filters
+
+def encode_cursor(key, sort='file_id', order='asc'):
+    """Build an opaque cursor pointing after the given page key"""
+    payload = json.dumps({"sort": sort, "order": order, "key": key}, ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, sort='file_id', order='asc'):
+    """Return the page key a cursor points after, checking it matches the requested order"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        key = payload['key']
+    except (ValueError, UnicodeError, KeyError, TypeError):
+        raise ValueError("invalid cursor")
+    if payload.get('sort') != sort or payload.get('order') != order:
+        raise ValueError("cursor does not match the requested sort order")
+    if not isinstance(key, list) or len(key) != (1 if sort == 'file_id' else 2):
+        raise ValueError("invalid cursor")
+    return key
+
+STREAM_CHUNK_ITEMS = 500
+
+def _stream_json_array(first_item, items):
+    """Serialize items as a JSON array, flushing every STREAM_CHUNK_ITEMS elements"""
+    if first_item is None:
+        yield '[]'
+        return
+    chunk = ['[', json.dumps(first_item, ensure_ascii=False)]
+    for item in items:
+        chunk.append(',')
+        chunk.append(json.dumps(item, ensure_ascii=False))
+        if len(chunk) >= 2 * STREAM_CHUNK_ITEMS:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(']')
+    yield ''.join(chunk)
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+@database_routes.route('/api/search', methods=['GET'])
+@data_version_etag
+def api_search():
+    """
+    Full-text search over debtor names/details and scraped sorgu payloads.
+
+    Query parameters:
+        q: free text (every word must match, as a prefix; Turkish letters are folded)
+        limit: number of hits (1..SEARCH_MAX_LIMIT, default SEARCH_DEFAULT_LIMIT)
+
+    Returns ranked hits with file_id, dosyaNo, icraMudurlugu, borclu_id,
+    borcluAdi, sorgu_tipi (null for debtor name matches) and a snippet.
+    """
+    try:
+        query = (request.args.get('q') or '').strip()
+        if not build_match_query(query):
+            return jsonify({"error": "q parameter is required"}), 400
+        limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT)
+        try:
+            limit = int(limit)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        if not 1 <= limit <= SEARCH_MAX_LIMIT:
+            return jsonify({"error": f"limit must be between 1 and {SEARCH_MAX_LIMIT}"}), 400
+
+        return jsonify(get_storage().search(query, limit))
+
+    except Exception as error:
+        print(f"Error in api_search: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+# Portfolio-wide asset queries over the tables projected from EGM, TAKBIS and Banka results
+
+ASSET_PAGE_SIZE = 100
+
+def _parse_asset_page(args):
+    """Validate limit (default ASSET_PAGE_SIZE) and after (next_after of the previous page)"""
+    limit = _parse_limit(args.get('limit')) or ASSET_PAGE_SIZE
+    after = args.get('after')
+    if after:
+        try:
+            after = int(after)
+        except ValueError:
+            raise ValueError("after must be an integer")
+    return limit, after or None
+
+def _parse_haciz(value):
+    """haciz=var / haciz=yok filter; None when not given"""
+    if not value:
+        return None
+    if value not in ('var', 'yok'):
+        raise ValueError("haciz must be var or yok")
+    return value == 'var'
+
+def _asset_page(list_assets, id_column, **filters):
+    """Run an asset list query for one page and wrap it with the keyset cursor"""
+    try:
+        limit, after = _parse_asset_page(request.args)
+        filters = {name: parse(request.args.get(name)) for name, parse in filters.items()}
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    filters['file_id'] = request.args.get('file_id') or None
+
+    # Read one extra row to know whether another page follows
+    items = list_assets(after=after, limit=limit + 1, **filters)
+    next_after = items[limit - 1][id_column] if len(items) > limit else None
+    return jsonify({"items": items[:limit], "next_after": next_after})
+
+def _text(value):
+    return value or None
+
+@database_routes.route('/api/varliklar/araclar', methods=['GET'])
+@data_version_etag
+def api_varlik_araclar():
+    """
+    Vehicles of all debtors (from EGM results) with mahrumiyet and haciz counts.
+
+    Optional query parameters: haciz (var / yok), marka, file_id, limit, after
+    """
+    try:
+        return _asset_page(get_storage().list_araclar, 'arac_id', haciz=_parse_haciz, marka=_text)
+    except Exception as error:
+        print(f"Error in api_varlik_araclar: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@database_routes.route('/api/varliklar/tasinmazlar', methods=['GET'])
+@data_version_etag
+def api_varlik_tasinmazlar():
+    """
+    Properties of all debtors (from TAKBIS results) with share and haciz counts.
+
+    Optional query parameters: haciz (var / yok), il_ilce, file_id, limit, after
+    """
+    try:
+        return _asset_page(get_storage().list_tasinmazlar, 'tasinmaz_id', haciz=_parse_haciz, il_ilce=_text)
+    except Exception as error:
+        print(f"Error in api_varlik_tasinmazlar: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@database_routes.route('/api/varliklar/banka-hesaplari', methods=['GET'])
+@data_version_etag
+def api_varlik_banka_hesaplari():
+    """
+    Bank accounts of all debtors (from Banka results).
+
+    Optional query parameters: kurum, file_id, limit, after
+    """
+    try:
+        return _asset_page(get_storage().list_banka_hesaplari, 'hesap_id', kurum=_text)
+    except Exception as error:
+        print(f"Error in api_varlik_banka_hesaplari: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@database_routes.route('/api/varliklar/ozet', methods=['GET'])
+@data_version_etag
+def api_varlik_ozet():
+    """Portfolio asset totals: vehicles/properties (and those without haciz), bank accounts by kurum"""
+    try:
+        return jsonify(get_storage().asset_summary())
+    except Exception as error:
+        print(f"Error in api_varlik_ozet: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@database_routes.route('/api/cache/stats', methods=['GET'])
+def api_cache_stats():
+    """Return sorgu result cache, connection pool and background writer statistics"""
+    try:
+        return jsonify({
+            "sorgu_cache": sorgu_cache.stats(),
+            "connection_pool": get_storage().stats(),
+            "write_queue": write_queue.stats()
+        })
+    except Exception as error:
+        print(f"Error in api_cache_stats: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@database_routes.route('/api/replica/status', methods=['GET'])
+def api_replica_status():
+    """
+    Report how far the read replica is behind files.db.
+
+    Served by the read-only processes about their own replica, and by the
+    primary about the replica of its database. 404 until the first sync.
+    """
+    try:
+        status = replica_status()
+        if status is None:
+            return jsonify({"error": "No replica"}), 404
+        return jsonify(status)
+    except Exception as error:
+        print(f"Error in api_replica_status: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @database_routes.route('/api/icra-dosyalarim/<file_id>', methods=['GET'])
+@data_version_etag
 def api_icra_dosya_detail(file_id):
-    """Get detailed information for a specific file"""
+    """Get detailed information for a specific file (arsiv=1: an archived file)"""
     try:
         print(f"API: Fetching file detail for file_id: {file_id}")
-        
-        file_row = get_file_by_id(file_id)
-        if not file_row:
+        try:
+            archived = _parse_arsiv(request.args)
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        
+        storage = get_storage()
+        file_dict = storage.get_file(file_id, archived=archived)
+        if not file_dict:
             return jsonify({"error": "File not found"}), 404
         
-        file_dict = get_file_dict(file_row)
-        file_details = get_file_details_by_id(file_id)
-        borclular = get_borclular_by_file_id(file_id)
+        file_details = storage.get_file_details(file_id, archived=archived)
+        borclular = storage.get_borclular(file_id, archived=archived)
         
         # Map file_details by column name
         response_data = {
@@ -123,33 +469,35 @@ def api_icra_dosya_detail(file_id):
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>', methods=['GET'])
+@data_version_etag
 def api_borclu_detail(file_id, borclu_id):
-    """Get detailed information for a specific borclu"""
+    """Get detailed information for a specific borclu (arsiv=1: a debtor of an archived file)"""
     try:
         print(f"API: Fetching borclu detail for file_id: {file_id}, borclu_id: {borclu_id}")
+        try:
+            archived = _parse_arsiv(request.args)
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
         
         # Get borclu information
-        conn = sqlite3.connect(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database', 'files.db'))
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM borclular WHERE file_id = ? AND borclu_id = ?", (file_id, borclu_id))
-        borclu_row = cur.fetchone()
-        conn.close()
+        storage = get_storage()
+        borclu = storage.get_borclu(file_id, borclu_id, archived=archived)
         
-        if not borclu_row:
+        if not borclu:
             return jsonify({"error": "Borclu not found"}), 404
         
         # Get sorgular for this borclu
-        sorgular = get_borclu_sorgular_by_borclu_id(borclu_id)
+        sorgular = storage.get_borclu_sorgular(borclu_id, archived=archived)
         
         response_data = {
             "borclu": {
-                "borclu_id": borclu_row[0],
-                "file_id": borclu_row[1],
-                "ad": borclu_row[2],
-                "tcKimlik": borclu_row[3],
-                "telefon": borclu_row[4],
-                "adres": borclu_row[5],
-                "vekil": borclu_row[6] if len(borclu_row) > 6 else "-"
+                "borclu_id": borclu['borclu_id'],
+                "file_id": borclu['file_id'],
+                "ad": borclu['ad'],
+                "tcKimlik": borclu['tcKimlik'],
+                "telefon": borclu['telefon'],
+                "adres": borclu['adres'],
+                "vekil": borclu.get('vekil', "-")
             },
             "sorgular": sorgular
         }
@@ -162,393 +510,569 @@ def api_borclu_detail(file_id, borclu_id):
         return jsonify({"error": "Internal server error"}), 500
 
 # Sorgulama endpoints
+BATCH_MAX_BORCLU = 100
+BATCH_MAX_FIELDS = 50
+
+@database_routes.route('/api/borclu-sorgular/batch', methods=['POST'])
+def api_borclu_sorgular_batch():
+    """
+    Get sorgu results for several borclular and query types in one request.
+
+    Request body:
+        {
+            "borclu_ids": ["1_1", "1_2"],
+            "sorgu_tipleri": ["Banka", "EGM"],        # optional, default: all types
+            "fields": {"EGM": ["$.EGM.Sonuc"]}        # optional JSON path projections
+        }
+
+    Returns {"results": {borclu_id: {sorgu_tipi: {"data": ..., "timestamp": ...}}}}.
+    All results come from a single borclu_sorgular query.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        borclu_ids = data.get('borclu_ids')
+        sorgu_tipleri = data.get('sorgu_tipleri')
+        fields = data.get('fields')
+
+        if not _is_string_list(borclu_ids) or not borclu_ids:
+            return jsonify({"error": "borclu_ids must be a non-empty list of strings"}), 400
+        if len(borclu_ids) > BATCH_MAX_BORCLU:
+            return jsonify({"error": f"At most {BATCH_MAX_BORCLU} borclu_ids are allowed"}), 400
+        if sorgu_tipleri is not None and not _is_string_list(sorgu_tipleri):
+            return jsonify({"error": "sorgu_tipleri must be a list of strings"}), 400
+        if fields is not None:
+            if not isinstance(fields, dict) or not all(_is_string_list(paths) and paths for paths in fields.values()):
+                return jsonify({"error": "fields must map sorgu types to non-empty lists of JSON paths"}), 400
+            paths = [path for paths in fields.values() for path in paths]
+            if len(paths) > BATCH_MAX_FIELDS:
+                return jsonify({"error": f"At most {BATCH_MAX_FIELDS} fields are allowed"}), 400
+            invalid = [path for path in paths if not JSON_PATH_PATTERN.match(path)]
+            if invalid:
+                return jsonify({"error": f"Invalid JSON path: {invalid[0]}"}), 400
+
+        results = get_storage().get_borclu_sorgular_batch(borclu_ids, sorgu_tipleri, fields)
+        return jsonify({"results": results})
+
+    except Exception as error:
+        print(f"Error in api_borclu_sorgular_batch: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+def _is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+HISTORY_PAGE_SIZE = 50
+
+def _parse_history_timestamp(value, name):
+    """
+    Parse a history query parameter into the stored timestamp format (local
+    time ISO). A bare date (YYYY-MM-DD or DD.MM.YYYY) means the end of that day.
+    """
+    if len(value) == 10:
+        return _parse_date(value, name) + "T23:59:59.999999"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a date or an ISO timestamp")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+@database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/sorgu-gecmisi/<sorgu_tipi>', methods=['GET'])
+def api_sorgu_gecmisi(file_id, borclu_id, sorgu_tipi):
+    """
+    List the stored versions of a query result, newest first.
+
+    Optional query parameters:
+        limit: page size (1..MAX_PAGE_SIZE, default HISTORY_PAGE_SIZE)
+        before: only versions stored before this ISO timestamp (next_before of the previous page)
+    """
+    try:
+        try:
+            limit = _parse_limit(request.args.get('limit')) or HISTORY_PAGE_SIZE
+            before = request.args.get('before')
+            if before:
+                before = _parse_history_timestamp(before, 'before')
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+
+        versions = get_storage().get_borclu_sorgu_versions(borclu_id, sorgu_tipi, limit + 1, before or None)
+        next_before = versions[limit - 1][1] if len(versions) > limit else None
+        return jsonify({
+            "file_id": int(file_id),
+            "borclu_id": borclu_id,
+            "sorgu_tipi": sorgu_tipi,
+            "versions": [
+                {"version_id": version_id, "timestamp": timestamp}
+                for version_id, timestamp in versions[:limit]
+            ],
+            "next_before": next_before
+        })
+
+    except Exception as error:
+        print(f"Error in api_sorgu_gecmisi: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/sorgu-gecmisi/<sorgu_tipi>/as-of', methods=['GET'])
+def api_sorgu_gecmisi_as_of(file_id, borclu_id, sorgu_tipi):
+    """
+    Get a query result as it was at a point in time.
+
+    Query parameters:
+        tarih: ISO date or timestamp; the latest version stored at or before it is returned
+    """
+    try:
+        tarih = request.args.get('tarih')
+        if not tarih:
+            return jsonify({"error": "tarih is required"}), 400
+        try:
+            as_of = _parse_history_timestamp(tarih, 'tarih')
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+
+        version = get_storage().get_borclu_sorgu_as_of(borclu_id, sorgu_tipi, as_of)
+        if version is None:
+            return jsonify({"error": "No query data stored at that time"}), 404
+
+        version_id, sorgu_verisi, timestamp = version
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,
+                "sorgu_tipi": sorgu_tipi,
+                "version_id": version_id,
+                "timestamp": timestamp
+            },
+            {"sorguSonucu": sorgu_verisi}
+        )
+
+    except Exception as error:
+        print(f"Error in api_sorgu_gecmisi_as_of: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/banka-sorgulama', methods=['GET'])
+@sorgu_etag('Banka')
 def api_banka_sorgulama(file_id, borclu_id):
     """Get bank query results for a specific borclu"""
     try:
         print(f"API: Fetching banka sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
         # For banka sorgulama, we look for Banka data which contains bank information
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'Banka')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'Banka')
         
         if sorgu_result is None:
             return jsonify({"error": "Bank query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "bankaSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved banka sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"bankaSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_banka_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/gib-sorgulama', methods=['GET'])
+@sorgu_etag('GİB')
 def api_gib_sorgulama(file_id, borclu_id):
     """Get GIB query results for a specific borclu"""
     try:
         print(f"API: Fetching GIB sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
         # For GİB sorgulama, we look for GİB data which contains GİB information
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'GİB')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'GİB')
         
         if sorgu_result is None:
             return jsonify({"error": "GIB query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "gibSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved GIB sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"gibSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_gib_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/sgk-sorgulama', methods=['GET'])
+@sorgu_etag('SGK')
 def api_sgk_sorgulama(file_id, borclu_id):
     """Get SGK query results for a specific borclu"""
     try:
         print(f"API: Fetching SGK sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'SGK')
+        # Reshaped in SQLite; the sections are spliced into the response as stored
+        sorgu_result = get_storage().get_borclu_sorgu_sections(borclu_id, 'SGK', SGK_SECTIONS, default='{"sonuc": {}}')
         
         if sorgu_result is None:
             return jsonify({"error": "SGK query data not found"}), 404
         
-        # The data is already in the correct structure from the database
-        sgk_data = sorgu_result["data"]
-        
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "sskCalisani": sgk_data.get("sskCalisani", {"sonuc": {}}),
-            "bagkurCalisani": sgk_data.get("bagkurCalisani", {"sonuc": {}}),
-            "sskIsYeriBilgisi": sgk_data.get("sskIsYeriBilgisi", {"sonuc": {}}),
-            "kamuCalisani": sgk_data.get("kamuCalisani", {"sonuc": {}}),
-            "kamuEmeklisi": sgk_data.get("kamuEmeklisi", {"sonuc": {}}),
-            "sskEmeklisi": sgk_data.get("sskEmeklisi", {"sonuc": {}}),
-            "bagkurEmeklisi": sgk_data.get("bagkurEmeklisi", {"sonuc": {}}),
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sections, timestamp = sorgu_result
         
         print(f"Successfully retrieved SGK sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            sections
+        )
         
     except Exception as error:
         print(f"Error in api_sgk_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/sgk-haciz-sorgulama', methods=['GET'])
+@sorgu_etag('SGK Haciz')
 def api_sgk_haciz_sorgulama(file_id, borclu_id):
     """Get SGK haciz query results for a specific borclu"""
     try:
         print(f"API: Fetching SGK haciz sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'SGK Haciz')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'SGK Haciz')
         
         if sorgu_result is None:
             return jsonify({"error": "SGK haciz query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "sgkSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved SGK haciz sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"sgkSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_sgk_haciz_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/egm-sorgulama', methods=['GET'])
+@sorgu_etag('egm_sorgulama')
 def api_egm_sorgulama(file_id, borclu_id):
     """Get EGM query results for a specific borclu"""
     try:
         print(f"API: Fetching EGM sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'egm_sorgulama')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'egm_sorgulama')
         
         if sorgu_result is None:
             return jsonify({"error": "EGM query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "egmSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved EGM sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"egmSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_egm_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/takbis-sorgulama', methods=['GET'])
+@sorgu_etag('takbis_sorgulama')
 def api_takbis_sorgulama(file_id, borclu_id):
     """Get TAKBIS query results for a specific borclu"""
     try:
         print(f"API: Fetching TAKBIS sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'takbis_sorgulama')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'takbis_sorgulama')
         
         if sorgu_result is None:
             return jsonify({"error": "TAKBIS query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "takbisSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved TAKBIS sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"takbisSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_takbis_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/icra-dosyasi-sorgulama', methods=['GET'])
+@sorgu_etag('icra_dosyasi_sorgulama')
 def api_icra_dosyasi_sorgulama(file_id, borclu_id):
     """Get icra dosyasi query results for a specific borclu"""
     try:
         print(f"API: Fetching icra dosyasi sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'icra_dosyasi_sorgulama')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'icra_dosyasi_sorgulama')
         
         if sorgu_result is None:
             return jsonify({"error": "İcra dosyasi query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "icraDosyasiSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved icra dosyasi sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"icraDosyasiSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_icra_dosyasi_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/adres-sorgulama', methods=['GET'])
+@sorgu_etag('MERNİS')
 def api_adres_sorgulama(file_id, borclu_id):
     """Get address query results for a specific borclu"""
     try:
         print(f"API: Fetching adres sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
         # For adres sorgulama, we look for MERNİS data which contains address information
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'MERNİS')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'MERNİS')
         
         if sorgu_result is None:
             return jsonify({"error": "Address query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "adresSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved adres sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"adresSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_adres_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/telefon-sorgulama', methods=['GET'])
+@sorgu_etag('GSM')
 def api_telefon_sorgulama(file_id, borclu_id):
     """Get phone query results for a specific borclu"""
     try:
         print(f"API: Fetching telefon sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
         # For telefon sorgulama, we look for GSM data which contains phone information
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'GSM')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'GSM')
         
         if sorgu_result is None:
             return jsonify({"error": "Phone query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "gsmSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved telefon sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"gsmSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_telefon_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/arac-sorgulama', methods=['GET'])
+@sorgu_etag('EGM')
 def api_arac_sorgulama(file_id, borclu_id):
     """Get vehicle query results for a specific borclu"""
     try:
         print(f"API: Fetching arac sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
         # For arac sorgulama, we look for EGM data which contains vehicle information
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'EGM')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'EGM')
         
         if sorgu_result is None:
             return jsonify({"error": "Vehicle query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "aracSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved arac sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"aracSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_arac_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/gayrimenkul-sorgulama', methods=['GET'])
+@sorgu_etag('TAKBIS')
 def api_gayrimenkul_sorgulama(file_id, borclu_id):
     """Get real estate query results for a specific borclu"""
     try:
         print(f"API: Fetching gayrimenkul sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
         # For gayrimenkul sorgulama, we look for TAKBIS data which contains real estate information
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'TAKBIS')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'TAKBIS')
         
         if sorgu_result is None:
             return jsonify({"error": "Real estate query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "gayrimenkulSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved gayrimenkul sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"gayrimenkulSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_gayrimenkul_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/dis-isleri-sorgulama', methods=['GET'])
+@sorgu_etag('Dış İşleri')
 def api_dis_isleri_sorgulama(file_id, borclu_id):
     """Get foreign affairs query results for a specific borclu"""
     try:
         print(f"API: Fetching dis isleri sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'Dış İşleri')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'Dış İşleri')
         
         if sorgu_result is None:
             return jsonify({"error": "Foreign affairs query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "disIsleriSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved dis isleri sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"disIsleriSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_dis_isleri_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/iski-sorgulama', methods=['GET'])
+@sorgu_etag('İSKİ')
 def api_iski_sorgulama(file_id, borclu_id):
     """Get ISKI query results for a specific borclu"""
     try:
         print(f"API: Fetching ISKI sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
         # For İSKİ sorgulama, we look for İSKİ data which contains İSKİ information
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'İSKİ')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'İSKİ')
         
         if sorgu_result is None:
             return jsonify({"error": "ISKI query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "iskiSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved ISKI sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"iskiSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_iski_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/posta-ceki-sorgulama', methods=['GET'])
+@sorgu_etag('Posta Çeki')
 def api_posta_ceki_sorgulama(file_id, borclu_id):
     """Get post office check query results for a specific borclu"""
     try:
         print(f"API: Fetching posta ceki sorgulama for file_id: {file_id}, borclu_id: {borclu_id}")
         
         # The backend saves data with sorgu_tipi = "Posta Çeki" (with space)
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'Posta Çeki')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'Posta Çeki')
         
         if sorgu_result is None:
             return jsonify({"error": "Post office check query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "postaCekiSorguSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved posta ceki sorgulama for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"postaCekiSorguSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_posta_ceki_sorgulama: {error}")
         return jsonify({"error": "Internal server error"}), 500
 
 @database_routes.route('/api/icra-dosyalarim/<file_id>/<borclu_id>/alacakli-dosyalari', methods=['GET'])
+@sorgu_etag('İcra Dosyası')
 def api_alacakli_dosyalari(file_id, borclu_id):
     """Get creditor files query results for a specific borclu"""
     try:
         print(f"API: Fetching alacakli dosyalari for file_id: {file_id}, borclu_id: {borclu_id}")
         
-        sorgu_result = get_borclu_sorgu_by_tipi(borclu_id, 'İcra Dosyası')
+        sorgu_result = get_storage().get_borclu_sorgu_raw(borclu_id, 'İcra Dosyası')
         
         if sorgu_result is None:
             return jsonify({"error": "Creditor files query data not found"}), 404
         
-        response_data = {
-            "file_id": int(file_id),
-            "borclu_id": borclu_id,  # Keep as string to match frontend expectation
-            "alacakliDosyalariSonucu": sorgu_result["data"],
-            "timestamp": sorgu_result["timestamp"]
-        }
+        sorgu_verisi, timestamp = sorgu_result
         
         print(f"Successfully retrieved alacakli dosyalari for borclu_id: {borclu_id}")
-        return jsonify(response_data)
+        return raw_json_response(
+            {
+                "file_id": int(file_id),
+                "borclu_id": borclu_id,  # Keep as string to match frontend expectation
+                "timestamp": timestamp
+            },
+            {"alacakliDosyalariSonucu": sorgu_verisi}
+        )
         
     except Exception as error:
         print(f"Error in api_alacakli_dosyalari: {error}")
@@ -3,7 +3,6 @@ import time
 import json
 import os
 import sys
-from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,7 +13,8 @@ backend_dir = os.path.join(os.path.dirname(__file__), '..', '..')
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
-from services.database_writer import save_extract_data_to_db, save_to_json_simple
+from services.database_writer import save_extract_batch_to_db
+from services.scrape_journal import append_to_journal
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,12 +26,6 @@ def extract_data_from_table(driver, ui_callback=None):
         processed_dosya_nos = set()  # Track processed rows across all pages
         max_pages_to_process = 1  # Limit to first 3 pages
 
-        # Define output directory and daily JSON filename
-        output_dir = "/Users/ugurulger/Desktop/extracted_data"
-        os.makedirs(output_dir, exist_ok=True)
-        today_date = datetime.now().strftime("%Y%m%d")  # Format: YYYYMMDD (e.g., 20250307)
-        output_file = os.path.join(output_dir, f"extracted_data_{today_date}.json")
-
         # Get total pages from the page indicator
         try:
             page_indicator = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".dx-datagrid-pager .dx-info")))
@@ -403,17 +397,13 @@ def extract_data_from_table(driver, ui_callback=None):
                         logger.warning(f"Could not find Page {next_page_num} after Page {page}. Assuming end of pagination.")
                         break
 
-        # Save all extracted data to both database and JSON (backup)
-        # Use the new function for extract data
-        processed_data = []
-        for file_data in all_data:
-            processed_file_data = save_extract_data_to_db(file_data)
-            if processed_file_data:
-                processed_data.append(processed_file_data)
+        # Save all extracted data to the database and the scrape journal (backup)
+        # All files are written in one transaction
+        processed_data = save_extract_batch_to_db(all_data)
         
-        # Save to JSON as backup
-        save_to_json_simple(processed_data, output_file)
-        logger.info(f"Saved all data to database and {output_file} (backup)")
+        # Append to the scrape journal as backup
+        append_to_journal(processed_data, 'search_all_files_extract')
+        logger.info("Saved all data to database and the scrape journal (backup)")
 
         # Print all extracted data at the end
         logger.info(f"Finished processing {len(processed_data)} files across {min(page, max_pages)} pages. Printing all data now:")
@@ -13,8 +13,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, ElementNotInteractableException
-from scrappers.queries.sorgulama_common import click_element_merged, save_to_json, get_logger, check_result_or_popup, DESKTOP_PATH
-from services.database_writer import save_scraping_data_to_db_and_json
+from scrappers.queries.sorgulama_common import click_element_merged, get_logger, check_result_or_popup, DESKTOP_PATH
+from services.write_queue import enqueue_scraping_data
 
 # Constants
 TIMEOUT = 15
@@ -181,8 +181,7 @@ def perform_egm_sorgu(driver, item_text, dosya_no, result_label=None):
                                   action_name="EGM-TNB button", 
                                   item_text=item_text, 
                                   result_label=result_label):
-            save_to_json(extracted_data)
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
             return False, extracted_data
 
         # Step 2: Click the "Sorgula" button
@@ -192,8 +191,7 @@ def perform_egm_sorgu(driver, item_text, dosya_no, result_label=None):
                                   action_name="Sorgula button", 
                                   item_text=item_text, 
                                   result_label=result_label):
-            save_to_json(extracted_data)
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
             return False, extracted_data
 
         # Step 3: Extract data from the specified XPath
@@ -204,8 +202,7 @@ def perform_egm_sorgu(driver, item_text, dosya_no, result_label=None):
             result = wait.until(lambda d: check_result_or_popup(d, (By.XPATH, DATA_XPATH), item_text, result_label))
             if isinstance(result, str):  # Pop-up mesajı
                 extracted_data[dosya_no][item_text]["EGM"]["Sonuc"] = result
-                save_to_json(extracted_data)
-                save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
+                enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
                 logger.info(f"Popup detected for {item_text}: {result}")
                 return False, extracted_data
             else:  # DATA_XPATH elementi
@@ -322,16 +319,14 @@ def perform_egm_sorgu(driver, item_text, dosya_no, result_label=None):
             if result_label:
                 result_label.config(text=error_msg)
             logger.error(error_msg)
-            save_to_json(extracted_data)
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
             return False, extracted_data
         except Exception as e:
             error_msg = f"Error extracting data for {item_text}: {e}"
             if result_label:
                 result_label.config(text=error_msg)
             logger.error(error_msg)
-            save_to_json(extracted_data)
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
             return False, extracted_data
 
         if result_label:
@@ -339,9 +334,8 @@ def perform_egm_sorgu(driver, item_text, dosya_no, result_label=None):
         logger.info(f"Waiting 3 seconds after processing {item_text}")
         time.sleep(3)
         
-        # Save to both JSON file and database
-        save_to_json(extracted_data)
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
+        # Save to database (the background writer also journals it)
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
         return True, extracted_data
 
     except Exception as e:
@@ -349,6 +343,5 @@ def perform_egm_sorgu(driver, item_text, dosya_no, result_label=None):
         if result_label:
             result_label.config(text=error_msg)
         logger.error(error_msg)
-        save_to_json(extracted_data)
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "egm_sorgu.json"))
         return False, extracted_data
\ No newline at end of file
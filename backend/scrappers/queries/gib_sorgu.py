@@ -19,7 +19,7 @@ from selenium.common.exceptions import (
     NoSuchElementException
 )
 from scrappers.queries.sorgulama_common import handle_popup_if_present, click_element_merged, save_to_json, get_logger, check_result_or_popup
-from services.database_writer import save_scraping_data_to_db_and_json
+from services.write_queue import enqueue_scraping_data
 
 # Global Sabitler
 TIMEOUT = 15
@@ -66,7 +66,7 @@ def perform_gib_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"Performing GİB sorgu for {item_text} - Clicking GİB button...")
         if not click_element_merged(driver, By.CSS_SELECTOR, GIB_BUTTON_CSS,
                                    action_name="GİB button", item_text=item_text, result_label=result_label):
-            save_scraping_data_to_db_and_json(extracted_data, JSON_FILE)
+            enqueue_scraping_data(extracted_data, JSON_FILE)
             return False, extracted_data
 
         # Adım 2: "Sorgula" butonuna tıkla
@@ -74,7 +74,7 @@ def perform_gib_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"Performing GİB sorgu for {item_text} - Clicking Sorgula button...")
         if not click_element_merged(driver, By.CSS_SELECTOR, SORGULA_BUTTON_CSS,
                                    action_name="Sorgula button", item_text=item_text, result_label=result_label):
-            save_scraping_data_to_db_and_json(extracted_data, JSON_FILE)
+            enqueue_scraping_data(extracted_data, JSON_FILE)
             return False, extracted_data
 
         # Adım 3: Veri çıkarma işlemi
@@ -86,7 +86,7 @@ def perform_gib_sorgu(driver, item_text, dosya_no, result_label=None):
             result = wait.until(lambda d: check_result_or_popup(d, (By.XPATH, SONUC_XPATH), item_text, result_label))
             if isinstance(result, str):  # Pop-up mesajı
                 extracted_data[dosya_no][item_text]["GİB"]["sonuc"] = result
-                save_scraping_data_to_db_and_json(extracted_data, JSON_FILE)
+                enqueue_scraping_data(extracted_data, JSON_FILE)
                 return False, extracted_data
             else:  # SONUC_XPATH elementi
                 sonuc_element = result
@@ -122,7 +122,7 @@ def perform_gib_sorgu(driver, item_text, dosya_no, result_label=None):
         logger.info(f"Successfully extracted data for {item_text}: {extracted_data}")
 
         # Save to both database and JSON file (backup)
-        save_scraping_data_to_db_and_json(extracted_data, JSON_FILE)
+        enqueue_scraping_data(extracted_data, JSON_FILE)
         return True, extracted_data
 
     except Exception as e:
@@ -130,5 +130,5 @@ def perform_gib_sorgu(driver, item_text, dosya_no, result_label=None):
         if result_label:
             result_label.config(text=error_msg)
         logger.error(error_msg)
-        save_scraping_data_to_db_and_json(extracted_data, JSON_FILE)
+        enqueue_scraping_data(extracted_data, JSON_FILE)
         return False, extracted_data
\ No newline at end of file
@@ -19,7 +19,7 @@ from selenium.common.exceptions import (
     NoSuchElementException
 )
 from scrappers.queries.sorgulama_common import handle_popup_if_present, click_element_merged, save_to_json, get_logger, check_result_or_popup
-from services.database_writer import save_scraping_data_to_db_and_json
+from services.write_queue import enqueue_scraping_data
 
 # Global Sabitler
 TIMEOUT = 15
@@ -75,7 +75,7 @@ def perform_icra_dosyasi_sorgu(driver, item_text, dosya_no, result_label=None):
         if not click_element_merged(driver, By.CSS_SELECTOR, ICRA_DOSYASI_BUTTON_CSS,
                                    action_name="İcra Dosyası button", item_text=item_text, result_label=result_label):
             logger.error("Failed to click İcra Dosyası button")
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
             return False, extracted_data
 
         # Adım 2: Sorgula butonuna tıkla
@@ -84,7 +84,7 @@ def perform_icra_dosyasi_sorgu(driver, item_text, dosya_no, result_label=None):
         if not click_element_merged(driver, By.CSS_SELECTOR, SORGULA_BUTTON_CSS,
                                    action_name="Sorgula button", item_text=item_text, result_label=result_label):
             logger.error("Failed to click Sorgula button")
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
             return False, extracted_data
 
         # Adım 3: Veri çıkarma
@@ -96,7 +96,7 @@ def perform_icra_dosyasi_sorgu(driver, item_text, dosya_no, result_label=None):
             result = wait.until(lambda d: check_result_or_popup(d, (By.XPATH, SONUC_XPATH), item_text, result_label))
             if isinstance(result, str):  # Pop-up mesajı
                 extracted_data[dosya_no][item_text]["İcra Dosyası"]["sonuc"] = result
-                save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
+                enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
                 return False, extracted_data
             else:  # SONUC_XPATH elementi
                 sonuc_element = result
@@ -124,7 +124,7 @@ def perform_icra_dosyasi_sorgu(driver, item_text, dosya_no, result_label=None):
                 if result_label:
                     result_label.config(text=error_msg)
                 logger.info(error_msg)
-                save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
+                enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
                 return False, extracted_data
 
             # Doğru tabloyu kontrol et (tbody/tr[1]/td[1] var mı?)
@@ -133,7 +133,7 @@ def perform_icra_dosyasi_sorgu(driver, item_text, dosya_no, result_label=None):
                 if result_label:
                     result_label.config(text=error_msg)
                 logger.error(error_msg)
-                save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
+                enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
                 return False, extracted_data
 
             # Tablo doğrulandı, genişlet butonuna tıkla
@@ -186,7 +186,7 @@ def perform_icra_dosyasi_sorgu(driver, item_text, dosya_no, result_label=None):
             if result_label:
                 result_label.config(text=error_msg)
             logger.error(error_msg)
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
             return False, extracted_data
         except Exception as e:
             logger.warning(f"Error extracting 'icra_dosyalari' table for {item_text}: {e}")
@@ -195,7 +195,7 @@ def perform_icra_dosyasi_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"İcra Dosyası sorgu completed for {item_text}")
         logger.info(f"Successfully extracted data for {item_text}: {extracted_data}")
 
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
         return True, extracted_data
 
     except Exception as e:
@@ -203,5 +203,5 @@ def perform_icra_dosyasi_sorgu(driver, item_text, dosya_no, result_label=None):
         if result_label:
             result_label.config(text=error_msg)
         logger.error(error_msg)
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "icra_dosyasi_sorgu.json"))
         return False, extracted_data
\ No newline at end of file
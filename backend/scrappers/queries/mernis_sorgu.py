@@ -19,7 +19,7 @@ from selenium.common.exceptions import (
     NoSuchElementException
 )
 from scrappers.queries.sorgulama_common import handle_popup_if_present, click_element_merged, save_to_json, get_logger, check_result_or_popup
-from services.database_writer import save_scraping_data_to_db_and_json
+from services.write_queue import enqueue_scraping_data
 
 # Global Sabitler
 TIMEOUT = 15
@@ -131,7 +131,7 @@ def perform_mernis_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"Performing MERNİS sorgu for {item_text} - Clicking MERNİS button...")
         if not click_element_merged(driver, By.CSS_SELECTOR, MERNIS_BUTTON_CSS,
                                    action_name="MERNİS button", item_text=item_text, result_label=result_label):
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
             return False, extracted_data
 
         # Adım 2: "Sorgula" butonuna tıkla
@@ -139,7 +139,7 @@ def perform_mernis_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"Performing MERNİS sorgu for {item_text} - Clicking Sorgula button...")
         if not click_element_merged(driver, By.CSS_SELECTOR, SORGULA_BUTTON_CSS,
                                    action_name="Sorgula button", item_text=item_text, result_label=result_label):
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
             return False, extracted_data
 
         # Adım 3: Veri çıkarma işlemi
@@ -151,7 +151,7 @@ def perform_mernis_sorgu(driver, item_text, dosya_no, result_label=None):
             result = wait.until(lambda d: check_result_or_popup(d, (By.ID, MERNIS_KIMLIK_TABLE_ID), item_text, result_label))
             if isinstance(result, str):  # Pop-up mesajı
                 extracted_data[dosya_no][item_text]["MERNİS"]["sonuc"] = {"Hata": result}
-                save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
+                enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
                 return False, extracted_data
             else:  # MERNIS_KIMLIK_TABLE_ID elementi
                 # extract_mernis_data ile hem kimlik hem adres bilgilerini çıkar
@@ -162,14 +162,14 @@ def perform_mernis_sorgu(driver, item_text, dosya_no, result_label=None):
                 result_label.config(text=error_msg)
             logger.error(error_msg)
             extracted_data[dosya_no][item_text]["MERNİS"]["sonuc"] = {"Hata": "Tablo veya pop-up bulunamadı"}
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
             return False, extracted_data
 
         if result_label:
             result_label.config(text=f"MERNİS sorgu completed for {item_text}")
         logger.info(f"Successfully extracted data for {item_text}: {extracted_data}")
 
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
         return True, extracted_data
 
     except Exception as e:
@@ -177,5 +177,5 @@ def perform_mernis_sorgu(driver, item_text, dosya_no, result_label=None):
         if result_label:
             result_label.config(text=error_msg)
         logger.error(error_msg)
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "mernis_sorgu.json"))
         return False, extracted_data
\ No newline at end of file
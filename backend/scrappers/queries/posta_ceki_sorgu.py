@@ -19,7 +19,7 @@ from selenium.common.exceptions import (
     NoSuchElementException
 )
 from scrappers.queries.sorgulama_common import handle_popup_if_present, click_element_merged, save_to_json, get_logger, check_result_or_popup
-from services.database_writer import save_scraping_data_to_db_and_json
+from services.write_queue import enqueue_scraping_data
 
 # Global Sabitler
 TIMEOUT = 15
@@ -64,7 +64,7 @@ def perform_posta_ceki_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"Performing Posta Çeki sorgu for {item_text} - Clicking Posta Çeki button...")
         if not click_element_merged(driver, By.CSS_SELECTOR, POSTA_CEKI_BUTTON_CSS,
                                    action_name="Posta Çeki button", item_text=item_text, result_label=result_label):
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
             return False, extracted_data
 
         # Adım 2: "Sorgula" butonuna tıkla
@@ -72,7 +72,7 @@ def perform_posta_ceki_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"Performing Posta Çeki sorgu for {item_text} - Clicking Sorgula button...")
         if not click_element_merged(driver, By.CSS_SELECTOR, SORGULA_BUTTON_CSS,
                                    action_name="Sorgula button", item_text=item_text, result_label=result_label):
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
             return False, extracted_data
 
         # Adım 3: Veri çıkarma işlemi
@@ -84,7 +84,7 @@ def perform_posta_ceki_sorgu(driver, item_text, dosya_no, result_label=None):
             result = wait.until(lambda d: check_result_or_popup(d, (By.XPATH, SONUC_XPATH), item_text, result_label))
             if isinstance(result, str):  # Pop-up mesajı
                 extracted_data[dosya_no][item_text]["Posta Çeki"]["sonuc"] = result
-                save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
+                enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
                 return False, extracted_data
             else:  # SONUC_XPATH elementi
                 sonuc_element = result
@@ -99,14 +99,14 @@ def perform_posta_ceki_sorgu(driver, item_text, dosya_no, result_label=None):
                 result_label.config(text=error_msg)
             logger.error(error_msg)
             extracted_data[dosya_no][item_text]["Posta Çeki"]["sonuc"] = ""
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
             return False, extracted_data
 
         if result_label:
             result_label.config(text=f"Posta Çeki sorgu completed for {item_text}")
         logger.info(f"Successfully extracted data for {item_text}: {extracted_data}")
 
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
         return True, extracted_data
 
     except Exception as e:
@@ -114,5 +114,5 @@ def perform_posta_ceki_sorgu(driver, item_text, dosya_no, result_label=None):
         if result_label:
             result_label.config(text=error_msg)
         logger.error(error_msg)
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "posta_ceki_sorgu.json"))
         return False, extracted_data
\ No newline at end of file
@@ -18,7 +18,7 @@ from selenium.common.exceptions import (
     NoSuchElementException
 )
 from scrappers.queries.sorgulama_common import handle_popup_if_present, click_element_merged, save_to_json
-from services.database_writer import save_scraping_data_to_db_and_json
+from services.write_queue import enqueue_scraping_data
 
 # Global Constants
 TIMEOUT = 15
@@ -192,7 +192,7 @@ def perform_sgk_sorgu(driver, item_text, dosya_no, result_label=None):
         result_label.config(text=f"SGK sorgu için {item_text} - SGK butonuna tıklanıyor...")
     time.sleep(SLEEP_INTERVAL)
     if not click_element_merged(driver, By.CSS_SELECTOR, SGK_BUTTON_CSS, "SGK button", item_text, result_label):
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "sgk_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "sgk_sorgu.json"))
         return False, extracted_data
 
     if not click_element_merged(driver, By.CSS_SELECTOR, ACTIVE_SUBPANEL_SELECTOR, "Active subpanel focus", item_text, result_label):
@@ -223,5 +223,5 @@ def perform_sgk_sorgu(driver, item_text, dosya_no, result_label=None):
         extracted_data[dosya_no][item_text][current_item] = {"sonuc": sonuc}
         logger.info(f"Extracted data for '{current_item}': {sonuc}")
     
-    save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "sgk_sorgu.json"))
+    enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "sgk_sorgu.json"))
     return True, extracted_data
\ No newline at end of file
@@ -18,7 +18,7 @@ from selenium.common.exceptions import (
     NoSuchElementException
 )
 from scrappers.queries.sorgulama_common import handle_popup_if_present, click_element_merged, save_to_json
-from services.database_writer import save_scraping_data_to_db_and_json
+from services.write_queue import enqueue_scraping_data
 
 # Global Constants
 TIMEOUT = 20
@@ -128,7 +128,7 @@ def perform_sgk_sorgu(driver, current, dosya_no, result_label=None):
     if not click_element_merged(driver, By.CSS_SELECTOR, SGK_BUTTON_CSS, "SGK button", current, result_label):
         logger.error("SGK butonuna tıklama başarısız.")
         logger.info("[SGK] Data to be saved:\n%s", json.dumps(extracted_data, ensure_ascii=False, indent=2))
-        save_scraping_data_to_db_and_json(extracted_data, JSON_FILE)
+        enqueue_scraping_data(extracted_data, JSON_FILE)
         return False, extracted_data
 
     # Aktif subpanel'e tıkla (iki kez)
@@ -224,6 +224,6 @@ def perform_sgk_sorgu(driver, current, dosya_no, result_label=None):
     # Save consolidated SGK data instead of individual sub-queries
     extracted_data[dosya_no][current]['SGK'] = consolidated_sgk
     
-    save_scraping_data_to_db_and_json(extracted_data, JSON_FILE)
+    enqueue_scraping_data(extracted_data, JSON_FILE)
     logger.info("[SGK] Consolidated data to be saved:\n%s", json.dumps(extracted_data, ensure_ascii=False, indent=2))
     return True, extracted_data
\ No newline at end of file
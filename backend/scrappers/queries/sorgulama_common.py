@@ -1,4 +1,4 @@
-import logging, time, os, json, inspect
+import logging, time, os, inspect
 import sys
 
 # Add backend directory to Python path for imports
@@ -12,6 +12,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (TimeoutException, NoSuchElementException,
                                         StaleElementReferenceException, ElementNotInteractableException,
                                         ElementClickInterceptedException)
+from services.borclu_lookup import borclu_lookup_run
+from services.scrape_journal import append_to_journal, journal_source
 
 # Global Constants
 TIMEOUT = 15                # Elementlerin beklenme süresi (saniye)
@@ -62,39 +64,23 @@ def get_logger():
 
 def save_to_json(data, filename=None):
     """
-    data sözlüğünü JSON dosyasına kaydeder veya, dosya varsa, mevcut veriler ile günceller.
-    filename verilmezse, çağrıldığı modülün adına göre dosya adı oluşturulur.
+    data sözlüğünü scrape journal'a (services/scrape_journal.py) tek satır olarak ekler.
+    Kaynak adı filename'den, verilmezse çağıran modülün adından alınır.
     """
     logger = get_logger()
-    # Çağrıcı modülün adını al
-    caller_module = inspect.stack()[1][0].f_globals.get('__name__')
-    if caller_module == '__main__':
-        caller_module = 'sorgulama_common'
-    
-    # Eğer filename verilmediyse, modül adına göre dosya adı oluştur
     if filename is None:
-        filename = os.path.join(DESKTOP_PATH, f"{caller_module}.json")
-    
-    os.makedirs(DESKTOP_PATH, exist_ok=True)
-    if os.path.exists(filename):
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                existing = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            existing = {}
+        # Çağrıcı modülün adını al
+        source = inspect.stack()[1][0].f_globals.get('__name__')
+        if source == '__main__':
+            source = 'sorgulama_common'
+        source = source.rsplit('.', 1)[-1]
     else:
-        existing = {}
-    # Yeni verileri mevcut veriyle merge et
-    for key, value in data.items():
-        if key not in existing:
-            existing[key] = {}
-        existing[key].update(value)
+        source = journal_source(filename)
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing, f, ensure_ascii=False, indent=4)
-        logger.info(f"Data saved in {filename}")
-    except IOError as e:
-        logger.error(f"JSON write error: {e}")
+        append_to_journal(data, source)
+        logger.info(f"Data appended to scrape journal ({source})")
+    except OSError as e:
+        logger.error(f"Journal write error: {e}")
 
 def select_dropdown_option(driver, dropdown_selector, option_text):
     """Dropdown'dan bir seçenek seçer."""
@@ -244,7 +230,14 @@ def perform_sorgulama(driver, dosya_no, selected_options, result_label=None):
       5. Dosya pop-up’ının açılması,
       6. 'Borçlu Bilgileri' sekmesinin tıklanması,
       7. Dropdown menüden seçeneklerin işlenmesi.
+
+    Borçlu eşleştirmeleri (dosya_no + dropdown metni -> borclu_id) bu çalıştırma
+    boyunca bir kez yapılır ve tüm sorgu sonuçlarının kaydında yeniden kullanılır.
     """
+    with borclu_lookup_run():
+        return _perform_sorgulama(driver, dosya_no, selected_options, result_label)
+
+def _perform_sorgulama(driver, dosya_no, selected_options, result_label=None):
     logger = get_logger()
     wait = WebDriverWait(driver, TIMEOUT)
     def status(msg):
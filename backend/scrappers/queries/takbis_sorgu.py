@@ -20,7 +20,7 @@ from selenium.common.exceptions import (
     NoSuchFrameException
 )
 from scrappers.queries.sorgulama_common import handle_popup_if_present, click_element_merged, save_to_json, get_logger, check_result_or_popup
-from services.database_writer import save_scraping_data_to_db_and_json
+from services.write_queue import enqueue_scraping_data
 
 # Constants
 TIMEOUT = 15
@@ -131,7 +131,7 @@ def perform_takbis_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"Performing TAKBIS sorgu for {item_text} - Clicking TAKBIS button...")
         if not click_element_merged(driver, By.CSS_SELECTOR, TAKBIS_BUTTON_CSS,
                                    action_name="TAKBIS button", item_text=item_text, result_label=result_label):
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
             return False, extracted_data
 
         # Step 2: Click the "Sorgula" button
@@ -139,7 +139,7 @@ def perform_takbis_sorgu(driver, item_text, dosya_no, result_label=None):
             result_label.config(text=f"Performing TAKBIS sorgu for {item_text} - Clicking Sorgula button...")
         if not click_element_merged(driver, By.CSS_SELECTOR, SORGULA_BUTTON_CSS,
                                    action_name="Sorgula button", item_text=item_text, result_label=result_label, use_js_first=True):
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
             return False, extracted_data
 
         # Step 3: Extract data
@@ -151,7 +151,7 @@ def perform_takbis_sorgu(driver, item_text, dosya_no, result_label=None):
             result = wait.until(lambda d: check_result_or_popup(d, (By.XPATH, SONUC_XPATH), item_text, result_label))
             if isinstance(result, str):  # Pop-up mesajı
                 extracted_data[dosya_no][item_text]["TAKBIS"]["sonuc"] = result
-                save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
+                enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
                 return False, extracted_data
             else:  # SONUC_XPATH elementi
                 sonuc_element = result
@@ -166,7 +166,7 @@ def perform_takbis_sorgu(driver, item_text, dosya_no, result_label=None):
                 result_label.config(text=error_msg)
             logger.error(error_msg)
             extracted_data[dosya_no][item_text]["TAKBIS"]["sonuc"] = ""
-            save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
+            enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
             return False, extracted_data
 
         # Initialize tasinmazlar
@@ -256,7 +256,7 @@ def perform_takbis_sorgu(driver, item_text, dosya_no, result_label=None):
         extracted_data[dosya_no][item_text]["TAKBIS"]["tasinmazlar"] = tasinmazlar
         logger.info(f"Successfully extracted data for {item_text}: {extracted_data}")
 
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
         return True, extracted_data
 
     except Exception as e:
@@ -264,5 +264,5 @@ def perform_takbis_sorgu(driver, item_text, dosya_no, result_label=None):
         if result_label:
             result_label.config(text=error_msg)
         logger.error(error_msg)
-        save_scraping_data_to_db_and_json(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
+        enqueue_scraping_data(extracted_data, os.path.join(DESKTOP_PATH, "takbis_sorgu.json"))
         return False, extracted_data
\ No newline at end of file
@@ -0,0 +1,48 @@
+import os
+
+from services import database_connection
+
+# Hot/cold split of files.db.
+#
+# Closed files (durum set to anything but ACTIVE_DURUMLAR) are moved with their
+# details, debtors, sorgu results, history and payloads into archive.db by
+# `python database/maintenance.py archive`, so the list queries, indexes and
+# caches of files.db only cover the files still being worked on. Readers ATTACH
+# the archive on a pooled connection the first time a request asks for archived
+# data (arsiv=1); requests for hot data never open it.
+
+# Overridable with ADALEX_ARCHIVE_DB_PATH; by default archive.db sits next to files.db
+ARCHIVE_DB_PATH = os.environ.get('ADALEX_ARCHIVE_DB_PATH')
+
+ARCHIVE_SCHEMA = 'archive'
+
+# Files in these states stay in files.db; so do files without a durum
+ACTIVE_DURUMLAR = ('Açık', 'Derdest')
+
+# Tables copied to the archive, parents before children
+ARCHIVE_TABLES = ['files', 'file_details', 'borclular', 'borclu_sorgular', 'borclu_sorgu_history', 'sorgu_payloads']
+
+def archive_path(db_path=None):
+    """Path of the archive belonging to the hot database at db_path (default: the pool's DB_PATH)"""
+    if ARCHIVE_DB_PATH:
+        return ARCHIVE_DB_PATH
+    return os.path.join(os.path.dirname(os.path.abspath(db_path or database_connection.DB_PATH)), 'archive.db')
+
+def archive_exists():
+    """True once files have been archived for the current database"""
+    return os.path.exists(archive_path())
+
+def attach_archive(conn):
+    """
+    ATTACH the archive as 'archive' on conn unless it already is; return the schema name.
+
+    Raises FileNotFoundError if nothing has been archived yet (ATTACH would
+    create an empty file).
+    """
+    if any(row[1] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list")):
+        return ARCHIVE_SCHEMA
+    path = archive_path()
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No archive database at {path}")
+    conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+    return ARCHIVE_SCHEMA
@@ -0,0 +1,335 @@
+from services.database_connection import db_connection
+from services.sorgu_types import SORGU_TYPE_IDS
+
+# Typed asset tables projected from scraped sorgu payloads.
+#
+# EGM vehicles (with their Mahrumiyet records), TAKBİS properties (with their
+# hisse rows) and Banka accounts only exist inside borclu_sorgular JSON. Triggers
+# on borclu_sorgular replace a debtor's rows in these tables on every write of
+# the matching sorgu_tipi, whichever code path does the write, so portfolio-wide
+# questions ("vehicles without a haciz") are answered with indexed SQL instead of
+# decoding every payload. Child rows carry borclu_id so a debtor's assets are
+# dropped with one indexed delete per table.
+
+def _haciz(expression):
+    """1 if the text mentions a haciz (LIKE folds ASCII case only, so HACİZ is listed too)"""
+    return f"(IFNULL({expression}, '') LIKE '%haciz%' OR IFNULL({expression}, '') LIKE '%HACİZ%')"
+
+def _array(payload, path):
+    """The payload if it is valid JSON with an array at path, else NULL (json_each then yields nothing)"""
+    return (f"CASE WHEN json_valid({payload}) THEN "
+            f"CASE json_type({payload}, '{path}') WHEN 'array' THEN {payload} END END")
+
+ASSET_TABLES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS borclu_araclar (
+        arac_id INTEGER PRIMARY KEY,
+        borclu_id TEXT NOT NULL,
+        sira INTEGER NOT NULL,
+        plaka TEXT,
+        marka TEXT,
+        model TEXT,
+        tipi TEXT,
+        renk TEXT,
+        cins TEXT
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_borclu_araclar_borclu_id ON borclu_araclar(borclu_id, sira);",
+    "CREATE INDEX IF NOT EXISTS idx_borclu_araclar_marka ON borclu_araclar(marka);",
+    """
+    CREATE TABLE IF NOT EXISTS borclu_arac_mahrumiyetleri (
+        mahrumiyet_id INTEGER PRIMARY KEY,
+        arac_id INTEGER NOT NULL REFERENCES borclu_araclar(arac_id),
+        borclu_id TEXT NOT NULL,
+        takyidat_sirasi TEXT,
+        ekleyen_birim TEXT,
+        ekleme_tarihi TEXT,
+        serh_turu TEXT,
+        kurum_adi TEXT,
+        haciz INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_borclu_arac_mahrumiyetleri_arac_id ON borclu_arac_mahrumiyetleri(arac_id, haciz);",
+    "CREATE INDEX IF NOT EXISTS idx_borclu_arac_mahrumiyetleri_borclu_id ON borclu_arac_mahrumiyetleri(borclu_id);",
+    """
+    CREATE TABLE IF NOT EXISTS borclu_tasinmazlar (
+        tasinmaz_id INTEGER PRIMARY KEY,
+        borclu_id TEXT NOT NULL,
+        sira INTEGER NOT NULL,
+        tapu_mudurlugu TEXT,
+        il_ilce TEXT,
+        mahalle TEXT,
+        vasfi TEXT,
+        yuzolcumu TEXT,
+        mevki TEXT,
+        ada_no TEXT,
+        parsel_no TEXT,
+        bagimsiz_bolum TEXT
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_borclu_tasinmazlar_borclu_id ON borclu_tasinmazlar(borclu_id, sira);",
+    "CREATE INDEX IF NOT EXISTS idx_borclu_tasinmazlar_il_ilce ON borclu_tasinmazlar(il_ilce);",
+    """
+    CREATE TABLE IF NOT EXISTS borclu_tasinmaz_hisseleri (
+        hisse_id INTEGER PRIMARY KEY,
+        tasinmaz_id INTEGER NOT NULL REFERENCES borclu_tasinmazlar(tasinmaz_id),
+        borclu_id TEXT NOT NULL,
+        sira INTEGER NOT NULL,
+        aciklama TEXT,
+        hisse_tipi TEXT,
+        durum TEXT,
+        takyidat_sayisi INTEGER NOT NULL DEFAULT 0,
+        haciz_sayisi INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_borclu_tasinmaz_hisseleri_tasinmaz_id ON borclu_tasinmaz_hisseleri(tasinmaz_id, haciz_sayisi);",
+    "CREATE INDEX IF NOT EXISTS idx_borclu_tasinmaz_hisseleri_borclu_id ON borclu_tasinmaz_hisseleri(borclu_id);",
+    """
+    CREATE TABLE IF NOT EXISTS borclu_banka_hesaplari (
+        hesap_id INTEGER PRIMARY KEY,
+        borclu_id TEXT NOT NULL,
+        sira INTEGER NOT NULL,
+        kurum TEXT
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_borclu_banka_hesaplari_borclu_id ON borclu_banka_hesaplari(borclu_id, sira);",
+    "CREATE INDEX IF NOT EXISTS idx_borclu_banka_hesaplari_kurum ON borclu_banka_hesaplari(kurum);",
+]
+
+_SERH_TURU = """m.value ->> '$."Serh Turu"'"""
+_TAKYIDAT_TEXT = "IFNULL(k.value ->> '$.tipi', '') || ' ' || IFNULL(k.value ->> '$.aciklama', '')"
+
+def _asset_projections(payload):
+    """canonical sorgu_tipi -> (tables holding its rows, statements that project the NEW row's payload expression)"""
+    return {
+        'EGM': (
+            ['borclu_arac_mahrumiyetleri', 'borclu_araclar'],
+            [f"""
+            INSERT INTO borclu_araclar (borclu_id, sira, plaka, marka, model, tipi, renk, cins)
+            SELECT NEW.borclu_id, a.key, a.value ->> '$.Plaka', a.value ->> '$.Marka', a.value ->> '$.Model',
+                   a.value ->> '$.Tipi', a.value ->> '$.Renk', a.value ->> '$.Cins'
+            FROM json_each({_array(payload, '$.Araclar')}, '$.Araclar') a
+            WHERE a.type = 'object';""", f"""
+            INSERT INTO borclu_arac_mahrumiyetleri
+                (arac_id, borclu_id, takyidat_sirasi, ekleyen_birim, ekleme_tarihi, serh_turu, kurum_adi, haciz)
+            SELECT ar.arac_id, NEW.borclu_id, m.value ->> '$."Takyidat Sirasi"', m.value ->> '$."Ekleyen Birim"',
+                   m.value ->> '$."Ekleme Tarihi"', m.value ->> '$."Serh Turu"', m.value ->> '$."Kurum Adi"',
+                   {_haciz(_SERH_TURU)}
+            FROM json_each({_array(payload, '$.Araclar')}, '$.Araclar') a
+            JOIN borclu_araclar ar ON ar.borclu_id = NEW.borclu_id AND ar.sira = a.key
+            JOIN json_each(a.value, '$.Mahrumiyet') m
+            WHERE a.type = 'object' AND m.type = 'object';"""]
+        ),
+        'TAKBIS': (
+            ['borclu_tasinmaz_hisseleri', 'borclu_tasinmazlar'],
+            [f"""
+            INSERT INTO borclu_tasinmazlar (borclu_id, sira, tapu_mudurlugu, il_ilce, mahalle, vasfi, yuzolcumu,
+                                            mevki, ada_no, parsel_no, bagimsiz_bolum)
+            SELECT NEW.borclu_id, t.key, t.value ->> '$.tapu_mudurlugu', t.value ->> '$.il_ilce', t.value ->> '$.mahalle',
+                   t.value ->> '$.vasfi', t.value ->> '$.yuzolcumu', t.value ->> '$.mevki', t.value ->> '$.ada_no',
+                   t.value ->> '$.parcel_no', t.value ->> '$.bagimsiz_bolum'
+            FROM json_each({_array(payload, '$.tasinmazlar')}, '$.tasinmazlar') t
+            WHERE t.type = 'object';""", f"""
+            INSERT INTO borclu_tasinmaz_hisseleri
+                (tasinmaz_id, borclu_id, sira, aciklama, hisse_tipi, durum, takyidat_sayisi, haciz_sayisi)
+            SELECT ta.tasinmaz_id, NEW.borclu_id, h.key, h.value ->> '$.aciklama', h.value ->> '$.hisse_tipi',
+                   h.value ->> '$.durum',
+                   (SELECT COUNT(*) FROM json_each(h.value, '$.takdiyat_bilgisi') k WHERE k.type = 'object'),
+                   (SELECT COUNT(*) FROM json_each(h.value, '$.takdiyat_bilgisi') k
+                    WHERE k.type = 'object' AND {_haciz(_TAKYIDAT_TEXT)})
+            FROM json_each({_array(payload, '$.tasinmazlar')}, '$.tasinmazlar') t
+            JOIN borclu_tasinmazlar ta ON ta.borclu_id = NEW.borclu_id AND ta.sira = t.key
+            JOIN json_each(t.value, '$.hisse_bilgisi') h
+            WHERE t.type = 'object' AND h.type = 'object';"""]
+        ),
+        'Banka': (
+            ['borclu_banka_hesaplari'],
+            [f"""
+            INSERT INTO borclu_banka_hesaplari (borclu_id, sira, kurum)
+            SELECT NEW.borclu_id, b.key, b.value ->> '$.kurum'
+            FROM json_each({_array(payload, '$.bankalar')}, '$.bankalar') b
+            WHERE b.type = 'object';"""]
+        ),
+    }
+
+ASSET_PROJECTIONS = _asset_projections('NEW.sorgu_verisi')
+
+def _projection_triggers(column, value, name, tables, statements):
+    """Build the insert/update/delete triggers that mirror one sorgu type (column = value) into its asset tables"""
+    def drop(row):
+        return "".join(f"\n        DELETE FROM {table} WHERE borclu_id = {row}.borclu_id;" for table in tables)
+    add = "".join(statements)
+    # Statements inside a trigger cannot be made conditional, so the update
+    # trigger is split: _old only clears rows the update moved away from (it
+    # must not undo _new, whatever order the two fire in)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_assets_{name}_insert AFTER INSERT ON borclu_sorgular\n"
+        f"    WHEN NEW.{column} = {value}\n    BEGIN{drop('NEW')}{add}\n    END;",
+        f"CREATE TRIGGER IF NOT EXISTS trg_assets_{name}_update_old AFTER UPDATE ON borclu_sorgular\n"
+        f"    WHEN OLD.{column} = {value}\n"
+        f"    AND (NEW.{column} IS NOT OLD.{column} OR NEW.borclu_id IS NOT OLD.borclu_id)\n"
+        f"    BEGIN{drop('OLD')}\n    END;",
+        f"CREATE TRIGGER IF NOT EXISTS trg_assets_{name}_update_new AFTER UPDATE ON borclu_sorgular\n"
+        f"    WHEN NEW.{column} = {value}\n    BEGIN{drop('NEW')}{add}\n    END;",
+        f"CREATE TRIGGER IF NOT EXISTS trg_assets_{name}_delete AFTER DELETE ON borclu_sorgular\n"
+        f"    WHEN OLD.{column} = {value}\n    BEGIN{drop('OLD')}\n    END;",
+    ]
+
+def _key_values(column):
+    """sorgu_tipi -> SQL literal it is stored as in the key column ('type_id' or the legacy 'sorgu_tipi')"""
+    if column == 'type_id':
+        return {sorgu_tipi: str(SORGU_TYPE_IDS[sorgu_tipi]) for sorgu_tipi in ASSET_PROJECTIONS}
+    return {sorgu_tipi: f"'{sorgu_tipi}'" for sorgu_tipi in ASSET_PROJECTIONS}
+
+def asset_triggers(payload, column='type_id'):
+    """
+    Projection triggers of every sorgu type, reading the payload through the given expression.
+
+    column is the sorgu type key of borclu_sorgular: 'type_id', or 'sorgu_tipi'
+    for the text-keyed table of migrations 8-9.
+    """
+    values = _key_values(column)
+    return [statement
+            for sorgu_tipi, (tables, statements) in _asset_projections(payload).items()
+            for statement in _projection_triggers(column, values[sorgu_tipi], sorgu_tipi.lower(), tables, statements)]
+
+# As created by migration 8; migrations 9 and 10 recreate the triggers over sorgu_payloads and type_id
+ASSET_INDEX_DDL = [*ASSET_TABLES_DDL, *asset_triggers('NEW.sorgu_verisi', column='sorgu_tipi')]
+
+def create_asset_index(cur):
+    """Create the asset tables and their triggers, and project the sorgu rows already stored"""
+    for statement in ASSET_INDEX_DDL:
+        cur.execute(statement)
+    rebuild_asset_index(cur, column='sorgu_tipi')
+
+def rebuild_asset_index(cur, column='type_id'):
+    """Re-project every asset-bearing sorgu row (runs inside the caller's transaction)"""
+    # Firing the update triggers keeps the projection rules in one place
+    values = ", ".join(_key_values(column).values())
+    cur.execute(f"UPDATE borclu_sorgular SET {column} = {column} WHERE {column} IN ({values})")
+
+# Portfolio queries. Every list is keyset-paginated on its integer row id and
+# joined to the owning debtor and file.
+
+_OWNER_COLUMNS = "f.file_id, f.dosyaNo, f.icraMudurlugu, b.borclu_id, b.ad AS borcluAdi"
+
+ARACLAR_SQL = f"""
+    SELECT a.arac_id, {_OWNER_COLUMNS}, a.plaka, a.marka, a.model, a.tipi, a.renk, a.cins,
+           (SELECT COUNT(*) FROM borclu_arac_mahrumiyetleri m WHERE m.arac_id = a.arac_id) AS mahrumiyet_sayisi,
+           (SELECT COUNT(*) FROM borclu_arac_mahrumiyetleri m WHERE m.arac_id = a.arac_id AND m.haciz = 1) AS haciz_sayisi
+    FROM borclu_araclar a
+    JOIN borclular b ON b.borclu_id = a.borclu_id
+    LEFT JOIN files f ON f.file_id = b.file_id
+    WHERE a.arac_id > ?{{where}}
+    ORDER BY a.arac_id
+    LIMIT ?
+"""
+
+TASINMAZLAR_SQL = f"""
+    SELECT t.tasinmaz_id, {_OWNER_COLUMNS}, t.tapu_mudurlugu, t.il_ilce, t.mahalle, t.vasfi, t.yuzolcumu,
+           t.mevki, t.ada_no, t.parsel_no, t.bagimsiz_bolum,
+           (SELECT COUNT(*) FROM borclu_tasinmaz_hisseleri h WHERE h.tasinmaz_id = t.tasinmaz_id) AS hisse_sayisi,
+           (SELECT IFNULL(SUM(h.haciz_sayisi), 0) FROM borclu_tasinmaz_hisseleri h WHERE h.tasinmaz_id = t.tasinmaz_id) AS haciz_sayisi
+    FROM borclu_tasinmazlar t
+    JOIN borclular b ON b.borclu_id = t.borclu_id
+    LEFT JOIN files f ON f.file_id = b.file_id
+    WHERE t.tasinmaz_id > ?{{where}}
+    ORDER BY t.tasinmaz_id
+    LIMIT ?
+"""
+
+BANKA_HESAPLARI_SQL = f"""
+    SELECT h.hesap_id, {_OWNER_COLUMNS}, h.kurum
+    FROM borclu_banka_hesaplari h
+    JOIN borclular b ON b.borclu_id = h.borclu_id
+    LEFT JOIN files f ON f.file_id = b.file_id
+    WHERE h.hesap_id > ?{{where}}
+    ORDER BY h.hesap_id
+    LIMIT ?
+"""
+
+def _list(sql, conditions, params, after, limit):
+    where = "".join(f" AND {condition}" for condition in conditions)
+    with db_connection() as conn:
+        rows = conn.execute(sql.format(where=where), (after or 0, *params, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+def list_araclar(haciz=None, marka=None, file_id=None, after=None, limit=100):
+    """
+    Vehicles across all debtors, ordered by arac_id.
+
+    haciz: True for vehicles with at least one haciz record, False for vehicles without any
+    """
+    conditions, params = [], []
+    if haciz is not None:
+        exists = "EXISTS (SELECT 1 FROM borclu_arac_mahrumiyetleri m WHERE m.arac_id = a.arac_id AND m.haciz = 1)"
+        conditions.append(exists if haciz else f"NOT {exists}")
+    if marka:
+        conditions.append("a.marka = ?")
+        params.append(marka)
+    if file_id:
+        conditions.append("b.file_id = ?")
+        params.append(file_id)
+    return _list(ARACLAR_SQL, conditions, params, after, limit)
+
+def list_tasinmazlar(haciz=None, il_ilce=None, file_id=None, after=None, limit=100):
+    """
+    Properties across all debtors, ordered by tasinmaz_id.
+
+    haciz: True for properties with a haciz on any share, False for properties without any
+    """
+    conditions, params = [], []
+    if haciz is not None:
+        exists = ("EXISTS (SELECT 1 FROM borclu_tasinmaz_hisseleri h "
+                  "WHERE h.tasinmaz_id = t.tasinmaz_id AND h.haciz_sayisi > 0)")
+        conditions.append(exists if haciz else f"NOT {exists}")
+    if il_ilce:
+        conditions.append("t.il_ilce = ?")
+        params.append(il_ilce)
+    if file_id:
+        conditions.append("b.file_id = ?")
+        params.append(file_id)
+    return _list(TASINMAZLAR_SQL, conditions, params, after, limit)
+
+def list_banka_hesaplari(kurum=None, file_id=None, after=None, limit=100):
+    """Bank accounts across all debtors, ordered by hesap_id"""
+    conditions, params = [], []
+    if kurum:
+        conditions.append("h.kurum = ?")
+        params.append(kurum)
+    if file_id:
+        conditions.append("b.file_id = ?")
+        params.append(file_id)
+    return _list(BANKA_HESAPLARI_SQL, conditions, params, after, limit)
+
+def asset_summary():
+    """Portfolio-wide asset counts"""
+    with db_connection() as conn:
+        araclar = conn.execute("""
+            SELECT COUNT(*) AS toplam,
+                   COUNT(DISTINCT borclu_id) AS borclu_sayisi,
+                   SUM(NOT EXISTS (SELECT 1 FROM borclu_arac_mahrumiyetleri m
+                                   WHERE m.arac_id = a.arac_id AND m.haciz = 1)) AS haczi_olmayan
+            FROM borclu_araclar a
+        """).fetchone()
+        tasinmazlar = conn.execute("""
+            SELECT COUNT(*) AS toplam,
+                   COUNT(DISTINCT borclu_id) AS borclu_sayisi,
+                   SUM(NOT EXISTS (SELECT 1 FROM borclu_tasinmaz_hisseleri h
+                                   WHERE h.tasinmaz_id = t.tasinmaz_id AND h.haciz_sayisi > 0)) AS haczi_olmayan
+            FROM borclu_tasinmazlar t
+        """).fetchone()
+        hesaplar = conn.execute(
+            "SELECT COUNT(*) AS toplam, COUNT(DISTINCT borclu_id) AS borclu_sayisi FROM borclu_banka_hesaplari"
+        ).fetchone()
+        kurumlar = conn.execute("""
+            SELECT kurum, COUNT(*) AS hesap_sayisi, COUNT(DISTINCT borclu_id) AS borclu_sayisi
+            FROM borclu_banka_hesaplari
+            GROUP BY kurum
+            ORDER BY hesap_sayisi DESC, kurum
+        """).fetchall()
+    return {
+        "araclar": {**dict(araclar), "haczi_olmayan": araclar['haczi_olmayan'] or 0},
+        "tasinmazlar": {**dict(tasinmazlar), "haczi_olmayan": tasinmazlar['haczi_olmayan'] or 0},
+        "banka_hesaplari": {**dict(hesaplar), "kurumlar": [dict(row) for row in kurumlar]},
+    }
@@ -0,0 +1,105 @@
+import re
+import threading
+from contextlib import contextmanager
+
+# Debtor lookup for scraper results.
+#
+# Scrapers identify a debtor by the UYAP dropdown text, "NAME - TCKIMLIK" (the
+# TC part may be missing). The debtor is resolved within its file by, in order:
+#   1. tcKimlik, when the text carries an 11 digit TC number
+#   2. ad_key, the stored normalized name (indexed with file_id)
+#   3. ad LIKE '%name%', only for rows written without ad_key by older code/tools
+
+TC_KIMLIK_PATTERN = re.compile(r'^\d{11}$')
+
+def borclu_ad_key(ad):
+    """Normalized debtor name: Turkish lower case, single spaces, no surrounding whitespace"""
+    if ad is None:
+        return None
+    # str.lower() maps İ to 'i' + combining dot and I to 'i'; Turkish wants i and ı
+    return ' '.join(ad.replace('İ', 'i').replace('I', 'ı').lower().split())
+
+def split_borclu_adi(borclu_adi):
+    """Split 'NAME - TC' dropdown text into (name, tc_kimlik or None)"""
+    name, _, rest = borclu_adi.partition(' - ')
+    tc_kimlik = rest.strip()
+    return name.strip(), (tc_kimlik if TC_KIMLIK_PATTERN.match(tc_kimlik) else None)
+
+def find_borclu_id(conn, file_id, borclu_adi):
+    """Return the borclu_id of the debtor named by dropdown text in a file, or None"""
+    name, tc_kimlik = split_borclu_adi(borclu_adi)
+    if tc_kimlik:
+        row = conn.execute(
+            "SELECT borclu_id FROM borclular WHERE file_id = ? AND tcKimlik = ? ORDER BY borclu_id LIMIT 1",
+            (file_id, tc_kimlik)
+        ).fetchone()
+        if row:
+            return row[0]
+    row = conn.execute(
+        "SELECT borclu_id FROM borclular WHERE file_id = ? AND ad_key = ? ORDER BY borclu_id LIMIT 1",
+        (file_id, borclu_ad_key(name))
+    ).fetchone()
+    if row:
+        return row[0]
+    row = conn.execute(
+        "SELECT borclu_id FROM borclular WHERE file_id = ? AND ad_key IS NULL AND ad LIKE ? ORDER BY borclu_id LIMIT 1",
+        (file_id, f"%{name}%")
+    ).fetchone()
+    return row[0] if row else None
+
+class BorcluResolver:
+    """
+    Memo of (dosya_no, borclu_adi) -> (file_id, borclu_id) lookups.
+
+    One resolver lives for one perform_sorgulama run, so every debtor is looked
+    up once per run instead of once per saved result (scrapers re-save their
+    cumulative results on every exit path).
+    """
+
+    def __init__(self):
+        self._file_ids = {}
+        self._borclu_ids = {}
+        self._lock = threading.Lock()
+
+    def file_id(self, conn, dosya_no):
+        """file_id for dosya_no, or None"""
+        with self._lock:
+            if dosya_no in self._file_ids:
+                return self._file_ids[dosya_no]
+        row = conn.execute("SELECT file_id FROM files WHERE dosyaNo = ?", (dosya_no,)).fetchone()
+        if row is None:
+            # Not remembered either: the file may be imported later in the run
+            return None
+        with self._lock:
+            self._file_ids[dosya_no] = row[0]
+        return row[0]
+
+    def resolve(self, conn, dosya_no, borclu_adi):
+        """(file_id, borclu_id) for a debtor; either is None when not found"""
+        key = (dosya_no, borclu_adi)
+        with self._lock:
+            if key in self._borclu_ids:
+                return self._borclu_ids[key]
+        file_id = self.file_id(conn, dosya_no)
+        result = (file_id, find_borclu_id(conn, file_id, borclu_adi) if file_id is not None else None)
+        # Misses are not remembered: the debtor may be added later in the run
+        if result[1] is not None:
+            with self._lock:
+                self._borclu_ids[key] = result
+        return result
+
+_run = threading.local()
+
+@contextmanager
+def borclu_lookup_run():
+    """Share one BorcluResolver between all results saved by this thread until the block exits"""
+    previous = getattr(_run, 'resolver', None)
+    _run.resolver = BorcluResolver()
+    try:
+        yield _run.resolver
+    finally:
+        _run.resolver = previous
+
+def current_borclu_resolver():
+    """The resolver of the current thread's run, or None outside borclu_lookup_run()"""
+    return getattr(_run, 'resolver', None)
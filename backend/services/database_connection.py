@@ -0,0 +1,238 @@
+import os
+import queue
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
+from services.sorgu_payloads import register_functions
+
+# Database path (can be overridden with ADALEX_DB_PATH, e.g. for tests)
+DB_PATH = os.environ.get(
+    'ADALEX_DB_PATH',
+    os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'files.db')
+)
+
+# Read-only API processes serving a replica (see services/replica.py) set
+# ADALEX_DB_QUERY_ONLY=1: their connections refuse writes and the schema is not migrated
+QUERY_ONLY = os.environ.get('ADALEX_DB_QUERY_ONLY', '') in ('1', 'true')
+
+# Pool configuration
+POOL_SIZE = int(os.environ.get('ADALEX_DB_POOL_SIZE', '8'))
+POOL_TIMEOUT = float(os.environ.get('ADALEX_DB_POOL_TIMEOUT', '30'))
+STATEMENT_CACHE_SIZE = int(os.environ.get('ADALEX_DB_STATEMENT_CACHE_SIZE', '256'))
+BUSY_TIMEOUT_SECONDS = 5.0
+
+# PRAGMAs applied once to every new connection, in this order
+PRAGMAS = [
+    ("auto_vacuum", "INCREMENTAL"),     # new files only, must precede WAL; see database/maintenance.py vacuum
+    ("journal_mode", "WAL"),            # readers no longer block on scraper writes
+    ("synchronous", "NORMAL"),          # safe with WAL, avoids an fsync per commit
+    ("mmap_size", 256 * 1024 * 1024),   # 256 MiB memory-mapped I/O
+    ("cache_size", -64 * 1024),         # 64 MiB page cache (negative = KiB)
+    ("temp_store", "MEMORY"),
+    ("recursive_triggers", "ON"),       # INSERT OR REPLACE fires DELETE triggers (keeps db_counters exact)
+]
+
+def get_logger():
+    """Get logger for connection pool operations"""
+    logger = logging.getLogger('database_connection')
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+def configure_connection(conn, query_only=False):
+    """Apply the standard PRAGMAs and SQL functions to a freshly opened connection"""
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+    # sorgu_payload() is called by the borclu_sorgular triggers, so every writing connection needs it
+    register_functions(conn)
+    if query_only:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+def connect(db_path=None, isolation_level='', query_only=False):
+    """
+    Open a new, fully configured connection that is not managed by the pool.
+
+    The caller owns the connection and must close it. Prefer db_connection()
+    or db_transaction() for normal reads and writes.
+    """
+    conn = sqlite3.connect(
+        db_path or DB_PATH,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        isolation_level=isolation_level,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    conn.row_factory = sqlite3.Row
+    return configure_connection(conn, query_only)
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections.
+
+    Connections are created lazily up to pool_size and handed out one caller at
+    a time. Pooled connections run in autocommit mode (isolation_level=None);
+    use db_transaction() to group writes into an explicit transaction.
+    """
+
+    def __init__(self, db_path=None, pool_size=None, timeout=None, query_only=None):
+        self.db_path = db_path or DB_PATH
+        self.pool_size = max(1, pool_size or POOL_SIZE)
+        self.timeout = POOL_TIMEOUT if timeout is None else timeout
+        self.query_only = QUERY_ONLY if query_only is None else query_only
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _open(self):
+        return connect(self.db_path, isolation_level=None, query_only=self.query_only)
+
+    def acquire(self):
+        """Borrow a connection, opening a new one while under pool_size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.pool_size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No database connection available after {self.timeout}s (pool_size={self.pool_size})")
+
+    def release(self, conn):
+        """Return a borrowed connection to the pool"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        if self._closed:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def close_all(self):
+        """Close every idle connection; borrowed ones are closed on release"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self):
+        """Return basic pool usage numbers"""
+        return {
+            "db_path": os.path.abspath(self.db_path),
+            "pool_size": self.pool_size,
+            "query_only": self.query_only,
+            "open_connections": self._created,
+            "idle_connections": self._idle.qsize()
+        }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Get the process-wide connection pool, creating it on first use.
+
+    Creating the pool first brings the schema up to date (once per process),
+    so schema DDL never runs on the read/write path.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Imported here: database_schema depends on this module
+                from services.database_schema import ensure_schema
+                # A replica is a copy of a migrated database and must not be written
+                if not QUERY_ONLY:
+                    ensure_schema(DB_PATH)
+                _pool = ConnectionPool()
+                get_logger().info(f"Connection pool created for {_pool.db_path} (pool_size={_pool.pool_size})")
+    return _pool
+
+def configure_pool(db_path=None, pool_size=None, timeout=None, query_only=None):
+    """
+    Replace the process-wide pool, e.g. to point at another database file.
+
+    Idle connections of the previous pool are closed. The schema of the new
+    database is not migrated; call database_schema.ensure_schema() for that.
+    """
+    global _pool, DB_PATH
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        if db_path:
+            DB_PATH = db_path
+        _pool = ConnectionPool(db_path=db_path, pool_size=pool_size, timeout=timeout, query_only=query_only)
+    return _pool
+
+def close_pool():
+    """Close the process-wide pool (a new one is created on next use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = None
+
+@contextmanager
+def db_connection():
+    """Borrow a pooled connection for reads (autocommit mode)"""
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+@contextmanager
+def db_transaction():
+    """
+    Borrow a pooled connection wrapped in a write transaction.
+
+    BEGIN IMMEDIATE takes the write lock up front so concurrent writers wait on
+    busy_timeout instead of failing on lock upgrade. Commits on success and
+    rolls back on any exception.
+    """
+    with db_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
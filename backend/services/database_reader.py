@@ -1,10 +1,12 @@
-import sqlite3
-import os
+import re
 import json
 from datetime import datetime
 
-# Update database path to point to the database directory
-DB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'files.db')
+from services.database_connection import db_connection
+from services.sorgu_cache import sorgu_cache
+from services.sorgu_payloads import payload_sql
+from services.archive import attach_archive
+from services.sorgu_types import TYPE_ID_SQL, sorgu_type_key
 
 # Column names for better data handling
 COLUMNS = ['file_id', 'klasor', 'dosyaNo', 'eYil', 'eNo', 'borcluAdi', 'alacakliAdi', 'foyTuru', 'durum', 'takipTarihi', 'icraMudurlugu']
@@ -13,81 +15,288 @@ COLUMNS = ['file_id', 'klasor', 'dosyaNo', 'eYil', 'eNo', 'borcluAdi', 'alacakli
 def get_all_files():
     """Get all files from the database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # Enable row factory for easier access
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM files ORDER BY file_id")
-        rows = cur.fetchall()
-        conn.close()
-        return rows
+        with db_connection() as conn:
+            return conn.execute("SELECT * FROM files ORDER BY file_id").fetchall()
     except Exception as e:
         print(f"Error getting files: {e}")
         return []
 
-def get_file_by_id(file_id):
-    """Get a specific file by ID"""
+# takipTarihi is stored as 'DD.MM.YYYY HH:MM'; this expression turns it into a sortable
+# 'YYYY-MM-DD HH:MM' string (indexed as idx_files_takipTarihi).
+TAKIP_TARIHI_ISO_SQL = "IFNULL(substr(f.takipTarihi, 7, 4) || '-' || substr(f.takipTarihi, 4, 2) || '-' || substr(f.takipTarihi, 1, 2) || substr(f.takipTarihi, 11), '')"
+
+# Exact-match list filters (query parameter -> expression). Each expression is indexed
+# together with file_id (idx_files_<name>); IFNULL keeps keyset comparisons NULL-free.
+# The expressions must match the index definitions in database_schema exactly.
+LIST_FILTER_COLUMNS = {
+    'durum': "IFNULL(f.durum, '')",
+    'icraMudurlugu': "IFNULL(f.icraMudurlugu, '')",
+    'foyTuru': "IFNULL(f.foyTuru, '')",
+    'eYil': "IFNULL(f.eYil, 0)",
+    'alacakliAdi': "IFNULL(f.alacakliAdi, '')",
+}
+
+# Sortable list fields; file_id is always the tie breaker, so (key, file_id) is unique
+LIST_SORT_KEYS = {
+    'file_id': 'f.file_id',
+    'takipTarihi': TAKIP_TARIHI_ISO_SQL,
+    **LIST_FILTER_COLUMNS,
+}
+
+# One row per file. For files with more than one debtor, borcluAdi is rebuilt from
+# borclular (ordered by borclu_id) with a correlated subquery on idx_borclular_file_id,
+# so the whole list comes from a single statement instead of one query per file.
+# {schema} / {where} / {order} / {limit} are filled in by build_icra_dosyalari_query.
+ICRA_DOSYALARI_LIST_SQL = """
+    SELECT
+        f.file_id, f.klasor, f.dosyaNo, f.eYil, f.eNo,
+        COALESCE((
+            SELECT CASE WHEN COUNT(*) > 1 THEN COALESCE(GROUP_CONCAT(NULLIF(b.ad, ''), ', '), '') END
+            FROM (SELECT ad FROM {schema}.borclular WHERE file_id = f.file_id ORDER BY borclu_id) AS b
+        ), f.borcluAdi) AS borcluAdi,
+        f.alacakliAdi, f.foyTuru, f.durum, f.takipTarihi, f.icraMudurlugu
+    FROM {schema}.files f
+    {where}
+    ORDER BY {order}
+    {limit}
+"""
+
+def _schema(conn, archived):
+    """Schema to read from: 'archive' (attached on first use) for archived files, else 'main'"""
+    return attach_archive(conn) if archived else 'main'
+
+def _filter_clauses(filters):
+    """Build WHERE clauses for the list filters (see LIST_FILTER_COLUMNS)"""
+    clauses = []
+    params = []
+    for name, column in LIST_FILTER_COLUMNS.items():
+        if filters.get(name) is not None:
+            clauses.append(f"{column} = ?")
+            params.append(filters[name])
+    # Date range bounds are ISO dates (YYYY-MM-DD), both inclusive
+    if filters.get('takipTarihiFrom'):
+        clauses.append(f"{TAKIP_TARIHI_ISO_SQL} >= ?")
+        params.append(filters['takipTarihiFrom'])
+    if filters.get('takipTarihiTo'):
+        clauses.append(f"{TAKIP_TARIHI_ISO_SQL} < date(?, '+1 day')")
+        params.append(filters['takipTarihiTo'])
+    return clauses, params
+
+def _keyset_clause(sort, descending, after):
+    """Build the clause that seeks past the last row of the previous page"""
+    op = '<' if descending else '>'
+    if sort == 'file_id':
+        return f"f.file_id {op} ?", [after[-1]]
+    # Written as a range on the sort expression plus a tie-break on file_id so the
+    # planner seeks on the expression index (a row-value comparison would scan it)
+    sort_sql = LIST_SORT_KEYS[sort]
+    value, file_id = after
+    return f"{sort_sql} {op}= ? AND ({sort_sql} {op} ? OR f.file_id {op} ?)", [value, value, file_id]
+
+def build_icra_dosyalari_query(filters=None, sort='file_id', descending=False, after=None, limit=None, schema='main'):
+    """
+    Build the (sql, params) pair for one page of the icra dosyalari list.
+
+    after is the page key of the last row already returned (see list_page_key);
+    schema is 'archive' to list archived files.
+    """
+    clauses, params = _filter_clauses(filters or {})
+    if after is not None:
+        clause, keyset_params = _keyset_clause(sort, descending, after)
+        clauses.append(clause)
+        params.extend(keyset_params)
+
+    direction = 'DESC' if descending else 'ASC'
+    if sort == 'file_id':
+        order = f"f.file_id {direction}"
+    else:
+        order = f"{LIST_SORT_KEYS[sort]} {direction}, f.file_id {direction}"
+
+    limit_sql = ""
+    if limit is not None:
+        limit_sql = "LIMIT ?"
+        params.append(limit)
+
+    sql = ICRA_DOSYALARI_LIST_SQL.format(
+        schema=schema,
+        where=f"WHERE {' AND '.join(clauses)}" if clauses else "",
+        order=order,
+        limit=limit_sql
+    )
+    return sql, params
+
+def list_page_key(item, sort='file_id'):
+    """Return the keyset pagination key of a list item for the given sort field"""
+    if sort == 'file_id':
+        return [item['file_id']]
+    value = item[sort]
+    if value is None:
+        # Same defaults as the IFNULL() in LIST_SORT_KEYS
+        value = 0 if sort == 'eYil' else ''
+    elif sort == 'takipTarihi':
+        # Same transformation as TAKIP_TARIHI_ISO_SQL
+        value = f"{value[6:10]}-{value[3:5]}-{value[0:2]}{value[10:]}"
+    return [value, item['file_id']]
+
+def iter_icra_dosyalari(limit=None, after=None, filters=None, sort='file_id', descending=False, archived=False):
+    """
+    Yield the icra dosyalari list items (as dicts) straight from a single query.
+
+    Rows can be filtered and sorted on indexed columns. Pages are read with
+    keyset pagination: rows come back in (sort key, file_id) order, starting
+    after the page key `after`, so every page is an index seek instead of an
+    OFFSET scan.
+
+    The pooled connection is held until the generator is exhausted or closed,
+    so callers can stream the rows into a response without materializing them.
+    With archived=True the files moved to archive.db are listed instead.
+    """
+    try:
+        with db_connection() as conn:
+            sql, params = build_icra_dosyalari_query(filters, sort, descending, after, limit, _schema(conn, archived))
+            for row in conn.execute(sql, params):
+                yield dict(row)
+    except Exception as e:
+        print(f"Error getting icra dosyalari list: {e}")
+        raise
+
+def count_files(filters=None, archived=False):
+    """
+    Get the number of files (None if unavailable).
+
+    Without filters the trigger-maintained db_counters row is read; with
+    filters (or for archived files, which have no counters) the count runs
+    on the same indexes the list query uses.
+    """
+    try:
+        with db_connection() as conn:
+            clauses, params = _filter_clauses(filters or {})
+            if clauses or archived:
+                where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+                return conn.execute(f"SELECT COUNT(*) FROM {_schema(conn, archived)}.files f {where}", params).fetchone()[0]
+            row = conn.execute("SELECT value FROM db_counters WHERE name = 'files'").fetchone()
+            if row is None:
+                row = conn.execute("SELECT COUNT(*) FROM files").fetchone()
+        return row[0]
+    except Exception as e:
+        print(f"Error counting files: {e}")
+        return None
+
+def get_file_by_id(file_id, archived=False):
+    """Get a specific file by ID (from archive.db with archived=True)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # Enable row factory for easier access
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM files WHERE file_id = ?", (file_id,))
-        row = cur.fetchone()
-        conn.close()
-        return row
+        with db_connection() as conn:
+            return conn.execute(f"SELECT * FROM {_schema(conn, archived)}.files WHERE file_id = ?", (file_id,)).fetchone()
     except Exception as e:
         print(f"Error getting file {file_id}: {e}")
         return None
 
-def get_file_details_by_id(file_id):
+def get_file_details_by_id(file_id, archived=False):
     """Get file details by file ID"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM file_details WHERE file_id = ?", (file_id,))
-        row = cur.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            row = conn.execute(f"SELECT * FROM {_schema(conn, archived)}.file_details WHERE file_id = ?", (file_id,)).fetchone()
         return dict(row) if row else None
     except Exception as e:
         print(f"Error getting file details for {file_id}: {e}")
         return None
 
-def get_borclular_by_file_id(file_id):
+def get_borclular_by_file_id(file_id, archived=False):
     """Get all borclular (debtors) for a specific file"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM borclular WHERE file_id = ?", (file_id,))
-        rows = cur.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            rows = conn.execute(f"SELECT * FROM {_schema(conn, archived)}.borclular WHERE file_id = ?", (file_id,)).fetchall()
         return [dict(row) for row in rows]
     except Exception as e:
         print(f"Error getting borclular for file {file_id}: {e}")
         return []
 
-def get_borclu_sorgular_by_borclu_id(borclu_id):
-    """Get all queries for a specific borclu"""
+def get_borclu_by_id(file_id, borclu_id, archived=False):
+    """Get one borclu row of a file, or None"""
+    try:
+        with db_connection() as conn:
+            return conn.execute(
+                f"SELECT * FROM {_schema(conn, archived)}.borclular WHERE file_id = ? AND borclu_id = ?", (file_id, borclu_id)
+            ).fetchone()
+    except Exception as e:
+        print(f"Error getting borclu {borclu_id}: {e}")
+        return None
+
+def get_borclu_sorgular_by_borclu_id(borclu_id, archived=False):
+    """Get all queries for a specific borclu, named by their canonical sorgu_tipi"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM borclu_sorgular WHERE borclu_id = ?", (borclu_id,))
-        rows = cur.fetchall()
-        conn.close()
-        return rows
+        with db_connection() as conn:
+            schema = _schema(conn, archived)
+            # Archived rows carry type ids of the files.db registry
+            rows = conn.execute(
+                f"SELECT s.borclu_id, t.name AS sorgu_tipi, {payload_sql('s', schema)} AS sorgu_verisi, s.timestamp "
+                f"FROM {schema}.borclu_sorgular s JOIN main.sorgu_types t ON t.type_id = s.type_id "
+                f"WHERE s.borclu_id = ?", (borclu_id,)
+            ).fetchall()
+        # Plain tuples keep the result JSON serializable
+        return [tuple(row) for row in rows]
     except Exception as e:
         print(f"Error getting sorgular for borclu {borclu_id}: {e}")
         return []
 
+def get_data_version():
+    """Get the global write counter (bumped by triggers on every data change), None if unavailable"""
+    try:
+        with db_connection() as conn:
+            row = conn.execute("SELECT value FROM db_counters WHERE name = 'data_version'").fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"Error getting data version: {e}")
+        return None
+
+def get_borclu_sorgu_timestamp(borclu_id, sorgu_tipi):
+    """Get only the timestamp of a stored query result (no payload is read), None if missing"""
+    try:
+        with db_connection() as conn:
+            # The (borclu_id, type_id) primary key of the WITHOUT ROWID table covers the timestamp
+            row = conn.execute(
+                f"SELECT timestamp FROM borclu_sorgular WHERE borclu_id = ? AND type_id = {TYPE_ID_SQL}",
+                (borclu_id, sorgu_type_key(sorgu_tipi))
+            ).fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"Error getting sorgu timestamp for borclu {borclu_id}, tipi {sorgu_tipi}: {e}")
+        return None
+
+def get_borclu_sorgu_raw(borclu_id, sorgu_tipi):
+    """
+    Get a stored query result as (sorgu_verisi JSON text, timestamp) without decoding it, None if missing.
+
+    Rows are served from the process-wide sorgu_cache, keyed by sorgu_type_key,
+    the alias key every spelling of a type folds to (the writers invalidate the
+    same key); the cached text is immutable, so it can be shared between requests.
+    """
+    key = (borclu_id, sorgu_type_key(sorgu_tipi))
+    cached = sorgu_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = sorgu_cache.generation
+    try:
+        with db_connection() as conn:
+            row = conn.execute(
+                f"SELECT {payload_sql('s')}, timestamp FROM borclu_sorgular s WHERE borclu_id = ? AND type_id = {TYPE_ID_SQL}",
+                (borclu_id, sorgu_type_key(sorgu_tipi))
+            ).fetchone()
+        
+        if row:
+            result = (row[0], row[1])
+            sorgu_cache.put(key, result, len(row[0]), generation)
+            return result
+        return None
+    except Exception as e:
+        print(f"Error getting sorgu for borclu {borclu_id}, tipi {sorgu_tipi}: {e}")
+        return None
+
 def get_borclu_sorgu_by_tipi(borclu_id, sorgu_tipi):
     """Get specific query result for a borclu by query type"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute("SELECT sorgu_verisi, timestamp FROM borclu_sorgular WHERE borclu_id = ? AND sorgu_tipi = ?", (borclu_id, sorgu_tipi))
-        row = cur.fetchone()
-        conn.close()
-        
+        row = get_borclu_sorgu_raw(borclu_id, sorgu_tipi)
         if row:
             return {
                 "data": json.loads(row[0]),
@@ -98,6 +307,130 @@ def get_borclu_sorgu_by_tipi(borclu_id, sorgu_tipi):
         print(f"Error getting sorgu for borclu {borclu_id}, tipi {sorgu_tipi}: {e}")
         return None
 
+def get_borclu_sorgu_sections(borclu_id, sorgu_tipi, sections, default='null'):
+    """
+    Extract top-level sections of a stored query result as JSON text, in SQLite.
+
+    Returns ({section: JSON text}, timestamp), with default (JSON text) for
+    missing sections, or None if there is no stored result. Lets routes reshape
+    a payload without decoding it in Python.
+    """
+    columns = ", ".join("IFNULL(sorgu_verisi -> ?, ?)" for _ in sections)
+    params = []
+    for section in sections:
+        params += [f'$."{section}"', default]
+    # MATERIALIZED: the payload is decompressed once, not once per section
+    with db_connection() as conn:
+        row = conn.execute(
+            f"WITH r AS MATERIALIZED (SELECT timestamp, {payload_sql('s')} AS sorgu_verisi FROM borclu_sorgular s "
+            f"WHERE borclu_id = ? AND type_id = {TYPE_ID_SQL}) SELECT timestamp, {columns} FROM r",
+            (borclu_id, sorgu_type_key(sorgu_tipi), *params)
+        ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(sections, row[1:])), row[0]
+
+def get_borclu_sorgu_versions(borclu_id, sorgu_tipi, limit, before=None):
+    """
+    List stored versions of a query result from borclu_sorgu_history, newest first.
+
+    Returns [(version_id, timestamp)], at most limit rows with timestamp < before
+    when given. Payloads are not read.
+    """
+    where = f"borclu_id = ? AND type_id = {TYPE_ID_SQL}"
+    params = [borclu_id, sorgu_type_key(sorgu_tipi)]
+    if before is not None:
+        where += " AND timestamp < ?"
+        params.append(before)
+    with db_connection() as conn:
+        rows = conn.execute(
+            f"SELECT version_id, timestamp FROM borclu_sorgu_history WHERE {where} "
+            "ORDER BY timestamp DESC, version_id DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+def get_borclu_sorgu_as_of(borclu_id, sorgu_tipi, as_of):
+    """
+    Get the query result that was current at as_of (ISO timestamp, local time).
+
+    Returns (version_id, sorgu_verisi JSON text, timestamp) of the latest version
+    stored at or before as_of, or None. Reads history only, never sorgu_cache.
+    """
+    with db_connection() as conn:
+        row = conn.execute(
+            f"SELECT version_id, {payload_sql('h')}, timestamp FROM borclu_sorgu_history h "
+            f"WHERE borclu_id = ? AND type_id = {TYPE_ID_SQL} AND timestamp <= ? "
+            "ORDER BY timestamp DESC, version_id DESC LIMIT 1",
+            (borclu_id, sorgu_type_key(sorgu_tipi), as_of)
+        ).fetchone()
+    return (row[0], row[1], row[2]) if row else None
+
+# JSON paths accepted for batch field projection: $, .key, ."quoted key", [index]
+JSON_PATH_PATTERN = re.compile(r'^\$(\.("[^"]*"|[^.\[\]"]+)|\[\d+\])*$')
+
+def get_borclu_sorgular_batch(borclu_ids, sorgu_tipleri=None, fields=None):
+    """
+    Get sorgu results for several borclular and query types with a single query.
+
+    Args:
+        borclu_ids (list): Debtor ids
+        sorgu_tipleri (list): Query types to return (all types when None)
+        fields (dict): Optional {sorgu_tipi: [json_path, ...]} projections. For
+            those types only the listed paths are extracted (inside SQLite) and
+            returned as {json_path: value}; other types return the full payload.
+
+    Returns:
+        dict: {borclu_id: {sorgu_tipi: {"data": ..., "timestamp": ...}}}; debtors
+        and types without a stored result are left out. Types are named as
+        requested in sorgu_tipleri, else by their canonical name.
+    """
+    fields = fields or {}
+    where_params, params = [], []
+
+    # Projected types: build the result object in SQL so the full payload is never decoded here
+    data_sql = "sorgu_verisi"
+    if fields:
+        cases = []
+        for sorgu_tipi, paths in fields.items():
+            pairs = ", ".join("?, json(sorgu_verisi -> ?)" for _ in paths)
+            cases.append(f"WHEN {TYPE_ID_SQL} THEN json_object({pairs})")
+            params.append(sorgu_type_key(sorgu_tipi))
+            for path in paths:
+                params.extend([path, path])
+        data_sql = f"CASE type_id {' '.join(cases)} ELSE sorgu_verisi END"
+
+    where = f"s.borclu_id IN ({', '.join('?' for _ in borclu_ids)})"
+    where_params.extend(borclu_ids)
+    if sorgu_tipleri is not None:
+        where += f" AND s.type_id IN (SELECT type_id FROM sorgu_type_aliases WHERE alias_key IN ({', '.join('?' for _ in sorgu_tipleri)}))"
+        where_params.extend(sorgu_type_key(sorgu_tipi) for sorgu_tipi in sorgu_tipleri)
+
+    try:
+        # MATERIALIZED: each payload is decompressed once, not once per projected path
+        with db_connection() as conn:
+            rows = conn.execute(
+                f"WITH r AS MATERIALIZED (SELECT s.borclu_id, s.type_id, t.name AS sorgu_tipi, "
+                f"{payload_sql('s')} AS sorgu_verisi, s.timestamp "
+                f"FROM borclu_sorgular s JOIN sorgu_types t ON t.type_id = s.type_id WHERE {where}) "
+                f"SELECT borclu_id, sorgu_tipi, {data_sql} AS data, timestamp FROM r",
+                (*where_params, *params)
+            ).fetchall()
+
+        # Requested spelling of each type, by alias key (an unregistered type's aliases share no canonical name)
+        requested = {sorgu_type_key(sorgu_tipi): sorgu_tipi for sorgu_tipi in sorgu_tipleri or []}
+        results = {}
+        for row in rows:
+            name = requested.get(sorgu_type_key(row['sorgu_tipi']), row['sorgu_tipi'])
+            results.setdefault(row['borclu_id'], {})[name] = {
+                "data": json.loads(row['data']),
+                "timestamp": row['timestamp']
+            }
+        return results
+    except Exception as e:
+        print(f"Error getting sorgu batch for borclular {borclu_ids}: {e}")
+        raise
+
 def get_file_dict(file_row):
     """Convert a file row to a dictionary with column names"""
     if file_row:
@@ -0,0 +1,462 @@
+import os
+import threading
+import logging
+
+from services import database_connection
+from services.database_connection import connect
+from services.search_index import create_search_index, rebuild_search_index, sorgu_search_triggers
+from services.asset_index import create_asset_index, asset_triggers
+from services.sorgu_payloads import SORGU_PAYLOADS_DDL, payload_sql, store_payload
+from services.sorgu_types import seed_sorgu_types, sorgu_type_id
+from services.borclu_lookup import borclu_ad_key
+
+# Versioned schema for files.db.
+#
+# PRAGMA user_version records the number of migrations applied. Each migration
+# runs in its own BEGIN IMMEDIATE transaction together with the user_version
+# bump, so a failed migration leaves the database at the previous version and
+# concurrent processes never apply the same migration twice. New indexes,
+# tables and columns go here as a new migration appended to MIGRATIONS; never
+# edit one that has shipped.
+#
+# The first migrations use IF NOT EXISTS because databases created before
+# versioning (user_version 0) already contain some or all of their objects.
+
+def get_logger():
+    """Get logger for schema migrations"""
+    logger = logging.getLogger('database_schema')
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+def _create_base_tables(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS files (
+        file_id TEXT PRIMARY KEY,
+        klasor TEXT,
+        dosyaNo TEXT,
+        eYil INTEGER,
+        eNo INTEGER,
+        borcluAdi TEXT,
+        alacakliAdi TEXT,
+        foyTuru TEXT,
+        durum TEXT,
+        takipTarihi TEXT,
+        icraMudurlugu TEXT
+    );
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS file_details (
+        file_id TEXT PRIMARY KEY,
+        takipSekli TEXT,
+        takipYolu TEXT,
+        takipTuru TEXT,
+        alacakliVekili TEXT,
+        borcMiktari TEXT,
+        faizOrani TEXT,
+        guncelBorc TEXT,
+        sonOdeme TEXT,
+        FOREIGN KEY (file_id) REFERENCES files(file_id)
+    );
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS borclular (
+        borclu_id TEXT PRIMARY KEY,
+        file_id TEXT,
+        ad TEXT,
+        tcKimlik TEXT,
+        telefon TEXT,
+        adres TEXT,
+        vekil TEXT,
+        FOREIGN KEY (file_id) REFERENCES files(file_id)
+    );
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS borclu_sorgular (
+        borclu_id TEXT,
+        sorgu_tipi TEXT,
+        sorgu_verisi TEXT,
+        timestamp TEXT,
+        PRIMARY KEY (borclu_id, sorgu_tipi),
+        FOREIGN KEY (borclu_id) REFERENCES borclular(borclu_id)
+    );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_files_dosyaNo_icraMudurlugu ON files(dosyaNo, icraMudurlugu);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_borclular_file_id ON borclular(file_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_borclu_sorgular_borclu_id ON borclu_sorgular(borclu_id);")
+
+def _create_list_indexes(cur):
+    # Covering index for ETag lookups: the timestamp is read without touching sorgu_verisi
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_borclu_sorgular_timestamp ON borclu_sorgular(borclu_id, sorgu_tipi, timestamp);")
+
+    # List filter/sort indexes: (expression, file_id), matching LIST_FILTER_COLUMNS/LIST_SORT_KEYS in database_reader
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_files_durum ON files(IFNULL(durum, ''), file_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_files_icraMudurlugu ON files(IFNULL(icraMudurlugu, ''), file_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_files_foyTuru ON files(IFNULL(foyTuru, ''), file_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_files_eYil ON files(IFNULL(eYil, 0), file_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_files_alacakliAdi ON files(IFNULL(alacakliAdi, ''), file_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_files_takipTarihi ON files(IFNULL(substr(takipTarihi, 7, 4) || '-' || substr(takipTarihi, 4, 2) || '-' || substr(takipTarihi, 1, 2) || substr(takipTarihi, 11), ''), file_id);")
+
+# Tables whose writes bump the data_version counter (used for list ETags)
+DATA_VERSION_TABLES = ['files', 'file_details', 'borclular', 'borclu_sorgular']
+
+def _create_counter_triggers(cur):
+    """
+    Create the db_counters table and the triggers that maintain it.
+
+    - files: number of rows in files
+    - data_version: bumped by every insert/update/delete on DATA_VERSION_TABLES
+
+    Counters are seeded only when they do not exist yet, in the same
+    transaction that creates the triggers, so they never drift.
+    """
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS db_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    );
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_files_count_insert AFTER INSERT ON files
+    BEGIN
+        UPDATE db_counters SET value = value + 1 WHERE name = 'files';
+    END;
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_files_count_delete AFTER DELETE ON files
+    BEGIN
+        UPDATE db_counters SET value = value - 1 WHERE name = 'files';
+    END;
+    """)
+    if cur.execute("SELECT 1 FROM db_counters WHERE name = 'files'").fetchone() is None:
+        cur.execute("INSERT INTO db_counters (name, value) SELECT 'files', COUNT(*) FROM files")
+
+    for table in DATA_VERSION_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_data_version_{event.lower()} AFTER {event} ON {table}
+            BEGIN
+                UPDATE db_counters SET value = value + 1 WHERE name = 'data_version';
+            END;
+            """)
+    cur.execute("INSERT OR IGNORE INTO db_counters (name, value) VALUES ('data_version', 0)")
+
+def _add_borclu_ad_key(cur):
+    """
+    Add borclular.ad_key, the normalized debtor name scraper results are matched
+    on (see borclu_lookup), backfill it and index it per file.
+    """
+    cur.execute("ALTER TABLE borclular ADD COLUMN ad_key TEXT;")
+    rows = cur.execute("SELECT borclu_id, ad FROM borclular WHERE ad IS NOT NULL").fetchall()
+    cur.executemany("UPDATE borclular SET ad_key = ? WHERE borclu_id = ?",
+                    [(borclu_ad_key(ad), borclu_id) for borclu_id, ad in rows])
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_borclular_file_id_ad_key ON borclular(file_id, ad_key);")
+
+def _create_file_id_sequence(cur):
+    """
+    Create the file_id sequence: db_counters 'last_file_id' is the highest
+    numeric file_id handed out or inserted.
+
+    New ids are taken with allocate_file_id inside the inserting transaction.
+    Rows inserted with an explicit file_id (build_database, save_file_data_to_db)
+    move the sequence past their id through the trigger.
+    """
+    cur.execute("""
+    INSERT OR IGNORE INTO db_counters (name, value)
+    SELECT 'last_file_id', IFNULL(MAX(CAST(file_id AS INTEGER)), 0) FROM files
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_files_file_id_sequence AFTER INSERT ON files
+    WHEN CAST(NEW.file_id AS INTEGER) > (SELECT value FROM db_counters WHERE name = 'last_file_id')
+    BEGIN
+        UPDATE db_counters SET value = CAST(NEW.file_id AS INTEGER) WHERE name = 'last_file_id';
+    END;
+    """)
+
+def _create_sorgu_history(cur):
+    """
+    Create borclu_sorgu_history, the append-only log of every stored query result.
+
+    borclu_sorgular keeps only the latest result per (borclu_id, sorgu_tipi);
+    the triggers copy each written version here in the same transaction. A
+    version already logged with the same timestamp (e.g. a re-import) is not
+    logged twice. Existing results are seeded as the first version.
+    """
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS borclu_sorgu_history (
+        version_id INTEGER PRIMARY KEY,
+        borclu_id TEXT NOT NULL,
+        sorgu_tipi TEXT NOT NULL,
+        sorgu_verisi TEXT,
+        timestamp TEXT
+    );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_borclu_sorgu_history ON borclu_sorgu_history(borclu_id, sorgu_tipi, timestamp);")
+    log_new = """
+        INSERT INTO borclu_sorgu_history (borclu_id, sorgu_tipi, sorgu_verisi, timestamp)
+        SELECT NEW.borclu_id, NEW.sorgu_tipi, NEW.sorgu_verisi, NEW.timestamp
+        WHERE NOT EXISTS (
+            SELECT 1 FROM borclu_sorgu_history
+            WHERE borclu_id = NEW.borclu_id AND sorgu_tipi = NEW.sorgu_tipi AND timestamp IS NEW.timestamp
+        );"""
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_borclu_sorgular_history_insert AFTER INSERT ON borclu_sorgular
+    BEGIN{log_new}
+    END;
+    """)
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_borclu_sorgular_history_update AFTER UPDATE OF sorgu_verisi, timestamp ON borclu_sorgular
+    BEGIN{log_new}
+    END;
+    """)
+    cur.execute("""
+    INSERT INTO borclu_sorgu_history (borclu_id, sorgu_tipi, sorgu_verisi, timestamp)
+    SELECT borclu_id, sorgu_tipi, sorgu_verisi, timestamp FROM borclu_sorgular ORDER BY timestamp
+    """)
+
+# Rows moved to sorgu_payloads per batch by migration 9
+PAYLOAD_BACKFILL_BATCH = 500
+
+def _store_sorgu_payloads(cur):
+    """
+    Move sorgu payloads into sorgu_payloads (see services/sorgu_payloads.py).
+
+    borclu_sorgular and borclu_sorgu_history get a payload_hash column and
+    their sorgu_verisi is moved into the content-addressed table. The history,
+    asset and search triggers are recreated to read the payload through
+    payload_sql(); they are dropped during the move, so the projections and
+    the search index (built from the same payloads) are left as they are.
+    """
+    cur.execute(SORGU_PAYLOADS_DDL)
+    for table in ('borclu_sorgular', 'borclu_sorgu_history'):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN payload_hash TEXT;")
+
+    triggers = cur.execute("""
+    SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'borclu_sorgular'
+    AND (name LIKE 'trg_assets_%' OR name LIKE 'trg_search_sorgu_%' OR name LIKE 'trg_borclu_sorgular_history_%')
+    """).fetchall()
+    for (name,) in triggers:
+        cur.execute(f"DROP TRIGGER {name}")
+
+    for table in ('borclu_sorgular', 'borclu_sorgu_history'):
+        last_rowid = 0
+        while True:
+            rows = cur.execute(
+                f"SELECT rowid, sorgu_verisi FROM {table} WHERE rowid > ? AND sorgu_verisi IS NOT NULL "
+                "ORDER BY rowid LIMIT ?", (last_rowid, PAYLOAD_BACKFILL_BATCH)
+            ).fetchall()
+            if not rows:
+                break
+            cur.executemany(f"UPDATE {table} SET payload_hash = ?, sorgu_verisi = NULL WHERE rowid = ?",
+                            [(store_payload(cur, text), rowid) for rowid, text in rows])
+            last_rowid = rows[-1][0]
+
+    log_new = """
+        INSERT INTO borclu_sorgu_history (borclu_id, sorgu_tipi, sorgu_verisi, payload_hash, timestamp)
+        SELECT NEW.borclu_id, NEW.sorgu_tipi, NEW.sorgu_verisi, NEW.payload_hash, NEW.timestamp
+        WHERE NOT EXISTS (
+            SELECT 1 FROM borclu_sorgu_history
+            WHERE borclu_id = NEW.borclu_id AND sorgu_tipi = NEW.sorgu_tipi AND timestamp IS NEW.timestamp
+        );"""
+    cur.execute(f"""
+    CREATE TRIGGER trg_borclu_sorgular_history_insert AFTER INSERT ON borclu_sorgular
+    BEGIN{log_new}
+    END;
+    """)
+    cur.execute(f"""
+    CREATE TRIGGER trg_borclu_sorgular_history_update AFTER UPDATE OF sorgu_verisi, payload_hash, timestamp ON borclu_sorgular
+    BEGIN{log_new}
+    END;
+    """)
+    for statement in (*asset_triggers(payload_sql('NEW'), column='sorgu_tipi'),
+                      *sorgu_search_triggers(payload_sql('NEW'), column='sorgu_tipi')):
+        cur.execute(statement)
+
+# borclu_sorgular and borclu_sorgu_history keyed on the sorgu_types registry (migration 10).
+# WITHOUT ROWID makes the (borclu_id, type_id) primary key the table itself: the
+# lookup reads timestamp and payload_hash from the key's b-tree leaf, so the key
+# is the covering index. sorgu_verisi (only set on rows written by hand) comes
+# last so reading the other columns never walks its overflow pages.
+SORGU_TABLES_DDL = {
+    'borclu_sorgular': """
+    CREATE TABLE {schema}.{table} (
+        borclu_id TEXT NOT NULL,
+        type_id INTEGER NOT NULL,
+        timestamp TEXT,
+        payload_hash TEXT,
+        sorgu_verisi TEXT,
+        PRIMARY KEY (borclu_id, type_id),
+        FOREIGN KEY (borclu_id) REFERENCES borclular(borclu_id)
+    ) WITHOUT ROWID;
+    """,
+    'borclu_sorgu_history': """
+    CREATE TABLE {schema}.{table} (
+        version_id INTEGER PRIMARY KEY,
+        borclu_id TEXT NOT NULL,
+        type_id INTEGER NOT NULL,
+        timestamp TEXT,
+        payload_hash TEXT,
+        sorgu_verisi TEXT
+    );
+    """,
+}
+
+def rekey_sorgu_tables(cur, schema='main', registry='main'):
+    """
+    Rebuild borclu_sorgular and borclu_sorgu_history of schema keyed on type_id.
+
+    Every stored sorgu_tipi is resolved (or registered) in the registry of the
+    registry schema. Where two spellings of one type were stored for a debtor
+    the latest result is kept; history keeps every version. Triggers of the old
+    tables are dropped with them; the caller recreates what the schema needs.
+    """
+    names = [row[0] for row in cur.execute(
+        f"SELECT sorgu_tipi FROM {schema}.borclu_sorgular WHERE sorgu_tipi IS NOT NULL "
+        f"UNION SELECT sorgu_tipi FROM {schema}.borclu_sorgu_history"
+    ).fetchall()]
+    cur.execute("CREATE TEMP TABLE sorgu_tipi_ids (sorgu_tipi TEXT PRIMARY KEY, type_id INTEGER NOT NULL)")
+    cur.executemany("INSERT INTO sorgu_tipi_ids (sorgu_tipi, type_id) VALUES (?, ?)",
+                    [(name, sorgu_type_id(cur, name, registry)) for name in names])
+
+    columns = "borclu_id, type_id, timestamp, payload_hash, sorgu_verisi"
+    for table, ddl in SORGU_TABLES_DDL.items():
+        cur.execute(ddl.format(schema=schema, table=f"{table}_new"))
+    # Oldest first: a later spelling of the same type replaces the earlier one
+    cur.execute(f"""
+    INSERT OR REPLACE INTO {schema}.borclu_sorgular_new ({columns})
+    SELECT s.borclu_id, t.type_id, s.timestamp, s.payload_hash, s.sorgu_verisi
+    FROM {schema}.borclu_sorgular s JOIN sorgu_tipi_ids t ON t.sorgu_tipi = s.sorgu_tipi
+    WHERE s.borclu_id IS NOT NULL
+    ORDER BY s.timestamp
+    """)
+    cur.execute(f"""
+    INSERT INTO {schema}.borclu_sorgu_history_new (version_id, {columns})
+    SELECT h.version_id, h.borclu_id, t.type_id, h.timestamp, h.payload_hash, h.sorgu_verisi
+    FROM {schema}.borclu_sorgu_history h JOIN sorgu_tipi_ids t ON t.sorgu_tipi = h.sorgu_tipi
+    ORDER BY h.version_id
+    """)
+    for table in SORGU_TABLES_DDL:
+        cur.execute(f"DROP TABLE {schema}.{table}")
+        cur.execute(f"ALTER TABLE {schema}.{table}_new RENAME TO {table}")
+    cur.execute(f"CREATE INDEX {schema}.idx_borclu_sorgu_history ON borclu_sorgu_history(borclu_id, type_id, timestamp);")
+    cur.execute("DROP TABLE temp.sorgu_tipi_ids")
+
+def _create_sorgu_history_triggers(cur):
+    """Create the triggers that log every written borclu_sorgular version into borclu_sorgu_history"""
+    log_new = """
+        INSERT INTO borclu_sorgu_history (borclu_id, type_id, timestamp, payload_hash, sorgu_verisi)
+        SELECT NEW.borclu_id, NEW.type_id, NEW.timestamp, NEW.payload_hash, NEW.sorgu_verisi
+        WHERE NOT EXISTS (
+            SELECT 1 FROM borclu_sorgu_history
+            WHERE borclu_id = NEW.borclu_id AND type_id = NEW.type_id AND timestamp IS NEW.timestamp
+        );"""
+    cur.execute(f"""
+    CREATE TRIGGER trg_borclu_sorgular_history_insert AFTER INSERT ON borclu_sorgular
+    BEGIN{log_new}
+    END;
+    """)
+    cur.execute(f"""
+    CREATE TRIGGER trg_borclu_sorgular_history_update AFTER UPDATE OF sorgu_verisi, payload_hash, timestamp ON borclu_sorgular
+    BEGIN{log_new}
+    END;
+    """)
+
+def _key_sorgular_by_type_id(cur):
+    """
+    Create the sorgu_types registry (see services/sorgu_types.py) and key the
+    sorgu tables on type_id instead of the sorgu_tipi text.
+
+    Rows stored under different spellings of one type ('TAKBİS' / 'TAKBIS')
+    are merged. The triggers of borclu_sorgular (data_version, history, asset
+    and search) are recreated over type_id, and the search index is rebuilt:
+    its documents are named by the canonical type names now. Re-indexing fires
+    the update triggers of every row, which re-projects the asset tables too.
+    """
+    seed_sorgu_types(cur)
+    rekey_sorgu_tables(cur)
+    _create_counter_triggers(cur)
+    _create_sorgu_history_triggers(cur)
+    for statement in (*asset_triggers(payload_sql('NEW')), *sorgu_search_triggers(payload_sql('NEW'))):
+        cur.execute(statement)
+    rebuild_search_index(cur)
+
+def allocate_file_id(conn):
+    """Take the next file_id from the sequence; call inside the transaction that inserts it"""
+    return str(conn.execute(
+        "UPDATE db_counters SET value = value + 1 WHERE name = 'last_file_id' RETURNING value"
+    ).fetchone()[0])
+
+# (description, function(cursor)); migration N is MIGRATIONS[N - 1]
+MIGRATIONS = [
+    ("base tables and lookup indexes", _create_base_tables),
+    ("list filter/sort indexes and sorgu timestamp covering index", _create_list_indexes),
+    ("row counters and data_version triggers", _create_counter_triggers),
+    ("full-text search index", create_search_index),
+    ("normalized debtor name key", _add_borclu_ad_key),
+    ("file_id sequence", _create_file_id_sequence),
+    ("append-only sorgu history", _create_sorgu_history),
+    ("typed asset tables projected from EGM/TAKBIS/Banka results", create_asset_index),
+    ("content-addressed, compressed sorgu payloads", _store_sorgu_payloads),
+    ("sorgu type registry; sorgu tables keyed on type_id", _key_sorgular_by_type_id),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_schema_version(conn):
+    """Return the number of migrations applied to the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    """
+    Apply every pending migration on conn, one transaction per migration.
+
+    Returns the list of migration versions applied (empty if the schema was
+    already current). A failing migration is rolled back and re-raised.
+    """
+    logger = get_logger()
+    applied = []
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return applied
+
+    for version, (description, apply) in enumerate(MIGRATIONS, 1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock: another process may have migrated meanwhile
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            apply(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        applied.append(version)
+        logger.info(f"Applied schema migration {version}: {description}")
+    return applied
+
+_migrated_paths = set()
+_migrate_lock = threading.Lock()
+
+def ensure_schema(db_path=None):
+    """
+    Bring the database at db_path (default: the pool's DB_PATH) up to date, once per process.
+
+    Uses its own short-lived connection, so it can run before the pool exists.
+    """
+    path = os.path.abspath(db_path or database_connection.DB_PATH)
+    if path in _migrated_paths:
+        return
+    with _migrate_lock:
+        if path in _migrated_paths:
+            return
+        conn = connect(path, isolation_level=None)
+        try:
+            migrate(conn)
+        finally:
+            conn.close()
+        _migrated_paths.add(path)
@@ -1,11 +1,17 @@
-import sqlite3
 import json
 import os
 import logging
 from pathlib import Path
+from contextlib import contextmanager
 
-# Database path
-DB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'files.db')
+from services import database_connection
+from services.database_connection import connect, db_transaction
+from services.database_schema import allocate_file_id, ensure_schema
+from services.sorgu_cache import sorgu_cache
+from services.borclu_lookup import BorcluResolver, borclu_ad_key, current_borclu_resolver
+from services.sorgu_payloads import store_payload
+from services.sorgu_types import canonical_sorgu_tipi, sorgu_type_id, sorgu_type_key
+from services import scrape_journal
 
 def get_logger():
     """Get logger for database operations"""
@@ -19,95 +25,32 @@ def get_logger():
     return logger
 
 def create_database_if_not_exists():
-    """Create database and tables if they don't exist"""
+    """
+    Create the database or bring its schema up to date.
+
+    The schema lives in database_schema and is migrated once per process (the
+    connection pool does this on creation), so writers no longer call this.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        
-        # Create files table
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS files (
-            file_id TEXT PRIMARY KEY,
-            klasor TEXT,
-            dosyaNo TEXT,
-            eYil INTEGER,
-            eNo INTEGER,
-            borcluAdi TEXT,
-            alacakliAdi TEXT,
-            foyTuru TEXT,
-            durum TEXT,
-            takipTarihi TEXT,
-            icraMudurlugu TEXT
-        );
-        """)
-        
-        # Create file_details table
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS file_details (
-            file_id TEXT PRIMARY KEY,
-            takipSekli TEXT,
-            takipYolu TEXT,
-            takipTuru TEXT,
-            alacakliVekili TEXT,
-            borcMiktari TEXT,
-            faizOrani TEXT,
-            guncelBorc TEXT,
-            sonOdeme TEXT,
-            FOREIGN KEY (file_id) REFERENCES files(file_id)
-        );
-        """)
+        ensure_schema()
         
-        # Create borclular table
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS borclular (
-            borclu_id TEXT PRIMARY KEY,
-            file_id TEXT,
-            ad TEXT,
-            tcKimlik TEXT,
-            telefon TEXT,
-            adres TEXT,
-            vekil TEXT,
-            FOREIGN KEY (file_id) REFERENCES files(file_id)
-        );
-        """)
-        
-        # Create borclu_sorgular table with timestamp column
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS borclu_sorgular (
-            borclu_id TEXT,
-            sorgu_tipi TEXT,
-            sorgu_verisi TEXT,
-            timestamp TEXT,
-            PRIMARY KEY (borclu_id, sorgu_tipi),
-            FOREIGN KEY (borclu_id) REFERENCES borclular(borclu_id)
-        );
-        """)
-        
-        # Create indexes
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_files_dosyaNo_icraMudurlugu ON files(dosyaNo, icraMudurlugu);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_borclular_file_id ON borclular(file_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_borclu_sorgular_borclu_id ON borclu_sorgular(borclu_id);")
-        
-        conn.commit()
-        conn.close()
         logger = get_logger()
-        logger.info(f"Database and tables created/verified at: {DB_PATH}")
+        logger.info(f"Database and tables created/verified at: {database_connection.DB_PATH}")
         
     except Exception as e:
         logger = get_logger()
         logger.error(f"Error creating database: {e}")
-        if conn:
-            conn.close()
 
 def get_database_connection():
-    """Get database connection"""
+    """
+    Get a standalone database connection (not pooled, caller must close it).
+    Writers in this module use the shared pool via db_transaction() instead.
+    """
     try:
-        # Ensure database exists before connecting
-        create_database_if_not_exists()
+        # The pool migrates on creation; this connection bypasses it
+        ensure_schema()
         
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # Enable row factory for easier access
-        return conn
+        return connect()
     except Exception as e:
         logger = get_logger()
         logger.error(f"Database connection error: {e}")
@@ -129,70 +72,56 @@ def save_scraping_result_to_db(dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi):
     logger = get_logger()
     
     try:
-        conn = get_database_connection()
-        if not conn:
-            logger.error("Failed to get database connection")
-            return False
-        
-        # Find borclu_id based on dosya_no and borclu_adi
-        cursor = conn.cursor()
-        
-        # First, find the file_id from dosya_no
-        cursor.execute("""
-            SELECT file_id FROM files WHERE dosyaNo = ?
-        """, (dosya_no,))
-        
-        file_result = cursor.fetchone()
-        if not file_result:
-            logger.warning(f"File not found for dosya_no: {dosya_no}")
-            conn.close()
-            return False
-        
-        file_id = file_result['file_id']
-        
-        # Extract just the name part before the TC number (before the "-" character)
-        borclu_name_only = borclu_adi.split(' - ')[0] if ' - ' in borclu_adi else borclu_adi
-        
-        # Then, find the borclu_id from file_id and borclu_adi
-        cursor.execute("""
-            SELECT borclu_id FROM borclular 
-            WHERE file_id = ? AND ad LIKE ?
-        """, (file_id, f"%{borclu_name_only}%"))
+        with db_transaction() as conn:
+            borclu_id = _write_scraping_result(conn, dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi)
         
-        borclu_result = cursor.fetchone()
-        if not borclu_result:
-            logger.warning(f"Debtor not found for file_id: {file_id}, borclu_adi: {borclu_adi}")
-            conn.close()
+        if borclu_id is None:
             return False
-        
-        borclu_id = borclu_result['borclu_id']
-        
-        # Convert sorgu_verisi to JSON string
-        sorgu_verisi_json = json.dumps(sorgu_verisi, ensure_ascii=False)
-        
-        # Get current timestamp
-        from datetime import datetime
-        current_timestamp = datetime.now().isoformat()
-        
-        # Insert or update the query result
-        cursor.execute("""
-            INSERT OR REPLACE INTO borclu_sorgular 
-            (borclu_id, sorgu_tipi, sorgu_verisi, timestamp) 
-            VALUES (?, ?, ?, ?)
-        """, (borclu_id, sorgu_tipi, sorgu_verisi_json, current_timestamp))
-        
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"Successfully saved {sorgu_tipi} query result for borclu_id: {borclu_id} at {current_timestamp}")
+        sorgu_cache.invalidate(borclu_id, sorgu_type_key(sorgu_tipi))
         return True
         
     except Exception as e:
         logger.error(f"Error saving scraping result to database: {e}")
-        if conn:
-            conn.close()
         return False
 
+def _write_scraping_result(conn, dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi, resolver=None, timestamp=None):
+    """Write one query result on the given connection; returns the borclu_id, or None if the debtor is unknown"""
+    logger = get_logger()
+    cursor = conn.cursor()
+    
+    # Find file_id and borclu_id from dosya_no and the "NAME - TC" dropdown text
+    file_id, borclu_id = (resolver or BorcluResolver()).resolve(conn, dosya_no, borclu_adi)
+    if file_id is None:
+        logger.warning(f"File not found for dosya_no: {dosya_no}")
+        return None
+    if borclu_id is None:
+        logger.warning(f"Debtor not found for file_id: {file_id}, borclu_adi: {borclu_adi}")
+        return None
+    
+    # Convert sorgu_verisi to JSON string, stored once per distinct payload
+    sorgu_verisi_json = json.dumps(sorgu_verisi, ensure_ascii=False)
+    payload_hash = store_payload(conn, sorgu_verisi_json)
+    
+    # Get current timestamp (replays keep the time the result was scraped)
+    from datetime import datetime
+    current_timestamp = timestamp or datetime.now().isoformat()
+    
+    # Insert or update the query result under its registry type_id; an unchanged payload is not written at all
+    cursor.execute("""
+        INSERT INTO borclu_sorgular 
+        (borclu_id, type_id, payload_hash, timestamp) 
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(borclu_id, type_id) DO UPDATE SET
+            sorgu_verisi = NULL, payload_hash = excluded.payload_hash, timestamp = excluded.timestamp
+        WHERE payload_hash IS NOT excluded.payload_hash
+    """, (borclu_id, sorgu_type_id(conn, sorgu_tipi), payload_hash, current_timestamp))
+    
+    if cursor.rowcount == 0:
+        logger.info(f"{sorgu_tipi} query result for borclu_id: {borclu_id} is unchanged, not written")
+    else:
+        logger.info(f"Successfully saved {sorgu_tipi} query result for borclu_id: {borclu_id} at {current_timestamp}")
+    return borclu_id
+
 def save_scraping_data_to_db_and_json(scraping_data, filename=None):
     """
     Save scraping data to both database and JSON file (backup)
@@ -220,41 +149,11 @@ def save_scraping_data_to_db_and_json(scraping_data, filename=None):
     except Exception as e:
         logger.error(f"Failed to save data to JSON: {e}")
     
-    # Save to database
+    # Save to database, through the configured storage backend
     try:
-        # Handle different data structures
-        if isinstance(scraping_data, list):
-            # New structure from search_all_files_extract.py (array of file objects)
-            for file_data in scraping_data:
-                dosya_no = file_data.get('dosyaNo', '')
-                borclu_adi = file_data.get('borcluAdi', '')
-                
-                # Save file data to files table
-                save_file_data_to_db(file_data)
-                
-                # Save debtor data to borclular table
-                for borclu in file_data.get('borcluList', []):
-                    save_borclu_data_to_db(borclu, file_data['file_id'])
-                
-                # Save query results if any
-                if 'sorgular' in file_data:
-                    for sorgu_tipi, sorgu_verisi in file_data['sorgular'].items():
-                        success = save_scraping_result_to_db(dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi)
-                        if not success:
-                            logger.warning(f"Failed to save {sorgu_tipi} for {borclu_adi} in {dosya_no}")
-        
-        elif isinstance(scraping_data, dict):
-            # Old structure (nested dictionary)
-            for dosya_no, borclular in scraping_data.items():
-                for borclu_adi, sorgular in borclular.items():
-                    for sorgu_tipi, sorgu_verisi in sorgular.items():
-                        success = save_scraping_result_to_db(dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi)
-                        if not success:
-                            logger.warning(f"Failed to save {sorgu_tipi} for {borclu_adi} in {dosya_no}")
-                        
-                        # MERNİS verilerinden T.C Kimlik No ve Adres bilgilerini otomatik kaydet
-                        if sorgu_tipi == "MERNİS" and isinstance(sorgu_verisi, dict) and "sonuc" in sorgu_verisi:
-                            process_mernis_data_for_borclu(dosya_no, borclu_adi, sorgu_verisi["sonuc"])
+        # Imported here: the storage backends import this module
+        from services.storage import get_storage
+        get_storage().write_scraping_batch([(scraping_data, None)])
         
         logger.info("Data saved to database successfully")
         return True
@@ -263,6 +162,109 @@ def save_scraping_data_to_db_and_json(scraping_data, filename=None):
         logger.error(f"Error saving data to database: {e}")
         return False
 
+@contextmanager
+def _savepoint(conn):
+    """Run part of a transaction that is rolled back on its own if it fails"""
+    conn.execute("SAVEPOINT write_item")
+    try:
+        yield
+    except Exception:
+        conn.execute("ROLLBACK TO write_item")
+        conn.execute("RELEASE write_item")
+        raise
+    conn.execute("RELEASE write_item")
+
+def write_scraping_data(conn, scraping_data, resolver=None, timestamp=None):
+    """
+    Write scraping data (see save_scraping_data_to_db_and_json) inside the caller's transaction.
+    
+    Every file and query result is written in its own savepoint, so a failing
+    item is logged and skipped without losing the others. Debtors are looked up
+    through resolver (default: the current sorgulama run's, see borclu_lookup).
+    Query results are stamped with timestamp (default: now).
+    
+    Returns:
+        list: (borclu_id, sorgu_tipi or None) pairs to drop from sorgu_cache after commit
+    """
+    logger = get_logger()
+    invalidations = []
+    resolver = resolver or current_borclu_resolver() or BorcluResolver()
+    
+    def write_result(dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi):
+        try:
+            with _savepoint(conn):
+                borclu_id = _write_scraping_result(conn, dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi, resolver, timestamp)
+        except Exception as e:
+            logger.error(f"Error saving scraping result to database: {e}")
+            borclu_id = None
+        if borclu_id is None:
+            logger.warning(f"Failed to save {sorgu_tipi} for {borclu_adi} in {dosya_no}")
+        else:
+            invalidations.append((borclu_id, sorgu_tipi))
+    
+    for item in iter_scraping_items(scraping_data):
+        if item[0] == 'file':
+            file_data = item[1]
+            # Save file data to files table and debtor data to borclular table
+            try:
+                with _savepoint(conn):
+                    _write_file_data(conn, file_data)
+                    for borclu in file_data.get('borcluList', []):
+                        _write_borclu_data(conn, borclu, file_data['file_id'])
+            except Exception as e:
+                logger.error(f"Error saving file data to database: {e}")
+        elif item[0] == 'sorgu':
+            write_result(*item[1:])
+        else:
+            # MERNİS verilerinden T.C Kimlik No ve Adres bilgilerini otomatik kaydet
+            _, dosya_no, borclu_adi, mernis_sonuc = item
+            try:
+                with _savepoint(conn):
+                    updated = _write_mernis_data(conn, dosya_no, borclu_adi, mernis_sonuc, resolver)
+                invalidations.extend((borclu_id, None) for borclu_id in updated)
+            except Exception as e:
+                logger.error(f"Error updating borclu data: {e}")
+    
+    return invalidations
+
+def iter_scraping_items(scraping_data):
+    """
+    Flatten scraping data (see save_scraping_data_to_db_and_json) into write items, in write order:
+
+        ('file', file_data)                                      files/file_details row and its borcluList
+        ('sorgu', dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi) one query result
+        ('mernis', dosya_no, borclu_adi, mernis_sonuc)           debtor fields from a MERNİS result
+
+    sorgu_tipi is the canonical name (see sorgu_types), whatever spelling the scraper used.
+    """
+    # Handle different data structures
+    if isinstance(scraping_data, list):
+        # New structure from search_all_files_extract.py (array of file objects)
+        for file_data in scraping_data:
+            dosya_no = file_data.get('dosyaNo', '')
+            borclu_adi = file_data.get('borcluAdi', '')
+            yield ('file', file_data)
+            
+            # Save query results if any
+            if 'sorgular' in file_data:
+                for sorgu_tipi, sorgu_verisi in file_data['sorgular'].items():
+                    yield ('sorgu', dosya_no, borclu_adi, canonical_sorgu_tipi(sorgu_tipi), sorgu_verisi)
+    
+    elif isinstance(scraping_data, dict):
+        # Old structure (nested dictionary)
+        for dosya_no, borclular in scraping_data.items():
+            for borclu_adi, sorgular in borclular.items():
+                for sorgu_tipi, sorgu_verisi in sorgular.items():
+                    sorgu_tipi = canonical_sorgu_tipi(sorgu_tipi)
+                    yield ('sorgu', dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi)
+                    if sorgu_tipi == "MERNİS" and isinstance(sorgu_verisi, dict) and "sonuc" in sorgu_verisi:
+                        yield ('mernis', dosya_no, borclu_adi, sorgu_verisi["sonuc"])
+
+def invalidate_sorgu_cache(invalidations):
+    """Drop committed (borclu_id, sorgu_tipi or None) pairs from sorgu_cache"""
+    for borclu_id, sorgu_tipi in invalidations:
+        sorgu_cache.invalidate(borclu_id, sorgu_type_key(sorgu_tipi) if sorgu_tipi is not None else None)
+
 def save_file_data_to_db(file_data):
     """
     Save file data to the files and file_details tables
@@ -273,61 +275,55 @@ def save_file_data_to_db(file_data):
     logger = get_logger()
     
     try:
-        conn = get_database_connection()
-        if not conn:
-            logger.error("Failed to get database connection")
-            return False
-        
-        cursor = conn.cursor()
-        
-        # Insert or update file data in files table
-        cursor.execute("""
-            INSERT OR REPLACE INTO files 
-            (file_id, klasor, dosyaNo, eYil, eNo, borcluAdi, alacakliAdi, foyTuru, durum, 
-             takipTarihi, icraMudurlugu) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            file_data.get('file_id'),
-            file_data.get('klasor'),
-            file_data.get('dosyaNo'),
-            file_data.get('eYil'),
-            file_data.get('eNo'),
-            file_data.get('borcluAdi'),
-            file_data.get('alacakliAdi'),
-            file_data.get('foyTuru'),
-            file_data.get('durum'),
-            file_data.get('takipTarihi'),
-            file_data.get('icraMudurlugu')
-        ))
-        
-        # Insert or update file details in file_details table
-        cursor.execute("""
-            INSERT OR REPLACE INTO file_details 
-            (file_id, takipSekli, takipYolu, takipTuru, alacakliVekili, borcMiktari, faizOrani, guncelBorc) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            file_data.get('file_id'),
-            file_data.get('takipSekli'),
-            file_data.get('takipYolu'),
-            file_data.get('takipTuru'),
-            file_data.get('alacakliVekili'),
-            file_data.get('borcMiktari'),
-            file_data.get('faizOrani'),
-            file_data.get('guncelBorc')
-        ))
-        
-        conn.commit()
-        conn.close()
+        with db_transaction() as conn:
+            _write_file_data(conn, file_data)
         
         logger.info(f"Successfully saved file data for file_id: {file_data.get('file_id')}")
         return True
         
     except Exception as e:
         logger.error(f"Error saving file data to database: {e}")
-        if conn:
-            conn.close()
         return False
 
+def _write_file_data(conn, file_data):
+    """Write one file row and its file_details row on the given connection"""
+    cursor = conn.cursor()
+    # Insert or update file data in files table
+    cursor.execute("""
+        INSERT OR REPLACE INTO files 
+        (file_id, klasor, dosyaNo, eYil, eNo, borcluAdi, alacakliAdi, foyTuru, durum, 
+         takipTarihi, icraMudurlugu) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        file_data.get('file_id'),
+        file_data.get('klasor'),
+        file_data.get('dosyaNo'),
+        file_data.get('eYil'),
+        file_data.get('eNo'),
+        file_data.get('borcluAdi'),
+        file_data.get('alacakliAdi'),
+        file_data.get('foyTuru'),
+        file_data.get('durum'),
+        file_data.get('takipTarihi'),
+        file_data.get('icraMudurlugu')
+    ))
+    
+    # Insert or update file details in file_details table
+    cursor.execute("""
+        INSERT OR REPLACE INTO file_details 
+        (file_id, takipSekli, takipYolu, takipTuru, alacakliVekili, borcMiktari, faizOrani, guncelBorc) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        file_data.get('file_id'),
+        file_data.get('takipSekli'),
+        file_data.get('takipYolu'),
+        file_data.get('takipTuru'),
+        file_data.get('alacakliVekili'),
+        file_data.get('borcMiktari'),
+        file_data.get('faizOrani'),
+        file_data.get('guncelBorc')
+    ))
+
 def save_borclu_data_to_db(borclu_data, file_id):
     """
     Save debtor data to the borclular table
@@ -339,118 +335,120 @@ def save_borclu_data_to_db(borclu_data, file_id):
     logger = get_logger()
     
     try:
-        conn = get_database_connection()
-        if not conn:
-            logger.error("Failed to get database connection")
-            return False
-        
-        cursor = conn.cursor()
-        
-        # Insert or update debtor data
-        cursor.execute("""
-            INSERT OR REPLACE INTO borclular 
-            (borclu_id, file_id, ad, tcKimlik, telefon, adres, vekil) 
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            borclu_data.get('borclu_id'),
-            file_id,
-            borclu_data.get('ad'),
-            borclu_data.get('tcKimlik'),
-            borclu_data.get('telefon'),
-            borclu_data.get('adres'),
-            borclu_data.get('vekil')
-        ))
-        
-        conn.commit()
-        conn.close()
+        with db_transaction() as conn:
+            _write_borclu_data(conn, borclu_data, file_id)
         
         logger.info(f"Successfully saved debtor data for borclu_id: {borclu_data.get('borclu_id')}")
         return True
         
     except Exception as e:
         logger.error(f"Error saving debtor data to database: {e}")
-        if conn:
-            conn.close()
         return False
 
+def _write_borclu_data(conn, borclu_data, file_id):
+    """Write one debtor row on the given connection"""
+    # Insert or update debtor data
+    conn.execute("""
+        INSERT OR REPLACE INTO borclular 
+        (borclu_id, file_id, ad, ad_key, tcKimlik, telefon, adres, vekil) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        borclu_data.get('borclu_id'),
+        file_id,
+        borclu_data.get('ad'),
+        borclu_ad_key(borclu_data.get('ad')),
+        borclu_data.get('tcKimlik'),
+        borclu_data.get('telefon'),
+        borclu_data.get('adres'),
+        borclu_data.get('vekil')
+    ))
+
 def process_mernis_data_for_borclu(dosya_no, borclu_adi, mernis_sonuc):
     """MERNİS verilerinden TC Kimlik ve adres bilgilerini veritabanına kaydet"""
     logger = get_logger()
     
     try:
-        # TC Kimlik ve adres bilgilerini çıkar
-        tc_kimlik = mernis_sonuc.get("Kimlik Bilgileri", {}).get("T.C Kimlik No", "").strip()
-        adres_bilgileri = mernis_sonuc.get("Adres Bilgileri", {})
-        
-        # Adres parçalarını birleştir
-        adres_parcalari = []
-        if adres_bilgileri.get("Mahalle"): adres_parcalari.append(adres_bilgileri["Mahalle"])
-        if adres_bilgileri.get("Cadde/Sokak"): adres_parcalari.append(adres_bilgileri["Cadde/Sokak"])
-        
-        # Kapı numarası
-        dis_kapi = adres_bilgileri.get("Dış Kapı No", "")
-        ic_kapi = adres_bilgileri.get("İç Kapı No", "")
-        if dis_kapi and ic_kapi:
-            adres_parcalari.append(f"No: {ic_kapi}/{dis_kapi}")
-        elif dis_kapi:
-            adres_parcalari.append(f"No: {dis_kapi}")
-        elif ic_kapi:
-            adres_parcalari.append(f"No: {ic_kapi}")
-        
-        # İl/İlçe
-        ilce = adres_bilgileri.get("İlçe", "")
-        il = adres_bilgileri.get("İl", "")
-        if ilce and il:
-            adres_parcalari.append(f"{ilce}/{il}")
-        elif ilce:
-            adres_parcalari.append(ilce)
-        elif il:
-            adres_parcalari.append(il)
-        
-        adres_str = " ".join(adres_parcalari)
-        
-        # Veritabanını güncelle
-        if tc_kimlik or adres_str:
-            conn = get_database_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT file_id FROM files WHERE dosyaNo = ?", (dosya_no,))
-            file_id = cursor.fetchone()['file_id']
-            borclu_name_only = borclu_adi.split(' - ')[0] if ' - ' in borclu_adi else borclu_adi
-            
-            cursor.execute("UPDATE borclular SET tcKimlik = ?, adres = ? WHERE file_id = ? AND ad LIKE ?", 
-                         (tc_kimlik, adres_str, file_id, f"%{borclu_name_only}%"))
-            conn.commit()
-            conn.close()
-            logger.info(f"Updated borclu data for {borclu_adi}")
+        with db_transaction() as conn:
+            updated = _write_mernis_data(conn, dosya_no, borclu_adi, mernis_sonuc)
+        for borclu_id in updated:
+            sorgu_cache.invalidate(borclu_id)
             
     except Exception as e:
         logger.error(f"Error updating borclu data: {e}")
 
+def mernis_borclu_fields(mernis_sonuc):
+    """MERNİS sonucundan (tcKimlik, adres) çıkarır"""
+    # TC Kimlik ve adres bilgilerini çıkar
+    tc_kimlik = mernis_sonuc.get("Kimlik Bilgileri", {}).get("T.C Kimlik No", "").strip()
+    adres_bilgileri = mernis_sonuc.get("Adres Bilgileri", {})
+    
+    # Adres parçalarını birleştir
+    adres_parcalari = []
+    if adres_bilgileri.get("Mahalle"): adres_parcalari.append(adres_bilgileri["Mahalle"])
+    if adres_bilgileri.get("Cadde/Sokak"): adres_parcalari.append(adres_bilgileri["Cadde/Sokak"])
+    
+    # Kapı numarası
+    dis_kapi = adres_bilgileri.get("Dış Kapı No", "")
+    ic_kapi = adres_bilgileri.get("İç Kapı No", "")
+    if dis_kapi and ic_kapi:
+        adres_parcalari.append(f"No: {ic_kapi}/{dis_kapi}")
+    elif dis_kapi:
+        adres_parcalari.append(f"No: {dis_kapi}")
+    elif ic_kapi:
+        adres_parcalari.append(f"No: {ic_kapi}")
+    
+    # İl/İlçe
+    ilce = adres_bilgileri.get("İlçe", "")
+    il = adres_bilgileri.get("İl", "")
+    if ilce and il:
+        adres_parcalari.append(f"{ilce}/{il}")
+    elif ilce:
+        adres_parcalari.append(ilce)
+    elif il:
+        adres_parcalari.append(il)
+    
+    adres_str = " ".join(adres_parcalari)
+    return tc_kimlik, adres_str
+
+def _write_mernis_data(conn, dosya_no, borclu_adi, mernis_sonuc, resolver=None):
+    """MERNİS sonucunu verilen bağlantı üzerinde yazar; güncellenen borclu_id listesini döndürür"""
+    logger = get_logger()
+    
+    tc_kimlik, adres_str = mernis_borclu_fields(mernis_sonuc)
+    
+    # Veritabanını güncelle
+    if not (tc_kimlik or adres_str):
+        return []
+    _, borclu_id = (resolver or BorcluResolver()).resolve(conn, dosya_no, borclu_adi)
+    if borclu_id is None:
+        logger.warning(f"Debtor not found for MERNİS update: {borclu_adi} in {dosya_no}")
+        return []
+    
+    updated = conn.execute(
+        "UPDATE borclular SET tcKimlik = ?, adres = ? WHERE borclu_id = ? RETURNING borclu_id",
+        (tc_kimlik, adres_str, borclu_id)
+    ).fetchall()
+    logger.info(f"Updated borclu data for {borclu_adi}")
+    return [row['borclu_id'] for row in updated]
+
 def save_to_json_simple(data, filename=None):
     """
-    Simple JSON saving function without selenium dependencies
+    Back up data by appending it to the scrape journal (see services/scrape_journal.py)
     
     Args:
         data: Data to save
-        filename (str): JSON filename
+        filename (str): Legacy backup filename; its base name is recorded as the journal source
     """
-    if filename is None:
-        # Create default filename
-        from datetime import datetime
-        filename = f"/tmp/extracted_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    
-    # Save data to JSON file
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    scrape_journal.journal.append(data, scrape_journal.journal_source(filename))
 
 #This function is used to get or create file_id for search_all_files_extract.py
 def get_or_create_file_id_for_extract(dosya_no, icra_mudurlugu):
     """
     Get existing file_id or create new one for search_all_files_extract.py
     
+    A new file_id is reserved from the sequence, so concurrent callers never
+    get the same id (an id that is never inserted is simply skipped).
+    
     Args:
         dosya_no (str): File number
         icra_mudurlugu (str): İcra Müdürlüğü
@@ -461,56 +459,39 @@ def get_or_create_file_id_for_extract(dosya_no, icra_mudurlugu):
     logger = get_logger()
     
     try:
-        conn = get_database_connection()
-        if not conn:
-            logger.error("Failed to get database connection")
-            return None, None, False
-        
-        cursor = conn.cursor()
-        
-        # Check if file already exists
-        cursor.execute("""
-            SELECT file_id, klasor FROM files 
-            WHERE dosyaNo = ? AND icraMudurlugu = ?
-        """, (dosya_no, icra_mudurlugu))
-        
-        existing_file = cursor.fetchone()
-        
-        if existing_file:
-            # File exists, return existing file_id and klasor
-            logger.info(f"File already exists: dosya_no={dosya_no}, icra_mudurlugu={icra_mudurlugu}, file_id={existing_file['file_id']}")
-            conn.close()
-            return existing_file['file_id'], existing_file['klasor'], False
-        
-        # File doesn't exist, find the next available file_id
-        cursor.execute("""
-            SELECT file_id FROM files 
-            ORDER BY CAST(file_id AS INTEGER) DESC 
-            LIMIT 1
-        """)
-        
-        last_file = cursor.fetchone()
-        
-        if last_file:
-            # Get the next available file_id
-            next_file_id = str(int(last_file['file_id']) + 1)
-        else:
-            # No files exist, start with 1
-            next_file_id = "1"
-        
-        # klasor is the same as file_id for UI display
-        klasor = next_file_id
-        
-        logger.info(f"Created new file_id: {next_file_id} for dosya_no={dosya_no}, icra_mudurlugu={icra_mudurlugu}")
-        conn.close()
-        return next_file_id, klasor, True
+        with db_transaction() as conn:
+            return _get_or_allocate_file_id(conn, dosya_no, icra_mudurlugu)
         
     except Exception as e:
         logger.error(f"Error getting or creating file_id: {e}")
-        if conn:
-            conn.close()
         return None, None, False
 
+def _get_or_allocate_file_id(conn, dosya_no, icra_mudurlugu):
+    """Look up the file_id for (dosya_no, icra_mudurlugu) or allocate the next one (inside a write transaction)"""
+    logger = get_logger()
+    cursor = conn.cursor()
+    # Check if file already exists
+    cursor.execute("""
+        SELECT file_id, klasor FROM files 
+        WHERE dosyaNo = ? AND icraMudurlugu = ?
+    """, (dosya_no, icra_mudurlugu))
+    
+    existing_file = cursor.fetchone()
+    
+    if existing_file:
+        # File exists, return existing file_id and klasor
+        logger.info(f"File already exists: dosya_no={dosya_no}, icra_mudurlugu={icra_mudurlugu}, file_id={existing_file['file_id']}")
+        return existing_file['file_id'], existing_file['klasor'], False
+    
+    # File doesn't exist, take the next file_id from the sequence
+    next_file_id = allocate_file_id(conn)
+    
+    # klasor is the same as file_id for UI display
+    klasor = next_file_id
+    
+    logger.info(f"Created new file_id: {next_file_id} for dosya_no={dosya_no}, icra_mudurlugu={icra_mudurlugu}")
+    return next_file_id, klasor, True
+
 # This function is used to save extract data to database with automatic file_id and klasor generation
 def save_extract_data_to_db(file_data_without_ids):
     """
@@ -522,22 +503,71 @@ def save_extract_data_to_db(file_data_without_ids):
     Returns:
         dict: File data with generated file_id and klasor, or None if failed
     """
+    saved = save_extract_batch_to_db([file_data_without_ids])
+    return saved[0] if saved else None
+
+def save_extract_batch_to_db(files_without_ids):
+    """
+    Save a batch of extracted files (files, file_details and borclular) in one transaction
+    
+    New files get the next free file_ids; existing ones (same dosyaNo and
+    icraMudurlugu) are updated in place. A resynced debtor keeps the tcKimlik
+    and adres MERNİS filled in earlier unless the extract brings its own, and
+    debtors no longer listed are removed. Written through the configured
+    storage backend (see services.storage).
+    
+    Args:
+        files_without_ids (list): File dicts without file_id and klasor
+    
+    Returns:
+        list: File data with generated file_id and klasor, in input order
+              (files missing dosyaNo or icraMudurlugu are skipped), or [] if failed
+    """
     logger = get_logger()
     
     try:
+        # Imported here: the storage backends import this module
+        from services.storage import get_storage
+        saved = get_storage().write_extract_batch(files_without_ids)
+        
+        logger.info(f"Successfully saved extract data for {len(saved)} files")
+        return saved
+        
+    except Exception as e:
+        logger.error(f"Error saving extract data to database: {e}")
+        return []
+
+def write_extract_batch(conn, files_without_ids):
+    """
+    Write extracted files (see save_extract_batch_to_db) inside the caller's transaction.
+    
+    Returns:
+        tuple: (saved file dicts, borclu_ids whose sorgu_cache entries must be dropped after commit)
+    """
+    logger = get_logger()
+    saved = []
+    changed_borclu_ids = set()
+    file_ids = {}
+    
+    for file_data_without_ids in files_without_ids:
         dosya_no = file_data_without_ids.get('dosyaNo')
         icra_mudurlugu = file_data_without_ids.get('icraMudurlugu')
-        
         if not dosya_no or not icra_mudurlugu:
             logger.error("dosyaNo or icraMudurlugu is missing")
-            return None
-        
-        # Get or create file_id and klasor
-        file_id, klasor, is_new_file = get_or_create_file_id_for_extract(dosya_no, icra_mudurlugu)
-        
-        if not file_id:
-            logger.error("Failed to get or create file_id")
-            return None
+            continue
+        
+        key = (dosya_no, icra_mudurlugu)
+        if key not in file_ids:
+            existing_file = conn.execute(
+                "SELECT file_id, klasor FROM files WHERE dosyaNo = ? AND icraMudurlugu = ?", key
+            ).fetchone()
+            if existing_file:
+                file_ids[key] = (existing_file['file_id'], existing_file['klasor'], False)
+            else:
+                # klasor is the same as file_id for UI display
+                next_file_id = allocate_file_id(conn)
+                file_ids[key] = (next_file_id, next_file_id, True)
+        file_id, klasor, is_new_file = file_ids[key]
         
         # Add file_id and klasor to the data
         file_data = file_data_without_ids.copy()
@@ -549,29 +579,74 @@ def save_extract_data_to_db(file_data_without_ids):
             borclu['file_id'] = file_id
             borclu['borclu_id'] = f"{file_id}_{i + 1}"
         
-        # Save to database
-        if is_new_file:
-            # New file - insert all data
-            save_file_data_to_db(file_data)
-            for borclu in file_data.get('borcluList', []):
-                save_borclu_data_to_db(borclu, file_id)
-        else:
-            # Existing file - update data
-            save_file_data_to_db(file_data)
-            # Update borclular (delete old ones and insert new ones)
-            conn = get_database_connection()
-            if conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM borclular WHERE file_id = ?", (file_id,))
-                conn.commit()
-                conn.close()
-                
-                for borclu in file_data.get('borcluList', []):
-                    save_borclu_data_to_db(borclu, file_id)
-        
-        logger.info(f"Successfully saved extract data for file_id: {file_id}")
-        return file_data
-        
-    except Exception as e:
-        logger.error(f"Error saving extract data to database: {e}")
-        return None 
\ No newline at end of file
+        if not is_new_file:
+            # borclu_ids are positional, so cached results may now belong to another debtor
+            kept = [borclu['borclu_id'] for borclu in file_data.get('borcluList', [])]
+            removed = [row['borclu_id'] for row in conn.execute(
+                "SELECT borclu_id FROM borclular WHERE file_id = ? AND borclu_id NOT IN (SELECT value FROM json_each(?))",
+                (file_id, json.dumps(kept))
+            )]
+            if removed:
+                # Children first: a debtor added later at the same position must not inherit
+                # these results, and the borclu_sorgular triggers drop their asset rows and
+                # search documents
+                for table in ('borclu_sorgu_history', 'borclu_sorgular', 'borclular'):
+                    conn.execute(f"DELETE FROM {table} WHERE borclu_id IN (SELECT value FROM json_each(?))",
+                                 (json.dumps(removed),))
+            changed_borclu_ids.update(removed)
+            changed_borclu_ids.update(kept)
+        saved.append(file_data)
+    
+    conn.executemany("""
+        INSERT INTO files 
+        (file_id, klasor, dosyaNo, eYil, eNo, borcluAdi, alacakliAdi, foyTuru, durum, 
+         takipTarihi, icraMudurlugu) 
+        VALUES (:file_id, :klasor, :dosyaNo, :eYil, :eNo, :borcluAdi, :alacakliAdi, :foyTuru, :durum,
+                :takipTarihi, :icraMudurlugu)
+        ON CONFLICT (file_id) DO UPDATE SET
+            klasor = excluded.klasor, dosyaNo = excluded.dosyaNo, eYil = excluded.eYil,
+            eNo = excluded.eNo, borcluAdi = excluded.borcluAdi, alacakliAdi = excluded.alacakliAdi,
+            foyTuru = excluded.foyTuru, durum = excluded.durum, takipTarihi = excluded.takipTarihi,
+            icraMudurlugu = excluded.icraMudurlugu
+    """, [_extract_row(file_data, FILE_COLUMNS) for file_data in saved])
+    
+    conn.executemany("""
+        INSERT INTO file_details 
+        (file_id, takipSekli, takipYolu, takipTuru, alacakliVekili, borcMiktari, faizOrani, guncelBorc) 
+        VALUES (:file_id, :takipSekli, :takipYolu, :takipTuru, :alacakliVekili, :borcMiktari, :faizOrani, :guncelBorc)
+        ON CONFLICT (file_id) DO UPDATE SET
+            takipSekli = excluded.takipSekli, takipYolu = excluded.takipYolu, takipTuru = excluded.takipTuru,
+            alacakliVekili = excluded.alacakliVekili, borcMiktari = excluded.borcMiktari,
+            faizOrani = excluded.faizOrani, guncelBorc = excluded.guncelBorc
+    """, [_extract_row(file_data, FILE_DETAIL_COLUMNS) for file_data in saved])
+    
+    # MERNİS data is only kept for the same debtor (the borclu at this position has the same name)
+    conn.executemany("""
+        INSERT INTO borclular 
+        (borclu_id, file_id, ad, ad_key, tcKimlik, telefon, adres, vekil) 
+        VALUES (:borclu_id, :file_id, :ad, :ad_key, :tcKimlik, :telefon, :adres, :vekil)
+        ON CONFLICT (borclu_id) DO UPDATE SET
+            file_id = excluded.file_id, ad = excluded.ad, ad_key = excluded.ad_key, telefon = excluded.telefon, vekil = excluded.vekil,
+            tcKimlik = CASE WHEN borclular.ad IS excluded.ad
+                            THEN COALESCE(NULLIF(excluded.tcKimlik, ''), borclular.tcKimlik)
+                            ELSE excluded.tcKimlik END,
+            adres = CASE WHEN borclular.ad IS excluded.ad
+                         THEN COALESCE(NULLIF(excluded.adres, ''), borclular.adres)
+                         ELSE excluded.adres END
+    """, [
+        dict(_extract_row(borclu, BORCLU_COLUMNS), ad_key=borclu_ad_key(borclu.get('ad')))
+        for file_data in saved
+        for borclu in file_data.get('borcluList', [])
+    ])
+    return saved, changed_borclu_ids
+
+# Columns written by save_extract_batch_to_db
+FILE_COLUMNS = ['file_id', 'klasor', 'dosyaNo', 'eYil', 'eNo', 'borcluAdi', 'alacakliAdi',
+                'foyTuru', 'durum', 'takipTarihi', 'icraMudurlugu']
+FILE_DETAIL_COLUMNS = ['file_id', 'takipSekli', 'takipYolu', 'takipTuru', 'alacakliVekili',
+                       'borcMiktari', 'faizOrani', 'guncelBorc']
+BORCLU_COLUMNS = ['borclu_id', 'file_id', 'ad', 'tcKimlik', 'telefon', 'adres', 'vekil']
+
+def _extract_row(data, columns):
+    """Named parameters for one row, with None for missing keys"""
+    return {column: data.get(column) for column in columns}
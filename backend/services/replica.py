@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+from datetime import datetime
+
+from services import database_connection
+from services.database_connection import BUSY_TIMEOUT_SECONDS, connect
+
+# Read replica of files.db.
+#
+# `python database/maintenance.py replicate` keeps a copy of files.db in
+# REPLICA_DIR up to date: every interval it checks the trigger-maintained
+# data_version counter and, when it moved, copies the database into the replica
+# with the online backup API in one step. The step reads one consistent WAL
+# snapshot of files.db, so the scraper writer is never blocked, and writes the
+# replica in one transaction, so its readers see either the old or the new
+# snapshot. Read-only API processes serve from the replica with
+#   ADALEX_DB_PATH=<replica> ADALEX_DB_QUERY_ONLY=1
+# and report how far behind they are at /api/replica/status.
+#
+# Each sync writes <replica>.status.json: the source path, the data_version
+# and time of the snapshot.
+
+REPLICA_DIR = os.environ.get(
+    'ADALEX_REPLICA_DIR',
+    os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'replica')
+)
+REPLICA_INTERVAL = float(os.environ.get('ADALEX_REPLICA_INTERVAL', '5'))
+
+def get_logger():
+    """Get logger for replication"""
+    logger = logging.getLogger('replica')
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+def replica_path(db_path=None):
+    """Replica of the database at db_path (default: the pool's DB_PATH): same file name in REPLICA_DIR"""
+    return os.path.join(REPLICA_DIR, os.path.basename(db_path or database_connection.DB_PATH))
+
+def status_path(replica):
+    """Status file written next to the replica"""
+    return replica + '.status.json'
+
+def read_status(replica):
+    """Status written by the last sync into replica, or None"""
+    try:
+        with open(status_path(replica), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def data_version(conn):
+    """The db_counters data_version of a connection's database (0 before the first write)"""
+    row = conn.execute("SELECT value FROM db_counters WHERE name = 'data_version'").fetchone()
+    return row[0] if row else 0
+
+class Replicator:
+    """
+    Copies db_path into replica whenever its data_version moves.
+
+    The source and replica connections stay open between syncs.
+    """
+
+    def __init__(self, db_path=None, replica=None):
+        self.db_path = os.path.abspath(db_path or database_connection.DB_PATH)
+        self.replica = os.path.abspath(replica or replica_path(self.db_path))
+        self.syncs = 0
+        self._source = None
+        self._target = None
+
+    def _connections(self):
+        if self._source is None:
+            self._source = connect(self.db_path, isolation_level=None)
+        if self._target is None:
+            os.makedirs(os.path.dirname(self.replica), exist_ok=True)
+            target = sqlite3.connect(self.replica, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            # A WAL destination needs the source's page size; set it while the file is still empty
+            page_size = self._source.execute("PRAGMA page_size").fetchone()[0]
+            target.execute(f"PRAGMA page_size = {page_size}")
+            target.execute("PRAGMA journal_mode = WAL")
+            self._target = target
+        return self._source, self._target
+
+    def sync(self, force=False):
+        """
+        Copy the database into the replica if it changed since the last sync.
+
+        Returns the replica status, with 'copied' telling whether this call copied.
+        """
+        source, target = self._connections()
+        status = read_status(self.replica)
+        if not force and status is not None and status['data_version'] == data_version(source):
+            return {**status, 'copied': False}
+
+        started = time.perf_counter()
+        # pages=-1: one step, one read snapshot of the source and one write transaction on the replica
+        source.backup(target, pages=-1)
+        # Move the copy from the replica's WAL into its file without waiting for readers
+        target.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        status = {
+            'source': self.db_path,
+            'data_version': data_version(target),
+            'synced_at': datetime.now().isoformat(),
+            'sync_seconds': round(time.perf_counter() - started, 3),
+        }
+        tmp_path = status_path(self.replica) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, status_path(self.replica))
+        self.syncs += 1
+        get_logger().info(f"Replicated {self.db_path} to {self.replica} at data_version {status['data_version']} "
+                          f"in {status['sync_seconds']:.3f} s")
+        return {**status, 'copied': True}
+
+    def run(self, interval=None, runs=None):
+        """Sync every interval seconds (runs times, or forever)"""
+        interval = REPLICA_INTERVAL if interval is None else interval
+        count = 0
+        while runs is None or count < runs:
+            if count:
+                time.sleep(interval)
+            try:
+                self.sync()
+            except sqlite3.Error as e:
+                get_logger().error(f"Replication of {self.db_path} failed: {e}")
+            count += 1
+
+    def close(self):
+        for conn in (self._source, self._target):
+            if conn is not None:
+                conn.close()
+        self._source = self._target = None
+
+def replica_status(replica=None):
+    """
+    How far the replica is behind its source, or None if it was never synced.
+
+    replica defaults to the database this process serves when it runs
+    query-only (a replica), else to replica_path() of the primary.
+    versions_behind counts data changes not yet copied; lag_seconds is 0 when
+    there are none, else the time since the last sync (an upper bound).
+    """
+    if replica is None:
+        replica = database_connection.DB_PATH if database_connection.QUERY_ONLY else replica_path()
+    replica = os.path.abspath(replica)
+    status = read_status(replica)
+    if status is None:
+        return None
+
+    # A read-only look at the primary: one row, no schema check, no pool
+    source = sqlite3.connect(f"file:{status['source']}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_SECONDS)
+    try:
+        source_version = data_version(source)
+    finally:
+        source.close()
+    versions_behind = max(0, source_version - status['data_version'])
+    synced_at = datetime.fromisoformat(status['synced_at'])
+    return {
+        'replica': replica,
+        'source': status['source'],
+        'replica_data_version': status['data_version'],
+        'source_data_version': source_version,
+        'versions_behind': versions_behind,
+        'synced_at': status['synced_at'],
+        'lag_seconds': round((datetime.now() - synced_at).total_seconds(), 3) if versions_behind else 0.0,
+    }
@@ -0,0 +1,142 @@
+import os
+import gzip
+import json
+import shutil
+import logging
+import threading
+from datetime import datetime
+
+# Append-only journal of everything the scrapers save.
+#
+# Each saved result is one compact JSON line {"ts", "source", "data"} appended
+# to scrape_journal.jsonl with a single write, replacing the per-module JSON
+# backups that were re-read, merged and rewritten on every save. When the active
+# file grows past max_bytes it is renamed to scrape_journal.<time>.jsonl and
+# (optionally) gzipped. Segments sort by name in write order, so replaying
+# iter_journal() in order rebuilds the database (see database/replay_journal.py).
+
+JOURNAL_DIR = os.environ.get(
+    'ADALEX_JOURNAL_DIR', os.path.join(os.path.expanduser("~"), "Desktop", "extracted_data", "journal")
+)
+JOURNAL_MAX_BYTES = int(os.environ.get('ADALEX_JOURNAL_MAX_BYTES', str(64 * 1024 * 1024)))
+JOURNAL_COMPRESS = os.environ.get('ADALEX_JOURNAL_COMPRESS', '1') != '0'
+
+JOURNAL_NAME = 'scrape_journal'
+
+def get_logger():
+    """Get logger for the scrape journal"""
+    logger = logging.getLogger('scrape_journal')
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+class ScrapeJournal:
+    """Size-rotated JSONL journal; safe to share between threads of one process"""
+
+    def __init__(self, directory=None, max_bytes=None, compress=None):
+        self.directory = directory or JOURNAL_DIR
+        self.max_bytes = max_bytes or JOURNAL_MAX_BYTES
+        self.compress = JOURNAL_COMPRESS if compress is None else compress
+        self.path = os.path.join(self.directory, f"{JOURNAL_NAME}.jsonl")
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def append(self, data, source=None):
+        """Append one saved result"""
+        self.append_many([(data, source)])
+
+    def append_many(self, entries):
+        """Append (data, source) pairs with one write"""
+        ts = datetime.now().isoformat()
+        payload = "".join(
+            json.dumps({"ts": ts, "source": source, "data": data}, ensure_ascii=False, separators=(',', ':')) + "\n"
+            for data, source in entries
+        ).encode('utf-8')
+        if not payload:
+            return
+        with self._lock:
+            if self._file is None:
+                self._open()
+            elif self._size and self._size + len(payload) > self.max_bytes:
+                self._rotate()
+            self._file.write(payload)
+            self._file.flush()
+            self._size += len(payload)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        segment = os.path.join(self.directory, f"{JOURNAL_NAME}.{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.jsonl")
+        os.replace(self.path, segment)
+        if self.compress:
+            with open(segment, 'rb') as source, gzip.open(segment + '.gz', 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(segment)
+        get_logger().info(f"Rotated scrape journal to {segment}{'.gz' if self.compress else ''}")
+        self._open()
+
+def journal_segments(directory=None):
+    """Journal files in write order: rotated segments, then the active file"""
+    directory = directory or JOURNAL_DIR
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(f"{JOURNAL_NAME}.") and name.endswith(('.jsonl', '.jsonl.gz'))
+        and name != f"{JOURNAL_NAME}.jsonl"
+    )
+    if os.path.exists(os.path.join(directory, f"{JOURNAL_NAME}.jsonl")):
+        names.append(f"{JOURNAL_NAME}.jsonl")
+    return [os.path.join(directory, name) for name in names]
+
+def iter_journal(directory=None, since=None):
+    """
+    Yield journal records ({"ts", "source", "data"}) in write order.
+
+    Records older than since (ISO timestamp) are skipped. A line that does not
+    parse (e.g. cut short by a crash) is logged and skipped.
+    """
+    logger = get_logger()
+    for path in journal_segments(directory):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable journal line {path}:{line_no}")
+                    continue
+                if since is not None and record.get('ts', '') < since:
+                    continue
+                yield record
+
+# Process-wide journal used by the scrapers and the background writer
+journal = ScrapeJournal()
+
+def append_to_journal(data, source=None):
+    """Append scraping data to the process-wide journal"""
+    journal.append(data, source)
+
+def journal_source(filename):
+    """Journal source name for a legacy backup filename (.../banka_sorgu.json -> banka_sorgu)"""
+    if not filename:
+        return None
+    return os.path.splitext(os.path.basename(filename))[0]
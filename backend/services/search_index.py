@@ -0,0 +1,147 @@
+import re
+
+from services.database_connection import db_connection
+
+# Full-text index over debtor names and scraped sorgu payloads.
+#
+# search_docs gives every indexed item a stable integer id (used as the FTS rowid):
+# one document per borclu (sorgu_tipi = '') and one per borclu_sorgular row, named
+# by its canonical sorgu type name.
+# Triggers on borclular / borclu_sorgular keep both tables in sync on every write,
+# whichever code path does the write. The unicode61 tokenizer with
+# remove_diacritics 2 folds most Turkish letters (İ/I -> i, Ş -> s, Ğ -> g, Ç -> c,
+# Ö -> o, Ü -> u); it keeps the dotless ı, which is mapped to i before indexing
+# and in queries. So "ŞAHİN", "Sahin" and "şahin" (or "IŞIK" and "isik") match.
+
+# Indexed text of a document, as (title, body) expressions over the NEW row
+_BORCLU_DOC = (
+    "IFNULL(NEW.ad, '')",
+    "IFNULL(NEW.tcKimlik, '') || ' ' || IFNULL(NEW.telefon, '') || ' ' || IFNULL(NEW.adres, '') || ' ' || IFNULL(NEW.vekil, '')"
+)
+def _sorgu_doc(payload, title):
+    """Sorgu document over the NEW row's payload expression"""
+    return (
+        title,
+        f"""CASE
+            WHEN json_valid({payload})
+            THEN IFNULL((SELECT group_concat(value, ' ') FROM json_tree({payload}) WHERE atom IS NOT NULL), '')
+            ELSE IFNULL({payload}, '')
+        END"""
+    )
+
+def _sync_triggers(name, table, sorgu_tipi, document):
+    """Build the insert/update/delete triggers that mirror one table into the index"""
+    title, body = document
+    new_key = f"borclu_id = NEW.borclu_id AND sorgu_tipi = {sorgu_tipi.format(row='NEW')}"
+    old_key = f"borclu_id = OLD.borclu_id AND sorgu_tipi = {sorgu_tipi.format(row='OLD')}"
+    drop_old = f"""
+        DELETE FROM search_index WHERE rowid = (SELECT doc_id FROM search_docs WHERE {old_key});
+        DELETE FROM search_docs WHERE {old_key};"""
+    add_new = f"""
+        INSERT OR IGNORE INTO search_docs (borclu_id, sorgu_tipi) VALUES (NEW.borclu_id, {sorgu_tipi.format(row='NEW')});
+        DELETE FROM search_index WHERE rowid = (SELECT doc_id FROM search_docs WHERE {new_key});
+        INSERT INTO search_index (rowid, title, body)
+        SELECT doc_id, replace({title}, 'ı', 'i'), replace({body}, 'ı', 'i')
+        FROM search_docs WHERE {new_key};"""
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_search_{name}_insert AFTER INSERT ON {table}\n    BEGIN{add_new}\n    END;",
+        f"CREATE TRIGGER IF NOT EXISTS trg_search_{name}_update AFTER UPDATE ON {table}\n    BEGIN{drop_old}{add_new}\n    END;",
+        f"CREATE TRIGGER IF NOT EXISTS trg_search_{name}_delete AFTER DELETE ON {table}\n    BEGIN{drop_old}\n    END;",
+    ]
+
+SEARCH_INDEX_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS search_docs (
+        doc_id INTEGER PRIMARY KEY,
+        borclu_id TEXT NOT NULL,
+        sorgu_tipi TEXT NOT NULL DEFAULT '',
+        UNIQUE (borclu_id, sorgu_tipi)
+    );
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title,
+        body,
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+    """,
+    # Debtor documents: title = name, body = identifying details
+    *_sync_triggers('borclu', 'borclular', "''", _BORCLU_DOC),
+    # Sorgu documents: title = sorgu tipi, body = every scalar value of the JSON payload
+    # (as created by migration 4; migrations 9 and 10 recreate them over sorgu_payloads and type_id)
+    *_sync_triggers('sorgu', 'borclu_sorgular', "{row}.sorgu_tipi", _sorgu_doc('NEW.sorgu_verisi', 'NEW.sorgu_tipi')),
+]
+
+# Name of a borclu_sorgular row's sorgu type in the sorgu_types registry
+_SORGU_TIPI_NAME = "(SELECT name FROM sorgu_types WHERE type_id = {row}.type_id)"
+
+def sorgu_search_triggers(payload, column='type_id'):
+    """
+    Sync triggers of the sorgu documents, reading the payload through the given expression.
+
+    column is the sorgu type key of borclu_sorgular: 'type_id', or 'sorgu_tipi'
+    for the text-keyed table of migrations 4-9.
+    """
+    sorgu_tipi = _SORGU_TIPI_NAME if column == 'type_id' else "{row}.sorgu_tipi"
+    return _sync_triggers('sorgu', 'borclu_sorgular', sorgu_tipi, _sorgu_doc(payload, sorgu_tipi.format(row='NEW')))
+
+# Ranked hits with the file and debtor they belong to. bm25 weights favour the
+# title column (debtor name / sorgu tipi) over payload text.
+SEARCH_SQL = """
+    SELECT
+        f.file_id, f.dosyaNo, f.icraMudurlugu,
+        b.borclu_id, b.ad AS borcluAdi,
+        NULLIF(d.sorgu_tipi, '') AS sorgu_tipi,
+        snippet(search_index, -1, '<b>', '</b>', '…', 12) AS snippet,
+        bm25(search_index, 2.0, 1.0) AS rank
+    FROM search_index
+    JOIN search_docs d ON d.doc_id = search_index.rowid
+    JOIN borclular b ON b.borclu_id = d.borclu_id
+    LEFT JOIN files f ON f.file_id = b.file_id
+    WHERE search_index MATCH ?
+    ORDER BY rank
+    LIMIT ?
+"""
+
+def create_search_index(cur):
+    """
+    Create the full-text index tables and their sync triggers.
+
+    When the index is created for the first time on a database that already
+    has data, existing borclular / borclu_sorgular rows are indexed too.
+    """
+    exists = cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_docs'").fetchone()
+    for statement in SEARCH_INDEX_DDL:
+        cur.execute(statement)
+    if not exists:
+        rebuild_search_index(cur)
+
+def rebuild_search_index(cur):
+    """Re-index every borclu and sorgu row from scratch (runs inside the caller's transaction)"""
+    cur.execute("DELETE FROM search_index")
+    cur.execute("DELETE FROM search_docs")
+    # Firing the update triggers keeps the indexing rules in one place
+    cur.execute("UPDATE borclular SET borclu_id = borclu_id")
+    cur.execute("UPDATE borclu_sorgular SET borclu_id = borclu_id")
+
+def build_match_query(text):
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and all terms must match, so user
+    input can never be parsed as FTS5 query syntax. Returns None if the text
+    has no searchable words.
+    """
+    terms = re.findall(r"\w+", (text or "").replace('ı', 'i'))
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search(text, limit=20):
+    """Return ranked search hits (as dicts) for free text"""
+    match_query = build_match_query(text)
+    if match_query is None:
+        return []
+    with db_connection() as conn:
+        rows = conn.execute(SEARCH_SQL, (match_query, limit)).fetchall()
+    return [dict(row) for row in rows]
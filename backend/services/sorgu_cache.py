@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# Cache configuration (ADALEX_SORGU_CACHE_MAX_BYTES=0 disables the cache)
+SORGU_CACHE_MAX_BYTES = int(os.environ.get('ADALEX_SORGU_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+SORGU_CACHE_TTL = float(os.environ.get('ADALEX_SORGU_CACHE_TTL', '300'))
+
+class SorguCache:
+    """
+    Thread-safe LRU + TTL cache for stored sorgu results, keyed by (borclu_id, sorgu_type_key).
+
+    Entries are sized by the length of their JSON text and the least
+    recently used ones are evicted once max_bytes is exceeded. The writers in
+    database_writer invalidate entries when they change the underlying rows;
+    the TTL bounds staleness for writes made by other processes.
+
+    Every invalidation bumps a generation number. Readers take the generation
+    before querying the database and pass it to put(), so a result read before
+    a concurrent write can never be stored after that write's invalidation.
+    """
+
+    def __init__(self, max_bytes=None, ttl=None, clock=time.monotonic):
+        self.max_bytes = SORGU_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttl = SORGU_CACHE_TTL if ttl is None else ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size, generation=None):
+        """
+        Store value under key, evicting least recently used entries as needed.
+
+        Nothing is stored if generation is given and an invalidation happened
+        since it was read, or if the entry alone would not fit.
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, self._clock() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, borclu_id, sorgu_tipi=None):
+        """Drop one (borclu_id, sorgu_tipi) entry, or every entry of borclu_id"""
+        with self._lock:
+            self._generation += 1
+            if sorgu_tipi is not None:
+                keys = [(borclu_id, sorgu_tipi)] if (borclu_id, sorgu_tipi) in self._entries else []
+            else:
+                keys = [key for key in self._entries if key[0] == borclu_id]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self):
+        """Return cache usage and hit/miss numbers"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+# Process-wide cache used by database_reader and invalidated by database_writer
+sorgu_cache = SorguCache()
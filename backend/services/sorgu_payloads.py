@@ -0,0 +1,70 @@
+import os
+import zlib
+import hashlib
+
+# Content-addressed storage for sorgu payloads.
+#
+# borclu_sorgular and borclu_sorgu_history rows point at their payload through
+# payload_hash; every distinct payload (the JSON text the writer produces) is
+# stored once in sorgu_payloads, however many debtors or versions share it
+# ("kayıt bulunamadı" popups, empty {"sonuc": ""} results). Payloads of at least
+# COMPRESS_MIN_BYTES are kept zlib-compressed when that makes them smaller.
+#
+# SQL reads the payload text through payload_sql(), which calls the
+# sorgu_payload() function registered on every connection by
+# services.database_connection, so triggers and json_* queries work on
+# compressed payloads too. Rows written before payloads were moved (or by hand)
+# may still carry the text in sorgu_verisi; payload_sql() prefers it.
+
+COMPRESS_MIN_BYTES = int(os.environ.get('ADALEX_SORGU_COMPRESS_MIN_BYTES', '256'))
+ZLIB_LEVEL = 6
+
+SORGU_PAYLOADS_DDL = """
+    CREATE TABLE IF NOT EXISTS sorgu_payloads (
+        payload_hash TEXT PRIMARY KEY,
+        encoding TEXT NOT NULL,
+        data BLOB NOT NULL
+    );
+"""
+
+def payload_hash(text):
+    """Content key of a payload: 128-bit BLAKE2b of its UTF-8 text, as hex"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def encode_payload(text, min_bytes=None):
+    """(encoding, data) to store for payload text: ('zlib', bytes) or ('json', text)"""
+    raw = text.encode('utf-8')
+    if len(raw) >= (COMPRESS_MIN_BYTES if min_bytes is None else min_bytes):
+        compressed = zlib.compress(raw, ZLIB_LEVEL)
+        if len(compressed) < len(raw):
+            return 'zlib', compressed
+    return 'json', text
+
+def decode_payload(encoding, data):
+    """Payload text of a sorgu_payloads row (registered as the SQL function sorgu_payload)"""
+    if encoding == 'zlib':
+        return zlib.decompress(data).decode('utf-8')
+    return data
+
+def register_functions(conn):
+    """Register sorgu_payload(encoding, data) on a connection"""
+    conn.create_function('sorgu_payload', 2, decode_payload, deterministic=True)
+
+def payload_sql(row, schema=None):
+    """
+    SQL expression for the payload text of a borclu_sorgular/borclu_sorgu_history row alias (or NEW/OLD).
+
+    schema qualifies sorgu_payloads for rows of an attached database (e.g. 'archive');
+    trigger bodies must leave it unqualified.
+    """
+    table = f"{schema}.sorgu_payloads" if schema else "sorgu_payloads"
+    return (f"COALESCE({row}.sorgu_verisi, (SELECT sorgu_payload(p.encoding, p.data) FROM {table} p "
+            f"WHERE p.payload_hash = {row}.payload_hash))")
+
+def store_payload(conn, text):
+    """Store payload text once and return its payload_hash (call inside the writing transaction)"""
+    key = payload_hash(text)
+    if conn.execute("SELECT 1 FROM sorgu_payloads WHERE payload_hash = ?", (key,)).fetchone() is None:
+        encoding, data = encode_payload(text)
+        conn.execute("INSERT INTO sorgu_payloads (payload_hash, encoding, data) VALUES (?, ?, ?)", (key, encoding, data))
+    return key
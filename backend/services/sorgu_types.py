@@ -0,0 +1,105 @@
+import re
+
+# Registry of sorgu types.
+#
+# Scrapers, routes and the frontend spell the same query type differently
+# ('TAKBİS' / 'TAKBIS' / 'takbis_sorgulama', 'MERNİS' / 'Mernis',
+# 'İcra Dosyası' / 'icra_dosyasi_sorgulama'). sorgu_types gives every type a
+# small integer type_id and one canonical name; sorgu_type_aliases maps the
+# folded spelling of every alias (sorgu_type_key) to its type_id.
+# borclu_sorgular and borclu_sorgu_history are keyed on type_id, so a result
+# written under one spelling is found under any other.
+#
+# The built-in types below have fixed ids, so code resolves them without a
+# query. A name that folds to none of them is registered on first write with
+# an id from DYNAMIC_TYPE_ID_START on; built-in ids below it stay free for
+# types added later (by a migration that seeds them).
+
+# (type_id, canonical name); the canonical name is what the scrapers write
+SORGU_TYPES = [
+    (1, 'Banka'),
+    (2, 'GİB'),
+    (3, 'SGK'),
+    (4, 'SGK Haciz'),
+    (5, 'EGM'),
+    (6, 'TAKBIS'),
+    (7, 'MERNİS'),
+    (8, 'GSM'),
+    (9, 'Dış İşleri'),
+    (10, 'İSKİ'),
+    (11, 'Posta Çeki'),
+    (12, 'İcra Dosyası'),
+]
+
+DYNAMIC_TYPE_ID_START = 1000
+
+SORGU_TYPES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS sorgu_types (
+        type_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sorgu_type_aliases (
+        alias_key TEXT PRIMARY KEY,
+        type_id INTEGER NOT NULL REFERENCES sorgu_types(type_id)
+    ) WITHOUT ROWID;
+    """,
+]
+
+_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i', 'Ş': 's', 'ş': 's', 'Ğ': 'g', 'ğ': 'g',
+                       'Ç': 'c', 'ç': 'c', 'Ö': 'o', 'ö': 'o', 'Ü': 'u', 'ü': 'u'})
+_ROUTE_SUFFIX = re.compile(r'(sorgulama|sorgusu|sorgu)$')
+
+def sorgu_type_key(name):
+    """
+    Folded spelling of a sorgu type name: Turkish letters mapped to ASCII,
+    lower case, no spaces/underscores/hyphens and no route suffix, so
+    'TAKBİS', 'takbis_sorgulama' and 'Takbis' share one key.
+    """
+    key = re.sub(r'[\s_\-]+', '', (name or '').translate(_FOLD).lower())
+    return _ROUTE_SUFFIX.sub('', key) or key
+
+SORGU_TYPE_NAMES = dict(SORGU_TYPES)
+SORGU_TYPE_IDS = {name: type_id for type_id, name in SORGU_TYPES}
+
+# alias_key -> type_id of the built-in types
+BUILTIN_ALIASES = {sorgu_type_key(name): type_id for type_id, name in SORGU_TYPES}
+
+# Parenthesized subquery resolving a sorgu_type_key parameter to its type_id (NULL if unknown)
+TYPE_ID_SQL = "(SELECT type_id FROM sorgu_type_aliases WHERE alias_key = ?)"
+
+def canonical_sorgu_tipi(name):
+    """Canonical name of a built-in sorgu type, or the name itself (whitespace collapsed) if it is not built in"""
+    type_id = BUILTIN_ALIASES.get(sorgu_type_key(name))
+    return SORGU_TYPE_NAMES[type_id] if type_id is not None else ' '.join((name or '').split())
+
+def seed_sorgu_types(cur):
+    """Create the registry tables and add the built-in types and aliases missing from them"""
+    for statement in SORGU_TYPES_DDL:
+        cur.execute(statement)
+    cur.executemany("INSERT OR IGNORE INTO sorgu_types (type_id, name) VALUES (?, ?)", SORGU_TYPES)
+    cur.executemany("INSERT OR IGNORE INTO sorgu_type_aliases (alias_key, type_id) VALUES (?, ?)",
+                    list(BUILTIN_ALIASES.items()))
+
+def sorgu_type_id(conn, name, schema='main'):
+    """
+    type_id of a sorgu type name, registering it as a new type if no alias matches.
+
+    Call inside the writing transaction. schema names the database holding the
+    registry (e.g. 'hot' when files.db is attached).
+    """
+    key = sorgu_type_key(name)
+    if key in BUILTIN_ALIASES:
+        return BUILTIN_ALIASES[key]
+    row = conn.execute(f"SELECT type_id FROM {schema}.sorgu_type_aliases WHERE alias_key = ?", (key,)).fetchone()
+    if row:
+        return row[0]
+    type_id = conn.execute(
+        f"SELECT IFNULL(MAX(type_id), ?) + 1 FROM {schema}.sorgu_types WHERE type_id >= ?",
+        (DYNAMIC_TYPE_ID_START - 1, DYNAMIC_TYPE_ID_START)
+    ).fetchone()[0]
+    conn.execute(f"INSERT INTO {schema}.sorgu_types (type_id, name) VALUES (?, ?)", (type_id, canonical_sorgu_tipi(name)))
+    conn.execute(f"INSERT INTO {schema}.sorgu_type_aliases (alias_key, type_id) VALUES (?, ?)", (key, type_id))
+    return type_id
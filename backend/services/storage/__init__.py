@@ -0,0 +1,54 @@
+import os
+import threading
+
+from services.storage.sqlite import SQLiteStorage
+from services.storage.postgres import PostgresStorage
+
+# Storage backends.
+#
+# ADALEX_STORAGE_BACKEND picks the database behind the API routes, the scraper
+# writes and the extract import: 'sqlite' (files.db, the default) or 'postgres'
+# (ADALEX_DATABASE_URL, see storage/postgres.py). Code outside this package
+# asks get_storage() for the process-wide instance.
+
+STORAGE_BACKEND = os.environ.get('ADALEX_STORAGE_BACKEND', 'sqlite')
+
+BACKENDS = {
+    SQLiteStorage.name: SQLiteStorage,
+    PostgresStorage.name: PostgresStorage,
+}
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def _create(backend, **options):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[backend](**options)
+
+def get_storage():
+    """Get the process-wide storage backend, creating it on first use"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = _create(STORAGE_BACKEND)
+    return _storage
+
+def configure_storage(backend=None, **options):
+    """Replace the process-wide storage backend (options go to its constructor, e.g. url)"""
+    global _storage
+    storage = _create(backend or STORAGE_BACKEND, **options)
+    with _storage_lock:
+        previous, _storage = _storage, storage
+    if previous is not None and previous is not storage:
+        previous.close()
+    return storage
+
+def close_storage():
+    """Close the process-wide storage backend (a new one is created on next use)"""
+    global _storage
+    with _storage_lock:
+        previous, _storage = _storage, None
+    if previous is not None:
+        previous.close()
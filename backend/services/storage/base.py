@@ -0,0 +1,133 @@
+class Storage:
+    """
+    Interface of a storage backend.
+
+    Rows come back as plain dicts (files, file_details, borclular) and sorgu
+    results as (borclu_id, sorgu_tipi, sorgu_verisi JSON text, timestamp)
+    tuples, whatever the database, so routes can serialize them directly.
+    archived=True reads the closed files moved out of the hot database (see
+    services.archive); backends without that split have nothing archived.
+    """
+
+    name = None
+
+    def ensure_schema(self):
+        """Create the tables and indexes, or bring them up to date"""
+        raise NotImplementedError
+
+    def get_file(self, file_id, archived=False):
+        """files row of file_id as a dict, or None"""
+        raise NotImplementedError
+
+    def get_file_details(self, file_id, archived=False):
+        """file_details row of file_id as a dict, or None"""
+        raise NotImplementedError
+
+    def get_borclular(self, file_id, archived=False):
+        """borclular rows of a file as dicts"""
+        raise NotImplementedError
+
+    def get_borclu(self, file_id, borclu_id, archived=False):
+        """One borclular row of a file as a dict, or None"""
+        raise NotImplementedError
+
+    def get_borclu_sorgular(self, borclu_id, archived=False):
+        """Every stored sorgu result of a debtor"""
+        raise NotImplementedError
+
+    def get_borclu_sorgu(self, borclu_id, sorgu_tipi):
+        """{"data": decoded result, "timestamp": ...} of one sorgu result, or None"""
+        raise NotImplementedError
+
+    def get_borclu_sorgu_raw(self, borclu_id, sorgu_tipi):
+        """(sorgu_verisi JSON text, timestamp) of one sorgu result, or None"""
+        raise NotImplementedError
+
+    def get_borclu_sorgu_timestamp(self, borclu_id, sorgu_tipi):
+        """Timestamp of one sorgu result without reading its payload, or None"""
+        raise NotImplementedError
+
+    def get_borclu_sorgu_sections(self, borclu_id, sorgu_tipi, sections, default='null'):
+        """({section: JSON text, default when missing}, timestamp) of one sorgu result's top-level sections, or None"""
+        raise NotImplementedError
+
+    def get_borclu_sorgu_versions(self, borclu_id, sorgu_tipi, limit, before=None):
+        """[(version_id, timestamp)] of a sorgu result's history, newest first, timestamp < before when given"""
+        raise NotImplementedError
+
+    def get_borclu_sorgu_as_of(self, borclu_id, sorgu_tipi, as_of):
+        """(version_id, sorgu_verisi JSON text, timestamp) of the version current at as_of, or None"""
+        raise NotImplementedError
+
+    def get_borclu_sorgular_batch(self, borclu_ids, sorgu_tipleri=None, fields=None):
+        """
+        {borclu_id: {sorgu_tipi: {"data": ..., "timestamp": ...}}} for several debtors.
+
+        fields maps sorgu types to JSON paths (database_reader.JSON_PATH_PATTERN)
+        to return instead of the whole payload, as {json_path: value}.
+        """
+        raise NotImplementedError
+
+    def iter_files(self, limit=None, after=None, filters=None, sort='file_id', descending=False, archived=False):
+        """
+        Yield the icra dosyalari list items as dicts.
+
+        filters, sort and the keyset page key after are those of
+        database_reader (LIST_FILTER_COLUMNS, LIST_SORT_KEYS, list_page_key).
+        With archived=True the archived files are listed (none if there is no archive).
+        """
+        raise NotImplementedError
+
+    def count_files(self, filters=None, archived=False):
+        """Number of files matching filters, or None if unavailable"""
+        raise NotImplementedError
+
+    def search(self, text, limit=20):
+        """Ranked search hits (see search_index.search) for free text"""
+        raise NotImplementedError
+
+    def list_araclar(self, haciz=None, marka=None, file_id=None, after=None, limit=100):
+        """Vehicles of all debtors, ordered by arac_id (see asset_index.list_araclar)"""
+        raise NotImplementedError
+
+    def list_tasinmazlar(self, haciz=None, il_ilce=None, file_id=None, after=None, limit=100):
+        """Properties of all debtors, ordered by tasinmaz_id (see asset_index.list_tasinmazlar)"""
+        raise NotImplementedError
+
+    def list_banka_hesaplari(self, kurum=None, file_id=None, after=None, limit=100):
+        """Bank accounts of all debtors, ordered by hesap_id (see asset_index.list_banka_hesaplari)"""
+        raise NotImplementedError
+
+    def asset_summary(self):
+        """Portfolio-wide asset counts (see asset_index.asset_summary)"""
+        raise NotImplementedError
+
+    def data_version(self):
+        """Counter bumped by every data change (for ETags), None if the backend has none"""
+        raise NotImplementedError
+
+    def write_scraping_batch(self, batch, timestamp=None):
+        """
+        Write [(scraping_data, resolver), ...] in one transaction.
+
+        scraping_data has the shapes of database_writer.save_scraping_data_to_db_and_json.
+        A failing file or result is logged and skipped without losing the rest.
+        """
+        raise NotImplementedError
+
+    def write_extract_batch(self, files_without_ids):
+        """
+        Write extracted files (files, file_details, borclular) in one transaction.
+
+        Same contract as database_writer.save_extract_batch_to_db: returns the
+        file dicts with their file_id and klasor, in input order.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """Connection pool statistics"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the backend's connections"""
+        raise NotImplementedError
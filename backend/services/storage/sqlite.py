@@ -0,0 +1,104 @@
+from services import asset_index, database_reader, search_index
+from services.archive import archive_exists
+from services.database_connection import close_pool, db_transaction, get_pool
+from services.database_schema import ensure_schema
+from services.database_writer import invalidate_sorgu_cache, write_extract_batch, write_scraping_data
+from services.sorgu_cache import sorgu_cache
+from services.storage.base import Storage
+
+class SQLiteStorage(Storage):
+    """
+    The files.db backend: the pooled connections of services.database_connection
+    and the queries of database_reader/database_writer.
+    """
+
+    name = 'sqlite'
+
+    def ensure_schema(self):
+        ensure_schema()
+
+    def get_file(self, file_id, archived=False):
+        return database_reader.get_file_dict(database_reader.get_file_by_id(file_id, archived=archived))
+
+    def get_file_details(self, file_id, archived=False):
+        return database_reader.get_file_details_by_id(file_id, archived=archived)
+
+    def get_borclular(self, file_id, archived=False):
+        return database_reader.get_borclular_by_file_id(file_id, archived=archived)
+
+    def get_borclu(self, file_id, borclu_id, archived=False):
+        row = database_reader.get_borclu_by_id(file_id, borclu_id, archived=archived)
+        return dict(row) if row else None
+
+    def get_borclu_sorgular(self, borclu_id, archived=False):
+        return database_reader.get_borclu_sorgular_by_borclu_id(borclu_id, archived=archived)
+
+    def get_borclu_sorgu(self, borclu_id, sorgu_tipi):
+        return database_reader.get_borclu_sorgu_by_tipi(borclu_id, sorgu_tipi)
+
+    def get_borclu_sorgu_raw(self, borclu_id, sorgu_tipi):
+        return database_reader.get_borclu_sorgu_raw(borclu_id, sorgu_tipi)
+
+    def get_borclu_sorgu_timestamp(self, borclu_id, sorgu_tipi):
+        return database_reader.get_borclu_sorgu_timestamp(borclu_id, sorgu_tipi)
+
+    def get_borclu_sorgu_sections(self, borclu_id, sorgu_tipi, sections, default='null'):
+        return database_reader.get_borclu_sorgu_sections(borclu_id, sorgu_tipi, sections, default)
+
+    def get_borclu_sorgu_versions(self, borclu_id, sorgu_tipi, limit, before=None):
+        return database_reader.get_borclu_sorgu_versions(borclu_id, sorgu_tipi, limit, before)
+
+    def get_borclu_sorgu_as_of(self, borclu_id, sorgu_tipi, as_of):
+        return database_reader.get_borclu_sorgu_as_of(borclu_id, sorgu_tipi, as_of)
+
+    def get_borclu_sorgular_batch(self, borclu_ids, sorgu_tipleri=None, fields=None):
+        return database_reader.get_borclu_sorgular_batch(borclu_ids, sorgu_tipleri, fields)
+
+    def iter_files(self, limit=None, after=None, filters=None, sort='file_id', descending=False, archived=False):
+        # archive.db is only attached when it exists
+        if archived and not archive_exists():
+            return iter(())
+        return database_reader.iter_icra_dosyalari(limit, after, filters, sort, descending, archived)
+
+    def count_files(self, filters=None, archived=False):
+        if archived and not archive_exists():
+            return 0
+        return database_reader.count_files(filters, archived=archived)
+
+    def search(self, text, limit=20):
+        return search_index.search(text, limit)
+
+    def list_araclar(self, haciz=None, marka=None, file_id=None, after=None, limit=100):
+        return asset_index.list_araclar(haciz, marka, file_id, after, limit)
+
+    def list_tasinmazlar(self, haciz=None, il_ilce=None, file_id=None, after=None, limit=100):
+        return asset_index.list_tasinmazlar(haciz, il_ilce, file_id, after, limit)
+
+    def list_banka_hesaplari(self, kurum=None, file_id=None, after=None, limit=100):
+        return asset_index.list_banka_hesaplari(kurum, file_id, after, limit)
+
+    def asset_summary(self):
+        return asset_index.asset_summary()
+
+    def data_version(self):
+        return database_reader.get_data_version()
+
+    def write_scraping_batch(self, batch, timestamp=None):
+        invalidations = []
+        with db_transaction() as conn:
+            for scraping_data, resolver in batch:
+                invalidations.extend(write_scraping_data(conn, scraping_data, resolver, timestamp))
+        invalidate_sorgu_cache(invalidations)
+
+    def write_extract_batch(self, files_without_ids):
+        with db_transaction() as conn:
+            saved, changed_borclu_ids = write_extract_batch(conn, files_without_ids)
+        for borclu_id in changed_borclu_ids:
+            sorgu_cache.invalidate(borclu_id)
+        return saved
+
+    def stats(self):
+        return get_pool().stats()
+
+    def close(self):
+        close_pool()
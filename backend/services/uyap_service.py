@@ -3,6 +3,10 @@ from datetime import datetime
 import sys
 import os
 
+from services.storage import get_storage
+from services.sorgu_types import canonical_sorgu_tipi
+from services.write_queue import flush_writes
+
 # Global UYAP session management
 uyap_sessions = {}
 uyap_session_lock = threading.Lock()
@@ -15,32 +19,6 @@ def get_uyap_session_lock():
     """Get the global UYAP session lock"""
     return uyap_session_lock
 
-def get_borclu_sorgu_by_tipi(borclu_id, sorgu_tipi):
-    """Get specific query result for a borclu by query type"""
-    try:
-        import sqlite3
-        import os
-        import json
-        
-        # Update database path to point to the database directory
-        DB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'files.db')
-        
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute("SELECT sorgu_verisi, timestamp FROM borclu_sorgular WHERE borclu_id = ? AND sorgu_tipi = ?", (borclu_id, sorgu_tipi))
-        row = cur.fetchone()
-        conn.close()
-        
-        if row:
-            return {
-                "data": json.loads(row[0]),
-                "timestamp": row[1]
-            }
-        return None
-    except Exception as e:
-        print(f"Error getting sorgu for borclu {borclu_id}, tipi {sorgu_tipi}: {e}")
-        return None
-
 # Business Logic Functions
 def trigger_sorgulama_logic(dosya_no, sorgu_tipi, borclu_id):
     """Business logic for triggering UYAP sorgulama"""
@@ -82,11 +60,14 @@ def trigger_sorgulama_logic(dosya_no, sorgu_tipi, borclu_id):
         # Run the sorgulama
         perform_sorgulama(driver, dosya_no, selected_options)
         
+        # Scrapers save through the background writer; wait for their results to be committed
+        flush_writes()
+        
         # Get the latest result from database
         # Map sorgu_tipi to database format
         db_sorgu_tipi = map_sorgu_tipi_to_db_format(sorgu_tipi)
         
-        sorgu_data = get_borclu_sorgu_by_tipi(borclu_id, db_sorgu_tipi)
+        sorgu_data = get_storage().get_borclu_sorgu(borclu_id, db_sorgu_tipi)
         
         return {
             'success': True,
@@ -319,30 +300,5 @@ def uyap_status_logic():
         }
 
 def map_sorgu_tipi_to_db_format(sorgu_tipi):
-    """Map sorgu_tipi to database format"""
-    if sorgu_tipi == 'MERNİS':
-        return 'Mernis'
-    elif sorgu_tipi == 'SGK':
-        return 'SGK'  # Keep as SGK for consistency with backend
-    elif sorgu_tipi == 'SGK Haciz':
-        return 'SGK Haciz'  # Keep as SGK Haciz for consistency
-    elif sorgu_tipi == 'EGM':
-        return 'EGM'  # Keep as EGM for consistency
-    elif sorgu_tipi == 'TAKBİS':
-        return 'TAKBİS'  # Keep as TAKBİS for consistency
-    elif sorgu_tipi == 'Banka':
-        return 'Banka'
-    elif sorgu_tipi == 'GSM':
-        return 'GSM'  # Keep as GSM for consistency
-    elif sorgu_tipi == 'GİB':
-        return 'GİB'  # Keep as GİB for consistency
-    elif sorgu_tipi == 'İSKİ':
-        return 'İSKİ'  # Keep as İSKİ for consistency
-    elif sorgu_tipi == 'Posta Çeki':
-        return 'Posta Çeki'  # Keep as Posta Çeki for consistency with backend
-    elif sorgu_tipi == 'Dış İşleri':
-        return 'Dış İşleri'  # Keep as Dış İşleri for consistency with backend
-    elif sorgu_tipi == 'İcra Dosyası':
-        return 'icra_dosyasi_sorgulama'
-    else:
-        return sorgu_tipi 
\ No newline at end of file
+    """Map sorgu_tipi to the canonical name results are stored under (see sorgu_types)"""
+    return canonical_sorgu_tipi(sorgu_tipi) 
@@ -0,0 +1,167 @@
+import os
+import copy
+import time
+import queue
+import atexit
+import logging
+import threading
+
+from services.borclu_lookup import current_borclu_resolver
+from services.storage import get_storage
+from services import scrape_journal
+
+# Queue configuration
+WRITE_QUEUE_SIZE = int(os.environ.get('ADALEX_WRITE_QUEUE_SIZE', '1000'))
+WRITE_COMMIT_WINDOW = float(os.environ.get('ADALEX_WRITE_COMMIT_WINDOW', '0.05'))
+WRITE_MAX_BATCH = int(os.environ.get('ADALEX_WRITE_MAX_BATCH', '100'))
+
+def get_logger():
+    """Get logger for the background writer"""
+    logger = logging.getLogger('write_queue')
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+class WriteQueue:
+    """
+    Single writer thread for scraper results.
+
+    Scraper threads only enqueue (a snapshot of) their data; the writer thread
+    appends it to the scrape journal and then commits every result collected
+    within commit_window (up to max_batch items) in one transaction. The queue is
+    bounded, so a stalled disk slows scrapers down instead of growing memory.
+    Pending writes are flushed when the process exits.
+    """
+
+    def __init__(self, max_size=None, commit_window=None, max_batch=None):
+        self.commit_window = WRITE_COMMIT_WINDOW if commit_window is None else commit_window
+        self.max_batch = max(1, max_batch or WRITE_MAX_BATCH)
+        self._queue = queue.Queue(maxsize=max_size or WRITE_QUEUE_SIZE)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopped = False
+        self.batches = 0
+        self.items_written = 0
+
+    def submit(self, scraping_data, filename=None):
+        """Queue scraping data for the writer thread (blocks while the queue is full)"""
+        if self._stopped:
+            raise RuntimeError("write queue is shut down")
+        self._ensure_started()
+        with self._idle:
+            self._pending += 1
+        # Scrapers keep mutating their result dict after saving it; debtor
+        # lookups are shared with the submitting thread's sorgulama run
+        self._queue.put((copy.deepcopy(scraping_data), filename, current_borclu_resolver()))
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far is committed; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def shutdown(self, timeout=None):
+        """Flush pending writes and stop the writer thread"""
+        self._stopped = True
+        if self._thread is None:
+            return True
+        flushed = self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+        return flushed
+
+    def stats(self):
+        """Return queue depth and throughput numbers"""
+        return {
+            "pending": self._pending,
+            "queued": self._queue.qsize(),
+            "max_size": self._queue.maxsize,
+            "commit_window_seconds": self.commit_window,
+            "batches": self.batches,
+            "items_written": self.items_written
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='adalex-db-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            # Group commit: collect whatever arrives within the window
+            deadline = time.monotonic() + self.commit_window
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._idle:
+                    self._pending -= len(batch)
+                    self._idle.notify_all()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        logger = get_logger()
+        # Journal backup first, as save_scraping_data_to_db_and_json does; the
+        # whole batch is appended with one write
+        try:
+            scrape_journal.journal.append_many(
+                (scraping_data, scrape_journal.journal_source(filename)) for scraping_data, filename, _ in batch
+            )
+        except Exception as e:
+            logger.error(f"Failed to append data to the scrape journal: {e}")
+
+        try:
+            get_storage().write_scraping_batch([(scraping_data, resolver) for scraping_data, _, resolver in batch])
+            self.batches += 1
+            self.items_written += len(batch)
+            logger.info(f"Committed {len(batch)} queued scraping results")
+        except Exception as e:
+            logger.error(f"Error saving queued scraping data to database: {e}")
+
+# Process-wide writer used by the scrapers
+write_queue = WriteQueue()
+atexit.register(write_queue.shutdown)
+
+def enqueue_scraping_data(scraping_data, filename=None):
+    """
+    Hand scraping data to the background writer instead of saving it inline.
+
+    Same data shapes as database_writer.save_scraping_data_to_db_and_json;
+    call flush_writes() before reading the results back.
+    """
+    write_queue.submit(scraping_data, filename)
+
+def flush_writes(timeout=None):
+    """Wait until all queued scraping data is committed"""
+    return write_queue.flush(timeout)
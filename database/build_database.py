@@ -1,238 +1,332 @@
-import sqlite3
-from process_json_files import get_processed_data
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from process_json_files import (
+    DATA_DIR, json_files, sorgu_files, clean_borclu_name, name_tokens,
+    iter_main_rows, iter_sorgu_results, mernis_kimlik_adres
+)
+
+# Şema backend ile ortak: services.database_schema
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from services.database_connection import connect
+from services.database_schema import migrate
+from services.borclu_lookup import borclu_ad_key, split_borclu_adi
+from services.sorgu_payloads import encode_payload, payload_hash
+from services.sorgu_types import SORGU_TYPE_IDS, sorgu_type_id
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 DB_PATH = "files.db"
 
-def create_tables(conn):
-    """Tüm gerekli tabloları oluşturur ve indeksler ekler."""
-    # files tablosu
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS files (
-        file_id TEXT PRIMARY KEY,
-        klasor TEXT,
-        dosyaNo TEXT,
-        eYil INTEGER,
-        eNo INTEGER,
-        borcluAdi TEXT,
-        alacakliAdi TEXT,
-        foyTuru TEXT,
-        durum TEXT,
-        takipTarihi TEXT,
-        icraMudurlugu TEXT
-    );
-    """)
-    # file_details tablosu
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS file_details (
-        file_id TEXT PRIMARY KEY,
-        takipSekli TEXT,
-        takipYolu TEXT,
-        takipTuru TEXT,
-        alacakliVekili TEXT,
-        borcMiktari TEXT,
-        faizOrani TEXT,
-        guncelBorc TEXT,
-        sonOdeme TEXT,
-        FOREIGN KEY (file_id) REFERENCES files(file_id)
-    );
-    """)
-    # borclular tablosu
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS borclular (
-        borclu_id TEXT PRIMARY KEY,
-        file_id TEXT,
-        ad TEXT,
-        tcKimlik TEXT,
-        telefon TEXT,
-        adres TEXT,
-        vekil TEXT,
-        FOREIGN KEY (file_id) REFERENCES files(file_id)
-    );
-    """)
-    # borclu_sorgular tablosu
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS borclu_sorgular (
-        borclu_id TEXT,
-        sorgu_tipi TEXT,
-        sorgu_verisi TEXT,
-        timestamp TEXT,
-        PRIMARY KEY (borclu_id, sorgu_tipi),
-        FOREIGN KEY (borclu_id) REFERENCES borclular(borclu_id)
-    );
-    """)
-    # İndeksler
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_files_dosyaNo_icraMudurlugu ON files(dosyaNo, icraMudurlugu);")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_borclular_file_id ON borclular(file_id);")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_borclu_sorgular_borclu_id ON borclu_sorgular(borclu_id);")
-
-def upsert_files(conn, records):
-    insert_sql = """
-    INSERT INTO files (
-        file_id, klasor, dosyaNo, eYil, eNo, borcluAdi,
-        alacakliAdi, foyTuru, durum,
-        takipTarihi, icraMudurlugu
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+# Staging tablolarına bu kadar satır birikince tek executemany ile yazılır
+BATCH_SIZE = 1000
+
+FILE_COLUMNS = ("file_id", "klasor", "dosyaNo", "eYil", "eNo", "borcluAdi",
+                "alacakliAdi", "foyTuru", "durum", "takipTarihi", "icraMudurlugu")
+DETAIL_COLUMNS = ("file_id", "takipSekli", "takipYolu", "takipTuru", "alacakliVekili",
+                  "borcMiktari", "faizOrani", "guncelBorc", "sonOdeme")
+BORCLU_COLUMNS = ("borclu_id", "file_id", "dosyaNo", "ad", "ad_key", "tcKimlik", "telefon", "adres", "vekil")
+SORGU_COLUMNS = ("sorgu_id", "dosyaNo", "ad_key", "tc", "type_id", "payload_hash", "timestamp",
+                 "mernis_tc", "mernis_adres")
+PAYLOAD_COLUMNS = ("payload_hash", "encoding", "data")
+BORCLU_TOKEN_COLUMNS = ("dosyaNo", "token", "borclu_id", "token_count")
+SORGU_TOKEN_COLUMNS = ("dosyaNo", "token", "sorgu_id", "token_count")
+
+# import_data'nın satır sayısını raporladığı staging tabloları (eşleştirme tabloları hariç)
+STAGED_TABLES = ("stage_files", "stage_file_details", "stage_borclular", "stage_sorgular")
+
+STAGING_DDL = [
+    f"CREATE TEMP TABLE stage_files ({', '.join(FILE_COLUMNS)})",
+    f"CREATE TEMP TABLE stage_file_details ({', '.join(DETAIL_COLUMNS)})",
+    f"CREATE TEMP TABLE stage_borclular ({', '.join(BORCLU_COLUMNS)})",
+    f"CREATE TEMP TABLE stage_sorgular (sorgu_id INTEGER PRIMARY KEY, {', '.join(SORGU_COLUMNS[1:])})",
+    f"CREATE TEMP TABLE stage_borclu_tokens ({', '.join(BORCLU_TOKEN_COLUMNS)})",
+    f"CREATE TEMP TABLE stage_sorgu_tokens ({', '.join(SORGU_TOKEN_COLUMNS)})",
+    "CREATE TEMP TABLE stage_matches (sorgu_id INTEGER PRIMARY KEY, borclu_id)",
+    "CREATE TEMP TABLE stage_payloads (payload_hash PRIMARY KEY, encoding, data)",
+]
+
+# Staging bittikten sonra kurulur: toplu yazım indekssiz tabloya yapılır
+STAGING_INDEXES = [
+    "CREATE INDEX temp.idx_stage_borclular_ad_key ON stage_borclular(dosyaNo, ad_key)",
+    "CREATE INDEX temp.idx_stage_borclular_tc ON stage_borclular(dosyaNo, tcKimlik)",
+    "CREATE INDEX temp.idx_stage_borclu_tokens ON stage_borclu_tokens(dosyaNo, token)",
+]
+
+# Sorgu sonucu -> borçlu eşleşmesi, aynı dosya içinde ve hepsi indeksli:
+#   1. ad_key birebir aynı
+#   2. bulunamazsa: adlardan birinin kelimeleri diğerinin kelimelerinin alt kümesi
+#      (kelime indeksi üzerinden; eskiden dosyadaki her borçluyla instr() karşılaştırılıyordu)
+#   3. MERNİS'ten tcKimlik'i öğrenilen borçlular için, sorgu anahtarındaki TC adın önüne geçer
+MATCH_SQL = [
     """
-    update_sql = """
-    UPDATE files SET
-        klasor = ?,
-        eYil = ?,
-        eNo = ?,
-        borcluAdi = ?,
-        alacakliAdi = ?,
-        foyTuru = ?,
-        durum = ?,
-        takipTarihi = ?,
-        icraMudurlugu = ?
-    WHERE dosyaNo = ? AND icraMudurlugu = ?;
+    INSERT INTO stage_matches (sorgu_id, borclu_id)
+    SELECT s.sorgu_id, MIN(b.borclu_id)
+    FROM stage_sorgular s JOIN stage_borclular b ON b.dosyaNo = s.dosyaNo AND b.ad_key = s.ad_key
+    GROUP BY s.sorgu_id
+    """,
     """
-    select_sql = """
-    SELECT 1 FROM files WHERE dosyaNo = ? AND icraMudurlugu = ?;
+    INSERT INTO stage_matches (sorgu_id, borclu_id)
+    SELECT sorgu_id, MIN(borclu_id) FROM (
+        SELECT st.sorgu_id, bt.borclu_id
+        FROM stage_sorgu_tokens st
+        JOIN stage_borclu_tokens bt ON bt.dosyaNo = st.dosyaNo AND bt.token = st.token
+        WHERE st.sorgu_id NOT IN (SELECT sorgu_id FROM stage_matches)
+        GROUP BY st.sorgu_id, bt.borclu_id
+        HAVING COUNT(*) = MAX(st.token_count) OR COUNT(*) = MAX(bt.token_count)
+    )
+    GROUP BY sorgu_id
+    """,
+    f"""
+    UPDATE stage_borclular SET tcKimlik = s.mernis_tc, adres = s.mernis_adres
+    FROM stage_matches m JOIN stage_sorgular s ON s.sorgu_id = m.sorgu_id
+    WHERE m.borclu_id = stage_borclular.borclu_id AND s.type_id = {SORGU_TYPE_IDS['MERNİS']}
+    """,
     """
+    INSERT OR REPLACE INTO stage_matches (sorgu_id, borclu_id)
+    SELECT s.sorgu_id, MIN(b.borclu_id)
+    FROM stage_sorgular s JOIN stage_borclular b ON b.dosyaNo = s.dosyaNo AND b.tcKimlik = s.tc
+    WHERE s.tc IS NOT NULL
+    GROUP BY s.sorgu_id
+    """,
+]
 
-    for rec in records:
-        cur = conn.execute(select_sql, (rec['dosyaNo'], rec['icraMudurlugu']))
-        exists = cur.fetchone()
-        if exists:
-            conn.execute(update_sql, (
-                rec['klasor'], rec.get('eYil'), rec.get('eNo'), rec['borcluAdi'], rec['alacakliAdi'],
-                rec['foyTuru'], rec['durum'], rec['takipTarihi'],
-                rec['icraMudurlugu'], rec['dosyaNo'], rec['icraMudurlugu']
-            ))
-        else:
-            try:
-                conn.execute(insert_sql, (
-                    rec['file_id'], rec['klasor'], rec['dosyaNo'],
-                    rec.get('eYil'), rec.get('eNo'), rec['borcluAdi'], rec['alacakliAdi'], rec['foyTuru'],
-                    rec['durum'], rec['takipTarihi'], rec['icraMudurlugu']
-                ))
-            except sqlite3.IntegrityError as e:
-                print(f"Files: Kayıt eklenemedi, file_id çakıştı: {rec['file_id']} - Hata: {str(e)}")
-
-def upsert_file_details(conn, records):
-    insert_sql = """
-    INSERT INTO file_details (
-        file_id, takipSekli, takipYolu, takipTuru, alacakliVekili,
-        borcMiktari, faizOrani, guncelBorc, sonOdeme
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
-    """
-    update_sql = """
-    UPDATE file_details SET
-        takipSekli = ?,
-        takipYolu = ?,
-        takipTuru = ?,
-        alacakliVekili = ?,
-        borcMiktari = ?,
-        faizOrani = ?,
-        guncelBorc = ?,
-        sonOdeme = ?
-    WHERE file_id = ?;
+FILE_CONFLICTS_SQL = """
+SELECT s.file_id FROM stage_files s
+WHERE NOT EXISTS (SELECT 1 FROM files f WHERE f.dosyaNo = s.dosyaNo AND f.icraMudurlugu = s.icraMudurlugu)
+  AND EXISTS (SELECT 1 FROM files f WHERE f.file_id = s.file_id)
+"""
+
+# Aynı (dosyaNo, icraMudurlugu) varsa güncellenir, yoksa staging'deki file_id ile eklenir
+MERGE_SQL = [
     """
-    select_sql = """
-    SELECT 1 FROM file_details WHERE file_id = ?;
+    UPDATE files SET
+        klasor = s.klasor, eYil = s.eYil, eNo = s.eNo, borcluAdi = s.borcluAdi,
+        alacakliAdi = s.alacakliAdi, foyTuru = s.foyTuru, durum = s.durum, takipTarihi = s.takipTarihi
+    FROM stage_files s
+    WHERE files.dosyaNo = s.dosyaNo AND files.icraMudurlugu = s.icraMudurlugu
+    """,
+    f"""
+    INSERT INTO files ({', '.join(FILE_COLUMNS)})
+    SELECT {', '.join('s.' + c for c in FILE_COLUMNS)} FROM stage_files s
+    WHERE NOT EXISTS (SELECT 1 FROM files f WHERE f.dosyaNo = s.dosyaNo AND f.icraMudurlugu = s.icraMudurlugu)
+    ORDER BY s.rowid
+    ON CONFLICT(file_id) DO NOTHING
+    """,
+    f"""
+    INSERT INTO file_details ({', '.join(DETAIL_COLUMNS)})
+    SELECT {', '.join(DETAIL_COLUMNS)} FROM stage_file_details WHERE true ORDER BY rowid
+    ON CONFLICT(file_id) DO UPDATE SET
+        {', '.join(f'{c} = excluded.{c}' for c in DETAIL_COLUMNS[1:])}
+    """,
     """
-
-    for rec in records:
-        cur = conn.execute(select_sql, (rec['file_id'],))
-        exists = cur.fetchone()
-        if exists:
-            conn.execute(update_sql, (
-                rec['takipSekli'], rec['takipYolu'], rec['takipTuru'], rec['alacakliVekili'],
-                rec['borcMiktari'], rec['faizOrani'],
-                rec['guncelBorc'], rec['sonOdeme'],
-                rec['file_id']
-            ))
-        else:
-            try:
-                conn.execute(insert_sql, (
-                    rec['file_id'], rec['takipSekli'], rec['takipYolu'], rec['takipTuru'], rec['alacakliVekili'],
-                    rec['borcMiktari'], rec['faizOrani'],
-                    rec['guncelBorc'], rec['sonOdeme']
-                ))
-            except sqlite3.IntegrityError as e:
-                print(f"File_details: Kayıt eklenemedi, file_id çakıştı: {rec['file_id']} - Hata: {str(e)}")
-
-def upsert_borclular(conn, records):
-    insert_sql = """
-    INSERT INTO borclular (
-        borclu_id, file_id, ad, tcKimlik,
-        telefon, adres, vekil
-    ) VALUES (?, ?, ?, ?, ?, ?, ?);
+    INSERT INTO borclular (borclu_id, file_id, ad, ad_key, tcKimlik, telefon, adres, vekil)
+    SELECT borclu_id, file_id, ad, ad_key, tcKimlik, telefon, adres, vekil FROM stage_borclular WHERE true ORDER BY rowid
+    ON CONFLICT(borclu_id) DO UPDATE SET
+        ad = excluded.ad, ad_key = excluded.ad_key, tcKimlik = excluded.tcKimlik,
+        telefon = excluded.telefon, adres = excluded.adres, vekil = excluded.vekil
+    """,
     """
-    update_sql = """
-    UPDATE borclular SET
-        ad = ?,
-        tcKimlik = ?,
-        telefon = ?,
-        adres = ?,
-        vekil = ?
-    WHERE borclu_id = ?;
+    INSERT INTO sorgu_payloads (payload_hash, encoding, data)
+    SELECT payload_hash, encoding, data FROM stage_payloads WHERE true
+    ON CONFLICT(payload_hash) DO NOTHING
+    """,
+    # İçeriği değişmemiş sorgu sonucu hiç yazılmaz (tarihçeye yeni sürüm de düşmez)
     """
-    select_sql = """
-    SELECT 1 FROM borclular WHERE borclu_id = ?;
+    INSERT INTO borclu_sorgular (borclu_id, type_id, payload_hash, timestamp)
+    SELECT m.borclu_id, s.type_id, s.payload_hash, s.timestamp
+    FROM stage_sorgular s JOIN stage_matches m ON m.sorgu_id = s.sorgu_id
+    WHERE true
+    ORDER BY s.sorgu_id
+    ON CONFLICT(borclu_id, type_id) DO UPDATE SET
+        sorgu_verisi = NULL, payload_hash = excluded.payload_hash, timestamp = excluded.timestamp
+    WHERE borclu_sorgular.payload_hash IS NOT excluded.payload_hash
+    """,
+]
+
+def create_tables(conn):
+    """Şemayı backend'deki sürümlü migration'larla oluşturur/günceller (tek kaynak: services/database_schema.py)."""
+    migrate(conn)
+
+class _Stager:
+    """Satırları tablo başına biriktirip BATCH_SIZE'da bir staging tablosuna yazar"""
+
+    def __init__(self, conn, batch_size=BATCH_SIZE):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.pending = {}
+        self.counts = {}
+        self.last_sorgu_id = 0
+        self.payload_hashes = set()
+        self.type_ids = {}
+
+    def type_id(self, sorgu_tipi):
+        """Sorgu tipinin kayıt defterindeki type_id'si (bilinmeyen tip aynı transaction'da kaydedilir)"""
+        if sorgu_tipi not in self.type_ids:
+            self.type_ids[sorgu_tipi] = sorgu_type_id(self.conn, sorgu_tipi)
+        return self.type_ids[sorgu_tipi]
+
+    def add(self, table, columns, row):
+        rows = self.pending.setdefault((table, columns), [])
+        rows.append(tuple(row[c] for c in columns))
+        if len(rows) >= self.batch_size:
+            self.flush(table, columns)
+
+    def flush(self, table, columns):
+        rows = self.pending.pop((table, columns), [])
+        if rows:
+            self.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+            )
+            self.counts[table] = self.counts.get(table, 0) + len(rows)
+
+    def flush_all(self):
+        for table, columns in list(self.pending):
+            self.flush(table, columns)
+
+def stage_main_rows(stager, main_rows):
+    """process_main_row çıktılarını staging tablolarına yazar"""
+    for file_row, detail_row, borclu_rows in main_rows:
+        stager.add("stage_files", FILE_COLUMNS, file_row)
+        stager.add("stage_file_details", DETAIL_COLUMNS, detail_row)
+        for borclu in borclu_rows:
+            ad_key = borclu_ad_key(borclu["ad"])
+            stager.add("stage_borclular", BORCLU_COLUMNS, dict(borclu, ad_key=ad_key))
+            tokens = name_tokens(ad_key)
+            for token in tokens:
+                stager.add("stage_borclu_tokens", BORCLU_TOKEN_COLUMNS, {
+                    "dosyaNo": borclu["dosyaNo"], "token": token,
+                    "borclu_id": borclu["borclu_id"], "token_count": len(tokens)
+                })
+
+def stage_sorgu_results(stager, results, timestamp):
     """
+    iter_sorgu_results çıktılarını staging tablosuna yazar.
 
-    for rec in records:
-        cur = conn.execute(select_sql, (rec['borclu_id'],))
-        exists = cur.fetchone()
-        if exists:
-            conn.execute(update_sql, (
-                rec['ad'], rec['tcKimlik'], rec['telefon'],
-                rec['adres'], rec['vekil'], rec['borclu_id']
-            ))
-        else:
-            try:
-                conn.execute(insert_sql, (
-                    rec['borclu_id'], rec['file_id'], rec['ad'],
-                    rec['tcKimlik'], rec['telefon'], rec['adres'],
-                    rec['vekil']
-                ))
-            except sqlite3.IntegrityError as e:
-                print(f"Borclular: Kayıt eklenemedi, borclu_id çakıştı: {rec['borclu_id']} - Hata: {str(e)}")
-
-def upsert_borclu_sorgular(conn, records):
-    insert_sql = """
-    INSERT INTO borclu_sorgular (
-        borclu_id, sorgu_tipi, sorgu_verisi, timestamp
-    ) VALUES (?, ?, ?, ?);
+    Anahtardaki ad ve TC ile adın kelimeleri eşleştirme için ayrıca yazılır;
+    MERNİS sonucundan tcKimlik/adres çıkarılır. Sorgu verisi hash'iyle
+    (services/sorgu_payloads.py) bir kez, gerekirse sıkıştırılarak yazılır.
+    Sorgu tipi, services/sorgu_types.py kayıt defterindeki type_id'siyle yazılır.
     """
-    update_sql = """
-    UPDATE borclu_sorgular SET
-        sorgu_verisi = ?,
-        timestamp = ?
-    WHERE borclu_id = ? AND sorgu_tipi = ?;
+    for dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi in results:
+        type_id = stager.type_id(sorgu_tipi)
+        mernis_tc, mernis_adres = (
+            mernis_kimlik_adres(sorgu_verisi.get("sonuc", {}))
+            if type_id == SORGU_TYPE_IDS["MERNİS"] and isinstance(sorgu_verisi, dict)
+            else (None, None)
+        )
+        stager.last_sorgu_id += 1
+        sorgu_id = stager.last_sorgu_id
+        ad_key = borclu_ad_key(clean_borclu_name(borclu_adi))
+        tokens = name_tokens(ad_key)
+        for token in tokens:
+            stager.add("stage_sorgu_tokens", SORGU_TOKEN_COLUMNS, {
+                "dosyaNo": dosya_no, "token": token, "sorgu_id": sorgu_id, "token_count": len(tokens)
+            })
+        text = json.dumps(sorgu_verisi, ensure_ascii=False)
+        key = payload_hash(text)
+        if key not in stager.payload_hashes:
+            stager.payload_hashes.add(key)
+            encoding, data = encode_payload(text)
+            stager.add("stage_payloads", PAYLOAD_COLUMNS, {"payload_hash": key, "encoding": encoding, "data": data})
+        stager.add("stage_sorgular", SORGU_COLUMNS, {
+            "sorgu_id": sorgu_id,
+            "dosyaNo": dosya_no,
+            "ad_key": ad_key,
+            "tc": split_borclu_adi(borclu_adi)[1],
+            "type_id": type_id,
+            "payload_hash": key,
+            "timestamp": timestamp,
+            "mernis_tc": mernis_tc,
+            "mernis_adres": mernis_adres,
+        })
+
+def import_data(conn, data_dir=None, main_files=None, sorgu_file_names=None):
     """
-    select_sql = """
-    SELECT 1 FROM borclu_sorgular WHERE borclu_id = ? AND sorgu_tipi = ?;
+    JSON arşivini tek transaction'da veritabanına aktarır.
+
+    Dosyalar iter_json_items ile akış halinde okunup TEMP staging tablolarına
+    yazılır, sonra her tablo tek bir set-based INSERT ... ON CONFLICT ile
+    birleştirilir. Sorgu sonuçları dosyanın değiştirilme zamanıyla damgalanır.
+    Tablo başına staging'e yazılan satır sayılarını döndürür.
     """
+    data_dir = Path(data_dir or DATA_DIR)
+    main_files = json_files if main_files is None else main_files
+    sorgu_file_names = sorgu_files if sorgu_file_names is None else sorgu_file_names
+
+    # Staging tabloları büyük olabilir: bağlantının varsayılan temp_store = MEMORY yerine diske yazılır
+    conn.execute("PRAGMA temp_store = FILE")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for ddl in STAGING_DDL:
+            conn.execute(ddl)
+        stager = _Stager(conn)
+
+        for fname in main_files:
+            stage_main_rows(stager, iter_main_rows(fname, data_dir))
+        for fname in sorgu_file_names:
+            path = data_dir / fname
+            if not path.exists():
+                print(f"Uyarı: {fname} dosyası bulunamadı, atlanıyor.")
+                continue
+            timestamp = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+            stage_sorgu_results(stager, iter_sorgu_results(fname, data_dir), timestamp)
+        stager.flush_all()
+        for sql in STAGING_INDEXES:
+            conn.execute(sql)
+
+        for sql in MATCH_SQL:
+            conn.execute(sql)
+        for (file_id,) in conn.execute(FILE_CONFLICTS_SQL).fetchall():
+            print(f"Files: Kayıt eklenemedi, file_id çakıştı: {file_id}")
+        for sql in MERGE_SQL:
+            conn.execute(sql)
 
-    for rec in records:
-        cur = conn.execute(select_sql, (rec['borclu_id'], rec['sorgu_tipi']))
-        exists = cur.fetchone()
-        if exists:
-            conn.execute(update_sql, (
-                rec['sorgu_verisi'], rec['timestamp'], rec['borclu_id'], rec['sorgu_tipi']
-            ))
-        else:
-            try:
-                conn.execute(insert_sql, (
-                    rec['borclu_id'], rec['sorgu_tipi'], rec['sorgu_verisi'], rec['timestamp']
-                ))
-            except sqlite3.IntegrityError as e:
-                print(f"Borclu_sorgular: Kayıt eklenemedi, borclu_id: {rec['borclu_id']}, sorgu_tipi: {rec['sorgu_tipi']} - Hata: {str(e)}")
-
-def main():
-    data = get_processed_data()
-    conn = sqlite3.connect(DB_PATH)
-    create_tables(conn)
-    upsert_files(conn, data["files"])
-    upsert_file_details(conn, data["file_details"])
-    upsert_borclular(conn, data["borclular"])
-    upsert_borclu_sorgular(conn, data["borclu_sorgular"])
+        for table in ("stage_matches", "stage_payloads", "stage_sorgu_tokens", "stage_borclu_tokens") + STAGED_TABLES:
+            conn.execute(f"DROP TABLE temp.{table}")
+    except BaseException:
+        conn.rollback()
+        raise
     conn.commit()
-    conn.close()
-    print(f"Veritabanı oluşturuldu/güncellendi: {DB_PATH}")
-    print(f"{len(data['files'])} dosya, {len(data['file_details'])} detay, {len(data['borclular'])} borçlu, {len(data['borclu_sorgular'])} sorgu işlendi.")
+    return {table: stager.counts.get(table, 0) for table in STAGED_TABLES}
+
+def peak_rss_mb():
+    """Sürecin en yüksek bellek kullanımı (MB); ölçülemiyorsa None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte cinsinden verir
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON arşivinden files.db'yi oluşturur/günceller.")
+    parser.add_argument('--db', default=DB_PATH, help=f"hedef veritabanı (varsayılan: {DB_PATH})")
+    parser.add_argument('--data-dir', default=str(DATA_DIR), help=f"JSON klasörü (varsayılan: {DATA_DIR})")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db, isolation_level=None)
+    try:
+        create_tables(conn)
+        started = time.perf_counter()
+        counts = import_data(conn, data_dir=args.data_dir)
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    rows = sum(counts.values())
+    print(f"Veritabanı oluşturuldu/güncellendi: {args.db}")
+    print(f"{counts.get('stage_files', 0)} dosya, {counts.get('stage_file_details', 0)} detay, "
+          f"{counts.get('stage_borclular', 0)} borçlu, {counts.get('stage_sorgular', 0)} sorgu işlendi.")
+    rss = peak_rss_mb()
+    print(f"{rows} satır {elapsed:.2f} sn'de aktarıldı ({rows / elapsed if elapsed else 0:.0f} satır/sn)"
+          + (f", en yüksek bellek: {rss:.1f} MB" if rss is not None else ""))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for files.db
+
+    python database/maintenance.py backup BACKUP.db   # online backup, API keeps serving
+    python database/maintenance.py analyze            # refresh planner statistics
+    python database/maintenance.py vacuum [--enable]  # give free pages back to the file system
+    python database/maintenance.py check [--full]     # integrity and foreign key check
+    python database/maintenance.py truncate           # delete all data and reclaim the space
+    python database/maintenance.py archive            # move closed files to archive.db
+    python database/maintenance.py replicate          # keep database/replica/files.db up to date
+    python database/maintenance.py schedule           # analyze + vacuum every --interval seconds
+
+Every command logs its elapsed time and how many bytes the database file
+(including its WAL) shrank by.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+
+# Connection settings are shared with the backend: services.database_connection
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from services.database_connection import connect
+from services.database_schema import ensure_schema, rekey_sorgu_tables
+from services.archive import ACTIVE_DURUMLAR, ARCHIVE_TABLES, archive_path
+from services.replica import REPLICA_INTERVAL, Replicator
+
+# Database path
+DB_PATH = os.path.join(os.path.dirname(__file__), 'files.db')
+
+# Pages copied per backup step; other connections can write between steps
+BACKUP_STEP_PAGES = 1024
+
+# Data tables in delete order (children before parents). Asset tables and the
+# search index are cleared by their triggers; db_counters are kept so data_version
+# keeps increasing and file_ids are not reused.
+DATA_TABLES = ['borclu_sorgu_history', 'borclu_sorgular', 'sorgu_payloads', 'borclular', 'file_details', 'files']
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+def get_logger():
+    """Get logger for maintenance commands"""
+    logger = logging.getLogger('maintenance')
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+def database_size(db_path):
+    """Size of the database file plus its WAL, in bytes"""
+    return sum(os.path.getsize(path) for path in (db_path, db_path + '-wal') if os.path.exists(path))
+
+def _checkpoint(conn):
+    """Copy the WAL into the database file and truncate the WAL to zero bytes"""
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+def _incremental_vacuum(conn, pages=None):
+    """Free up to pages free pages (all when None)"""
+    # Each step frees one page and returns no row, so Cursor.execute would stop after
+    # the first page; executescript runs the statement to completion
+    conn.executescript(f"PRAGMA incremental_vacuum({int(pages or 0)});")
+
+class _Run:
+    """Times one command and reports how much the database shrank"""
+
+    def __init__(self, name, db_path):
+        self.name = name
+        self.db_path = db_path
+        self.result = {'command': name}
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.size_before = database_size(self.db_path)
+        return self.result
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            return False
+        size_after = database_size(self.db_path)
+        self.result.update(
+            elapsed=time.perf_counter() - self.started,
+            bytes_before=self.size_before,
+            bytes_after=size_after,
+            bytes_reclaimed=self.size_before - size_after,
+        )
+        get_logger().info(
+            f"{self.name}: {self.result['elapsed']:.2f} s, {self.result['bytes_reclaimed']} bytes reclaimed "
+            f"({self.size_before} -> {size_after} bytes)"
+        )
+        return False
+
+def backup(db_path, dest_path, step_pages=BACKUP_STEP_PAGES, sleep=0.0):
+    """
+    Copy the database to dest_path with the SQLite online backup API.
+
+    The copy is taken step_pages at a time, so API readers and the scraper
+    writer keep working. It is written next to dest_path and renamed into place
+    once complete, so dest_path is never a half-written database.
+    """
+    tmp_path = dest_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    with _Run('backup', db_path) as result:
+        source = connect(db_path, isolation_level=None)
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target, pages=step_pages, sleep=sleep)
+            # The copy must be a self-contained file, not a WAL database missing its -wal
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+            source.close()
+        os.replace(tmp_path, dest_path)
+        result['backup_path'] = dest_path
+        result['backup_bytes'] = os.path.getsize(dest_path)
+    return result
+
+def analyze(db_path):
+    """Rebuild the planner statistics (sqlite_stat1) and let PRAGMA optimize do the rest"""
+    with _Run('analyze', db_path) as result:
+        conn = connect(db_path, isolation_level=None)
+        try:
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+            result['stat_rows'] = conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]
+        finally:
+            conn.close()
+    return result
+
+def vacuum(db_path, pages=None, enable=False):
+    """
+    Return free pages to the file system.
+
+    With auto_vacuum=INCREMENTAL (the default for new databases) this runs
+    PRAGMA incremental_vacuum, which is quick and only holds the write lock
+    briefly; pages limits how many free pages are released. Older databases
+    must be converted once with enable=True, which runs a full VACUUM that
+    blocks writers while the file is rebuilt.
+    """
+    with _Run('vacuum', db_path) as result:
+        conn = connect(db_path, isolation_level=None)
+        try:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            result['freelist_before'] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if mode == AUTO_VACUUM_INCREMENTAL:
+                _incremental_vacuum(conn, pages)
+            elif enable:
+                conn.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+                conn.execute("VACUUM")
+            else:
+                raise RuntimeError("auto_vacuum is not INCREMENTAL; run 'vacuum --enable' once to convert the database")
+            _checkpoint(conn)
+            result['auto_vacuum'] = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            result['freelist_after'] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+    return result
+
+def _dangling_keys(conn, table, parent, fkid):
+    """Primary keys (as dicts) of the table's rows whose foreign key fkid has no parent row"""
+    references = [row for row in conn.execute(f"PRAGMA foreign_key_list({table})") if row[0] == fkid]
+    key_columns = [row[1] for row in sorted(conn.execute(f"PRAGMA table_info({table})"), key=lambda row: row[5]) if row[5]]
+    join = " AND ".join(f"p.{row[4]} = t.{row[3]}" for row in references)
+    rows = conn.execute(
+        f"SELECT {', '.join('t.' + column for column in key_columns)} FROM {table} t "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {parent} p WHERE {join})"
+    ).fetchall()
+    return [dict(zip(key_columns, row)) for row in rows]
+
+def check(db_path, full=False):
+    """
+    Check the database for corruption and dangling foreign keys.
+
+    PRAGMA quick_check skips the index-content comparison of integrity_check
+    and is much faster on large files; full=True runs integrity_check.
+    result['ok'] is False if either check reports a problem.
+    """
+    with _Run('check', db_path) as result:
+        conn = connect(db_path, isolation_level=None)
+        try:
+            pragma = "integrity_check" if full else "quick_check"
+            problems = [row[0] for row in conn.execute(f"PRAGMA {pragma}")]
+            result['integrity'] = [] if problems == ['ok'] else problems
+            result['foreign_keys'] = [tuple(row) for row in conn.execute("PRAGMA foreign_key_check")]
+            result['ok'] = not result['integrity'] and not result['foreign_keys']
+            # WITHOUT ROWID tables (borclu_sorgular) report no rowid; name their rows by primary key
+            dangling = {}
+            for table, rowid, parent, fkid in result['foreign_keys']:
+                if rowid is None and (table, parent, fkid) not in dangling:
+                    dangling[(table, parent, fkid)] = _dangling_keys(conn, table, parent, fkid)
+        finally:
+            conn.close()
+    logger = get_logger()
+    for problem in result['integrity']:
+        logger.error(f"Integrity: {problem}")
+    for table, rowid, parent, _ in result['foreign_keys']:
+        if rowid is not None:
+            logger.error(f"Foreign key: {table} row {rowid} has no {parent} parent")
+    for (table, parent, _), keys in dangling.items():
+        for key in keys:
+            columns = ", ".join(f"{column}={value!r}" for column, value in key.items())
+            logger.error(f"Foreign key: {table} row ({columns}) has no {parent} parent")
+    return result
+
+def truncate(db_path):
+    """
+    Delete all data in one transaction and give the space back.
+
+    Incremental databases release their free pages with incremental_vacuum;
+    others are rebuilt with VACUUM.
+    """
+    logger = get_logger()
+    ensure_schema(db_path)
+    with _Run('truncate', db_path) as result:
+        conn = connect(db_path, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = {}
+                for table in DATA_TABLES:
+                    deleted[table] = conn.execute(f"DELETE FROM {table}").rowcount
+                    logger.info(f"Cleared {deleted[table]} rows from table '{table}'")
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            result['deleted'] = deleted
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+                _incremental_vacuum(conn)
+            else:
+                conn.execute("VACUUM")
+            _checkpoint(conn)
+        finally:
+            conn.close()
+    return result
+
+# Closed files: durum set, and not one of ACTIVE_DURUMLAR
+CLOSED_FILES_SQL = f"""
+SELECT file_id FROM hot.files
+WHERE IFNULL(durum, '') != '' AND durum NOT IN ({', '.join('?' for _ in ACTIVE_DURUMLAR)})
+"""
+
+def _columns(conn, schema, table):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+def _create_archive_tables(conn):
+    """
+    Create the archive tables (and their indexes) from the hot schema.
+
+    Only tables, not triggers: archive.db has no search index, asset tables or
+    counters. Columns added to the hot tables by later migrations are added here
+    too, so rows can always be copied column for column. An archive written
+    before the sorgu tables were keyed on type_id is rekeyed through the hot
+    sorgu_types registry.
+    """
+    archived = _columns(conn, 'main', 'borclu_sorgular')
+    if archived and 'type_id' not in archived:
+        rekey_sorgu_tables(conn.cursor(), schema='main', registry='hot')
+    existing = {row[0] for row in conn.execute("SELECT name FROM main.sqlite_master")}
+    placeholders = ", ".join("?" for _ in ARCHIVE_TABLES)
+    for name, sql in conn.execute(
+        f"SELECT name, sql FROM hot.sqlite_master WHERE type IN ('table', 'index') AND sql IS NOT NULL "
+        f"AND tbl_name IN ({placeholders}) ORDER BY type DESC", ARCHIVE_TABLES
+    ).fetchall():
+        if name not in existing:
+            conn.execute(sql)
+    for table in ARCHIVE_TABLES:
+        archived = set(_columns(conn, 'main', table))
+        for row in conn.execute(f"PRAGMA hot.table_info({table})").fetchall():
+            if row[1] not in archived:
+                conn.execute(f"ALTER TABLE main.{table} ADD COLUMN {row[1]} {row[2]}")
+
+def _move_closed_files(conn):
+    """Copy the closed files and everything hanging off them into main (archive.db), then delete them from hot"""
+    conn.execute(f"CREATE TEMP TABLE archive_file_ids AS {CLOSED_FILES_SQL}", ACTIVE_DURUMLAR)
+    conn.execute("CREATE TEMP TABLE archive_borclu_ids AS "
+                 "SELECT borclu_id FROM hot.borclular WHERE file_id IN (SELECT file_id FROM archive_file_ids)")
+    conn.execute("""
+    CREATE TEMP TABLE archive_payload_hashes AS
+    SELECT payload_hash FROM hot.borclu_sorgular WHERE borclu_id IN (SELECT borclu_id FROM archive_borclu_ids)
+    UNION
+    SELECT payload_hash FROM hot.borclu_sorgu_history WHERE borclu_id IN (SELECT borclu_id FROM archive_borclu_ids)
+    """)
+    moved = {}
+    scopes = {
+        'files': "file_id IN (SELECT file_id FROM archive_file_ids)",
+        'file_details': "file_id IN (SELECT file_id FROM archive_file_ids)",
+        'borclular': "borclu_id IN (SELECT borclu_id FROM archive_borclu_ids)",
+        'borclu_sorgular': "borclu_id IN (SELECT borclu_id FROM archive_borclu_ids)",
+        'borclu_sorgu_history': "borclu_id IN (SELECT borclu_id FROM archive_borclu_ids)",
+        'sorgu_payloads': "payload_hash IN (SELECT payload_hash FROM archive_payload_hashes)",
+    }
+    for table in ARCHIVE_TABLES:
+        columns = _columns(conn, 'hot', table)
+        if table == 'borclu_sorgu_history':
+            # version_id is a rowid and may be reused in files.db; versions are unique per timestamp
+            columns.remove('version_id')
+            conn.execute(f"""
+            INSERT INTO main.{table} ({', '.join(columns)})
+            SELECT {', '.join('h.' + c for c in columns)} FROM hot.{table} h
+            WHERE h.{scopes[table]} AND NOT EXISTS (
+                SELECT 1 FROM main.{table} a
+                WHERE a.borclu_id = h.borclu_id AND a.type_id = h.type_id AND a.timestamp IS h.timestamp
+            )
+            ORDER BY h.version_id
+            """)
+        else:
+            verb = "INSERT OR IGNORE" if table == 'sorgu_payloads' else "INSERT OR REPLACE"
+            conn.execute(f"{verb} INTO main.{table} ({', '.join(columns)}) "
+                         f"SELECT {', '.join(columns)} FROM hot.{table} WHERE {scopes[table]}")
+
+    # Children first; the hot triggers keep counters, search index and asset tables in step
+    for table in reversed(ARCHIVE_TABLES[:-1]):
+        moved[table] = conn.execute(f"DELETE FROM hot.{table} WHERE {scopes[table]}").rowcount
+    # Payloads still used by a hot row (shared "kayıt bulunamadı" results) stay
+    moved['sorgu_payloads'] = conn.execute(f"""
+    DELETE FROM hot.sorgu_payloads WHERE {scopes['sorgu_payloads']}
+    AND payload_hash NOT IN (
+        SELECT payload_hash FROM hot.borclu_sorgular WHERE payload_hash IS NOT NULL
+        UNION
+        SELECT payload_hash FROM hot.borclu_sorgu_history WHERE payload_hash IS NOT NULL
+    )
+    """).rowcount
+    for table in ('archive_file_ids', 'archive_borclu_ids', 'archive_payload_hashes'):
+        conn.execute(f"DROP TABLE temp.{table}")
+    return moved
+
+def archive(db_path, archive_db=None):
+    """
+    Move closed files with their details, debtors, sorgu results, history and
+    payloads from db_path into the archive database, in one transaction.
+
+    Running it again only moves files closed since the last run. The hot file
+    gives the freed pages back (incremental vacuum). result['moved'] counts the
+    rows deleted from db_path per table.
+
+    The connection opens archive.db as main and attaches files.db: SQLite has
+    no cross-file atomic commit for WAL databases and commits main first, so a
+    crash during commit can leave a file in both databases (the next run
+    replaces the copy), never in neither.
+    """
+    logger = get_logger()
+    archive_db = archive_db or archive_path(db_path)
+    ensure_schema(db_path)
+    with _Run('archive', db_path) as result:
+        conn = connect(archive_db, isolation_level=None)
+        try:
+            conn.execute("ATTACH DATABASE ? AS hot", (db_path,))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                _create_archive_tables(conn)
+                moved = _move_closed_files(conn)
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            conn.execute("DETACH DATABASE hot")
+            _checkpoint(conn)
+        finally:
+            conn.close()
+        for table, count in moved.items():
+            logger.info(f"Archived {count} rows from table '{table}'")
+        result['moved'] = moved
+        result['archive_path'] = archive_db
+
+        conn = connect(db_path, isolation_level=None)
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+                _incremental_vacuum(conn)
+            _checkpoint(conn)
+        finally:
+            conn.close()
+    return result
+
+def replicate(db_path, replica=None, interval=REPLICA_INTERVAL, runs=None):
+    """Copy the database into its read replica whenever it changed, every interval seconds (see services/replica.py)"""
+    ensure_schema(db_path)
+    replicator = Replicator(db_path, replica)
+    try:
+        replicator.run(interval, runs=runs)
+    finally:
+        replicator.close()
+    return replicator
+
+def schedule(db_path, interval, pages=None, runs=None):
+    """Run analyze and an incremental vacuum every interval seconds (runs times, or forever)"""
+    count = 0
+    while runs is None or count < runs:
+        if count:
+            time.sleep(interval)
+        analyze(db_path)
+        vacuum(db_path, pages=pages)
+        count += 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="files.db maintenance")
+    parser.add_argument('--db', default=DB_PATH, help=f"database (default: {DB_PATH})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    backup_parser = commands.add_parser('backup', help="online backup that does not block the API")
+    backup_parser.add_argument('dest', help="backup file to write")
+    backup_parser.add_argument('--step-pages', type=int, default=BACKUP_STEP_PAGES, help="pages copied per step")
+    backup_parser.add_argument('--sleep', type=float, default=0.0, help="seconds to pause between steps")
+
+    commands.add_parser('analyze', help="ANALYZE and PRAGMA optimize")
+
+    vacuum_parser = commands.add_parser('vacuum', help="incremental vacuum")
+    vacuum_parser.add_argument('--pages', type=int, help="free at most this many pages (default: all)")
+    vacuum_parser.add_argument('--enable', action='store_true', help="convert the database to auto_vacuum=INCREMENTAL (full VACUUM)")
+
+    check_parser = commands.add_parser('check', help="quick integrity and foreign key check")
+    check_parser.add_argument('--full', action='store_true', help="run the slower PRAGMA integrity_check")
+
+    commands.add_parser('truncate', help="delete all data and reclaim the space")
+
+    archive_parser = commands.add_parser('archive', help="move closed files to the archive database")
+    archive_parser.add_argument('--archive', help="archive database (default: archive.db next to --db)")
+
+    replicate_parser = commands.add_parser('replicate', help="keep the read replica up to date")
+    replicate_parser.add_argument('--replica', help="replica database (default: database/replica/<name of --db>)")
+    replicate_parser.add_argument('--interval', type=float, default=REPLICA_INTERVAL,
+                                  help=f"seconds between checks (default: {REPLICA_INTERVAL:g})")
+    replicate_parser.add_argument('--once', action='store_true', help="sync once and exit")
+
+    schedule_parser = commands.add_parser('schedule', help="analyze + incremental vacuum periodically")
+    schedule_parser.add_argument('--interval', type=float, default=3600, help="seconds between runs (default: 3600)")
+    schedule_parser.add_argument('--pages', type=int, help="free at most this many pages per run")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'backup':
+            backup(args.db, args.dest, step_pages=args.step_pages, sleep=args.sleep)
+        elif args.command == 'analyze':
+            analyze(args.db)
+        elif args.command == 'vacuum':
+            vacuum(args.db, pages=args.pages, enable=args.enable)
+        elif args.command == 'check':
+            if not check(args.db, full=args.full)['ok']:
+                return 1
+        elif args.command == 'truncate':
+            truncate(args.db)
+        elif args.command == 'archive':
+            archive(args.db, args.archive)
+        elif args.command == 'replicate':
+            replicate(args.db, args.replica, args.interval, runs=1 if args.once else None)
+        elif args.command == 'schedule':
+            schedule(args.db, args.interval, pages=args.pages)
+    except (RuntimeError, sqlite3.Error) as e:
+        get_logger().error(f"{args.command} failed: {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
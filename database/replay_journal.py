@@ -0,0 +1,65 @@
+import os
+import sys
+import argparse
+
+# Journal ve yazma kodu backend ile ortak: services.scrape_journal, services.database_writer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from services.database_connection import configure_pool, close_pool, db_transaction
+from services.database_schema import ensure_schema
+from services.database_writer import write_scraping_data
+from services.scrape_journal import JOURNAL_DIR, iter_journal
+
+DB_PATH = "files.db"
+BATCH_SIZE = 500
+
+def replay_journal(db_path, journal_dir=None, since=None, batch_size=BATCH_SIZE):
+    """
+    Scrape journal kayıtlarını yazıldıkları sırayla db_path veritabanına işler.
+
+    Sorgu sonuçları journal'daki zaman damgasıyla yazılır; her batch_size kayıt
+    tek transaction'dır. İşlenen kayıt sayısını döndürür.
+    """
+    configure_pool(db_path=db_path)
+    ensure_schema(db_path)
+    count = 0
+    try:
+        batch = []
+        for record in iter_journal(journal_dir, since):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                _write_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            _write_batch(batch)
+            count += len(batch)
+    finally:
+        close_pool()
+    return count
+
+def _write_batch(records):
+    with db_transaction() as conn:
+        for record in records:
+            write_scraping_data(conn, record['data'], timestamp=record.get('ts'))
+
+def remove_database(db_path):
+    """Veritabanı dosyasını WAL/SHM dosyalarıyla birlikte siler"""
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape journal'ından files.db'yi yeniden oluşturur/günceller.")
+    parser.add_argument('--db', default=DB_PATH, help=f"hedef veritabanı (varsayılan: {DB_PATH})")
+    parser.add_argument('--journal', default=JOURNAL_DIR, help=f"journal dizini (varsayılan: {JOURNAL_DIR})")
+    parser.add_argument('--since', help="yalnızca bu ISO zamandan sonraki kayıtlar")
+    parser.add_argument('--fresh', action='store_true', help="mevcut veritabanını silip sıfırdan oluşturur")
+    args = parser.parse_args(argv)
+
+    if args.fresh:
+        remove_database(args.db)
+    count = replay_journal(args.db, args.journal, args.since)
+    print(f"{count} journal kaydı işlendi: {args.db}")
+
+if __name__ == "__main__":
+    main()
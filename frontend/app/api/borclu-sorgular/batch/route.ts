@@ -0,0 +1,29 @@
+import { NextResponse } from "next/server"
+
+// POST /api/borclu-sorgular/batch - Get several borclu/sorgu type results in one request
+export async function POST(request: Request) {
+  try {
+    const body = await request.json()
+
+    // Proxy to Flask API
+    const flaskApiUrl = process.env.FLASK_API_URL || "http://localhost:5001"
+    const response = await fetch(`${flaskApiUrl}/api/borclu-sorgular/batch`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(body),
+    })
+
+    if (!response.ok) {
+      const errorData = await response.json()
+      return NextResponse.json(errorData, { status: response.status })
+    }
+
+    const data = await response.json()
+    return NextResponse.json(data)
+  } catch (error) {
+    console.error("Error fetching sorgu batch:", error)
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 })
+  }
+}
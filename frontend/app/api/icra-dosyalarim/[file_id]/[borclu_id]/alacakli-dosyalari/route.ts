@@ -1,4 +1,5 @@
 import { NextResponse } from "next/server"
+import { conditionalRequestHeaders, validatorHeaders } from "@/lib/conditional-get"
 
 export async function GET(request: Request, context: { params: Promise<{ file_id: string; borclu_id: string }> }) {
   try {
@@ -10,7 +11,14 @@ export async function GET(request: Request, context: { params: Promise<{ file_id
 
     // Proxy to Flask API
     const flaskApiUrl = process.env.FLASK_API_URL || "http://localhost:5001"
-    const response = await fetch(`${flaskApiUrl}/api/icra-dosyalarim/${file_id}/${borclu_id}/alacakli-dosyalari`)
+    const response = await fetch(`${flaskApiUrl}/api/icra-dosyalarim/${file_id}/${borclu_id}/alacakli-dosyalari`, {
+      headers: conditionalRequestHeaders(request),
+    })
+
+    // Unchanged since the browser's copy: pass the 304 through without a body
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: validatorHeaders(response) })
+    }
 
     if (!response.ok) {
       const errorData = await response.json()
@@ -18,7 +26,7 @@ export async function GET(request: Request, context: { params: Promise<{ file_id
     }
 
     const data = await response.json()
-    return NextResponse.json(data)
+    return NextResponse.json(data, { headers: validatorHeaders(response) })
   } catch (error) {
     console.error("Error fetching alacakli-dosyalari data:", error)
     return NextResponse.json({ error: "Internal server error" }, { status: 500 })
@@ -1,22 +1,33 @@
-import { NextResponse } from "next/server"
+import { NextRequest, NextResponse } from "next/server"
+import { conditionalRequestHeaders, validatorHeaders } from "@/lib/conditional-get"
 
 // Database API configuration
 const DATABASE_API_BASE_URL = process.env.DATABASE_API_URL || "http://localhost:5001"
 
-// GET /api/icra-dosyalarim - Get list of all files
-export async function GET() {
+// Pagination headers passed through from the database API
+const FORWARDED_HEADERS = ["X-Total-Count", "X-Next-Cursor"]
+
+// GET /api/icra-dosyalarim - Get list of all files (optionally paged with ?limit=&cursor=)
+export async function GET(request: NextRequest) {
   try {
     console.log("API: Fetching icra dosyalari list from database API")
     console.log("Database API URL:", DATABASE_API_BASE_URL)
 
     // Fetch data from the database API
-    const response = await fetch(`${DATABASE_API_BASE_URL}/api/icra-dosyalarim`, {
+    const query = request.nextUrl.search
+    const response = await fetch(`${DATABASE_API_BASE_URL}/api/icra-dosyalarim${query}`, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
+        ...Object.fromEntries(conditionalRequestHeaders(request)),
       },
     })
 
+    // Unchanged since the browser's copy: pass the 304 through without a body
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: validatorHeaders(response) })
+    }
+
     if (!response.ok) {
       console.error("Database API error:", response.status, response.statusText)
       return NextResponse.json(
@@ -27,12 +38,16 @@ export async function GET() {
 
     const data = await response.json()
     console.log("Database API response length:", data.length)
-    
-    if (data.length > 0) {
-      console.log("First item structure:", JSON.stringify(data[0], null, 2))
+
+    const headers = validatorHeaders(response)
+    for (const name of FORWARDED_HEADERS) {
+      const value = response.headers.get(name)
+      if (value !== null) {
+        headers.set(name, value)
+      }
     }
 
-    return NextResponse.json(data)
+    return NextResponse.json(data, { headers })
   } catch (error) {
     console.error("Error fetching files list:", error)
     return NextResponse.json({ error: "Internal server error" }, { status: 500 })
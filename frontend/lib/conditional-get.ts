@@ -0,0 +1,25 @@
+// Helpers for passing conditional GET (ETag / Last-Modified) through the API proxies
+
+const REQUEST_VALIDATORS = ["If-None-Match", "If-Modified-Since"]
+const RESPONSE_VALIDATORS = ["ETag", "Last-Modified", "Cache-Control"]
+
+function copyHeaders(source: Headers, names: string[]): Headers {
+  const headers = new Headers()
+  for (const name of names) {
+    const value = source.get(name)
+    if (value !== null) {
+      headers.set(name, value)
+    }
+  }
+  return headers
+}
+
+// Validators sent by the browser, to forward to the database API
+export function conditionalRequestHeaders(request: Request): Headers {
+  return copyHeaders(request.headers, REQUEST_VALIDATORS)
+}
+
+// Validators returned by the database API, to send back to the browser
+export function validatorHeaders(response: Response): Headers {
+  return copyHeaders(response.headers, RESPONSE_VALIDATORS)
+}
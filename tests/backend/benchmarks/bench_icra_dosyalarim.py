@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark for GET /api/icra-dosyalarim
+
+Compares the previous implementation (get_all_files() followed by one
+get_borclular_by_file_id() call, and one connection, per file) with the
+current single-query, streamed endpoint.
+
+Usage:
+    python tests/backend/benchmarks/bench_icra_dosyalarim.py [--sizes 1000,10000,100000]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add backend and api directories to path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+sys.path.insert(0, os.path.join(backend_path, 'api'))
+
+from api_endpoint import app
+from services.database_connection import configure_pool, close_pool, db_transaction
+from services.database_writer import create_database_if_not_exists
+
+def build_database(db_path, file_count):
+    """Create a portfolio of file_count files with 1-3 debtors each"""
+    configure_pool(db_path=db_path)
+    create_database_if_not_exists()
+    with db_transaction() as conn:
+        conn.executemany("""
+            INSERT INTO files (file_id, klasor, dosyaNo, eYil, eNo, borcluAdi, alacakliAdi,
+                               foyTuru, durum, takipTarihi, icraMudurlugu)
+            VALUES (?, ?, ?, 2024, ?, ?, 'XYZ Holding A.Ş.', 'İlamsız', 'Açık', '15.01.2024', 'Ankara 2. İcra Müdürlüğü')
+        """, (
+            (str(i), str(i), f"2024/{i}", i, f"Borçlu {i}")
+            for i in range(1, file_count + 1)
+        ))
+        conn.executemany(
+            "INSERT INTO borclular (borclu_id, file_id, ad) VALUES (?, ?, ?)",
+            (
+                (f"{i}_{j}", str(i), f"Borçlu {i}-{j}")
+                for i in range(1, file_count + 1)
+                for j in range(1, (i % 3) + 2)
+            )
+        )
+
+def legacy_list(db_path):
+    """The N+1 implementation this endpoint used before"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    files = conn.execute("SELECT * FROM files ORDER BY file_id").fetchall()
+    conn.close()
+
+    list_data = []
+    for file_row in files:
+        file_dict = dict(file_row)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        borclular = [dict(row) for row in conn.execute("SELECT * FROM borclular WHERE file_id = ?", (file_dict['file_id'],))]
+        conn.close()
+        if borclular and len(borclular) > 1:
+            borclu_names = [b.get('ad', '') for b in sorted(borclular, key=lambda x: x.get('borclu_id', '')) if b.get('ad')]
+            file_dict['borcluAdi'] = ', '.join(borclu_names)
+        list_data.append(file_dict)
+    return json.dumps(list_data, ensure_ascii=False)
+
+def current_list(client):
+    """The current endpoint, read to the end of the stream"""
+    response = client.get('/api/icra-dosyalarim')
+    assert response.status_code == 200
+    return response.get_data()
+
+def timed(func, *args, repeat=3):
+    """Best-of-N wall clock time in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GET /api/icra-dosyalarim")
+    parser.add_argument('--sizes', default='1000,10000,100000', help="Comma separated file counts")
+    args = parser.parse_args()
+
+    app.config['TESTING'] = True
+    client = app.test_client()
+
+    print(f"{'files':>8} | {'before (ms)':>12} | {'after (ms)':>11} | {'speedup':>7}")
+    print("-" * 48)
+    for size in [int(s) for s in args.sizes.split(',')]:
+        db_path = os.path.join(tempfile.mkdtemp(), 'files.db')
+        build_database(db_path, size)
+        before = timed(legacy_list, db_path, repeat=1 if size >= 100000 else 3)
+        after = timed(current_list, client)
+        print(f"{size:>8} | {before:>12.1f} | {after:>11.1f} | {before / after:>6.1f}x")
+        close_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark for matching sorgu results to debtors in database/build_database.py
+
+Compares the previous matching (find_borclu_in_sorgu_data: exact key, then
+clean_borclu_name over every key of the file, then a substring scan, once per
+debtor) with the current import, which matches through the indexed name, TC
+and word tables built while the sorgu JSON is staged.
+
+Every file has the given number of debtors; every debtor has a sorgu entry
+keyed "NAME - TC" (so the exact key never hits) and every tenth debtor has
+no entry at all (so the previous code falls through to the substring scan).
+
+Usage:
+    python tests/backend/benchmarks/bench_sorgu_matching.py [--sizes 100,1000,5000] [--files 2]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add backend and database directories to path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+sys.path.insert(0, os.path.join(backend_path, '..', 'database'))
+
+from services.database_connection import connect
+from process_json_files import clean_borclu_name
+from build_database import create_tables, import_data
+
+def build_archive(data_dir, file_count, debtor_count):
+    """Write extracted.json and banka_sorgu.json; return the sorgu data for the previous matcher"""
+    extracted = {}
+    sorgu_data = {}
+    for i in range(1, file_count + 1):
+        dosya_no = f"2024/{i}"
+        names = [f"Borçlu{j} Soyad{j % 97}" for j in range(1, debtor_count + 1)]
+        taraflar = {f"Taraf {j}": {"Rol": "Borçlu", "Adi": name} for j, name in enumerate(names, 1)}
+        extracted[f"row{i}"] = {"Genel": {"Dosya No": dosya_no, "Birim": "Ankara 2. İcra Müdürlüğü"},
+                                "Taraf Bilgileri": taraflar}
+        sorgu_data[dosya_no] = {
+            f"{name.upper()} - {10000000000 + j}": {"Banka": {"sonuc": "1 banka"}}
+            for j, name in enumerate(names, 1) if j % 10
+        }
+    with open(os.path.join(data_dir, 'extracted.json'), 'w', encoding='utf-8') as f:
+        json.dump(extracted, f, ensure_ascii=False)
+    with open(os.path.join(data_dir, 'banka_sorgu.json'), 'w', encoding='utf-8') as f:
+        json.dump(sorgu_data, f, ensure_ascii=False)
+    return extracted, sorgu_data
+
+def legacy_find(sorgu_data, dosya_no, borclu_adi):
+    """find_borclu_in_sorgu_data as it was before the staged import"""
+    if dosya_no not in sorgu_data:
+        return {}
+    if borclu_adi in sorgu_data[dosya_no]:
+        return sorgu_data[dosya_no][borclu_adi]
+    clean_name = clean_borclu_name(borclu_adi)
+    for key in sorgu_data[dosya_no].keys():
+        if clean_borclu_name(key) == clean_name:
+            return sorgu_data[dosya_no][key]
+    for key in sorgu_data[dosya_no].keys():
+        json_clean_name = clean_borclu_name(key)
+        if clean_name in json_clean_name or json_clean_name in clean_name:
+            return sorgu_data[dosya_no][key]
+    return {}
+
+def legacy_match(extracted, sorgu_data):
+    """Previous matching only, with the sorgu file already loaded (it used to be re-read per debtor)"""
+    matched = 0
+    for rec in extracted.values():
+        dosya_no = rec["Genel"]["Dosya No"]
+        for borclu in rec["Taraf Bilgileri"].values():
+            # The previous code compared case-sensitively; compare in the case the keys use
+            if legacy_find(sorgu_data, dosya_no, borclu["Adi"].upper()):
+                matched += 1
+    return matched
+
+def current_import(data_dir):
+    """Whole staged import (parse, stage, match and merge) into a fresh database"""
+    db_path = os.path.join(data_dir, f"files_{time.perf_counter_ns()}.db")
+    conn = connect(db_path, isolation_level=None)
+    try:
+        create_tables(conn)
+        import_data(conn, data_dir=data_dir, main_files=['extracted.json'], sorgu_file_names=['banka_sorgu.json'])
+        return conn.execute("SELECT COUNT(*) FROM borclu_sorgular").fetchone()[0]
+    finally:
+        conn.close()
+
+def timed(func, *args, repeat=3):
+    """Best-of-N wall clock time in milliseconds, and the last result"""
+    best = result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sorgu-to-debtor matching in build_database.py")
+    parser.add_argument('--sizes', default='100,1000,5000', help="Comma separated debtors per file")
+    parser.add_argument('--files', type=int, default=2, help="Number of files")
+    args = parser.parse_args()
+    # Every run migrates a fresh database; keep the table readable
+    logging.disable(logging.INFO)
+
+    print(f"{'debtors/file':>12} | {'before match (ms)':>17} | {'after import (ms)':>17} | {'speedup':>7} | matched")
+    print("-" * 78)
+    for size in [int(s) for s in args.sizes.split(',')]:
+        data_dir = tempfile.mkdtemp()
+        extracted, sorgu_data = build_archive(data_dir, args.files, size)
+        repeat = 1 if size >= 5000 else 3
+        before, before_matched = timed(legacy_match, extracted, sorgu_data, repeat=repeat)
+        after, after_matched = timed(current_import, data_dir, repeat=repeat)
+        print(f"{size:>12} | {before:>17.1f} | {after:>17.1f} | {before / after:>6.1f}x | {before_matched}/{after_matched}")
+
+if __name__ == "__main__":
+    main()
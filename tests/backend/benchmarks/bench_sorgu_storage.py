@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark for sorgu payload storage (services/sorgu_payloads.py)
+
+Writes the same synthetic portfolio twice into fresh databases and compares
+their size after VACUUM:
+
+- before: every result stored as its JSON text in sorgu_verisi, as the writer
+  did before payloads were moved (and as the history copied it)
+- after: the current writer, which stores each distinct payload once in
+  sorgu_payloads, zlib-compressed above COMPRESS_MIN_BYTES
+
+Every file has three debtors. Each debtor gets MERNİS, GSM, SGK, GİB, İSKİ,
+Posta Çeki and Dış İşleri results that are mostly the same "kayıt bulunamadı"
+popup or an empty {"sonuc": ""}, a Banka result, and for some debtors EGM
+vehicles and TAKBİS properties. The portfolio is then queried --rescans more
+times: most results come back unchanged, a few change.
+
+Usage:
+    python tests/backend/benchmarks/bench_sorgu_storage.py [--sizes 100,1000] [--rescans 2]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add backend directory to path
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+from services.database_connection import connect
+from services.database_schema import migrate
+from services.database_writer import _write_scraping_result
+
+NOT_FOUND = {"sonuc": "Kişiye ait kayıt bulunamadı.", "popup": "Sorgulanan kişiye ait kayıt bulunamadı."}
+EMPTY = {"sonuc": ""}
+
+# Tables (and their indexes) that hold sorgu payloads
+PAYLOAD_TABLES = ('borclu_sorgular', 'borclu_sorgu_history', 'sorgu_payloads')
+
+def egm_result(rng):
+    return {"sonuc": "Araç kaydı bulundu", "Araclar": [{
+        "Plaka": f"06 {rng.choice('ABCDEFG')}{rng.choice('KLMNPR')} {rng.randint(100, 9999)}",
+        "Marka": rng.choice(["FIAT", "RENAULT", "FORD", "TOYOTA"]), "Model": str(rng.randint(2005, 2023)),
+        "Tipi": "OTOMOBİL", "Renk": rng.choice(["BEYAZ", "GRİ", "SİYAH"]), "Cins": "HUSUSİ",
+        "Mahrumiyet": [{
+            "Takyidat Sirasi": str(k), "Ekleyen Birim": f"Ankara {rng.randint(1, 30)}. İcra Dairesi",
+            "Ekleme Tarihi": f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(2015, 2024)}",
+            "Serh Turu": rng.choice(["HACİZ", "REHİN", "YAKALAMA"]), "Kurum Adi": "UYAP",
+        } for k in range(1, rng.randint(1, 5))],
+    } for _ in range(rng.randint(1, 3))]}
+
+def takbis_result(rng):
+    return {"sonuc": "Taşınmaz kaydı bulundu", "tasinmazlar": [{
+        "tapu_mudurlugu": "Çankaya Tapu Müdürlüğü", "il_ilce": "Ankara/Çankaya", "mahalle": "Kızılay",
+        "vasfi": "Mesken", "yuzolcumu": f"{rng.randint(60, 250)} m2", "mevki": "", "ada_no": str(rng.randint(1, 9999)),
+        "parcel_no": str(rng.randint(1, 99)), "bagimsiz_bolum": str(rng.randint(1, 40)),
+        "hisse_bilgisi": [{"aciklama": "Tam", "hisse_tipi": "Müstakil", "durum": "Aktif", "takdiyat_bilgisi": [
+            {"tipi": rng.choice(["Haciz", "İpotek", "Şerh"]), "aciklama": f"Ankara {rng.randint(1, 30)}. İcra Dairesi"}
+            for _ in range(rng.randint(0, 3))
+        ]}],
+    } for _ in range(rng.randint(1, 2))]}
+
+def debtor_results(rng, file_no, debtor_no):
+    """sorgu_tipi -> result of one scan for one debtor"""
+    tc = f"{10000000000 + file_no * 10 + debtor_no}"
+    results = {
+        "MERNİS": {"sonuc": {
+            "Kimlik Bilgileri": {"T.C Kimlik No": tc, "Adı": f"BORÇLU{debtor_no}", "Soyadı": f"SOYAD{file_no}",
+                                 "Doğum Yeri": "ANKARA", "Doğum Tarihi": f"{rng.randint(1, 28):02d}.01.19{rng.randint(50, 99)}"},
+            "Adres Bilgileri": {"Mahalle": "Kızılay", "Cadde/Sokak": "Atatürk Blv", "Dış Kapı No": str(rng.randint(1, 200)),
+                                "İç Kapı No": str(rng.randint(1, 20)), "İl": "Ankara", "İlçe": "Çankaya"},
+        }},
+        "Banka": {"sonuc": "1 banka", "bankalar": [{"kurum": rng.choice(["Ziraat", "Halkbank", "Vakıfbank"])}]}
+                 if rng.random() < 0.3 else NOT_FOUND,
+    }
+    for sorgu_tipi in ("GSM", "SGK", "GİB", "İSKİ", "Posta Çeki", "Dış İşleri"):
+        results[sorgu_tipi] = rng.choice([NOT_FOUND, EMPTY]) if rng.random() < 0.9 else {"sonuc": f"{sorgu_tipi} kaydı var: {tc}"}
+    results["EGM"] = egm_result(rng) if rng.random() < 0.3 else NOT_FOUND
+    results["TAKBIS"] = takbis_result(rng) if rng.random() < 0.2 else NOT_FOUND
+    return results
+
+def build_portfolio(file_count, rescans, seed=1):
+    """[(scan timestamp, [(dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi), ...]), ...]"""
+    rng = random.Random(seed)
+    current = {(i, j): debtor_results(rng, i, j) for i in range(1, file_count + 1) for j in range(1, 4)}
+    scans = []
+    for scan in range(rescans + 1):
+        if scan:
+            # A re-scan: about 5% of the debtors have a new result for one query
+            for (i, j), results in current.items():
+                if rng.random() < 0.05:
+                    results["EGM" if rng.random() < 0.5 else "Banka"] = debtor_results(rng, i, j)["EGM"]
+        writes = [(f"2024/{i}", f"BORÇLU{j} SOYAD{i}", sorgu_tipi, sorgu_verisi)
+                  for (i, j), results in current.items() for sorgu_tipi, sorgu_verisi in results.items()]
+        scans.append((f"2024-0{scan + 1}-01T10:00:00", writes))
+    return scans
+
+def new_database(path, file_count):
+    conn = connect(path, isolation_level=None)
+    migrate(conn)
+    with conn:
+        conn.executemany("INSERT INTO files (file_id, dosyaNo, icraMudurlugu) VALUES (?, ?, 'Ankara 2. İcra Müdürlüğü')",
+                         [(str(i), f"2024/{i}") for i in range(1, file_count + 1)])
+        conn.executemany("INSERT INTO borclular (borclu_id, file_id, ad, ad_key) VALUES (?, ?, ?, ?)",
+                         [(f"{i}_{j}", str(i), f"BORÇLU{j} SOYAD{i}", f"borçlu{j} soyad{i}")
+                          for i in range(1, file_count + 1) for j in range(1, 4)])
+    return conn
+
+def write_before(conn, scans):
+    """JSON text in sorgu_verisi, rewritten on every scan"""
+    borclu_ids = {row['ad']: row['borclu_id'] for row in conn.execute("SELECT borclu_id, ad FROM borclular")}
+    for timestamp, writes in scans:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO borclu_sorgular (borclu_id, sorgu_tipi, sorgu_verisi, timestamp) VALUES (?, ?, ?, ?)",
+                [(borclu_ids[borclu_adi], sorgu_tipi, json.dumps(sorgu_verisi, ensure_ascii=False), timestamp)
+                 for _, borclu_adi, sorgu_tipi, sorgu_verisi in writes]
+            )
+
+def write_after(conn, scans):
+    """The current writer"""
+    for timestamp, writes in scans:
+        with conn:
+            for dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi in writes:
+                _write_scraping_result(conn, dosya_no, borclu_adi, sorgu_tipi, sorgu_verisi, timestamp=timestamp)
+
+def measure(path, file_count, scans, write):
+    """(file bytes after VACUUM, bytes of the payload tables and their indexes, write seconds)"""
+    conn = new_database(path, file_count)
+    try:
+        started = time.perf_counter()
+        write(conn, scans)
+        elapsed = time.perf_counter() - started
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        placeholders = ", ".join("?" for _ in PAYLOAD_TABLES)
+        payload_bytes = conn.execute(
+            f"SELECT IFNULL(SUM(d.pgsize), 0) FROM dbstat d JOIN sqlite_schema s ON s.name = d.name "
+            f"WHERE s.tbl_name IN ({placeholders})", PAYLOAD_TABLES
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return os.path.getsize(path), payload_bytes, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare database size with and without compact sorgu payloads")
+    parser.add_argument('--sizes', default='100,1000', help="Comma separated number of files (3 debtors each)")
+    parser.add_argument('--rescans', type=int, default=2, help="Scans of the whole portfolio after the first")
+    args = parser.parse_args()
+    # Every write is logged by the writer; keep the table readable
+    logging.disable(logging.INFO)
+
+    print(f"{'files':>6} | {'results':>8} | {'before MB':>9} | {'after MB':>8} | {'payload before/after MB':>23} | {'saved':>5} | write s before/after")
+    print("-" * 104)
+    for size in [int(s) for s in args.sizes.split(',')]:
+        scans = build_portfolio(size, args.rescans)
+        temp_dir = tempfile.mkdtemp()
+        before = measure(os.path.join(temp_dir, 'before.db'), size, scans, write_before)
+        after = measure(os.path.join(temp_dir, 'after.db'), size, scans, write_after)
+        results = sum(len(writes) for _, writes in scans)
+        mb = 1024 * 1024
+        print(f"{size:>6} | {results:>8} | {before[0] / mb:>9.2f} | {after[0] / mb:>8.2f} | "
+              f"{before[1] / mb:>11.2f} / {after[1] / mb:>9.2f} | {1 - after[0] / before[0]:>5.0%} | "
+              f"{before[2]:.2f} / {after[2]:.2f}")
+
+if __name__ == "__main__":
+    main()
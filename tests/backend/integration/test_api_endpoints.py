@@ -18,12 +18,30 @@ sys.path.insert(0, api_path)
 from api_endpoint import app
 from routes.uyap_routes import uyap_routes
 from routes.database_routes import database_routes
+from services import database_connection
+from services.database_connection import configure_pool, close_pool
+from services.database_schema import ensure_schema
+from services.storage import close_storage
 
 class TestAPIEndpoints:
     """Integration tests for API endpoints using real Flask app with mocked dependencies"""
     
     @pytest.fixture
-    def test_app(self):
+    def test_db(self, tmp_path):
+        """Route the pool to a temporary database so no test touches database/files.db"""
+        original_path = database_connection.DB_PATH
+        path = str(tmp_path / 'files.db')
+        configure_pool(db_path=path)
+        ensure_schema(path)
+
+        yield path
+
+        close_storage()
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    @pytest.fixture
+    def test_app(self, test_db):
         """Create Flask app for testing with real routes"""
         app.config['TESTING'] = True
         return app
@@ -354,7 +372,7 @@ class TestAPIEndpoints:
     
     def test_icra_dosyalarim_endpoint(self, client):
         """Test icra dosyalarim endpoint"""
-        with patch('routes.database_routes.get_all_files') as mock_get_files:
+        with patch('services.database_reader.iter_icra_dosyalari') as mock_iter_files:
             mock_files = [
                 {
                     'file_id': 1,
@@ -370,7 +388,7 @@ class TestAPIEndpoints:
                     'icraMudurlugu': 'İstanbul'
                 }
             ]
-            mock_get_files.return_value = mock_files
+            mock_iter_files.return_value = iter(mock_files)
             
             response = client.get('/api/icra-dosyalarim')
             
@@ -383,17 +401,12 @@ class TestAPIEndpoints:
     
     def test_icra_dosyalarim_detail_endpoint(self, client):
         """Test icra dosyalarim detail endpoint"""
-        with patch('routes.database_routes.get_file_by_id') as mock_get_file, \
-             patch('routes.database_routes.get_file_dict') as mock_get_file_dict, \
-             patch('routes.database_routes.get_file_details_by_id') as mock_get_file_details, \
-             patch('routes.database_routes.get_borclular_by_file_id') as mock_get_borclular:
-            
-            # Mock the file row data
-            mock_file_row = (1, '2024/1', '2024/1', 2024, 1, 'Ahmet Yılmaz', 'Mehmet Demir', 'İlamlı', 'Açık', '2024-01-15', 'İstanbul')
-            mock_get_file.return_value = mock_file_row
+        with patch('routes.database_routes.get_storage') as mock_get_storage:
+            storage = mock_get_storage.return_value
+            storage.data_version.return_value = None
             
             # Mock the file dictionary
-            mock_file_dict = {
+            storage.get_file.return_value = {
                 'file_id': 1,
                 'klasor': '2024/1',
                 'dosyaNo': '2024/1',
@@ -406,10 +419,9 @@ class TestAPIEndpoints:
                 'takipTarihi': '2024-01-15',
                 'icraMudurlugu': 'İstanbul'
             }
-            mock_get_file_dict.return_value = mock_file_dict
             
             # Mock file details
-            mock_get_file_details.return_value = {
+            storage.get_file_details.return_value = {
                 'takipSekli': 'İlamlı',
                 'takipYolu': 'İcra',
                 'takipTuru': 'Para',
@@ -420,7 +432,7 @@ class TestAPIEndpoints:
             }
             
             # Mock borclular
-            mock_get_borclular.return_value = [
+            storage.get_borclular.return_value = [
                 {
                     'borclu_id': '1',
                     'file_id': '1',
@@ -444,8 +456,9 @@ class TestAPIEndpoints:
     
     def test_icra_dosyalarim_detail_not_found(self, client):
         """Test icra dosyalarim detail endpoint with non-existent file"""
-        with patch('routes.database_routes.get_file_by_id') as mock_get_file:
-            mock_get_file.return_value = None
+        with patch('routes.database_routes.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.data_version.return_value = None
+            mock_get_storage.return_value.get_file.return_value = None
             
             response = client.get('/api/icra-dosyalarim/999')
             
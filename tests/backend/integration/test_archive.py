@@ -0,0 +1,141 @@
+import pytest
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+
+# Add backend, api and database to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+sys.path.insert(0, os.path.join(backend_path, 'api'))
+database_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database')
+sys.path.insert(0, database_path)
+
+from api_endpoint import app
+from services import database_connection
+from services.database_connection import configure_pool, close_pool, db_connection, db_transaction
+from services.database_schema import ensure_schema
+from services.database_writer import _write_scraping_result
+from services.database_reader import (
+    count_files, get_borclu_sorgular_by_borclu_id, get_file_by_id, iter_icra_dosyalari
+)
+from services.archive import archive_path
+from services.sorgu_cache import sorgu_cache
+import maintenance
+
+NOT_FOUND = {"sonuc": "Kişiye ait kayıt bulunamadı."}
+
+class TestArchive:
+    """Integration tests for `maintenance.py archive` and reading archived files"""
+
+    @pytest.fixture
+    def db_path(self):
+        """Open, derdest, closed and durum-less files, each with a debtor and two sorgu results"""
+        original_path = database_connection.DB_PATH
+        path = os.path.join(tempfile.mkdtemp(), 'files.db')
+        configure_pool(db_path=path)
+        ensure_schema(path)
+        sorgu_cache.clear()
+        files = [('1', 'Açık'), ('2', 'Derdest'), ('3', 'Kapalı'), ('4', 'İnfaz'), ('5', None)]
+        with db_transaction() as conn:
+            for file_id, durum in files:
+                conn.execute("INSERT INTO files (file_id, dosyaNo, durum, icraMudurlugu) VALUES (?, ?, ?, 'Ankara')",
+                             (file_id, f"2024/{file_id}", durum))
+                conn.execute("INSERT INTO file_details (file_id, takipSekli) VALUES (?, 'İlamsız')", (file_id,))
+                conn.execute("INSERT INTO borclular (borclu_id, file_id, ad) VALUES (?, ?, ?)",
+                             (f"{file_id}_1", file_id, f"Borçlu {file_id}"))
+            for file_id, _ in files:
+                # GSM is the same popup for everyone; EGM differs per file and changes once
+                _write_scraping_result(conn, f"2024/{file_id}", f"Borçlu {file_id}", 'GSM', NOT_FOUND,
+                                       timestamp='2024-01-01T10:00:00')
+                for day in (1, 2):
+                    _write_scraping_result(conn, f"2024/{file_id}", f"Borçlu {file_id}", 'EGM',
+                                           {"sonuc": f"Araç {file_id}/{day}"}, timestamp=f"2024-01-0{day}T10:00:00")
+
+        yield path
+
+        sorgu_cache.clear()
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    @pytest.fixture
+    def client(self, db_path):
+        app.config['TESTING'] = True
+        return app.test_client()
+
+    def test_archive_moves_closed_files(self, db_path):
+        """Closed files leave files.db with everything hanging off them; shared payloads stay"""
+        result = maintenance.archive(db_path)
+
+        assert result['moved']['files'] == 2
+        assert result['moved']['borclu_sorgular'] == 4
+        # Two EGM versions per closed file; the shared GSM popup is still used by hot files
+        assert result['moved']['sorgu_payloads'] == 4
+        with db_connection() as conn:
+            assert [row[0] for row in conn.execute("SELECT file_id FROM files ORDER BY file_id")] == ['1', '2', '5']
+            for table in ('file_details', 'borclular'):
+                assert conn.execute(f"SELECT COUNT(*) FROM {table} WHERE file_id IN ('3', '4')").fetchone()[0] == 0
+            assert conn.execute("SELECT value FROM db_counters WHERE name = 'files'").fetchone()[0] == 3
+            assert conn.execute("SELECT COUNT(*) FROM sorgu_payloads").fetchone()[0] == 7
+
+        archive = sqlite3.connect(result['archive_path'])
+        try:
+            assert [row[0] for row in archive.execute("SELECT file_id FROM files ORDER BY file_id")] == ['3', '4']
+            assert archive.execute("SELECT COUNT(*) FROM borclu_sorgu_history").fetchone()[0] == 6
+            # Every archived result still resolves to a payload inside archive.db
+            assert archive.execute("""
+                SELECT COUNT(*) FROM borclu_sorgular s
+                LEFT JOIN sorgu_payloads p ON p.payload_hash = s.payload_hash WHERE p.payload_hash IS NULL
+            """).fetchone()[0] == 0
+        finally:
+            archive.close()
+
+    def test_archive_again_moves_only_newly_closed_files(self, db_path):
+        maintenance.archive(db_path)
+        assert maintenance.archive(db_path)['moved']['files'] == 0
+
+        with db_transaction() as conn:
+            conn.execute("UPDATE files SET durum = 'Kapalı' WHERE file_id = '1'")
+        assert maintenance.main(['--db', db_path, 'archive']) == 0
+
+        archive = sqlite3.connect(archive_path(db_path))
+        try:
+            assert archive.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 3
+            assert archive.execute("SELECT COUNT(*) FROM borclu_sorgu_history").fetchone()[0] == 9
+        finally:
+            archive.close()
+
+    def test_archive_is_attached_only_when_asked_for(self, db_path):
+        maintenance.archive(db_path)
+
+        assert [item['file_id'] for item in iter_icra_dosyalari()] == ['1', '2', '5']
+        with db_connection() as conn:
+            assert 'archive' not in [row[1] for row in conn.execute("PRAGMA database_list")]
+
+        assert [item['file_id'] for item in iter_icra_dosyalari(archived=True)] == ['3', '4']
+        assert count_files(archived=True) == 2
+        assert get_file_by_id('3') is None
+        assert get_file_by_id('3', archived=True)['durum'] == 'Kapalı'
+        sorgular = dict((row[1], json.loads(row[2])) for row in get_borclu_sorgular_by_borclu_id('3_1', archived=True))
+        assert sorgular == {'GSM': NOT_FOUND, 'EGM': {"sonuc": "Araç 3/2"}}
+
+    def test_routes_read_archived_files(self, client, db_path):
+        response = client.get('/api/icra-dosyalarim?arsiv=1')
+        assert response.status_code == 200
+        assert json.loads(response.data) == []
+        assert response.headers['X-Total-Count'] == '0'
+        assert not os.path.exists(archive_path(db_path))
+
+        maintenance.archive(db_path)
+
+        response = client.get('/api/icra-dosyalarim?arsiv=1')
+        assert [item['file_id'] for item in json.loads(response.data)] == ['3', '4']
+        assert response.headers['X-Total-Count'] == '2'
+        assert client.get('/api/icra-dosyalarim/3').status_code == 404
+        assert json.loads(client.get('/api/icra-dosyalarim/3?arsiv=1').data)['durum'] == 'Kapalı'
+        response = client.get('/api/icra-dosyalarim/4/4_1?arsiv=1')
+        assert response.status_code == 200
+        sorgular = json.loads(response.data)['sorgular']
+        assert {row[1]: json.loads(row[2]) for row in sorgular}['EGM'] == {"sonuc": "Araç 4/2"}
+        assert client.get('/api/icra-dosyalarim?arsiv=maybe').status_code == 400
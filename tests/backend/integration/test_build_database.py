@@ -0,0 +1,160 @@
+import pytest
+import sys
+import os
+import json
+import tempfile
+
+# Add backend and database to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+database_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database')
+sys.path.insert(0, database_path)
+
+from services.database_connection import connect
+from process_json_files import iter_json_items
+from build_database import create_tables, import_data
+from services.sorgu_payloads import payload_sql
+from services.sorgu_types import SORGU_TYPE_IDS
+
+def extracted_row(dosya_no, borclular, durum='Açık'):
+    """Build one record shaped like the extracted_data_*.json archive"""
+    taraflar = {'Taraf 1': {'Rol': 'Alacaklı', 'Adi': 'XYZ Holding A.Ş.', 'Vekil': 'Av. Ahmet'}}
+    for idx, ad in enumerate(borclular, 2):
+        taraflar[f'Taraf {idx}'] = {'Rol': 'Borçlu', 'Adi': ad, 'Vekil': ''}
+    return {
+        'Genel': {'Dosya No': dosya_no, 'Birim': 'Ankara 2. İcra Müdürlüğü', 'Dosya Türü': 'İlamsız',
+                  'Dosya Durumu': durum, 'Dosya Açılış Tarihi': '15.01.2024 10:00'},
+        'Taraf Bilgileri': taraflar,
+        'Dosya Bilgileri': {'Şekli': 'Genel Haciz', 'Yolu': 'İlamsız', 'Türü': 'Para'},
+        'Dosya Hesabı': {'Takipte Kesinleşen Miktar': '1000', 'Bakiye Borç Miktarı': '1200'},
+    }
+
+def write_with_trailing_commas(path, data):
+    """Write JSON the way the old scrapers did, with a comma before every closing bracket"""
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    text = text.replace('\n}', ',\n}').replace('\n  }', ',\n  }').replace('\n]', ',\n]')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+class TestStreamingJson:
+    """Tests for the incremental JSON reader used by the importer"""
+
+    def test_items_survive_chunk_boundaries(self):
+        """Keys, numbers and trailing commas split across tiny chunks are read correctly"""
+        data = {f'row{i}': {'n': 12345 + i, 'ad': 'Ayşe Demir', 'liste': [1, 2, 3]} for i in range(1, 30)}
+        path = os.path.join(tempfile.mkdtemp(), 'data.json')
+        write_with_trailing_commas(path, data)
+
+        for chunk_size in (1, 3, 7, 64, 1 << 20):
+            assert dict(iter_json_items(path, chunk_size=chunk_size)) == data
+
+    def test_empty_and_invalid_objects(self):
+        temp_dir = tempfile.mkdtemp()
+        empty = os.path.join(temp_dir, 'empty.json')
+        with open(empty, 'w') as f:
+            f.write(' { } ')
+        assert list(iter_json_items(empty)) == []
+
+        broken = os.path.join(temp_dir, 'broken.json')
+        with open(broken, 'w') as f:
+            f.write('{"row1": {"a": 1} "row2": 2}')
+        with pytest.raises(ValueError):
+            list(iter_json_items(broken))
+
+class TestImportData:
+    """Integration tests for the staged, set-based import into a temporary database"""
+
+    @pytest.fixture
+    def archive(self):
+        """Archive with two files and MERNİS/Banka results for their debtors"""
+        data_dir = tempfile.mkdtemp()
+        write_with_trailing_commas(os.path.join(data_dir, 'extracted.json'), {
+            'row1': extracted_row('2024/1', ['Ayşe Demir', 'MEHMET DEMİR']),
+            'row2': extracted_row('2024/2', ['Ali Kaya']),
+        })
+        write_with_trailing_commas(os.path.join(data_dir, 'mernis_sorgu.json'), {
+            '2024/1': {'AYŞE DEMİR - 12345678901': {'MERNİS': {'sonuc': {
+                'Kimlik Bilgileri': {'T.C Kimlik No': '12345678901'},
+                'Adres Bilgileri': {'Mahalle': 'Kızılay', 'Cadde/Sokak': 'Atatürk Blv', 'Dış Kapı No': '5',
+                                    'İç Kapı No': '3', 'İl': 'Ankara', 'İlçe': 'Çankaya'},
+            }}}},
+        })
+        write_with_trailing_commas(os.path.join(data_dir, 'banka_sorgu.json'), {
+            '2024/1': {'Mehmet Demir': {'Banka': {'sonuc': '1 banka'}}},
+            '2024/2': {'Ali Kaya - 98765432109': {'Banka': {'sonuc': 'yok'}}},
+            '2024/9': {'Bilinmeyen': {'Banka': {'sonuc': 'x'}}},
+        })
+        conn = connect(os.path.join(data_dir, 'files.db'), isolation_level=None)
+        create_tables(conn)
+
+        yield data_dir, conn
+
+        conn.close()
+
+    def run_import(self, data_dir, conn):
+        return import_data(conn, data_dir=data_dir, main_files=['extracted.json'],
+                           sorgu_file_names=['mernis_sorgu.json', 'banka_sorgu.json', 'gsm_sorgu.json'])
+
+    def test_import_creates_rows(self, archive):
+        data_dir, conn = archive
+
+        counts = self.run_import(data_dir, conn)
+
+        assert counts == {'stage_files': 2, 'stage_file_details': 2, 'stage_borclular': 3, 'stage_sorgular': 4}
+        assert [tuple(row) for row in conn.execute("SELECT file_id, dosyaNo, eYil, borcluAdi FROM files ORDER BY file_id")] == [
+            ('1', '2024/1', 2024, 'Ayşe Demir, MEHMET DEMİR'), ('2', '2024/2', 2024, 'Ali Kaya')
+        ]
+        borclu = conn.execute("SELECT ad_key, tcKimlik, adres FROM borclular WHERE borclu_id = '1_1'").fetchone()
+        assert tuple(borclu) == ('ayşe demir', '12345678901', 'Kızılay, Atatürk Blv No: 5/3 Ankara/Çankaya')
+        sorgular = conn.execute(f"SELECT borclu_id, t.name, {payload_sql('s')}, timestamp FROM borclu_sorgular s "
+                                f"JOIN sorgu_types t USING (type_id) ORDER BY borclu_id").fetchall()
+        assert [(row[0], row[1], json.loads(row[2])) for row in sorgular] == [
+            ('1_1', 'MERNİS', json.loads(sorgular[0][2])),
+            ('1_2', 'Banka', {'sonuc': '1 banka'}),
+            ('2_1', 'Banka', {'sonuc': 'yok'}),
+        ]
+        assert all(row['timestamp'] for row in sorgular)
+        assert conn.execute("SELECT value FROM db_counters WHERE name = 'last_file_id'").fetchone()[0] == 2
+
+    def test_sorgu_matching_uses_tc_and_name_tokens(self, archive):
+        """TC from MERNİS wins over the name, word order is ignored and a longer name is not a match"""
+        data_dir, conn = archive
+        write_with_trailing_commas(os.path.join(data_dir, 'gsm_sorgu.json'), {
+            '2024/1': {'A. DEMİR - 12345678901': {'GSM': {'sonuc': 'tc'}},
+                       'DEMİR MEHMET': {'GSM': {'sonuc': 'kelime'}}},
+            '2024/2': {'ALİ KAYALI OĞLU': {'GSM': {'sonuc': 'başka kişi'}}},
+        })
+
+        self.run_import(data_dir, conn)
+
+        rows = conn.execute(f"SELECT borclu_id, {payload_sql('s')} FROM borclu_sorgular s WHERE type_id = {SORGU_TYPE_IDS['GSM']} ORDER BY borclu_id")
+        assert [(row[0], json.loads(row[1])) for row in rows] == [
+            ('1_1', {'sonuc': 'tc'}), ('1_2', {'sonuc': 'kelime'})
+        ]
+
+    def test_reimport_updates_in_place(self, archive):
+        """Running the import again updates existing rows instead of duplicating them"""
+        data_dir, conn = archive
+        self.run_import(data_dir, conn)
+        write_with_trailing_commas(os.path.join(data_dir, 'extracted.json'), {
+            'row1': extracted_row('2024/1', ['Ayşe Demir', 'MEHMET DEMİR'], durum='Kapalı'),
+        })
+
+        self.run_import(data_dir, conn)
+
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 2
+        assert conn.execute("SELECT durum FROM files WHERE file_id = '1'").fetchone()[0] == 'Kapalı'
+        assert conn.execute("SELECT COUNT(*) FROM borclu_sorgular").fetchone()[0] == 3
+        assert not conn.execute("SELECT name FROM sqlite_temp_master WHERE name LIKE 'stage_%'").fetchall()
+
+    def test_failed_import_rolls_back(self, archive):
+        """A parse error half way through leaves the database untouched"""
+        data_dir, conn = archive
+        with open(os.path.join(data_dir, 'banka_sorgu.json'), 'w', encoding='utf-8') as f:
+            f.write('{"2024/1": {"Mehmet Demir": ')
+
+        with pytest.raises(ValueError):
+            self.run_import(data_dir, conn)
+
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+        assert not conn.in_transaction
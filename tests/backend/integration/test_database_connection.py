@@ -0,0 +1,98 @@
+import pytest
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+
+# Add backend to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+from services import database_connection
+from services.database_connection import (
+    configure_pool, close_pool, db_connection, db_transaction
+)
+
+class TestConnectionPool:
+    """Integration tests for the shared SQLite connection pool"""
+
+    @pytest.fixture
+    def temp_pool(self):
+        """Point the process-wide pool at a temporary database"""
+        original_path = database_connection.DB_PATH
+        temp_dir = tempfile.mkdtemp()
+        temp_db_path = os.path.join(temp_dir, 'files.db')
+
+        pool = configure_pool(db_path=temp_db_path, pool_size=2, timeout=1)
+        with db_transaction() as conn:
+            conn.execute("CREATE TABLE files (file_id TEXT PRIMARY KEY, dosyaNo TEXT)")
+
+        yield pool
+
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    def test_pragmas_applied(self, temp_pool):
+        """Pooled connections run in WAL mode with the tuned PRAGMAs"""
+        with db_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64 * 1024
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+
+    def test_connections_are_reused(self, temp_pool):
+        """Sequential borrows get the same connection back"""
+        with db_connection() as first:
+            pass
+        with db_connection() as second:
+            pass
+
+        assert first is second
+        assert temp_pool.stats()['open_connections'] == 1
+
+    def test_pool_size_is_bounded(self, temp_pool):
+        """Borrowing more than pool_size connections waits and then times out"""
+        with db_connection():
+            with db_connection():
+                with pytest.raises(TimeoutError):
+                    with db_connection():
+                        pass
+
+        assert temp_pool.stats()['open_connections'] == 2
+
+    def test_transaction_commit_and_rollback(self, temp_pool):
+        """db_transaction commits on success and rolls back on error"""
+        with db_transaction() as conn:
+            conn.execute("INSERT INTO files (file_id, dosyaNo) VALUES ('1', '2024/1')")
+
+        with pytest.raises(sqlite3.IntegrityError):
+            with db_transaction() as conn:
+                conn.execute("INSERT INTO files (file_id, dosyaNo) VALUES ('2', '2024/2')")
+                conn.execute("INSERT INTO files (file_id, dosyaNo) VALUES ('1', '2024/3')")
+
+        with db_connection() as conn:
+            rows = conn.execute("SELECT file_id FROM files ORDER BY file_id").fetchall()
+        assert [row['file_id'] for row in rows] == ['1']
+
+    def test_concurrent_readers_share_pool(self, temp_pool):
+        """Several threads can read through the pool at the same time"""
+        with db_transaction() as conn:
+            conn.execute("INSERT INTO files (file_id, dosyaNo) VALUES ('1', '2024/1')")
+
+        results = []
+
+        def reader():
+            for _ in range(20):
+                with db_connection() as conn:
+                    results.append(conn.execute("SELECT COUNT(*) FROM files").fetchone()[0])
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [1] * 80
+        assert temp_pool.stats()['open_connections'] <= 2
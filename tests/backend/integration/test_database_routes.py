@@ -0,0 +1,805 @@
+import pytest
+import sys
+import os
+import json
+import tempfile
+
+# Add backend to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+# Also add the api directory to the path to handle relative imports
+api_path = os.path.join(backend_path, 'api')
+sys.path.insert(0, api_path)
+
+from api_endpoint import app
+from services import database_connection
+from services.database_connection import configure_pool, close_pool, db_transaction
+from services.database_writer import create_database_if_not_exists
+from services.database_reader import build_icra_dosyalari_query, get_borclu_sorgu_raw
+from services.database_writer import save_scraping_result_to_db
+from services.search_index import create_search_index
+from services.sorgu_cache import sorgu_cache
+from services.sorgu_types import SORGU_TYPE_IDS, sorgu_type_key
+
+def seed_files(conn, files):
+    """Insert (file dict, [debtor names]) pairs using the real schema"""
+    for file_data, borclu_names in files:
+        conn.execute("""
+            INSERT INTO files (file_id, klasor, dosyaNo, eYil, eNo, borcluAdi, alacakliAdi,
+                               foyTuru, durum, takipTarihi, icraMudurlugu)
+            VALUES (:file_id, :file_id, :dosyaNo, :eYil, :eNo, :borcluAdi, :alacakliAdi,
+                    :foyTuru, :durum, :takipTarihi, :icraMudurlugu)
+        """, file_data)
+        for index, ad in enumerate(borclu_names, 1):
+            conn.execute(
+                "INSERT INTO borclular (borclu_id, file_id, ad) VALUES (?, ?, ?)",
+                (f"{file_data['file_id']}_{index}", file_data['file_id'], ad)
+            )
+
+def make_file(file_id, **overrides):
+    """Build a files row with sensible defaults"""
+    file_data = {
+        'file_id': file_id,
+        'dosyaNo': f"2024/{file_id}",
+        'eYil': 2024,
+        'eNo': int(file_id),
+        'borcluAdi': 'Ahmet Yılmaz',
+        'alacakliAdi': 'XYZ Holding A.Ş.',
+        'foyTuru': 'İlamsız',
+        'durum': 'Açık',
+        'takipTarihi': '15.01.2024',
+        'icraMudurlugu': 'Ankara 2. İcra Müdürlüğü'
+    }
+    file_data.update(overrides)
+    return file_data
+
+class TestDatabaseRoutes:
+    """Integration tests for database routes against a real temporary database"""
+
+    @pytest.fixture
+    def real_db(self):
+        """Create the real schema in a temporary database and route the pool to it"""
+        original_path = database_connection.DB_PATH
+        temp_dir = tempfile.mkdtemp()
+        configure_pool(db_path=os.path.join(temp_dir, 'files.db'))
+        create_database_if_not_exists()
+        sorgu_cache.clear()
+
+        yield
+
+        sorgu_cache.clear()
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    @pytest.fixture
+    def client(self, real_db):
+        """Create test client"""
+        app.config['TESTING'] = True
+        return app.test_client()
+
+    def test_icra_dosyalarim_list_joins_borclular(self, client):
+        """borcluAdi is rebuilt from borclular in borclu_id order only for multi-debtor files"""
+        with db_transaction() as conn:
+            seed_files(conn, [
+                (make_file('1', borcluAdi='Ayşe Demir'), ['Ayşe Demir']),
+                (make_file('2', borcluAdi='stale'), ['Mehmet Demir', '', 'Ayşe Demir']),
+                (make_file('3', borcluAdi='Fatma Kaya'), []),
+            ])
+
+        response = client.get('/api/icra-dosyalarim')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [item['file_id'] for item in data] == ['1', '2', '3']
+        assert data[0]['borcluAdi'] == 'Ayşe Demir'
+        assert data[1]['borcluAdi'] == 'Mehmet Demir, Ayşe Demir'
+        assert data[2]['borcluAdi'] == 'Fatma Kaya'
+        assert data[1]['icraMudurlugu'] == 'Ankara 2. İcra Müdürlüğü'
+
+    def test_icra_dosyalarim_list_empty(self, client):
+        """An empty database returns an empty JSON array"""
+        response = client.get('/api/icra-dosyalarim')
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == []
+
+    def test_icra_dosyalarim_keyset_pagination(self, client):
+        """limit/cursor walk the list in file_id order without gaps or repeats"""
+        with db_transaction() as conn:
+            seed_files(conn, [(make_file(str(i)), []) for i in range(1, 6)])
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            url = '/api/icra-dosyalarim?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.headers['X-Total-Count'] == '5'
+            seen.extend(item['file_id'] for item in json.loads(response.data))
+            pages += 1
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+
+        assert pages == 3
+        assert seen == ['1', '2', '3', '4', '5']
+
+    def test_icra_dosyalarim_without_limit_returns_everything(self, client):
+        """Without limit the full list is returned and no cursor is set"""
+        with db_transaction() as conn:
+            seed_files(conn, [(make_file(str(i)), []) for i in range(1, 4)])
+
+        response = client.get('/api/icra-dosyalarim')
+
+        assert len(json.loads(response.data)) == 3
+        assert response.headers['X-Total-Count'] == '3'
+        assert 'X-Next-Cursor' not in response.headers
+
+    @pytest.mark.parametrize('query', ['limit=0', 'limit=abc', 'limit=100000', 'limit=2&cursor=not-a-cursor'])
+    def test_icra_dosyalarim_invalid_pagination(self, client, query):
+        """Invalid limit or cursor values are rejected with 400"""
+        response = client.get(f'/api/icra-dosyalarim?{query}')
+
+        assert response.status_code == 400
+        assert 'error' in json.loads(response.data)
+
+    def test_total_count_counter_follows_writes(self, client):
+        """db_counters tracks inserts, INSERT OR REPLACE and deletes on files"""
+        with db_transaction() as conn:
+            seed_files(conn, [(make_file(str(i)), []) for i in range(1, 4)])
+            conn.execute("INSERT OR REPLACE INTO files (file_id, dosyaNo) VALUES ('2', '2024/2')")
+            conn.execute("DELETE FROM files WHERE file_id = '3'")
+
+        response = client.get('/api/icra-dosyalarim?limit=1')
+
+        assert response.headers['X-Total-Count'] == '2'
+
+    def seed_portfolio(self):
+        """Seed files that differ in every filterable column (including NULLs)"""
+        with db_transaction() as conn:
+            seed_files(conn, [
+                (make_file('1', durum='Açık', eYil=2023, takipTarihi='04.12.2023 16:23'), []),
+                (make_file('2', durum='Kapalı', eYil=2024, takipTarihi='05.02.2024 10:10',
+                           icraMudurlugu='İzmir 1. İcra Dairesi', alacakliAdi='ADEM ASLAN'), []),
+                (make_file('3', durum='Açık', eYil=2024, takipTarihi='09.02.2024 13:52', foyTuru='Talimat Dosyası'), []),
+                (make_file('4', durum=None, eYil=2025, takipTarihi=None), []),
+                (make_file('5', durum='Açık', eYil=2025, takipTarihi='01.07.2025 14:17'), []),
+            ])
+
+    def fetch_all_pages(self, client, query, limit=2):
+        """Follow X-Next-Cursor until the last page and return the file_ids in order"""
+        seen = []
+        cursor = None
+        while True:
+            url = f'/api/icra-dosyalarim?{query}&limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+            response = client.get(url)
+            assert response.status_code == 200
+            seen.extend(item['file_id'] for item in json.loads(response.data))
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                return seen, response
+
+    @pytest.mark.parametrize('query, expected', [
+        ('durum=Açık', ['1', '3', '5']),
+        ('icraMudurlugu=İzmir 1. İcra Dairesi', ['2']),
+        ('foyTuru=Talimat Dosyası', ['3']),
+        ('eYil=2024', ['2', '3']),
+        ('alacakliAdi=ADEM ASLAN', ['2']),
+        ('takipTarihiFrom=01.01.2024&takipTarihiTo=09.02.2024', ['2', '3']),
+        ('takipTarihiFrom=2025-01-01', ['5']),
+        ('durum=Açık&eYil=2024', ['3']),
+    ])
+    def test_icra_dosyalarim_filters(self, client, query, expected):
+        """Filters are applied server side and reflected in X-Total-Count"""
+        self.seed_portfolio()
+
+        seen, response = self.fetch_all_pages(client, query)
+
+        assert seen == expected
+        assert response.headers['X-Total-Count'] == str(len(expected))
+
+    @pytest.mark.parametrize('query, expected', [
+        ('sort=takipTarihi', ['4', '1', '2', '3', '5']),
+        ('sort=takipTarihi&order=desc', ['5', '3', '2', '1', '4']),
+        ('sort=durum', ['4', '1', '3', '5', '2']),
+        ('sort=eYil&order=desc', ['5', '4', '3', '2', '1']),
+        ('sort=eYil&durum=Açık', ['1', '3', '5']),
+        ('order=desc', ['5', '4', '3', '2', '1']),
+    ])
+    def test_icra_dosyalarim_sorted_pages(self, client, query, expected):
+        """Keyset pages follow the requested sort order (NULLs first ascending)"""
+        self.seed_portfolio()
+
+        seen, _ = self.fetch_all_pages(client, query)
+
+        assert seen == expected
+
+    @pytest.mark.parametrize('query', ['sort=borcluAdi', 'order=up', 'eYil=abc', 'takipTarihiFrom=2024/01/01'])
+    def test_icra_dosyalarim_invalid_filters(self, client, query):
+        """Unsupported sort fields and malformed filter values are rejected with 400"""
+        response = client.get(f'/api/icra-dosyalarim?{query}')
+
+        assert response.status_code == 400
+
+    def test_cursor_is_bound_to_sort_order(self, client):
+        """A cursor from one sort order cannot be replayed against another"""
+        self.seed_portfolio()
+        cursor = client.get('/api/icra-dosyalarim?sort=eYil&limit=2').headers['X-Next-Cursor']
+
+        response = client.get(f'/api/icra-dosyalarim?sort=durum&limit=2&cursor={cursor}')
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('filters, sort, descending, after, index', [
+        ({'durum': 'Açık'}, 'file_id', False, ['3'], 'idx_files_durum'),
+        ({'icraMudurlugu': 'Ankara'}, 'file_id', False, None, 'idx_files_icraMudurlugu'),
+        ({'foyTuru': 'İlamsız'}, 'file_id', True, ['3'], 'idx_files_foyTuru'),
+        ({'eYil': 2024}, 'file_id', False, None, 'idx_files_eYil'),
+        ({'alacakliAdi': 'ADEM ASLAN'}, 'file_id', False, None, 'idx_files_alacakliAdi'),
+        ({'takipTarihiFrom': '2024-01-01', 'takipTarihiTo': '2024-12-31'}, 'file_id', False, None, 'idx_files_takipTarihi'),
+        ({}, 'takipTarihi', True, ['2024-02-05 10:10', '2'], 'idx_files_takipTarihi'),
+        ({}, 'durum', False, ['Açık', '3'], 'idx_files_durum'),
+        ({}, 'eYil', True, [2024, '3'], 'idx_files_eYil'),
+    ])
+    def test_list_queries_use_index_range_scans(self, real_db, filters, sort, descending, after, index):
+        """Every supported filter, and every keyset page, is an index search (never a table scan)"""
+        sql, params = build_icra_dosyalari_query(filters, sort, descending, after, limit=51)
+
+        with db_transaction() as conn:
+            plan = [row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+        assert plan[0].startswith(f"SEARCH f USING INDEX {index} ")
+        # The only sort step is the borclular subquery's ORDER BY borclu_id, except for
+        # date ranges, whose rows come out of the index by date and are re-sorted by file_id
+        temp_sorts = [detail for detail in plan if detail == 'USE TEMP B-TREE FOR ORDER BY']
+        assert len(temp_sorts) == (2 if 'takipTarihiFrom' in filters else 1)
+
+    def seed_search_data(self):
+        """Two files with debtors and a couple of scraped sorgu payloads"""
+        with db_transaction() as conn:
+            seed_files(conn, [
+                (make_file('1'), ['Mehmet Şahin']),
+                (make_file('2'), ['Ayşe Işık', 'Ali Güneş']),
+            ])
+            conn.execute(
+                "INSERT INTO borclu_sorgular (borclu_id, type_id, sorgu_verisi, timestamp) VALUES (?, ?, ?, ?)",
+                ('2_1', SORGU_TYPE_IDS['EGM'], json.dumps({"EGM": {"Sonuc": "1 araç", "Araclar": [
+                    {"No": 1, "Plaka": "34ABC123", "Marka": "FORD", "Model": "FOCUS"}
+                ]}}, ensure_ascii=False), '2024-01-15 10:00:00')
+            )
+            conn.execute(
+                "INSERT INTO borclu_sorgular (borclu_id, type_id, sorgu_verisi, timestamp) VALUES (?, ?, ?, ?)",
+                ('1_1', SORGU_TYPE_IDS['SGK'], json.dumps({"SGK": {"sskCalisani": {"sonuc": "ÖZTÜRK İNŞAAT LTD. ŞTİ."}}}, ensure_ascii=False),
+                 '2024-01-15 10:00:00')
+            )
+
+    @pytest.mark.parametrize('query', ['ŞAHİN', 'sahin', 'Şahin', 'şah'])
+    def test_search_folds_turkish_letters(self, client, query):
+        """Debtor names match regardless of Turkish case and diacritics"""
+        self.seed_search_data()
+
+        response = client.get(f'/api/search?q={query}')
+
+        assert response.status_code == 200
+        hits = json.loads(response.data)
+        assert hits[0]['borclu_id'] == '1_1'
+        assert hits[0]['file_id'] == '1'
+        assert hits[0]['sorgu_tipi'] is None
+        assert '<b>' in hits[0]['snippet']
+
+    def test_search_finds_sorgu_payload_values(self, client):
+        """Values inside scraped payloads (plates, employers) are searchable"""
+        self.seed_search_data()
+
+        plate_hits = json.loads(client.get('/api/search?q=34abc123').data)
+        employer_hits = json.loads(client.get('/api/search?q=ozturk insaat').data)
+
+        assert [(hit['borclu_id'], hit['sorgu_tipi']) for hit in plate_hits] == [('2_1', 'EGM')]
+        assert plate_hits[0]['dosyaNo'] == '2024/2'
+        assert [(hit['borclu_id'], hit['sorgu_tipi']) for hit in employer_hits] == [('1_1', 'SGK')]
+
+    def test_search_index_follows_updates_and_deletes(self, client):
+        """Replaced payloads and deleted debtors drop out of the index"""
+        self.seed_search_data()
+        with db_transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO borclu_sorgular (borclu_id, type_id, sorgu_verisi, timestamp) VALUES (?, ?, ?, ?)",
+                ('2_1', SORGU_TYPE_IDS['EGM'], json.dumps({"EGM": {"Sonuc": "1 araç", "Araclar": [{"Plaka": "06XYZ99"}]}}), '2024-02-01 10:00:00')
+            )
+            conn.execute("UPDATE borclular SET ad = 'Ali Yıldız' WHERE borclu_id = '2_2'")
+
+        assert json.loads(client.get('/api/search?q=34ABC123').data) == []
+        assert len(json.loads(client.get('/api/search?q=06XYZ99').data)) == 1
+        assert json.loads(client.get('/api/search?q=Güneş').data) == []
+        assert json.loads(client.get('/api/search?q=yildiz').data)[0]['borclu_id'] == '2_2'
+
+        with db_transaction() as conn:
+            conn.execute("DELETE FROM borclu_sorgular WHERE borclu_id = '2_1'")
+            conn.execute("DELETE FROM borclular WHERE borclu_id = '2_1'")
+            docs = conn.execute("SELECT COUNT(*) FROM search_docs").fetchone()[0]
+            indexed = conn.execute("SELECT COUNT(*) FROM search_index").fetchone()[0]
+
+        assert json.loads(client.get('/api/search?q=06XYZ99').data) == []
+        assert json.loads(client.get('/api/search?q=ışık').data) == []
+        assert docs == indexed == 3
+
+    def test_search_index_backfills_existing_rows(self, client):
+        """Creating the index on a populated database indexes the existing rows"""
+        self.seed_search_data()
+        with db_transaction() as conn:
+            for name in ('search_index', 'search_docs'):
+                conn.execute(f"DROP TABLE {name}")
+            create_search_index(conn.cursor())
+
+        assert json.loads(client.get('/api/search?q=34ABC123').data)[0]['borclu_id'] == '2_1'
+        assert json.loads(client.get('/api/search?q=ahmet').data) == []
+
+    @pytest.mark.parametrize('query', ['', 'q=', 'q=%22%20*', 'q=ali&limit=0', 'q=ali&limit=x'])
+    def test_search_rejects_invalid_queries(self, client, query):
+        """Missing/empty queries and bad limits are rejected with 400"""
+        response = client.get(f'/api/search?{query}')
+
+        assert response.status_code == 400
+
+    def seed_sorgular(self):
+        """One file with three debtors and a few stored sorgu results"""
+        with db_transaction() as conn:
+            seed_files(conn, [(make_file('1'), ['Ayşe Demir', 'Mehmet Demir', 'Ali Kaya'])])
+            rows = [
+                ('1_1', 'Banka', {"Banka": {"sonuc": "2 banka", "bankalar": [{"no": 1, "kurum": "Ziraat"}]}}),
+                ('1_1', 'EGM', {"EGM": {"Sonuc": "1 araç", "Araclar": [{"No": 1, "Plaka": "34ABC123", "Marka": "FORD"}]}}),
+                ('1_2', 'EGM', {"EGM": {"Sonuc": "Kayıt yok", "Araclar": []}}),
+                ('1_3', 'GSM', {"GSM": {"sonuc": "1 hat"}}),
+            ]
+            conn.executemany(
+                "INSERT INTO borclu_sorgular (borclu_id, type_id, sorgu_verisi, timestamp) VALUES (?, ?, ?, ?)",
+                [(borclu_id, SORGU_TYPE_IDS[tipi], json.dumps(data, ensure_ascii=False), '2024-01-15 10:00:00')
+                 for borclu_id, tipi, data in rows]
+            )
+
+    def test_sorgu_batch_returns_all_requested_results(self, client):
+        """Several debtors and types come back in one response, missing ones are omitted"""
+        self.seed_sorgular()
+
+        response = client.post('/api/borclu-sorgular/batch', json={
+            "borclu_ids": ['1_1', '1_2', '1_3', 'missing'],
+            "sorgu_tipleri": ['Banka', 'EGM']
+        })
+
+        assert response.status_code == 200
+        results = json.loads(response.data)['results']
+        assert set(results) == {'1_1', '1_2'}
+        assert set(results['1_1']) == {'Banka', 'EGM'}
+        assert results['1_1']['Banka']['data']['Banka']['bankalar'][0]['kurum'] == 'Ziraat'
+        assert results['1_2']['EGM'] == {"data": {"EGM": {"Sonuc": "Kayıt yok", "Araclar": []}}, "timestamp": '2024-01-15 10:00:00'}
+
+    def test_sorgu_batch_projects_fields(self, client):
+        """Projected types only return the requested JSON paths"""
+        self.seed_sorgular()
+
+        response = client.post('/api/borclu-sorgular/batch', json={
+            "borclu_ids": ['1_1', '1_3'],
+            "fields": {"EGM": ['$.EGM.Sonuc', '$.EGM.Araclar[0]', '$.EGM.Yok']}
+        })
+
+        results = json.loads(response.data)['results']
+        assert results['1_1']['EGM']['data'] == {
+            '$.EGM.Sonuc': '1 araç',
+            '$.EGM.Araclar[0]': {"No": 1, "Plaka": "34ABC123", "Marka": "FORD"},
+            '$.EGM.Yok': None
+        }
+        # Types without a projection are returned in full
+        assert results['1_1']['Banka']['data']['Banka']['sonuc'] == '2 banka'
+        assert results['1_3']['GSM']['data'] == {"GSM": {"sonuc": "1 hat"}}
+
+    def test_sorgu_batch_names_unregistered_types_as_requested(self, client):
+        """A type that is not built in comes back under the spelling it was asked for"""
+        self.seed_sorgular()
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'Vergi Borcu', {"borc": "100"})
+
+        response = client.post('/api/borclu-sorgular/batch', json={
+            "borclu_ids": ['1_1'],
+            "sorgu_tipleri": ['vergi_borcu_sorgulama']
+        })
+
+        results = json.loads(response.data)['results']
+        assert results['1_1']['vergi_borcu_sorgulama']['data'] == {"borc": "100"}
+
+    def test_sorgu_batch_uses_one_query(self, client):
+        """The whole batch is read with a single borclu_sorgular statement"""
+        self.seed_sorgular()
+        statements = []
+        with database_connection.db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+
+        try:
+            client.post('/api/borclu-sorgular/batch', json={"borclu_ids": ['1_1', '1_2', '1_3']})
+        finally:
+            with database_connection.db_connection() as conn:
+                conn.set_trace_callback(None)
+
+        assert len([sql for sql in statements if 'borclu_sorgular' in sql]) == 1
+
+    @pytest.mark.parametrize('body', [
+        {},
+        {"borclu_ids": []},
+        {"borclu_ids": "1_1"},
+        {"borclu_ids": ['1_1'], "sorgu_tipleri": "EGM"},
+        {"borclu_ids": ['1_1'], "fields": {"EGM": "$.EGM"}},
+        {"borclu_ids": ['1_1'], "fields": {"EGM": ["EGM.Sonuc"]}},
+        {"borclu_ids": ['1_1'], "fields": {"EGM": ["$.EGM[x]"]}},
+        {"borclu_ids": [str(i) for i in range(101)]},
+    ])
+    def test_sorgu_batch_rejects_invalid_bodies(self, client, body):
+        """Malformed batch requests are rejected with 400"""
+        response = client.post('/api/borclu-sorgular/batch', json=body)
+
+        assert response.status_code == 400
+
+    def test_sorgu_endpoint_conditional_get(self, client):
+        """Sorgulama endpoints answer 304 while the stored row's timestamp is unchanged"""
+        self.seed_sorgular()
+        url = '/api/icra-dosyalarim/1/1_1/banka-sorgulama'
+
+        first = client.get(url)
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+        assert 'Last-Modified' in first.headers
+
+        not_modified = client.get(url, headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304
+        assert not_modified.data == b''
+        assert not_modified.headers['ETag'] == etag
+
+        since = client.get(url, headers={'If-Modified-Since': first.headers['Last-Modified']})
+        assert since.status_code == 304
+
+        with db_transaction() as conn:
+            conn.execute(
+                "UPDATE borclu_sorgular SET sorgu_verisi = ?, timestamp = ? WHERE borclu_id = '1_1' AND type_id = ?",
+                (json.dumps({"Banka": {"sonuc": "yok", "bankalar": []}}), '2024-01-15T10:00:00.500000', SORGU_TYPE_IDS['Banka'])
+            )
+        # Direct SQL bypasses the writers, so drop the cached result as they would
+        sorgu_cache.invalidate('1_1', sorgu_type_key('Banka'))
+
+        changed = client.get(url, headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+        assert json.loads(changed.data)['bankaSorguSonucu']['Banka']['sonuc'] == 'yok'
+
+    def test_sorgu_endpoint_conditional_get_skips_payload(self, client):
+        """A 304 is served from the covering primary key without reading sorgu_verisi"""
+        self.seed_sorgular()
+        url = '/api/icra-dosyalarim/1/1_1/arac-sorgulama'
+        etag = client.get(url).headers['ETag']
+
+        statements = []
+        with database_connection.db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT timestamp FROM borclu_sorgular WHERE borclu_id = ? AND type_id = ?",
+                ('1_1', SORGU_TYPE_IDS['EGM'])
+            ).fetchall()
+        try:
+            response = client.get(url, headers={'If-None-Match': etag})
+        finally:
+            with database_connection.db_connection() as conn:
+                conn.set_trace_callback(None)
+
+        assert response.status_code == 304
+        assert plan[0]['detail'] == 'SEARCH borclu_sorgular USING PRIMARY KEY (borclu_id=? AND type_id=?)'
+        assert not [sql for sql in statements if 'sorgu_verisi' in sql]
+
+    def test_sorgu_results_are_cached(self, client):
+        """A repeated sorgu read is served from the cache without touching the database"""
+        self.seed_sorgular()
+        url = '/api/icra-dosyalarim/1/1_1/banka-sorgulama'
+        first = client.get(url)
+
+        statements = []
+        with database_connection.db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            second = client.get(url)
+        finally:
+            with database_connection.db_connection() as conn:
+                conn.set_trace_callback(None)
+
+        assert second.data == first.data
+        assert not [sql for sql in statements if 'sorgu_verisi' in sql]
+        assert sorgu_cache.stats()['hits'] >= 1
+
+    def test_scraping_write_invalidates_cached_result(self, client):
+        """Saving a new scraping result replaces the cached one"""
+        self.seed_sorgular()
+        url = '/api/icra-dosyalarim/1/1_1/banka-sorgulama'
+        client.get(url)
+        invalidations = sorgu_cache.stats()['invalidations']
+
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'Banka', {"Banka": {"sonuc": "yok", "bankalar": []}})
+
+        response = client.get(url)
+        assert json.loads(response.data)['bankaSorguSonucu']['Banka']['sonuc'] == 'yok'
+        assert sorgu_cache.stats()['invalidations'] == invalidations + 1
+
+    def test_sorgu_type_aliases_read_one_result(self, client):
+        """Results written under one spelling of a type are served by every endpoint asking for another"""
+        self.seed_sorgular()
+        takbis = {"tasinmazlar": [{"il_ilce": "Ankara/Çankaya", "hisse_bilgisi": []}]}
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'TAKBİS', takbis)
+
+        for url, key in [('takbis-sorgulama', 'takbisSorguSonucu'), ('gayrimenkul-sorgulama', 'gayrimenkulSorguSonucu')]:
+            response = client.get(f'/api/icra-dosyalarim/1/1_1/{url}')
+            assert response.status_code == 200
+            assert json.loads(response.data)[key] == takbis
+        egm = json.loads(client.get('/api/icra-dosyalarim/1/1_1/egm-sorgulama').data)
+        assert egm['egmSorguSonucu']['EGM']['Araclar'][0]['Plaka'] == '34ABC123'
+        assert json.loads(client.get('/api/varliklar/tasinmazlar').data)['items'][0]['il_ilce'] == 'Ankara/Çankaya'
+
+        # The cached result is dropped by a write under yet another spelling
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'takbis_sorgulama', {"tasinmazlar": []})
+        response = client.get('/api/icra-dosyalarim/1/1_1/gayrimenkul-sorgulama')
+        assert json.loads(response.data)['gayrimenkulSorguSonucu'] == {"tasinmazlar": []}
+        batch = client.post('/api/borclu-sorgular/batch', json={"borclu_ids": ['1_1'], "sorgu_tipleri": ['TAKBİS']})
+        assert set(json.loads(batch.data)['results']['1_1']) == {'TAKBİS'}
+
+    def test_dynamic_sorgu_type_aliases_share_a_cache_entry(self, client):
+        """A write under one spelling of an unregistered type drops the result cached under another"""
+        self.seed_sorgular()
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'Vergi Borcu', {"borc": "100"})
+        assert json.loads(get_borclu_sorgu_raw('1_1', 'vergi_borcu_sorgulama')[0]) == {"borc": "100"}
+
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'Vergi Borcu', {"borc": "0"})
+        assert json.loads(get_borclu_sorgu_raw('1_1', 'vergi_borcu_sorgulama')[0]) == {"borc": "0"}
+
+    def test_cache_stats_endpoint(self, client):
+        """Cache and pool statistics are exposed for monitoring"""
+        self.seed_sorgular()
+        before = json.loads(client.get('/api/cache/stats').data)['sorgu_cache']
+        client.get('/api/icra-dosyalarim/1/1_1/banka-sorgulama')
+        client.get('/api/icra-dosyalarim/1/1_1/banka-sorgulama')
+
+        response = client.get('/api/cache/stats')
+
+        assert response.status_code == 200
+        stats = json.loads(response.data)
+        assert stats['sorgu_cache']['entries'] == 1
+        assert stats['sorgu_cache']['hits'] == before['hits'] + 1
+        assert stats['sorgu_cache']['misses'] == before['misses'] + 1
+        assert stats['connection_pool']['open_connections'] >= 1
+
+    def test_sorgu_payload_is_passed_through_verbatim(self, client):
+        """The stored JSON text is copied into the response as is"""
+        self.seed_sorgular()
+        stored = '{"GSM":  {"sonuc": "1 hat", "hatlar": [ {"no": "0555 111 22 33"} ]}}'
+        with db_transaction() as conn:
+            conn.execute("UPDATE borclu_sorgular SET sorgu_verisi = ? WHERE borclu_id = '1_3' AND type_id = ?",
+                         (stored, SORGU_TYPE_IDS['GSM']))
+
+        response = client.get('/api/icra-dosyalarim/1/1_3/telefon-sorgulama')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert stored.encode('utf-8') in response.data
+        assert json.loads(response.data) == {
+            "file_id": 1,
+            "borclu_id": '1_3',
+            "timestamp": '2024-01-15 10:00:00',
+            "gsmSorguSonucu": json.loads(stored)
+        }
+
+    def test_sgk_sections_are_reshaped_in_sql(self, client):
+        """SGK sections are extracted by SQLite, missing ones get the empty default"""
+        self.seed_sorgular()
+        with db_transaction() as conn:
+            conn.execute(
+                "INSERT INTO borclu_sorgular (borclu_id, type_id, sorgu_verisi, timestamp) VALUES (?, ?, ?, ?)",
+                ('1_1', SORGU_TYPE_IDS['SGK'], json.dumps({
+                    "sskCalisani": {"sonuc": {"isyeri": "ABC Ltd. Şti."}},
+                    "kamuEmeklisi": None,
+                    "ignored": {"sonuc": "x"}
+                }, ensure_ascii=False), '2024-01-15 10:00:00')
+            )
+
+        response = client.get('/api/icra-dosyalarim/1/1_1/sgk-sorgulama')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['sskCalisani'] == {"sonuc": {"isyeri": "ABC Ltd. Şti."}}
+        assert data['kamuEmeklisi'] is None
+        assert data['bagkurEmeklisi'] == {"sonuc": {}}
+        assert 'ignored' not in data
+        assert (data['file_id'], data['borclu_id'], data['timestamp']) == (1, '1_1', '2024-01-15 10:00:00')
+
+    def test_missing_sorgu_has_no_etag(self, client):
+        """Endpoints without a stored row keep their 404 and send no validators"""
+        self.seed_sorgular()
+
+        response = client.get('/api/icra-dosyalarim/1/1_3/banka-sorgulama')
+
+        assert response.status_code == 404
+        assert 'ETag' not in response.headers
+
+    @pytest.mark.parametrize('url', [
+        '/api/icra-dosyalarim',
+        '/api/icra-dosyalarim?limit=1',
+        '/api/icra-dosyalarim/1',
+        '/api/icra-dosyalarim/1/1_1',
+        '/api/search?q=demir',
+    ])
+    def test_list_endpoints_conditional_get(self, client, url):
+        """List and detail endpoints are validated by the global data version"""
+        self.seed_sorgular()
+
+        etag = client.get(url).headers['ETag']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+        with db_transaction() as conn:
+            conn.execute("UPDATE borclular SET telefon = '05551112233' WHERE borclu_id = '1_2'")
+
+        changed = client.get(url, headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+
+    def write_versions(self, versions):
+        """Store successive results of one query the way the scraper writer does"""
+        for timestamp, sonuc in versions:
+            with db_transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO borclu_sorgular (borclu_id, type_id, sorgu_verisi, timestamp) VALUES (?, ?, ?, ?)",
+                    ('1_1', SORGU_TYPE_IDS['Banka'], json.dumps({"Banka": {"sonuc": sonuc}}), timestamp)
+                )
+
+    def test_sorgu_history_keeps_every_version(self, client):
+        """Re-queries append to history while borclu_sorgular keeps only the latest row"""
+        self.seed_sorgular()
+        self.write_versions([('2024-02-01T09:00:00', 'iki'), ('2024-03-01T09:00:00', 'üç')])
+
+        response = client.get('/api/icra-dosyalarim/1/1_1/sorgu-gecmisi/Banka')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [v['timestamp'] for v in data['versions']] == ['2024-03-01T09:00:00', '2024-02-01T09:00:00', '2024-01-15 10:00:00']
+        assert data['next_before'] is None
+        with db_transaction() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM borclu_sorgular WHERE borclu_id = '1_1' AND type_id = ?",
+                                (SORGU_TYPE_IDS['Banka'],)).fetchone()[0] == 1
+
+    def test_sorgu_history_pages(self, client):
+        """limit/before page through the versions"""
+        self.seed_sorgular()
+        self.write_versions([('2024-02-01T09:00:00', 'iki'), ('2024-03-01T09:00:00', 'üç')])
+
+        first = json.loads(client.get('/api/icra-dosyalarim/1/1_1/sorgu-gecmisi/Banka?limit=2').data)
+        second = json.loads(client.get(f"/api/icra-dosyalarim/1/1_1/sorgu-gecmisi/Banka?limit=2&before={first['next_before']}").data)
+
+        assert [v['timestamp'] for v in first['versions']] == ['2024-03-01T09:00:00', '2024-02-01T09:00:00']
+        assert [v['timestamp'] for v in second['versions']] == ['2024-01-15 10:00:00']
+        assert second['next_before'] is None
+
+    @pytest.mark.parametrize('tarih, sonuc', [
+        ('2024-02-15', 'iki'),
+        ('01.02.2024', 'iki'),
+        ('2024-02-01T08:59:59', None),
+        ('2024-03-01T09:00:00', 'üç'),
+        ('2025-01-01', 'üç'),
+    ])
+    def test_sorgu_as_of(self, client, tarih, sonuc):
+        """as-of returns the version that was current at the given time"""
+        self.seed_sorgular()
+        with db_transaction() as conn:
+            conn.execute("DELETE FROM borclu_sorgu_history")
+        self.write_versions([('2024-02-01T09:00:00', 'iki'), ('2024-03-01T09:00:00', 'üç')])
+
+        response = client.get(f'/api/icra-dosyalarim/1/1_1/sorgu-gecmisi/Banka/as-of?tarih={tarih}')
+
+        if sonuc is None:
+            assert response.status_code == 404
+        else:
+            assert response.status_code == 200
+            assert json.loads(response.data)['sorguSonucu'] == {"Banka": {"sonuc": sonuc}}
+
+    @pytest.mark.parametrize('url', [
+        '/api/icra-dosyalarim/1/1_1/sorgu-gecmisi/Banka/as-of',
+        '/api/icra-dosyalarim/1/1_1/sorgu-gecmisi/Banka/as-of?tarih=dün',
+        '/api/icra-dosyalarim/1/1_1/sorgu-gecmisi/Banka?before=x',
+        '/api/icra-dosyalarim/1/1_1/sorgu-gecmisi/Banka?limit=0',
+    ])
+    def test_sorgu_history_rejects_invalid_parameters(self, client, url):
+        self.seed_sorgular()
+
+        assert client.get(url).status_code == 400
+
+    def seed_assets(self):
+        """Store EGM, TAKBIS and Banka results in the shape the scrapers produce"""
+        with db_transaction() as conn:
+            seed_files(conn, [(make_file('1'), ['Ayşe Demir', 'Mehmet Demir']), (make_file('2'), ['Ali Kaya'])])
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'EGM', {"Sonuc": "bulundu", "Araclar": [
+            {"No": "1", "Plaka": "06ABC01", "Marka": "FIAT", "Mahrumiyet": [
+                {"Takyidat Sirasi": "1", "Serh Turu": "HACİZ", "Kurum Adi": "Ankara 1. İcra"},
+                {"Takyidat Sirasi": "2", "Serh Turu": "REHİN", "Kurum Adi": "Banka"}
+            ]},
+            {"No": "2", "Plaka": "06XYZ02", "Marka": "FORD", "Mahrumiyet": [
+                {"Takyidat Sirasi": "1", "Serh Turu": "REHİN", "Kurum Adi": "Banka"}
+            ]}
+        ]})
+        assert save_scraping_result_to_db('2024/2', 'Ali Kaya', 'EGM', {"Sonuc": "bulundu", "Araclar": [
+            {"No": "1", "Plaka": "34DEF03", "Marka": "FIAT", "Mahrumiyet": []}
+        ]})
+        assert save_scraping_result_to_db('2024/1', 'Mehmet Demir', 'TAKBIS', {"sonuc": "1 taşınmaz", "tasinmazlar": [
+            {"no": "1", "il_ilce": "Çankaya/Ankara", "vasfi": "Mesken", "hisse_bilgisi": [
+                {"no": "1", "aciklama": "1/2", "takdiyat_bilgisi": [{"no": "1", "tipi": "Haciz", "aciklama": "x"}]},
+                {"no": "2", "aciklama": "1/2", "takdiyat_bilgisi": []}
+            ]}
+        ]})
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'Banka', {"sonuc": "2 banka", "bankalar": [
+            {"no": "1", "kurum": "Ziraat Bankası"}, {"no": "2", "kurum": "Vakıfbank"}
+        ]})
+        assert save_scraping_result_to_db('2024/2', 'Ali Kaya', 'Banka', {"sonuc": "1 banka", "bankalar": [
+            {"no": "1", "kurum": "Ziraat Bankası"}
+        ]})
+
+    def test_vehicles_without_haciz(self, client):
+        """Portfolio-wide vehicle query answered from the projected tables"""
+        self.seed_assets()
+
+        response = client.get('/api/varliklar/araclar?haciz=yok')
+
+        assert response.status_code == 200
+        items = json.loads(response.data)['items']
+        assert [(v['plaka'], v['borclu_id'], v['dosyaNo'], v['haciz_sayisi']) for v in items] == [
+            ('06XYZ02', '1_1', '2024/1', 0), ('34DEF03', '2_1', '2024/2', 0)
+        ]
+        with_haciz = json.loads(client.get('/api/varliklar/araclar?haciz=var&marka=FIAT').data)['items']
+        assert [(v['plaka'], v['mahrumiyet_sayisi'], v['haciz_sayisi']) for v in with_haciz] == [('06ABC01', 2, 1)]
+
+    def test_assets_follow_rewrites(self, client):
+        """A new result for the same debtor replaces its projected rows"""
+        self.seed_assets()
+
+        assert save_scraping_result_to_db('2024/1', 'Ayşe Demir', 'EGM', {"Sonuc": "Kayıt yok", "Araclar": []})
+
+        items = json.loads(client.get('/api/varliklar/araclar').data)['items']
+        assert [v['plaka'] for v in items] == ['34DEF03']
+        with db_transaction() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM borclu_arac_mahrumiyetleri").fetchone()[0] == 0
+
+    def test_asset_lists_page_and_filter(self, client):
+        self.seed_assets()
+
+        first = json.loads(client.get('/api/varliklar/banka-hesaplari?limit=2').data)
+        second = json.loads(client.get(f"/api/varliklar/banka-hesaplari?limit=2&after={first['next_after']}").data)
+        ziraat = json.loads(client.get('/api/varliklar/banka-hesaplari?kurum=Ziraat Bankası&file_id=2').data)
+        tasinmazlar = json.loads(client.get('/api/varliklar/tasinmazlar?haciz=var').data)['items']
+
+        assert len(first['items']) == 2 and len(second['items']) == 1 and second['next_after'] is None
+        assert [(h['borclu_id'], h['kurum']) for h in ziraat['items']] == [('2_1', 'Ziraat Bankası')]
+        assert [(t['il_ilce'], t['hisse_sayisi'], t['haciz_sayisi']) for t in tasinmazlar] == [('Çankaya/Ankara', 2, 1)]
+
+    def test_asset_summary(self, client):
+        self.seed_assets()
+
+        summary = json.loads(client.get('/api/varliklar/ozet').data)
+
+        assert summary['araclar'] == {"toplam": 3, "borclu_sayisi": 2, "haczi_olmayan": 2}
+        assert summary['tasinmazlar'] == {"toplam": 1, "borclu_sayisi": 1, "haczi_olmayan": 0}
+        assert summary['banka_hesaplari']['kurumlar'][0] == {"kurum": 'Ziraat Bankası', "hesap_sayisi": 2, "borclu_sayisi": 2}
+
+    def test_vehicle_query_uses_indexes(self, client):
+        """The haciz filter is answered from the projected tables' indexes"""
+        with db_transaction() as conn:
+            plan = ' '.join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT arac_id FROM borclu_araclar a WHERE NOT EXISTS "
+                "(SELECT 1 FROM borclu_arac_mahrumiyetleri m WHERE m.arac_id = a.arac_id AND m.haciz = 1)"
+            ))
+        assert 'idx_borclu_arac_mahrumiyetleri_arac_id' in plan
+
+    @pytest.mark.parametrize('url', [
+        '/api/varliklar/araclar?haciz=belki',
+        '/api/varliklar/tasinmazlar?after=x',
+        '/api/varliklar/banka-hesaplari?limit=0',
+    ])
+    def test_asset_lists_reject_invalid_parameters(self, client, url):
+        assert client.get(url).status_code == 400
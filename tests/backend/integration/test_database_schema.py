@@ -0,0 +1,153 @@
+import pytest
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add backend to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+from services import database_connection, database_schema
+from services.database_connection import connect, configure_pool, close_pool, db_connection
+from services.database_schema import MIGRATIONS, SCHEMA_VERSION, ensure_schema, get_schema_version, migrate
+from services.database_writer import save_file_data_to_db
+from services.sorgu_payloads import payload_sql
+from services.sorgu_types import DYNAMIC_TYPE_ID_START, SORGU_TYPE_IDS
+
+class TestDatabaseSchema:
+    """Integration tests for the versioned schema migrations"""
+
+    @pytest.fixture
+    def db_path(self):
+        return os.path.join(tempfile.mkdtemp(), 'files.db')
+
+    @pytest.fixture
+    def conn(self, db_path):
+        conn = connect(db_path, isolation_level=None)
+        yield conn
+        conn.close()
+
+    def object_names(self, conn):
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+
+    def test_fresh_database_gets_full_schema(self, conn):
+        """All migrations run on an empty database and are recorded in user_version"""
+        assert migrate(conn) == list(range(1, SCHEMA_VERSION + 1))
+
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        assert {'files', 'file_details', 'borclular', 'borclu_sorgular', 'db_counters', 'search_docs',
+                'idx_files_takipTarihi', 'trg_files_count_insert', 'trg_search_sorgu_insert'} <= self.object_names(conn)
+
+    def test_current_database_runs_no_ddl(self, conn):
+        """Migrating an up-to-date database only reads user_version"""
+        migrate(conn)
+        statements = []
+        conn.set_trace_callback(statements.append)
+
+        assert migrate(conn) == []
+        assert statements == ['PRAGMA user_version']
+
+    def test_legacy_database_is_upgraded(self, conn):
+        """A pre-versioning database with data gets the missing objects and backfilled counters"""
+        conn.execute("CREATE TABLE files (file_id TEXT PRIMARY KEY, klasor TEXT, dosyaNo TEXT, eYil INTEGER, eNo INTEGER, "
+                     "borcluAdi TEXT, alacakliAdi TEXT, foyTuru TEXT, durum TEXT, takipTarihi TEXT, icraMudurlugu TEXT)")
+        conn.execute("CREATE TABLE borclular (borclu_id TEXT PRIMARY KEY, file_id TEXT, ad TEXT, tcKimlik TEXT, "
+                     "telefon TEXT, adres TEXT, vekil TEXT)")
+        conn.execute("INSERT INTO files (file_id, dosyaNo) VALUES ('1', '2024/1'), ('2', '2024/2')")
+        conn.execute("INSERT INTO borclular (borclu_id, file_id, ad) VALUES ('1_1', '1', 'Ayşe Demir')")
+        conn.execute("CREATE TABLE borclu_sorgular (borclu_id TEXT, sorgu_tipi TEXT, sorgu_verisi TEXT, timestamp TEXT, "
+                     "PRIMARY KEY (borclu_id, sorgu_tipi))")
+        conn.execute("INSERT INTO borclu_sorgular VALUES ('1_1', 'Banka', '{}', '2024-01-15T10:00:00')")
+
+        migrate(conn)
+
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        assert conn.execute("SELECT value FROM db_counters WHERE name = 'files'").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM search_index WHERE search_index MATCH 'ayse'").fetchone()[0] == 1
+        assert conn.execute("SELECT ad_key FROM borclular WHERE borclu_id = '1_1'").fetchone()[0] == 'ayşe demir'
+        assert [tuple(row) for row in conn.execute("SELECT borclu_id, type_id, timestamp FROM borclu_sorgu_history")] == [
+            ('1_1', SORGU_TYPE_IDS['Banka'], '2024-01-15T10:00:00')
+        ]
+        assert [tuple(row) for row in conn.execute(f"SELECT sorgu_verisi, {payload_sql('s')} FROM borclu_sorgular s")] == [
+            (None, '{}')
+        ]
+        assert conn.execute("SELECT COUNT(*) FROM sorgu_payloads").fetchone()[0] == 1
+
+    def test_sorgu_spellings_are_merged_into_type_ids(self, conn, monkeypatch):
+        """Migration 10 keys stored results on type_id, keeping the latest of two spellings of one type"""
+        monkeypatch.setattr(database_schema, 'MIGRATIONS', MIGRATIONS[:9])
+        monkeypatch.setattr(database_schema, 'SCHEMA_VERSION', 9)
+        migrate(conn)
+        conn.execute("INSERT INTO files (file_id, dosyaNo) VALUES ('1', '2024/1')")
+        conn.execute("INSERT INTO borclular (borclu_id, file_id, ad) VALUES ('1_1', '1', 'Ayşe Demir')")
+        conn.executemany("INSERT INTO borclu_sorgular (borclu_id, sorgu_tipi, sorgu_verisi, timestamp) VALUES ('1_1', ?, ?, ?)", [
+            ('TAKBIS', '{"tasinmazlar": []}', '2024-01-01T10:00:00'),
+            ('TAKBİS', '{"tasinmazlar": [{"il_ilce": "Ankara/Çankaya"}]}', '2024-02-01T10:00:00'),
+            ('egm_sorgulama', '{"Araclar": []}', '2024-01-01T10:00:00'),
+            ('Vergi Borcu', '{"sonuc": "yok"}', '2024-01-01T10:00:00'),
+        ])
+        monkeypatch.undo()
+
+        assert migrate(conn) == [SCHEMA_VERSION]
+
+        rows = conn.execute(f"SELECT type_id, {payload_sql('s')}, timestamp FROM borclu_sorgular s ORDER BY type_id").fetchall()
+        assert [tuple(row) for row in rows] == [
+            (SORGU_TYPE_IDS['EGM'], '{"Araclar": []}', '2024-01-01T10:00:00'),
+            (SORGU_TYPE_IDS['TAKBIS'], '{"tasinmazlar": [{"il_ilce": "Ankara/Çankaya"}]}', '2024-02-01T10:00:00'),
+            (DYNAMIC_TYPE_ID_START, '{"sonuc": "yok"}', '2024-01-01T10:00:00'),
+        ]
+        assert conn.execute("SELECT name FROM sorgu_types WHERE type_id = ?", (DYNAMIC_TYPE_ID_START,)).fetchone()[0] == 'Vergi Borcu'
+        assert conn.execute("SELECT COUNT(*) FROM borclu_sorgu_history WHERE type_id = ?",
+                            (SORGU_TYPE_IDS['TAKBIS'],)).fetchone()[0] == 2
+        # The 'TAKBİS' row was never projected before; the search documents use canonical names
+        assert [row[0] for row in conn.execute("SELECT il_ilce FROM borclu_tasinmazlar")] == ['Ankara/Çankaya']
+        assert {row[0] for row in conn.execute("SELECT sorgu_tipi FROM search_docs")} == {'', 'EGM', 'TAKBIS', 'Vergi Borcu'}
+        assert 'sorgu_tipi' not in {row[1] for row in conn.execute("PRAGMA table_info(borclu_sorgular)")}
+
+    def test_failed_migration_is_rolled_back(self, conn, monkeypatch):
+        """A failing migration leaves no partial objects and keeps the previous version"""
+        def broken(cur):
+            cur.execute("CREATE TABLE half_done (id INTEGER)")
+            raise RuntimeError("boom")
+        monkeypatch.setattr(database_schema, 'MIGRATIONS', MIGRATIONS + [("broken", broken)])
+        monkeypatch.setattr(database_schema, 'SCHEMA_VERSION', SCHEMA_VERSION + 1)
+
+        with pytest.raises(RuntimeError):
+            migrate(conn)
+
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        assert 'half_done' not in self.object_names(conn)
+        assert not conn.in_transaction
+
+    def test_writers_run_no_schema_ddl(self, db_path):
+        """Once the schema is in place, writes do not re-run CREATE statements"""
+        original_path = database_connection.DB_PATH
+        configure_pool(db_path=db_path)
+        ensure_schema(db_path)
+        statements = []
+        with db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            assert save_file_data_to_db({'file_id': '1', 'dosyaNo': '2024/1'})
+        finally:
+            with db_connection() as conn:
+                conn.set_trace_callback(None)
+            close_pool()
+            database_connection.DB_PATH = original_path
+
+        assert statements
+        assert not [sql for sql in statements if 'CREATE' in sql]
+
+    def test_ensure_schema_runs_once_per_path(self, db_path):
+        """ensure_schema migrates a database file only the first time it is called"""
+        ensure_schema(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA user_version = 0")
+        conn.close()
+
+        ensure_schema(db_path)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+        conn.close()
@@ -0,0 +1,389 @@
+import pytest
+import sys
+import os
+import tempfile
+import threading
+
+# Add backend to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+database_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database')
+sys.path.insert(0, database_path)
+
+from services import database_connection, scrape_journal
+from services.database_connection import configure_pool, close_pool, db_connection, db_transaction
+from services.borclu_lookup import borclu_ad_key, borclu_lookup_run
+from services.database_writer import (
+    create_database_if_not_exists, get_or_create_file_id_for_extract, save_extract_batch_to_db,
+    save_extract_data_to_db, save_file_data_to_db, save_scraping_data_to_db_and_json
+)
+from services.database_reader import (
+    get_borclu_sorgu_by_tipi, get_borclu_sorgu_sections, get_borclu_sorgu_timestamp, get_borclu_sorgular_batch,
+    get_borclu_sorgular_by_borclu_id
+)
+from services.sorgu_cache import sorgu_cache
+import maintenance
+
+def make_extract(dosya_no, borclu_names, **overrides):
+    """Build a file dict shaped like search_all_files_extract output"""
+    file_data = {
+        'dosyaNo': dosya_no,
+        'eYil': 2024,
+        'eNo': 1,
+        'borcluAdi': ', '.join(borclu_names),
+        'alacakliAdi': 'XYZ Holding A.Ş.',
+        'foyTuru': 'İlamsız',
+        'durum': 'Açık',
+        'takipTarihi': '15.01.2024',
+        'icraMudurlugu': 'Ankara 2. İcra Müdürlüğü',
+        'takipSekli': 'İlamsız',
+        'takipYolu': 'Genel Haciz Yoluyla',
+        'takipTuru': 'Adi',
+        'alacakliVekili': 'Av. Mehmet',
+        'borcMiktari': '1.000,00 TL',
+        'faizOrani': '%9',
+        'guncelBorc': '1.100,00 TL',
+        'borcluList': [
+            {'ad': ad, 'tcKimlik': '', 'telefon': '', 'adres': '', 'vekil': ''}
+            for ad in borclu_names
+        ]
+    }
+    file_data.update(overrides)
+    return file_data
+
+class TestExtractBatchWriter:
+    """Integration tests for the bulk extract writer against a real temporary database"""
+
+    @pytest.fixture
+    def real_db(self):
+        """Create the real schema in a temporary database and route the pool to it"""
+        original_path = database_connection.DB_PATH
+        temp_dir = tempfile.mkdtemp()
+        configure_pool(db_path=os.path.join(temp_dir, 'files.db'))
+        create_database_if_not_exists()
+        sorgu_cache.clear()
+
+        yield
+
+        sorgu_cache.clear()
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    def borclular(self):
+        with db_connection() as conn:
+            rows = conn.execute("SELECT borclu_id, ad, tcKimlik, adres FROM borclular ORDER BY borclu_id").fetchall()
+        return [tuple(row) for row in rows]
+
+    def test_batch_is_written_in_one_transaction(self, real_db):
+        """Every file, detail and debtor row is committed together"""
+        statements = []
+        with db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            saved = save_extract_batch_to_db([
+                make_extract('2024/1', ['Ayşe Demir']),
+                make_extract('2024/2', ['Mehmet Demir', 'Ali Kaya']),
+                make_extract('2024/3', []),
+            ])
+        finally:
+            with db_connection() as conn:
+                conn.set_trace_callback(None)
+
+        assert [(f['file_id'], f['klasor']) for f in saved] == [('1', '1'), ('2', '2'), ('3', '3')]
+        assert [b['borclu_id'] for b in saved[1]['borcluList']] == ['2_1', '2_2']
+        # Schema setup may run its own transaction first; every row is written by the last one
+        batch = statements[max(i for i, sql in enumerate(statements) if sql == 'BEGIN IMMEDIATE'):]
+        assert [sql for sql in batch if sql.startswith(('BEGIN', 'COMMIT'))] == ['BEGIN IMMEDIATE', 'COMMIT']
+        assert not [sql for sql in statements[:-len(batch)] if 'INSERT INTO borclular' in sql]
+        assert [sql for sql in batch if 'INSERT INTO borclular' in sql]
+        with db_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 3
+            assert conn.execute("SELECT COUNT(*) FROM file_details").fetchone()[0] == 3
+            assert conn.execute("SELECT value FROM db_counters WHERE name = 'files'").fetchone()[0] == 3
+        assert [row[:2] for row in self.borclular()] == [('1_1', 'Ayşe Demir'), ('2_1', 'Mehmet Demir'), ('2_2', 'Ali Kaya')]
+
+    def test_resync_keeps_mernis_data(self, real_db):
+        """Re-extracting a file updates it in place and keeps tcKimlik/adres of unchanged debtors"""
+        save_extract_batch_to_db([make_extract('2024/1', ['Ayşe Demir', 'Mehmet Demir', 'Ali Kaya'])])
+        with db_transaction() as conn:
+            conn.execute("UPDATE borclular SET tcKimlik = '11111111110', adres = 'Çankaya/Ankara' WHERE borclu_id IN ('1_1', '1_2')")
+
+        saved = save_extract_data_to_db(make_extract('2024/1', ['Ayşe Demir', 'Veli Kaya'], durum='Kapalı'))
+
+        assert saved['file_id'] == '1'
+        assert self.borclular() == [
+            ('1_1', 'Ayşe Demir', '11111111110', 'Çankaya/Ankara'),
+            ('1_2', 'Veli Kaya', '', ''),
+        ]
+        with db_connection() as conn:
+            assert conn.execute("SELECT durum FROM files WHERE file_id = '1'").fetchone()[0] == 'Kapalı'
+            assert conn.execute("SELECT value FROM db_counters WHERE name = 'files'").fetchone()[0] == 1
+
+    def test_resync_drops_results_of_removed_debtors(self, real_db):
+        """Results of a debtor no longer listed go with it, not to the next debtor at its position"""
+        save_extract_batch_to_db([make_extract('2024/1', ['Ayşe Demir', 'Mehmet Demir'])])
+        save_scraping_data_to_db_and_json({'2024/1': {'Mehmet Demir': {
+            'EGM': {"sonuc": "Araç", "Araclar": [{"Plaka": "06 AB 123"}]}
+        }}})
+        assert get_borclu_sorgu_by_tipi('1_2', 'EGM') is not None
+
+        save_extract_batch_to_db([make_extract('2024/1', ['Ayşe Demir'])])
+
+        with db_connection() as conn:
+            for table in ('borclu_sorgular', 'borclu_sorgu_history', 'borclu_araclar'):
+                assert conn.execute(f"SELECT COUNT(*) FROM {table} WHERE borclu_id = '1_2'").fetchone()[0] == 0
+        assert maintenance.check(database_connection.DB_PATH)['ok']
+
+        save_extract_batch_to_db([make_extract('2024/1', ['Ayşe Demir', 'Veli Kaya'])])
+        assert get_borclu_sorgu_by_tipi('1_2', 'EGM') is None
+
+    def test_new_files_continue_after_existing_ids(self, real_db):
+        """Existing files keep their ids and new ones get the next free ids, once per dosya"""
+        save_extract_batch_to_db([make_extract('2024/1', ['Ayşe Demir'])])
+
+        saved = save_extract_batch_to_db([
+            make_extract('2024/2', ['Mehmet Demir']),
+            make_extract('2024/1', ['Ayşe Demir']),
+            make_extract('2024/2', ['Mehmet Demir']),
+            make_extract('', ['Skipped']),
+        ])
+
+        assert [f['file_id'] for f in saved] == ['2', '1', '2']
+
+    def test_failed_batch_writes_nothing(self, real_db):
+        """An error rolls back the whole batch"""
+        saved = save_extract_batch_to_db([
+            make_extract('2024/1', ['Ayşe Demir']),
+            make_extract('2024/2', ['Mehmet Demir'], borcluList=None),
+        ])
+
+        assert saved == []
+        with db_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+
+class TestFileIdAllocation:
+    """Integration tests for the file_id sequence"""
+
+    @pytest.fixture
+    def real_db(self):
+        original_path = database_connection.DB_PATH
+        temp_dir = tempfile.mkdtemp()
+        configure_pool(db_path=os.path.join(temp_dir, 'files.db'))
+        create_database_if_not_exists()
+        sorgu_cache.clear()
+
+        yield
+
+        sorgu_cache.clear()
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    def test_allocation_does_not_scan_files(self, real_db):
+        """New ids come from the sequence row, not from MAX/ORDER BY over file_id"""
+        save_extract_batch_to_db([make_extract('2024/1', ['Ayşe Demir'])])
+        statements = []
+        with db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            saved = save_extract_batch_to_db([make_extract('2024/2', ['Mehmet Demir'])])
+        finally:
+            with db_connection() as conn:
+                conn.set_trace_callback(None)
+
+        assert saved[0]['file_id'] == '2'
+        assert not [sql for sql in statements if 'CAST(file_id' in sql]
+
+    def test_explicit_ids_advance_the_sequence(self, real_db):
+        """Files inserted with their own file_id are never handed out again"""
+        assert save_file_data_to_db({'file_id': '41', 'dosyaNo': '2023/9', 'icraMudurlugu': 'Ankara'})
+
+        assert get_or_create_file_id_for_extract('2024/1', 'Ankara') == ('42', '42', True)
+        assert get_or_create_file_id_for_extract('2023/9', 'Ankara') == ('41', None, False)
+
+    def test_concurrent_extractions_get_distinct_ids(self, real_db):
+        """Parallel extract writers never allocate the same file_id"""
+        results = []
+        errors = []
+
+        def extract(worker):
+            try:
+                for n in range(10):
+                    results.extend(save_extract_batch_to_db([make_extract(f'2024/{worker * 100 + n}', ['Ayşe Demir'])]))
+                    file_id, _, is_new = get_or_create_file_id_for_extract(f'2025/{worker * 100 + n}', 'Ankara')
+                    results.append({'file_id': file_id, 'new': is_new})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=extract, args=(worker,)) for worker in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        file_ids = [result['file_id'] for result in results]
+        assert not errors
+        assert len(file_ids) == 120
+        assert len(set(file_ids)) == len(file_ids)
+        with db_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 60
+            assert conn.execute("SELECT value FROM db_counters WHERE name = 'last_file_id'").fetchone()[0] == 120
+
+class TestBorcluLookup:
+    """Integration tests for matching scraper results to debtors"""
+
+    @pytest.fixture
+    def real_db(self, monkeypatch):
+        """Seed one file whose debtor names overlap"""
+        original_path = database_connection.DB_PATH
+        temp_dir = tempfile.mkdtemp()
+        monkeypatch.setattr(scrape_journal, 'journal', scrape_journal.ScrapeJournal(os.path.join(temp_dir, 'journal')))
+        configure_pool(db_path=os.path.join(temp_dir, 'files.db'))
+        create_database_if_not_exists()
+        sorgu_cache.clear()
+        save_extract_batch_to_db([make_extract('2024/1', ['ALİ KAYALI', 'Ali  Kaya', 'IŞIK Ağaç'])])
+
+        yield temp_dir
+
+        sorgu_cache.clear()
+        scrape_journal.journal.close()
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    def save(self, temp_dir, borclu_adi, sorgu_tipi, sorgu_verisi):
+        save_scraping_data_to_db_and_json({'2024/1': {borclu_adi: {sorgu_tipi: sorgu_verisi}}},
+                                          os.path.join(temp_dir, 'sorgu.json'))
+
+    def stored(self):
+        with db_connection() as conn:
+            return {(row['borclu_id'], row['sorgu_tipi']) for row in
+                    conn.execute("SELECT borclu_id, t.name AS sorgu_tipi FROM borclu_sorgular JOIN sorgu_types t USING (type_id)")}
+
+    def test_ad_key_is_turkish_casefolded(self):
+        """İ/I fold to i/ı and whitespace is collapsed"""
+        assert borclu_ad_key('  ALİ   KAYALI ') == 'ali kayalı'
+        assert borclu_ad_key('IŞIK Ağaç') == borclu_ad_key('ışık ağaç')
+        assert borclu_ad_key(None) is None
+
+    def test_overlapping_names_match_exactly(self, real_db):
+        """'Ali Kaya' no longer matches the earlier 'ALİ KAYALI' row"""
+        self.save(real_db, 'ALİ KAYA - ', 'Banka', {'sonuc': 'x'})
+        self.save(real_db, 'ışık ağaç', 'GSM', {'sonuc': 'y'})
+
+        assert self.stored() == {('1_2', 'Banka'), ('1_3', 'GSM')}
+
+    def test_tc_kimlik_is_matched_first(self, real_db):
+        """Once MERNİS stored a TC number, results carrying it match by tcKimlik"""
+        mernis = {'sonuc': {'Kimlik Bilgileri': {'T.C Kimlik No': '12345678901'}, 'Adres Bilgileri': {'İl': 'Ankara'}}}
+        self.save(real_db, 'Ali Kaya - 12345678901', 'MERNİS', mernis)
+        with db_connection() as conn:
+            rows = conn.execute("SELECT borclu_id, tcKimlik FROM borclular WHERE tcKimlik != ''").fetchall()
+        assert [tuple(row) for row in rows] == [('1_2', '12345678901')]
+
+        # Name as shown by UYAP differs, the TC number still identifies the debtor
+        self.save(real_db, 'ALİ KAYA (VEFAT) - 12345678901', 'Banka', {'sonuc': 'x'})
+
+        assert ('1_2', 'Banka') in self.stored()
+
+    def test_lookup_uses_file_and_name_index(self, real_db):
+        """The name lookup is an index search, not a scan of the file's debtors"""
+        with db_connection() as conn:
+            plan = ' '.join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT borclu_id FROM borclular WHERE file_id = ? AND ad_key = ? ORDER BY borclu_id LIMIT 1",
+                ('1', 'ali kaya')
+            ))
+        assert 'idx_borclular_file_id_ad_key' in plan
+
+    def test_debtor_is_looked_up_once_per_run(self, real_db):
+        """Within a sorgulama run repeated saves for a debtor reuse the first lookup"""
+        statements = []
+        with db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            with borclu_lookup_run():
+                for sorgu_tipi in ('Banka', 'GSM', 'EGM'):
+                    self.save(real_db, 'Ali Kaya', sorgu_tipi, {'sonuc': ''})
+        finally:
+            with db_connection() as conn:
+                conn.set_trace_callback(None)
+
+        assert len([sql for sql in statements if 'FROM borclular' in sql]) == 1
+        assert len([sql for sql in statements if 'FROM files' in sql]) == 1
+        assert self.stored() == {('1_2', 'Banka'), ('1_2', 'GSM'), ('1_2', 'EGM')}
+
+    def test_file_imported_later_in_the_run_is_found(self, real_db):
+        """A missing file is not remembered as missing by the run's resolver"""
+        sorgu_json = os.path.join(real_db, 'sorgu.json')
+        with borclu_lookup_run():
+            save_scraping_data_to_db_and_json({'2024/9': {'Can Öz': {'GSM': {'sonuc': 'yok'}}}}, sorgu_json)
+            save_extract_batch_to_db([make_extract('2024/9', ['Can Öz'])])
+            save_scraping_data_to_db_and_json({'2024/9': {'Can Öz': {'GSM': {'sonuc': 'var'}}}}, sorgu_json)
+
+        with db_connection() as conn:
+            borclu_id = conn.execute(
+                "SELECT borclu_id FROM borclular JOIN files USING (file_id) WHERE dosyaNo = '2024/9'"
+            ).fetchone()[0]
+        assert (borclu_id, 'GSM') in self.stored()
+
+class TestSorguPayloads:
+    """Integration tests for content-addressed, compressed sorgu payload storage"""
+
+    @pytest.fixture
+    def real_db(self, monkeypatch):
+        """Seed one file with three debtors"""
+        original_path = database_connection.DB_PATH
+        temp_dir = tempfile.mkdtemp()
+        monkeypatch.setattr(scrape_journal, 'journal', scrape_journal.ScrapeJournal(os.path.join(temp_dir, 'journal')))
+        configure_pool(db_path=os.path.join(temp_dir, 'files.db'))
+        create_database_if_not_exists()
+        sorgu_cache.clear()
+        save_extract_batch_to_db([make_extract('2024/1', ['Ayşe Demir', 'Ali Kaya', 'Veli Can'])])
+
+        yield temp_dir
+
+        sorgu_cache.clear()
+        scrape_journal.journal.close()
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    def save(self, temp_dir, borclu_adi, sorgu_tipi, sorgu_verisi):
+        save_scraping_data_to_db_and_json({'2024/1': {borclu_adi: {sorgu_tipi: sorgu_verisi}}},
+                                          os.path.join(temp_dir, 'sorgu.json'))
+
+    def test_identical_payloads_are_stored_once(self, real_db):
+        """Shared payloads are one row; large ones are compressed and still readable and projected"""
+        egm = {'sonuc': 'bulundu', 'Araclar': [
+            {'Plaka': f'06 ABC {i}', 'Marka': 'FIAT', 'Mahrumiyet': [{'Serh Turu': 'HACİZ', 'Kurum Adi': 'İcra'}]}
+            for i in range(20)
+        ]}
+        for borclu_adi in ('Ayşe Demir', 'Ali Kaya', 'Veli Can'):
+            self.save(real_db, borclu_adi, 'GSM', {'sonuc': ''})
+        self.save(real_db, 'Ayşe Demir', 'EGM', egm)
+
+        with db_connection() as conn:
+            payloads = conn.execute("SELECT encoding FROM sorgu_payloads ORDER BY encoding").fetchall()
+            assert [row[0] for row in payloads] == ['json', 'zlib']
+            assert conn.execute("SELECT COUNT(*) FROM borclu_sorgular WHERE sorgu_verisi IS NOT NULL").fetchone()[0] == 0
+            assert conn.execute("SELECT COUNT(*) FROM borclu_araclar").fetchone()[0] == 20
+        sorgu_cache.clear()
+        assert get_borclu_sorgu_by_tipi('1_1', 'EGM')['data'] == egm
+        assert get_borclu_sorgu_sections('1_1', 'EGM', ['sonuc'])[0] == {'sonuc': '"bulundu"'}
+        assert get_borclu_sorgular_by_borclu_id('1_2') == [
+            ('1_2', 'GSM', '{"sonuc": ""}', get_borclu_sorgu_timestamp('1_2', 'GSM'))
+        ]
+        assert get_borclu_sorgular_batch(['1_2', '1_3'], fields={'GSM': ['$.sonuc']}) == {
+            '1_2': {'GSM': {'data': {'$.sonuc': ''}, 'timestamp': get_borclu_sorgu_timestamp('1_2', 'GSM')}},
+            '1_3': {'GSM': {'data': {'$.sonuc': ''}, 'timestamp': get_borclu_sorgu_timestamp('1_3', 'GSM')}},
+        }
+
+    def test_unchanged_payload_is_not_rewritten(self, real_db):
+        """Re-saving the same result leaves the row and its history alone; a change is written"""
+        self.save(real_db, 'Ali Kaya', 'Banka', {'sonuc': 'kayıt bulunamadı'})
+        timestamp = get_borclu_sorgu_timestamp('1_2', 'Banka')
+
+        self.save(real_db, 'Ali Kaya', 'Banka', {'sonuc': 'kayıt bulunamadı'})
+        assert get_borclu_sorgu_timestamp('1_2', 'Banka') == timestamp
+
+        self.save(real_db, 'Ali Kaya', 'Banka', {'sonuc': '1 banka'})
+        with db_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM borclu_sorgu_history").fetchone()[0] == 2
+        assert get_borclu_sorgu_by_tipi('1_2', 'Banka')['data'] == {'sonuc': '1 banka'}
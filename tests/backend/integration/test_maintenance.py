@@ -0,0 +1,126 @@
+import pytest
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add backend and database to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+database_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database')
+sys.path.insert(0, database_path)
+
+from services import database_connection
+from services.database_connection import configure_pool, close_pool, db_connection, db_transaction
+from services.database_schema import ensure_schema
+from services.sorgu_types import SORGU_TYPE_IDS
+import maintenance
+
+class TestMaintenance:
+    """Integration tests for database/maintenance.py against a populated temporary database"""
+
+    @pytest.fixture
+    def db_path(self):
+        """200 files with a debtor and a large sorgu result each, served through the pool"""
+        original_path = database_connection.DB_PATH
+        path = os.path.join(tempfile.mkdtemp(), 'files.db')
+        configure_pool(db_path=path)
+        ensure_schema(path)
+        with db_transaction() as conn:
+            conn.executemany("INSERT INTO files (file_id, dosyaNo, icraMudurlugu) VALUES (?, ?, 'Ankara')",
+                             ((str(i), f"2024/{i}") for i in range(1, 201)))
+            conn.executemany("INSERT INTO borclular (borclu_id, file_id, ad) VALUES (?, ?, 'Ayşe Demir')",
+                             ((f"{i}_1", str(i)) for i in range(1, 201)))
+            conn.executemany("INSERT INTO borclu_sorgular (borclu_id, type_id, sorgu_verisi, timestamp) VALUES (?, ?, ?, '2024-01-01T00:00:00')",
+                             ((f"{i}_1", SORGU_TYPE_IDS['GSM'], 'x' * 4000) for i in range(1, 201)))
+
+        yield path
+
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    def test_backup_while_pool_is_reading(self, db_path):
+        """The backup is a complete, standalone copy and pooled readers keep working"""
+        dest = os.path.join(os.path.dirname(db_path), 'backup.db')
+        with db_connection() as reader:
+            cursor = reader.execute("SELECT file_id FROM files")
+            cursor.fetchone()
+            result = maintenance.backup(db_path, dest, step_pages=8)
+            assert len(cursor.fetchall()) == 199
+
+        assert result['backup_bytes'] == os.path.getsize(dest)
+        assert not os.path.exists(dest + '-wal')
+        copy = sqlite3.connect(dest)
+        try:
+            assert copy.execute("PRAGMA journal_mode").fetchone()[0] == 'delete'
+            assert copy.execute("SELECT COUNT(*) FROM borclu_sorgular").fetchone()[0] == 200
+        finally:
+            copy.close()
+
+    def test_analyze_writes_statistics(self, db_path):
+        result = maintenance.analyze(db_path)
+
+        assert result['stat_rows'] > 0
+        assert result['elapsed'] >= 0
+
+    def test_incremental_vacuum_reclaims_deleted_pages(self, db_path):
+        """Deleting results leaves free pages; vacuum returns them and reports the bytes"""
+        with db_transaction() as conn:
+            conn.execute("DELETE FROM borclu_sorgular")
+            conn.execute("DELETE FROM borclu_sorgu_history")
+        with db_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        result = maintenance.vacuum(db_path)
+
+        assert result['auto_vacuum'] == maintenance.AUTO_VACUUM_INCREMENTAL
+        assert result['freelist_before'] > 0
+        assert result['freelist_after'] == 0
+        assert result['bytes_reclaimed'] > 0
+
+    def test_vacuum_converts_legacy_database(self, db_path):
+        """A database created without auto_vacuum needs --enable once"""
+        legacy = os.path.join(os.path.dirname(db_path), 'legacy.db')
+        conn = sqlite3.connect(legacy)
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        conn.close()
+
+        with pytest.raises(RuntimeError):
+            maintenance.vacuum(legacy)
+        assert maintenance.vacuum(legacy, enable=True)['auto_vacuum'] == maintenance.AUTO_VACUUM_INCREMENTAL
+
+    def test_check_reports_dangling_foreign_keys(self, db_path):
+        assert maintenance.check(db_path)['ok']
+
+        with db_transaction() as conn:
+            conn.execute("INSERT INTO borclular (borclu_id, file_id, ad) VALUES ('999_1', '999', 'Yetim')")
+        result = maintenance.check(db_path, full=True)
+
+        assert not result['ok']
+        assert result['integrity'] == []
+        assert result['foreign_keys'][0][0] == 'borclular'
+        assert maintenance.main(['--db', db_path, 'check']) == 1
+
+    def test_check_names_dangling_rows_of_without_rowid_tables(self, db_path, caplog):
+        """borclu_sorgular has no rowid, so its dangling rows are logged by primary key"""
+        with db_transaction() as conn:
+            conn.execute("DELETE FROM borclular WHERE borclu_id = '7_1'")
+
+        result = maintenance.check(db_path)
+
+        assert result['foreign_keys'] == [('borclu_sorgular', None, 'borclular', 0)]
+        assert f"borclu_sorgular row (borclu_id='7_1', type_id={SORGU_TYPE_IDS['GSM']}) has no borclular parent" in caplog.text
+
+    def test_truncate_empties_and_shrinks(self, db_path):
+        """All data and its projections are gone, counters stay consistent and the file shrinks"""
+        result = maintenance.truncate(db_path)
+
+        assert result['deleted']['files'] == 200
+        assert result['bytes_reclaimed'] > 0
+        with db_connection() as conn:
+            for table in maintenance.DATA_TABLES:
+                assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+            assert conn.execute("SELECT value FROM db_counters WHERE name = 'files'").fetchone()[0] == 0
+            assert conn.execute("SELECT value FROM db_counters WHERE name = 'last_file_id'").fetchone()[0] == 200
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
@@ -0,0 +1,104 @@
+import pytest
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+
+# Add backend, api and database to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+sys.path.insert(0, os.path.join(backend_path, 'api'))
+database_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database')
+sys.path.insert(0, database_path)
+
+from api_endpoint import app
+from services import database_connection
+from services.database_connection import configure_pool, close_pool, connect, db_connection, db_transaction
+from services.database_schema import ensure_schema
+from services.replica import Replicator, read_status, replica_status
+import maintenance
+
+class TestReplica:
+    """Integration tests for the read replica (services/replica.py)"""
+
+    @pytest.fixture
+    def db_path(self):
+        """A primary with one file, served through the pool"""
+        original_path = database_connection.DB_PATH
+        path = os.path.join(tempfile.mkdtemp(), 'files.db')
+        configure_pool(db_path=path)
+        ensure_schema(path)
+        with db_transaction() as conn:
+            conn.execute("INSERT INTO files (file_id, dosyaNo, icraMudurlugu) VALUES ('1', '2024/1', 'Ankara')")
+
+        yield path
+
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    @pytest.fixture
+    def replicator(self, db_path):
+        replicator = Replicator(db_path, os.path.join(os.path.dirname(db_path), 'replica', 'files.db'))
+        yield replicator
+        replicator.close()
+
+    def add_file(self, file_id):
+        with db_transaction() as conn:
+            conn.execute("INSERT INTO files (file_id, dosyaNo, icraMudurlugu) VALUES (?, ?, 'Ankara')",
+                         (file_id, f"2024/{file_id}"))
+
+    def test_sync_copies_only_when_the_data_changed(self, replicator):
+        assert replicator.sync()['copied']
+        assert not replicator.sync()['copied']
+
+        self.add_file('2')
+        status = replica_status(replicator.replica)
+        assert status['versions_behind'] == 1
+        assert status['lag_seconds'] >= 0
+
+        assert replicator.sync()['copied']
+        assert replica_status(replicator.replica)['versions_behind'] == 0
+        assert replica_status(replicator.replica)['lag_seconds'] == 0
+        assert replicator.syncs == 2
+
+    def test_replica_readers_keep_their_snapshot(self, replicator):
+        replicator.sync()
+        reader = connect(replicator.replica, isolation_level=None, query_only=True)
+        try:
+            reader.execute("BEGIN")
+            assert reader.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 1
+            self.add_file('2')
+            replicator.sync()
+            # The open read transaction still sees the snapshot it started on
+            assert reader.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 1
+            reader.execute("COMMIT")
+            assert reader.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 2
+
+            with pytest.raises(sqlite3.OperationalError):
+                reader.execute("DELETE FROM files")
+        finally:
+            reader.close()
+
+    def test_query_only_pool_serves_the_replica(self, db_path, replicator, monkeypatch):
+        replicator.sync()
+        monkeypatch.setattr(database_connection, 'QUERY_ONLY', True)
+        configure_pool(db_path=replicator.replica)
+
+        with db_connection() as conn:
+            assert conn.execute("SELECT dosyaNo FROM files").fetchone()[0] == '2024/1'
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO files (file_id) VALUES ('9')")
+
+        app.config['TESTING'] = True
+        response = app.test_client().get('/api/replica/status')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['source'] == os.path.abspath(db_path)
+        assert data['versions_behind'] == 0
+
+    def test_replicate_command_and_missing_replica(self, db_path, replicator):
+        assert replica_status(replicator.replica + '.missing') is None
+
+        assert maintenance.main(['--db', db_path, 'replicate', '--replica', replicator.replica, '--once']) == 0
+        assert read_status(replicator.replica)['source'] == os.path.abspath(db_path)
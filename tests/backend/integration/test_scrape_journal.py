@@ -0,0 +1,128 @@
+import pytest
+import sys
+import os
+import gzip
+import json
+import tempfile
+
+# Add backend and database to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+database_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database')
+sys.path.insert(0, database_path)
+
+from services import database_connection
+from services.database_connection import configure_pool, close_pool, db_connection
+from services.database_schema import ensure_schema
+from services.database_writer import save_extract_batch_to_db
+from services.sorgu_payloads import payload_sql
+from services.scrape_journal import ScrapeJournal, iter_journal, journal_segments, journal_source
+from replay_journal import replay_journal
+
+class TestScrapeJournal:
+    """Tests for the append-only scrape journal"""
+
+    @pytest.fixture
+    def journal_dir(self):
+        return tempfile.mkdtemp()
+
+    def test_records_are_read_back_in_order(self, journal_dir):
+        """append and append_many records come back in write order"""
+        journal = ScrapeJournal(journal_dir)
+        journal.append({'n': 1}, 'banka_sorgu')
+        journal.append_many([({'n': 2}, 'gsm_sorgu'), ({'n': 3}, None)])
+        journal.close()
+
+        records = list(iter_journal(journal_dir))
+        assert [record['data'] for record in records] == [{'n': 1}, {'n': 2}, {'n': 3}]
+        assert [record['source'] for record in records] == ['banka_sorgu', 'gsm_sorgu', None]
+        assert all(record['ts'] for record in records)
+
+    def test_full_journal_rotates_and_compresses(self, journal_dir):
+        """Past max_bytes the active file becomes a gzipped segment; reads span all segments"""
+        journal = ScrapeJournal(journal_dir, max_bytes=200, compress=True)
+        for n in range(10):
+            journal.append({'n': n, 'pad': 'x' * 50}, 'sorgu')
+        journal.close()
+
+        segments = journal_segments(journal_dir)
+        assert len(segments) > 2
+        assert all(path.endswith('.jsonl.gz') for path in segments[:-1])
+        assert segments[-1].endswith('scrape_journal.jsonl')
+        with gzip.open(segments[0], 'rt', encoding='utf-8') as f:
+            assert json.loads(f.readline())['data']['n'] == 0
+        assert [record['data']['n'] for record in iter_journal(journal_dir)] == list(range(10))
+
+    def test_truncated_line_is_skipped(self, journal_dir):
+        """A line cut short by a crash does not stop the read"""
+        journal = ScrapeJournal(journal_dir)
+        journal.append({'n': 1})
+        journal.close()
+        with open(os.path.join(journal_dir, 'scrape_journal.jsonl'), 'a', encoding='utf-8') as f:
+            f.write('{"ts": "2024-01-01T00:00:00", "data": {"n"\n')
+        journal = ScrapeJournal(journal_dir)
+        journal.append({'n': 2})
+        journal.close()
+
+        assert [record['data'] for record in iter_journal(journal_dir)] == [{'n': 1}, {'n': 2}]
+
+    def test_since_filters_older_records(self, journal_dir):
+        with open(os.path.join(journal_dir, 'scrape_journal.jsonl'), 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'ts': '2024-01-01T10:00:00', 'source': None, 'data': 1}) + '\n')
+            f.write(json.dumps({'ts': '2024-02-01T10:00:00', 'source': None, 'data': 2}) + '\n')
+
+        assert [record['data'] for record in iter_journal(journal_dir, since='2024-01-15')] == [2]
+
+    def test_journal_source(self):
+        assert journal_source('/home/user/Desktop/extracted_data/banka_sorgu.json') == 'banka_sorgu'
+        assert journal_source(None) is None
+
+class TestReplayJournal:
+    """Rebuilding a database from the journal with database/replay_journal.py"""
+
+    @pytest.fixture
+    def journal_dir(self):
+        """Journal of one extract run followed by two query results"""
+        original_path = database_connection.DB_PATH
+        temp_dir = tempfile.mkdtemp()
+        configure_pool(db_path=os.path.join(temp_dir, 'source.db'))
+        ensure_schema(os.path.join(temp_dir, 'source.db'))
+        processed = save_extract_batch_to_db([{
+            'dosyaNo': '2024/1',
+            'icraMudurlugu': 'Ankara 2. İcra Müdürlüğü',
+            'borcluList': [{'ad': 'Ayşe Demir'}]
+        }])
+        close_pool()
+
+        directory = os.path.join(temp_dir, 'journal')
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'scrape_journal.jsonl'), 'w', encoding='utf-8') as f:
+            for record in (
+                {'ts': '2024-03-01T09:00:00', 'source': 'search_all_files_extract', 'data': processed},
+                {'ts': '2024-03-02T10:00:00', 'source': 'banka_sorgu',
+                 'data': {'2024/1': {'Ayşe Demir': {'Banka': {'sonuc': 'ilk'}}}}},
+                {'ts': '2024-03-03T11:00:00', 'source': 'banka_sorgu',
+                 'data': {'2024/1': {'Ayşe Demir': {'Banka': {'sonuc': 'son'}}}}},
+            ):
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        yield directory
+
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    def test_replay_rebuilds_database(self, journal_dir):
+        """Files, debtors and the latest query result are restored with their journal timestamps"""
+        db_path = os.path.join(os.path.dirname(journal_dir), 'replayed.db')
+
+        assert replay_journal(db_path, journal_dir, batch_size=2) == 3
+
+        configure_pool(db_path=db_path)
+        with db_connection() as conn:
+            assert conn.execute("SELECT dosyaNo FROM files").fetchone()[0] == '2024/1'
+            row = conn.execute(f"SELECT borclu_id, {payload_sql('s')} AS sorgu_verisi, timestamp FROM borclu_sorgular s").fetchone()
+            history = conn.execute("SELECT timestamp FROM borclu_sorgu_history ORDER BY version_id").fetchall()
+        assert row['borclu_id'] == '1_1'
+        assert json.loads(row['sorgu_verisi']) == {'sonuc': 'son'}
+        assert row['timestamp'] == '2024-03-03T11:00:00'
+        assert [h[0] for h in history] == ['2024-03-02T10:00:00', '2024-03-03T11:00:00']
@@ -0,0 +1,17 @@
+import pytest
+import os
+import glob
+import py_compile
+
+# The scraper query modules are imported lazily (sorgulama_common imports them
+# per sorgu) and need selenium and a browser to run, so nothing else in the
+# suite loads them. Compile each one so a broken edit fails here.
+queries_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend', 'scrappers', 'queries')
+QUERY_MODULES = sorted(glob.glob(os.path.join(queries_path, '*.py')))
+
+def test_query_modules_are_found():
+    assert os.path.join(queries_path, 'egm_sorgu.py') in QUERY_MODULES
+
+@pytest.mark.parametrize('path', QUERY_MODULES, ids=os.path.basename)
+def test_query_module_compiles(path, tmp_path):
+    py_compile.compile(path, cfile=str(tmp_path / 'module.pyc'), doraise=True)
@@ -6,12 +6,17 @@ Test script for search_all_files_extract.py with database helper integration
 import sys
 import os
 import json
-from datetime import datetime
+import shutil
+import tempfile
 
 # Add backend directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend'))
 
+from services import database_connection
+from services.database_connection import configure_pool, close_pool
+from services.database_schema import ensure_schema
 from services.database_writer import get_database_connection
+from services import scrape_journal
 
 def test_search_all_files_extract_integration():
     """Test that search_all_files_extract.py data can be saved and retrieved from database"""
@@ -76,35 +81,34 @@ def test_search_all_files_extract_integration():
         }
     ]
     
-    # Create a temporary JSON file for testing
-    test_output_file = f"/tmp/test_extracted_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    # Route the scrape journal (JSON backup) to a temporary directory
+    journal_dir = tempfile.mkdtemp()
+    original_journal = scrape_journal.journal
+    scrape_journal.journal = scrape_journal.ScrapeJournal(journal_dir)
+
+    # Route the pool to a temporary database so database/files.db is left untouched
+    original_db_path = database_connection.DB_PATH
+    db_path = os.path.join(journal_dir, 'files.db')
+    configure_pool(db_path=db_path)
+    ensure_schema(db_path)
     
     try:
         # Import the database helper function
         from services.database_writer import save_scraping_data_to_db_and_json
         
-        print(f"📝 Saving sample data to database and {test_output_file}...")
+        print(f"📝 Saving sample data to database and the journal in {journal_dir}...")
         
         # Save the sample data
-        save_scraping_data_to_db_and_json(sample_data, test_output_file)
+        save_scraping_data_to_db_and_json(sample_data, "/tmp/search_all_files_extract.json")
         
         print("✅ Data saved successfully!")
         
-        # Verify JSON file was created
-        if os.path.exists(test_output_file):
-            print(f"✅ JSON backup file created: {test_output_file}")
-            
-            # Read and verify JSON content
-            with open(test_output_file, 'r', encoding='utf-8') as f:
-                saved_data = json.load(f)
-            
-            if saved_data == sample_data:
-                print("✅ JSON file content matches original data")
-            else:
-                print("❌ JSON file content does not match original data")
-                return False
+        # Verify the journal record was appended
+        records = list(scrape_journal.iter_journal(journal_dir))
+        if len(records) == 1 and records[0]['data'] == sample_data:
+            print("✅ Journal record matches original data")
         else:
-            print(f"❌ JSON backup file was not created: {test_output_file}")
+            print("❌ Journal record does not match original data")
             return False
         
         # Verify data in database
@@ -160,10 +164,13 @@ def test_search_all_files_extract_integration():
         return False
     
     finally:
-        # Clean up test file
-        if os.path.exists(test_output_file):
-            os.remove(test_output_file)
-            print(f"🧹 Cleaned up test file: {test_output_file}")
+        # Clean up the test journal
+        scrape_journal.journal.close()
+        scrape_journal.journal = original_journal
+        close_pool()
+        database_connection.DB_PATH = original_db_path
+        shutil.rmtree(journal_dir, ignore_errors=True)
+        print(f"🧹 Cleaned up test journal: {journal_dir}")
 
 if __name__ == "__main__":
     success = test_search_all_files_extract_integration()
@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+
+# Add backend to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+from services.sorgu_cache import SorguCache
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestSorguCache:
+    """Tests for the LRU + TTL sorgu result cache"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def cache(self, clock):
+        return SorguCache(max_bytes=100, ttl=60, clock=clock)
+
+    def test_hit_and_miss_counters(self, cache):
+        """Lookups are counted as hits or misses"""
+        assert cache.get(('1_1', 'Banka')) is None
+        cache.put(('1_1', 'Banka'), {"data": {}}, 10)
+
+        assert cache.get(('1_1', 'Banka')) == {"data": {}}
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+        assert (stats['entries'], stats['bytes']) == (1, 10)
+
+    def test_least_recently_used_entry_is_evicted(self, cache):
+        """Going over max_bytes drops the least recently used entries first"""
+        cache.put(('1_1', 'Banka'), 'banka', 40)
+        cache.put(('1_1', 'EGM'), 'egm', 40)
+        cache.get(('1_1', 'Banka'))
+        cache.put(('1_2', 'GSM'), 'gsm', 40)
+
+        assert cache.get(('1_1', 'EGM')) is None
+        assert cache.get(('1_1', 'Banka')) == 'banka'
+        assert cache.get(('1_2', 'GSM')) == 'gsm'
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['bytes'] == 80
+
+    def test_oversized_entry_is_not_stored(self, cache):
+        """An entry larger than the whole cache is skipped"""
+        cache.put(('1_1', 'Banka'), 'banka', 101)
+
+        assert cache.stats()['entries'] == 0
+
+    def test_entries_expire_after_ttl(self, cache, clock):
+        """Expired entries count as misses and are dropped"""
+        cache.put(('1_1', 'Banka'), 'banka', 10)
+        clock.now = 59
+        assert cache.get(('1_1', 'Banka')) == 'banka'
+
+        clock.now = 60
+        assert cache.get(('1_1', 'Banka')) is None
+        assert cache.stats()['expirations'] == 1
+        assert cache.stats()['bytes'] == 0
+
+    def test_invalidate_one_type_or_whole_borclu(self, cache):
+        """invalidate drops one sorgu tipi, or every entry of a borclu"""
+        cache.put(('1_1', 'Banka'), 'banka', 10)
+        cache.put(('1_1', 'EGM'), 'egm', 10)
+        cache.put(('1_2', 'EGM'), 'egm', 10)
+
+        cache.invalidate('1_1', 'Banka')
+        assert cache.get(('1_1', 'Banka')) is None
+        assert cache.get(('1_1', 'EGM')) == 'egm'
+
+        cache.invalidate('1_1')
+        assert cache.get(('1_1', 'EGM')) is None
+        assert cache.get(('1_2', 'EGM')) == 'egm'
+        assert cache.stats()['invalidations'] == 2
+
+    def test_stale_read_is_not_stored_after_invalidation(self, cache):
+        """A value read before a concurrent write's invalidation is discarded"""
+        generation = cache.generation
+        cache.invalidate('1_1', 'Banka')
+        cache.put(('1_1', 'Banka'), 'stale', 10, generation)
+
+        assert cache.get(('1_1', 'Banka')) is None
+
+    def test_zero_max_bytes_disables_cache(self, clock):
+        """With max_bytes = 0 nothing is ever stored"""
+        cache = SorguCache(max_bytes=0, ttl=60, clock=clock)
+        cache.put(('1_1', 'Banka'), 'banka', 1)
+
+        assert cache.get(('1_1', 'Banka')) is None
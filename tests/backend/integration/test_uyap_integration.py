@@ -240,8 +240,8 @@ class TestUYAPIntegration:
             assert "9092" not in sessions
     
     @patch('scrappers.queries.sorgulama_common.perform_sorgulama')
-    @patch('uyap_service.get_borclu_sorgu_by_tipi')
-    def test_trigger_sorgulama_success(self, mock_get_sorgu, mock_perform_sorgulama):
+    @patch('uyap_service.get_storage')
+    def test_trigger_sorgulama_success(self, mock_get_storage, mock_perform_sorgulama):
         """Test successful trigger sorgulama"""
         # Setup active session
         sessions = get_uyap_sessions()
@@ -250,7 +250,7 @@ class TestUYAPIntegration:
         sessions["9092"] = mock_driver
         
         # Mock sorgulama results
-        mock_get_sorgu.return_value = {
+        mock_get_storage.return_value.get_borclu_sorgu.return_value = {
             "data": {"test": "data"},
             "timestamp": "2024-01-01T00:00:00"
         }
@@ -0,0 +1,116 @@
+import pytest
+import sys
+import os
+import json
+import tempfile
+
+# Add backend to path - fix the path to work from tests directory
+backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
+sys.path.insert(0, backend_path)
+
+from services import database_connection, scrape_journal
+from services.database_connection import configure_pool, close_pool, db_connection
+from services.database_schema import ensure_schema
+from services.database_writer import save_extract_batch_to_db
+from services.sorgu_payloads import payload_sql
+from services.sorgu_cache import sorgu_cache
+from services.write_queue import WriteQueue
+
+class TestWriteQueue:
+    """Integration tests for the background scraper writer against a real temporary database"""
+
+    @pytest.fixture
+    def real_db(self, monkeypatch):
+        """Seed one file with two debtors in a temporary database; journal into the same directory"""
+        original_path = database_connection.DB_PATH
+        temp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(temp_dir, 'files.db')
+        monkeypatch.setattr(scrape_journal, 'journal', scrape_journal.ScrapeJournal(os.path.join(temp_dir, 'journal')))
+        configure_pool(db_path=db_path)
+        ensure_schema(db_path)
+        sorgu_cache.clear()
+        save_extract_batch_to_db([{
+            'dosyaNo': '2024/1',
+            'icraMudurlugu': 'Ankara 2. İcra Müdürlüğü',
+            'borcluList': [{'ad': 'Ayşe Demir'}, {'ad': 'Mehmet Demir'}]
+        }])
+
+        yield temp_dir
+
+        sorgu_cache.clear()
+        scrape_journal.journal.close()
+        close_pool()
+        database_connection.DB_PATH = original_path
+
+    @pytest.fixture
+    def writer(self, real_db):
+        writer = WriteQueue(max_size=10, commit_window=0.2, max_batch=10)
+        yield writer
+        writer.shutdown(timeout=5)
+
+    def stored(self):
+        with db_connection() as conn:
+            rows = conn.execute(f"SELECT borclu_id, t.name AS sorgu_tipi, {payload_sql('s')} AS sorgu_verisi "
+                                f"FROM borclu_sorgular s JOIN sorgu_types t USING (type_id) ORDER BY borclu_id, sorgu_tipi").fetchall()
+        return {(row['borclu_id'], row['sorgu_tipi']): json.loads(row['sorgu_verisi']) for row in rows}
+
+    def test_results_are_group_committed(self, real_db, writer):
+        """Results submitted within the commit window share one transaction"""
+        statements = []
+        with db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            writer.submit({'2024/1': {'Ayşe Demir': {'Banka': {'sonuc': '1 banka'}}}}, os.path.join(real_db, 'banka.json'))
+            writer.submit({'2024/1': {'Mehmet Demir': {'GSM': {'sonuc': '1 hat'}}}}, os.path.join(real_db, 'gsm.json'))
+            writer.submit({'2024/1': {'Ayşe Demir': {'EGM': {'sonuc': 'yok'}}}}, os.path.join(real_db, 'egm.json'))
+            assert writer.flush(timeout=5)
+        finally:
+            with db_connection() as conn:
+                conn.set_trace_callback(None)
+
+        assert set(self.stored()) == {('1_1', 'Banka'), ('1_1', 'EGM'), ('1_2', 'GSM')}
+        assert statements.count('BEGIN IMMEDIATE') == 1
+        assert writer.stats()['batches'] == 1
+        assert writer.stats()['items_written'] == 3
+
+    def test_submitted_data_is_snapshotted(self, real_db, writer):
+        """Changes the scraper makes after submitting do not leak into the queued write"""
+        extracted_data = {'2024/1': {'Ayşe Demir': {'Banka': {'sonuc': 'ilk'}}}}
+        writer.submit(extracted_data, os.path.join(real_db, 'banka.json'))
+        extracted_data['2024/1']['Ayşe Demir']['Banka']['sonuc'] = 'sonra'
+        writer.flush(timeout=5)
+
+        assert self.stored()[('1_1', 'Banka')] == {'sonuc': 'ilk'}
+
+    def test_batch_is_journaled_in_order(self, real_db, writer):
+        """Every submitted result is appended to the journal, tagged with its backup name"""
+        filename = os.path.join(real_db, 'banka.json')
+        writer.submit({'2024/1': {'Ayşe Demir': {'Banka': {'sonuc': 'ilk'}}}}, filename)
+        writer.submit({'2024/1': {'Ayşe Demir': {'Banka': {'sonuc': 'son'}}}}, filename)
+        writer.submit({'2024/1': {'Mehmet Demir': {'GSM': {'sonuc': '1 hat'}}}}, os.path.join(real_db, 'gsm.json'))
+        writer.flush(timeout=5)
+
+        records = list(scrape_journal.iter_journal(os.path.join(real_db, 'journal')))
+        assert [record['source'] for record in records] == ['banka', 'banka', 'gsm']
+        assert records[1]['data'] == {'2024/1': {'Ayşe Demir': {'Banka': {'sonuc': 'son'}}}}
+        assert self.stored()[('1_1', 'Banka')] == {'sonuc': 'son'}
+
+    def test_failed_item_does_not_lose_batch(self, real_db, writer):
+        """A result that cannot be written is skipped; the rest of the batch is committed"""
+        writer.submit({'2024/9': {'Bilinmeyen': {'Banka': {'sonuc': 'x'}}}}, os.path.join(real_db, 'a.json'))
+        writer.submit({'2024/1': {'Ayşe Demir': {'MERNİS': {'sonuc': 'not a dict'}}}}, os.path.join(real_db, 'b.json'))
+        writer.submit({'2024/1': {'Mehmet Demir': {'GSM': {'sonuc': '1 hat'}}}}, os.path.join(real_db, 'c.json'))
+        writer.flush(timeout=5)
+
+        assert set(self.stored()) == {('1_1', 'MERNİS'), ('1_2', 'GSM')}
+
+    def test_shutdown_flushes_pending_writes(self, real_db):
+        """Stopping the writer commits everything that was queued"""
+        writer = WriteQueue(max_size=10, commit_window=0.5, max_batch=10)
+        writer.submit({'2024/1': {'Ayşe Demir': {'Banka': {'sonuc': '1 banka'}}}}, os.path.join(real_db, 'banka.json'))
+
+        assert writer.shutdown(timeout=5)
+
+        assert ('1_1', 'Banka') in self.stored()
+        with pytest.raises(RuntimeError):
+            writer.submit({}, None)